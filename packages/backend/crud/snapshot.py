@@ -1,4 +1,4 @@
-from sqlmodel import Session
+from sqlmodel import Session, delete
 from pathlib import Path
 from models.snapshot import Snapshot
 
@@ -17,5 +17,41 @@ def snapshot_register(db: Session, snapshot_data):
     db.refresh(snapshot)
     
     return snapshot
-    
-    
\ No newline at end of file
+
+def snapshot_register_bulk(db: Session, snapshots_data):
+    """여러 스냅샷을 하나의 트랜잭션으로 등록"""
+    snapshots = [
+        Snapshot(
+            class_div=snapshot_data["class_div"],
+            hw_name=snapshot_data["hw_name"],
+            student_id=snapshot_data["student_id"],
+            filename=snapshot_data["filename"],
+            timestamp=snapshot_data["timestamp"],
+            file_size=snapshot_data["file_size"]
+        )
+        for snapshot_data in snapshots_data
+    ]
+
+    db.add_all(snapshots)
+    db.commit()
+
+    return len(snapshots)
+
+def snapshot_delete_bulk(db: Session, snapshots_data):
+    """보존 정책으로 솎아낸 스냅샷 행을 하나의 트랜잭션으로 삭제하고 항목별 삭제 여부를 반환"""
+    deleted = []
+    for snapshot_data in snapshots_data:
+        result = db.exec(
+            delete(Snapshot).where(
+                Snapshot.class_div == snapshot_data["class_div"],
+                Snapshot.hw_name == snapshot_data["hw_name"],
+                Snapshot.student_id == snapshot_data["student_id"],
+                Snapshot.filename == snapshot_data["filename"],
+                Snapshot.timestamp == snapshot_data["timestamp"],
+            )
+        )
+        deleted.append(result.rowcount > 0)
+
+    db.commit()
+
+    return deleted
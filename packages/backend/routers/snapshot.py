@@ -4,8 +4,9 @@ from pathlib import Path
 from db.connection import get_session
 from sqlmodel import Session
 from fastapi import Depends
-from crud.snapshot import snapshot_register
-from schemas.snapshot import SnapshotCreate
+from crud.snapshot import snapshot_register, snapshot_register_bulk, snapshot_delete_bulk
+from schemas.snapshot import SnapshotCreate, SnapshotBulkItem, SnapshotThinnedItem
+from typing import List
 from schemas.config import settings
 from urllib.parse import unquote
 from datetime import datetime, timezone, timedelta
@@ -16,6 +17,50 @@ def convert_to_kst(timestamp_str: str) -> datetime:
     dt_utc = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
     return dt_utc + timedelta(hours=9)
 
+def to_kst_timestamp_str(timestamp: str) -> str:
+    only_timestamp = timestamp.split('.')[0]
+    return convert_to_kst(only_timestamp).strftime("%Y%m%d_%H%M%S")
+
+#스냅샷 일괄 등록 (하나의 트랜잭션)
+@router.post("/api/snapshots/bulk")
+def register_snapshots_bulk(
+    snapshots: List[SnapshotBulkItem] = Body(...),
+    db: Session=Depends(get_session)
+):
+    snapshots_data = [
+        {
+            "class_div": snapshot.class_div,
+            "hw_name": snapshot.hw_name,
+            "student_id": snapshot.student_id,
+            "filename": snapshot.filename,
+            "timestamp": to_kst_timestamp_str(snapshot.timestamp),
+            "file_size": snapshot.bytes
+        }
+        for snapshot in snapshots
+    ]
+    count = snapshot_register_bulk(db=db, snapshots_data=snapshots_data)
+    return {"message": "Snapshots registered successfully", "count": count}
+
+#보존 정책으로 솎아낸 스냅샷 삭제 (하나의 트랜잭션)
+@router.post("/api/snapshots/thinned")
+def delete_thinned_snapshots(
+    snapshots: List[SnapshotThinnedItem] = Body(...),
+    db: Session=Depends(get_session)
+):
+    snapshots_data = [
+        {
+            "class_div": snapshot.class_div,
+            "hw_name": snapshot.hw_name,
+            "student_id": snapshot.student_id,
+            "filename": snapshot.filename,
+            "timestamp": to_kst_timestamp_str(snapshot.timestamp),
+        }
+        for snapshot in snapshots
+    ]
+    deleted = snapshot_delete_bulk(db=db, snapshots_data=snapshots_data)
+    # deleted: 요청 순서대로 DB 행을 실제로 지웠는지 (filemon은 지운 항목의 파일만 삭제)
+    return {"message": "Thinned snapshots deleted successfully", "count": sum(deleted), "deleted": deleted}
+
 #스냅샷 등록
 @router.post("/api/{class_div}/{hw_name}/{student_id}/{filename}/{timestamp}")
 def register_snapshot(
@@ -27,10 +72,7 @@ def register_snapshot(
     file_size: SnapshotCreate = Body(...),
     db: Session=Depends(get_session)
 ):
-    only_timestamp = timestamp.split('.')[0]
-    
-    timestamp_kst = convert_to_kst(only_timestamp)
-    timestamp_kst_str = timestamp_kst.strftime("%Y%m%d_%H%M%S")
+    timestamp_kst_str = to_kst_timestamp_str(timestamp)
     
     # file_depth = unquote(filename).replace('@', '/')   # 모든 @ 문자를 / 로 변환
     
@@ -3,6 +3,21 @@ from pydantic import BaseModel
 class SnapshotCreate(BaseModel):
     bytes: int
 
+class SnapshotBulkItem(BaseModel):
+    class_div: str   # 수업-분반
+    hw_name: str     # 과제명
+    student_id: int  # 학번
+    filename: str    # 과제 코드 파일명
+    timestamp: str   # 타임스탬프 (UTC, YYYYMMDD_HHMMSS)
+    bytes: int       # 파일 크기
+
+class SnapshotThinnedItem(BaseModel):
+    class_div: str   # 수업-분반
+    hw_name: str     # 과제명
+    student_id: int  # 학번
+    filename: str    # 과제 코드 파일명
+    timestamp: str   # 타임스탬프 (UTC, YYYYMMDD_HHMMSS)
+
 # class Snapshot(BaseModel):
 #     class_div: str   # 수업-분반
 #     hw_name: str     # 과제명
@@ -1,5 +1,12 @@
 import asyncio
-from app.main import main
+import sys
+from app.config.settings import settings
 
 if __name__ == "__main__":
+    if settings.FILEMON_WORKERS > 1:
+        # 학생 디렉토리 해시로 나눈 워커 프로세스를 슈퍼바이저가 관리
+        from app.supervisor import run_supervisor
+        sys.exit(run_supervisor())
+
+    from app.main import main
     asyncio.run(main())
@@ -0,0 +1,130 @@
+import errno
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from app.utils.logger import get_logger
+from app.utils.metrics import record_dedup_result, record_blob_gc
+
+logger = get_logger(__name__)
+
+
+class BlobStore:
+    """
+    내용 주소 기반(content-addressed) 블롭 저장소.
+    동일한 내용은 해시로 식별되는 하나의 블롭 파일로만 저장하고,
+    학생별 타임스탬프 스냅샷 파일은 블롭에 대한 하드 링크(참조)로 생성합니다.
+    블롭의 참조 수는 파일시스템의 링크 수(st_nlink)로 관리되므로
+    링크 수가 1인 블롭(스냅샷에서 더 이상 참조하지 않음)은 GC 대상입니다.
+    """
+
+    def __init__(self, root: Path, gc_grace_seconds: float = 600):
+        self.root = Path(root)
+        self.gc_grace_seconds = gc_grace_seconds
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """내용 해시 계산 (blake2b-128)"""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def blob_path(self, digest: str) -> Path:
+        """해시에 해당하는 블롭 경로 (앞 2글자로 디렉토리 분산)"""
+        return self.root / digest[:2] / digest
+
+    def link_snapshot(self, data: bytes, snapshot_path: Path) -> bool:
+        """
+        블롭을 저장(없는 경우)하고 스냅샷 경로에 하드 링크를 생성합니다.
+
+        Returns:
+            bool: 기존 블롭을 재사용(중복 제거)했는지 여부
+        """
+        blob = self.blob_path(self.digest(data))
+        reused = blob.exists()
+        if not reused:
+            self._write_blob(blob, data)
+
+        try:
+            self._link(blob, snapshot_path)
+        except FileNotFoundError:
+            # 존재 확인 후 링크 전에 GC가 블롭을 지운 경우 다시 저장 후 링크
+            reused = False
+            self._write_blob(blob, data)
+            self._link(blob, snapshot_path)
+        except OSError as e:
+            if e.errno not in (errno.EMLINK, errno.EXDEV, errno.EPERM, errno.ENOTSUP):
+                raise
+            # 링크 수 한도 초과 또는 하드 링크 미지원 파일시스템: 일반 파일로 저장
+            # (스냅샷 경로가 이미 다른 블롭의 링크일 수 있으므로 제자리에서 덮어쓰지 않고 교체)
+            logger.debug("하드 링크 생성 불가, 일반 파일로 저장",
+                        snapshot_path=str(snapshot_path),
+                        errno=e.errno)
+            reused = False
+            self._replace_file(snapshot_path, data)
+
+        record_dedup_result("hit" if reused else "miss")
+        return reused
+
+    def collect_garbage(self) -> int:
+        """
+        어떤 스냅샷도 참조하지 않는 블롭(st_nlink == 1)을 삭제합니다.
+        막 저장되어 아직 링크되지 않은 블롭을 보호하기 위해 유예 시간 이내의 블롭은 건너뜁니다.
+
+        Returns:
+            int: 삭제한 블롭 수
+        """
+        if not self.root.exists():
+            return 0
+
+        removed = 0
+        freed_bytes = 0
+        cutoff = time.time() - self.gc_grace_seconds
+        for shard in os.scandir(self.root):
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    if st.st_nlink > 1 or st.st_mtime > cutoff:
+                        continue
+                    os.unlink(entry.path)
+                    removed += 1
+                    freed_bytes += st.st_size
+                except FileNotFoundError:
+                    continue
+
+        record_blob_gc(removed, freed_bytes)
+        logger.info("블롭 GC 완료", removed=removed, freed_bytes=freed_bytes)
+        return removed
+
+    def _write_blob(self, blob: Path, data: bytes):
+        """임시 파일에 쓴 뒤 원자적으로 교체하여 블롭 저장"""
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        self._replace_file(blob, data)
+
+    def _link(self, blob: Path, snapshot_path: Path):
+        """스냅샷 경로에 블롭 하드 링크 생성 (이미 있으면 교체)"""
+        try:
+            os.link(blob, snapshot_path)
+        except FileExistsError:
+            os.unlink(snapshot_path)
+            os.link(blob, snapshot_path)
+
+    @staticmethod
+    def _replace_file(path: Path, data: bytes):
+        """
+        같은 디렉토리의 고유한 임시 파일에 쓴 뒤 os.replace로 교체합니다.
+        같은 내용을 여러 스레드가 동시에 저장해도 임시 파일이 겹치지 않고,
+        기존 경로가 하드 링크여도 공유 inode를 잘라내지 않습니다.
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
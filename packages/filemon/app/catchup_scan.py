@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from watchdog.events import FileModifiedEvent
+from app.models.source_file_info import SourceFileInfo
+from app.manifest import content_digest
+from app.notebook import normalize_notebook
+from app.snapshot import SnapshotManager
+from app.source_path_filter import PathFilter
+from app.source_path_parser import SourcePathParser
+from app.tracing import start_trace
+from app.utils.logger import get_logger
+from app.utils.metrics import record_catchup_files, set_catchup_pending_dirs, record_raw_event
+
+logger = get_logger(__name__)
+
+
+class CatchUpScanner:
+    """
+    시작 시 재시작·업그레이드 중에 놓친 변경을 찾는 일회성 스캐너.
+
+    WATCH_ROOT의 과제 디렉토리(과목-분반-학번/hwN) 단위로 스레드 풀에서 병렬 탐색하며,
+    각 소스 파일을 마지막으로 캡처한 스냅샷과 비교합니다. 파일 mtime이 스냅샷 시각보다
+    이전이면 바로 건너뛰고, 그렇지 않으면 크기와 내용을 비교합니다. 변경된 파일(또는 스냅샷이
+    없는 파일)만 modified 이벤트로 raw 큐에 넣으며, 실시간 이벤트가 밀리지 않도록 초당
+    이벤트 수를 rate로 제한합니다.
+    notebook_max_file_size가 주어지면 노트북(.ipynb)은 파이프라인과 같이 정규화한 내용으로
+    비교합니다 (크기 제한도 원본 대신 이 값을 사용).
+    """
+
+    def __init__(self, watch_root: Path, path_filter: PathFilter, parser: SourcePathParser,
+                 snapshot_manager: SnapshotManager, executor: ThreadPoolExecutor,
+                 concurrency: int = 4, rate: float = 200, max_file_size: int = 64 * 1024,
+                 notebook_max_file_size: Optional[int] = None):
+        self.watch_root = Path(watch_root)
+        self.path_filter = path_filter
+        self.parser = parser
+        self.snapshot_manager = snapshot_manager
+        self.executor = executor
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.max_file_size = max_file_size
+        self.notebook_max_file_size = notebook_max_file_size
+
+    async def run(self, raw_queue, student_dirs: Optional[List[str]] = None) -> int:
+        """
+        전체 스캔을 실행하고 큐에 넣은 이벤트 수를 반환합니다.
+        student_dirs가 주어지면 해당 학생 디렉토리만 스캔합니다 (lazy 감시에서 watch를 새로 등록한 작업 공간 등).
+        """
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        hw_dirs = await loop.run_in_executor(self.executor, self._list_hw_dirs, student_dirs)
+        logger.info("캐치업 스캔 시작", hw_dirs=len(hw_dirs), concurrency=self.concurrency)
+
+        pending = len(hw_dirs)
+        set_catchup_pending_dirs(pending)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # 이벤트 간 최소 간격 (rate 제한)
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        next_slot = loop.time()
+        enqueued = 0
+
+        async def scan(hw_dir: str) -> List[str]:
+            async with semaphore:
+                return await loop.run_in_executor(self.executor, self._scan_hw_dir, hw_dir)
+
+        for completed in asyncio.as_completed([scan(d) for d in hw_dirs]):
+            changed = await completed
+            pending -= 1
+            set_catchup_pending_dirs(pending)
+            for path in changed:
+                delay = next_slot - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_slot = max(next_slot, loop.time()) + interval
+                record_raw_event("modified")
+                raw_queue.put_nowait(start_trace(FileModifiedEvent(path)))
+                enqueued += 1
+
+        logger.info("캐치업 스캔 완료", hw_dirs=len(hw_dirs), enqueued=enqueued,
+                   elapsed=round(time.monotonic() - started, 3))
+        return enqueued
+
+    def _list_hw_dirs(self, student_dirs: Optional[List[str]] = None) -> List[str]:
+        """WATCH_ROOT(또는 student_dirs) 아래의 과제 디렉토리 목록 (병렬 처리 단위)"""
+        hw_dirs = []
+        if student_dirs is None:
+            student_dirs = self._subdirs(str(self.watch_root))
+        for student_dir in student_dirs:
+            hw_dirs.extend(self._subdirs(student_dir))
+        return hw_dirs
+
+    def _subdirs(self, path: str) -> List[str]:
+        try:
+            with os.scandir(path) as it:
+                return [entry.path for entry in it
+                        if entry.is_dir(follow_symlinks=False) and self.path_filter.should_descend(entry.path)]
+        except OSError:
+            logger.debug("디렉토리 목록 읽기 실패", path=path, exc_info=True)
+            return []
+
+    def _scan_hw_dir(self, hw_dir: str) -> List[str]:
+        """과제 디렉토리 하나를 탐색하여 변경된 파일 경로 목록을 반환 (스레드 풀에서 실행)"""
+        changed = []
+        for root, dirnames, filenames in os.walk(hw_dir):
+            dirnames[:] = [d for d in dirnames if self.path_filter.should_descend(os.path.join(root, d))]
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if not self.path_filter.should_process(path):
+                    continue
+                try:
+                    result = self._compare(path)
+                except Exception:
+                    logger.debug("캐치업 비교 실패", path=path, exc_info=True)
+                    result = "error"
+                record_catchup_files(result)
+                if result == "changed":
+                    changed.append(path)
+        return changed
+
+    def _compare(self, path: str) -> str:
+        """
+        파일을 마지막 스냅샷과 비교합니다.
+
+        Returns:
+            str: "changed", "unchanged", "too_large" 중 하나
+        """
+        st = os.stat(path)
+        is_notebook = self.notebook_max_file_size is not None and path.endswith(".ipynb")
+        if st.st_size > (self.notebook_max_file_size if is_notebook else self.max_file_size):
+            return "too_large"
+
+        source_info = SourceFileInfo.from_parsed_data(self.parser.parse(Path(path)), Path(path))
+        # 매니페스트에 기록이 있으면 스냅샷 디렉토리 탐색과 스냅샷 읽기 없이 크기·해시로 비교
+        entry = self.snapshot_manager.latest_manifest_entry(source_info)
+        timestamp = entry.timestamp if entry is not None else self.snapshot_manager.latest_snapshot_timestamp(source_info)
+        if timestamp is None:
+            return "changed"
+
+        # 스냅샷 시각(초 단위) 이전에 마지막으로 수정된 파일은 이미 캡처됨
+        captured_at = datetime.strptime(timestamp, "%Y%m%d_%H%M%S").timestamp()
+        if st.st_mtime < captured_at:
+            return "unchanged"
+
+        if entry is not None and entry.digest is not None:
+            snapshot_size = entry.size
+        else:
+            snapshot = self.snapshot_manager.load_snapshot(source_info, timestamp)
+            snapshot_size = len(snapshot)
+        if not is_notebook and snapshot_size != st.st_size:
+            return "changed"
+        with open(path, "rb") as f:
+            data = f.read()
+        if is_notebook:
+            try:
+                data = normalize_notebook(data)
+            except ValueError:
+                pass  # 파이프라인도 노트북 형식이 아니면 원본을 그대로 저장
+        if entry is not None and entry.digest is not None:
+            return "unchanged" if content_digest(data) == entry.digest else "changed"
+        return "unchanged" if data == snapshot else "changed"
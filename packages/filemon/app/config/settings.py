@@ -1,28 +1,132 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from datetime import datetime
+from typing import Dict, Literal
 
 class Settings(BaseSettings):
     WATCH_ROOT: Path = Path('/watcher/codes')
     SNAPSHOT_BASE: Path = Path('/watcher/snapshots')
+    # 변경 감지 방식
+    # inotify: watchdog Observer만 사용, scan: stat 스캐너만 사용 (NFS 원격 쓰기 감지)
+    # hybrid: 두 방식을 함께 사용 (로컬 쓰기는 inotify로 즉시, 원격 쓰기는 스캐너로 감지)
+    WATCH_MODE: Literal["inotify", "scan", "hybrid"] = "inotify"
+    WATCH_PRUNE_ENABLED: bool = True  # 무시 대상 하위 트리(가상환경, .git 등)에는 inotify watch를 등록하지 않음
+    # lazy 감시: 작업 공간(WATCH_ROOT 바로 아래 디렉토리)과 과제 디렉토리에는 얕은 watch만 두고, 그 안에서 쓰기
+    # 이벤트가 감지되거나 stat 스캐너가 변경을 찾으면 하위 전체에 watch를 등록
+    # (WATCH_PRUNE_ENABLED와 WATCH_MODE=hybrid 필요, 그 밖에는 무시하고 전체 watch 등록)
+    # 플랫폼은 작업 공간 디렉토리를 touch하여 활성화를 알릴 수 있음
+    WATCH_LAZY_ENABLED: bool = False
+    WATCH_LAZY_IDLE_TTL: float = 1800  # 쓰기 활동이 없으면 하위 watch를 해제할 시간 (초)
+    WATCH_LAZY_RELEASE_INTERVAL: float = 60  # 유휴 작업 공간 확인 주기 (초)
+    SCANNER_MIN_INTERVAL: float = 2  # 최근 변경이 있는 디렉토리의 스캔 주기 (초)
+    SCANNER_MAX_INTERVAL: float = 60  # 변경이 없는 디렉토리의 최대 스캔 주기 (초)
+    SCANNER_MAX_DIRS_PER_PASS: int = 500  # 한 번에 스캔할 최대 디렉토리 수
+    SCANNER_INDEX_PATH: Path = Path('/opt/filemon/logs/scanner-index.json')  # 스캔 인덱스 저장 경로 (영구 볼륨)
+    SCANNER_CHECKPOINT_INTERVAL: float = 60  # 스캔 인덱스 저장 주기 (초)
+    # 시작 시 캐치업 스캔 (재시작·업그레이드 중 놓친 변경을 마지막 스냅샷과 비교하여 감지)
+    CATCHUP_SCAN_ENABLED: bool = True
+    CATCHUP_SCAN_CONCURRENCY: int = 4  # 동시에 탐색할 과제 디렉토리 수
+    CATCHUP_SCAN_RATE: float = 200  # 초당 큐에 넣는 최대 이벤트 수 (실시간 이벤트 보호)
     MAX_CAPTURABLE_FILE_SIZE: int = 64 * 1024  # 64KB - 저장할 수 있는 최대 파일 크기
+    NOTEBOOK_NORMALIZE: bool = True  # .ipynb는 출력·실행 정보를 지운 셀 소스만 저장 (크기 제한은 정규화 후 크기에 적용)
+    NOTEBOOK_MAX_FILE_SIZE: int = 32 * 1024 * 1024  # 32MB - 정규화를 위해 읽을 노트북 원본의 최대 크기
+    # MAX_CAPTURABLE_FILE_SIZE를 넘는 파일 처리 (청크 단위 스트리밍, 등록 크기는 원본 크기)
+    # skip: 건너뜀, excerpt: 앞·뒤 발췌본 + 전체 해시 저장, full: LARGE_FILE_MAX_SIZE까지 전체 복사
+    LARGE_FILE_MODE: Literal["skip", "excerpt", "full"] = "excerpt"
+    LARGE_FILE_MAX_SIZE: int = 256 * 1024 * 1024  # 256MB - full 모드에서 전체 복사할 최대 크기 (초과 시 발췌본)
+    LARGE_FILE_EXCERPT_BYTES: int = 32 * 1024  # 32KB - 발췌본에 남길 앞·뒤 각각의 크기
     API_SERVER: str = "http://localhost:8080"  # API 서버 주소
     API_TIMEOUT_TOTAL: int = 20
     
+    # HTTP 커넥션 풀 설정
+    API_POOL_SIZE: int = 100  # 전체 커넥션 풀 최대 크기
+    API_POOL_PER_HOST: int = 32  # 호스트당 최대 동시 커넥션 수
+    API_KEEPALIVE_TIMEOUT: float = 30  # 유휴 커넥션 유지 시간 (초)
+    
+    # 스냅샷 일괄 등록(배치) 설정
+    API_BATCH_ENABLED: bool = False  # 등록 요청을 모아 bulk API로 전송할지 여부
+    API_BATCH_MAX_SIZE: int = 100  # 한 번에 전송할 최대 등록 수
+    API_BATCH_MAX_LINGER: float = 0.2  # 배치를 채우기 위해 기다리는 최대 시간 (초)
+    
+    # 등록 실패 재전송(outbox) 설정
+    OUTBOX_ENABLED: bool = True  # 등록에 실패한 스냅샷을 로컬 outbox에 저장하고 재전송할지 여부
+    OUTBOX_PATH: Path = Path('/opt/filemon/logs/outbox.db')  # outbox SQLite 파일 경로 (영구 볼륨)
+    OUTBOX_RETRY_INTERVAL: float = 5  # 재전송 대상 확인 주기 (초)
+    OUTBOX_BACKOFF_BASE: float = 2  # 재시도 대기 시간 기본값 (초, 시도마다 2배)
+    OUTBOX_BACKOFF_MAX: float = 300  # 재시도 대기 시간 상한 (초)
+    OUTBOX_MAX_ATTEMPTS: int = 100  # 이 횟수만큼 실패하면 재시도를 멈추고 dead-letter 테이블로 이동 (0이면 무제한)
+    
+    # 스냅샷 저장 방식 설정
+    # file: 스냅샷마다 전체 내용 저장, delta: 직전 버전 대비 차분 저장 + 주기적 키프레임
+    # segment: 학생·과제별 세그먼트 파일에 이어 쓰기 (로그 구조)
+    SNAPSHOT_STORAGE_MODE: Literal["file", "delta", "segment"] = "file"
+    SNAPSHOT_DELTA_KEYFRAME_INTERVAL: int = 20  # 키프레임 간격 (버전 수)
+    SNAPSHOT_DELTA_CACHE_SIZE: int = 1024  # 직전 버전 내용을 캐시할 파일 수
+    SNAPSHOT_SEGMENT_DIR: str = ".segments"  # SNAPSHOT_BASE 하위 세그먼트 저장 디렉토리명
+    SNAPSHOT_SEGMENT_MAX_BYTES: int = 16 * 1024 * 1024  # 세그먼트 롤오버 크기 (16MB)
+    SNAPSHOT_SEGMENT_OPEN_LOGS: int = 256  # 파일 핸들을 열어둘 최대 학생·과제 로그 수
+    SNAPSHOT_SEGMENT_COMPACT_INTERVAL: float = 6 * 3600  # 세그먼트 압축 주기 (초)
+    
+    # 스냅샷 중복 제거(내용 주소 기반 블롭 저장소) 설정
+    SNAPSHOT_DEDUP_ENABLED: bool = False  # 동일 내용 스냅샷을 블롭 하드 링크로 저장할지 여부 (file 모드 전용)
+    SNAPSHOT_BLOB_DIR: str = ".blobs"  # SNAPSHOT_BASE 하위 블롭 저장 디렉토리명
+    SNAPSHOT_BLOB_GC_INTERVAL: float = 3600  # 미참조 블롭 GC 주기 (초)
+    SNAPSHOT_BLOB_GC_GRACE: float = 600  # 생성 직후 블롭을 GC에서 보호하는 유예 시간 (초)
+    SNAPSHOT_ZERO_COPY: bool = True  # file 모드(중복 제거 비활성화)에서 원본을 커널 내부 복사(copy_file_range)로 저장
+    SNAPSHOT_RETENTION_ENABLED: bool = False  # 오래된 스냅샷을 보존 정책에 따라 솎아낼지 여부 (file 모드 전용)
+    SNAPSHOT_RETENTION_KEEP_ALL: float = 24 * 3600  # 모든 스냅샷을 보존하는 기간 (초)
+    SNAPSHOT_RETENTION_RECENT_INTERVAL: float = 300  # 보존 기간이 지난 스냅샷을 구간당 하나만 남기는 간격 (초)
+    SNAPSHOT_RETENTION_CLOSED_INTERVAL: float = 3600  # 마감이 지난 과제의 스냅샷을 구간당 하나만 남기는 간격 (초)
+    SNAPSHOT_RETENTION_DEADLINES: Dict[str, datetime] = {}  # "과목-분반/과제" -> 마감 시각 (JSON)
+    SNAPSHOT_RETENTION_INTERVAL: float = 6 * 3600  # 보존 정리 주기 (초)
+    SNAPSHOT_RETENTION_DIRS_PER_SECOND: float = 20  # 초당 처리할 학생 디렉토리 수 (I/O 제한)
+    SNAPSHOT_MANIFEST_ENABLED: bool = True  # 스냅샷마다 학생별 매니페스트에 레코드를 추가할지 여부
+    SNAPSHOT_MANIFEST_DIR: str = ".manifests"  # SNAPSHOT_BASE 하위 매니페스트 저장 디렉토리명
+    SNAPSHOT_MANIFEST_CHECKPOINT_EVERY: int = 256  # 체크포인트로 로그를 정리할 레코드 수
+    SNAPSHOT_MANIFEST_OPEN: int = 1024  # 메모리에 인덱스를 둘 최대 학생·과제 매니페스트 수
+    SNAPSHOT_DIR_CACHE_SIZE: int = 8192  # 존재를 확인한 스냅샷 디렉토리를 기억할 개수 (0이면 매번 mkdir)
+    
+    # 변경 없는 수정 이벤트 필터 설정
+    SNAPSHOT_NOOP_CACHE_SIZE: int = 4096  # 마지막 캡처 내용 해시를 보관할 파일 수 (0이면 비활성화)
+    
     # ThreadPool 설정
     THREAD_POOL_WORKERS: int = 8  # 파일 읽기용 스레드 풀 워커 수
     
+    # 파이프라인 워커 설정
+    PIPELINE_WORKERS: int = 4  # 동시에 이벤트를 처리할 파이프라인 워커(샤드) 수 (파일 경로 해시로 분배)
+    PIPELINE_SHARD_QUEUE_SIZE: int = 1000  # 샤드 큐의 메모리 최대 크기 (초과분은 QUEUE_SPILL_DIR에 스필)
+    
+    # 이벤트 큐 설정
+    RAW_QUEUE_MAXSIZE: int = 10000  # raw 큐의 메모리 최대 크기 (초과분은 디스크로 스필)
+    PROCESSED_QUEUE_MAXSIZE: int = 10000  # processed 큐의 메모리 최대 크기 (초과분은 디스크로 스필)
+    QUEUE_SPILL_DIR: Path = Path('/opt/filemon/spill')  # 스필 파일 저장 경로 (로컬 디스크)
+    
     # Debounce 설정
     DEBOUNCE_WINDOW: float = 0.6  # modified 이벤트 600ms 대기
     DEBOUNCE_MAX_WAIT: float = 3  # 최대 대기 시간 3초
+    DEBOUNCE_ADAPTIVE: bool = True  # 파일·학생별 저장 간격에 따라 대기 시간을 조절할지 여부
+    DEBOUNCE_WINDOW_MIN: float = 0.3  # 가끔 저장되는 파일의 대기 시간 (초)
+    DEBOUNCE_WINDOW_MAX: float = 2.0  # 잦은 저장 파일의 최대 대기 시간 (초)
+    DEBOUNCE_MAX_WAIT_MAX: float = 10  # 대기 시간을 늘릴 때 최대 대기 시간의 상한 (초)
+    DEBOUNCE_ADAPTIVE_KEYS: int = 8192  # 저장 간격을 추적할 최대 파일 수
     
     # Logging 설정
     LOG_FILE_PATH: str = "/opt/filemon/logs/"
     LOG_LEVEL: str = "INFO"
     LOG_MAX_BYTES: int = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT: int = 0
+    LOG_SAMPLE_RATE: int = 10  # 같은 INFO 메시지를 초당 최대 N개만 기록 (0이면 샘플링 안 함)
 
     # Metrics 설정
     METRICS_PORT: int = 3000
+    PROMETHEUS_MULTIPROC_DIR: Path = Path('/opt/filemon/prometheus')  # 멀티 프로세스 모드의 워커별 메트릭 파일 경로
+
+    # 멀티 프로세스 설정 (학생 디렉토리 해시로 WATCH_ROOT를 나눠 워커 프로세스별로 감시)
+    FILEMON_WORKERS: int = 1  # 워커 프로세스 수 (1이면 단일 프로세스로 실행)
+    WORKER_RESTART_BACKOFF_MAX: float = 30  # 비정상 종료된 워커 재시작 대기 시간 상한 (초)
+    WORKER_SHUTDOWN_TIMEOUT: float = 30  # 종료 시 워커가 끝나기를 기다리는 시간 (초)
+    WORKER_INDEX: int = 0  # 워커 번호 (슈퍼바이저가 설정)
+    WORKER_COUNT: int = 1  # 전체 워커 수 (슈퍼바이저가 설정)
 
 
 # 애플리케이션 전체에서 사용할 단일 설정 인스턴스
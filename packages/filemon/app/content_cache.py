@@ -0,0 +1,60 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+class ContentFingerprint(NamedTuple):
+    """마지막으로 캡처한 파일 버전의 식별 정보"""
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+    @classmethod
+    def from_data(cls, file_stat: os.stat_result, data: bytes) -> "ContentFingerprint":
+        """읽기 후 stat 결과와 내용으로 지문 생성 (blake2b-128)"""
+        return cls(len(data), file_stat.st_mtime_ns, hashlib.blake2b(data, digest_size=16).digest())
+
+    def same_content(self, other: "ContentFingerprint") -> bool:
+        """내용이 같은지 비교 (크기가 다르면 해시 비교 없이 False)"""
+        return self.size == other.size and self.digest == other.digest
+
+
+class ContentHashCache:
+    """
+    소스 경로별로 마지막으로 캡처한 버전의 지문을 보관하는 LRU 캐시.
+    저장 없이 수정 이벤트만 발생한 경우(touch, 변경 없는 저장, 동일 결과의 자동 포맷)를
+    스냅샷 생성과 API 등록 전에 걸러내는 데 사용합니다.
+    이벤트 루프에서만 접근하므로 별도의 잠금은 사용하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, ContentFingerprint]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def is_unchanged(self, path: str, fingerprint: ContentFingerprint) -> bool:
+        """마지막으로 캡처한 버전과 내용이 같은지 확인"""
+        previous = self._entries.get(path)
+        if previous is None:
+            return False
+        self._entries.move_to_end(path)
+        return previous.same_content(fingerprint)
+
+    def remember(self, path: str, fingerprint: ContentFingerprint):
+        """캡처를 마친 버전의 지문을 기록"""
+        if self.max_entries <= 0:
+            return
+        self._entries[path] = fingerprint
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, path: str):
+        """경로의 지문 삭제 (삭제 이벤트 등)"""
+        self._entries.pop(path, None)
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+from app.config.settings import settings
+
+# 이벤트 간격 지수 이동 평균의 가중치 (새 간격의 비중)
+_EWMA_ALPHA = 0.3
+# 평균 간격의 몇 배를 대기 시간으로 쓸지 (간격보다 길어야 연속 이벤트가 합쳐짐)
+_STRETCH = 1.5
+
+
+class FixedWindowPolicy:
+    """모든 파일에 DEBOUNCE_WINDOW / DEBOUNCE_MAX_WAIT를 그대로 사용하는 기본 정책"""
+
+    def observe(self, key: str, now: float) -> Tuple[float, float]:
+        return settings.DEBOUNCE_WINDOW, settings.DEBOUNCE_MAX_WAIT
+
+
+class AdaptiveWindowPolicy:
+    """
+    파일별·학생별 이벤트 간격에 따라 debounce 대기 시간을 조절하는 정책.
+
+    파일(키)마다 modified 이벤트 간격의 지수 이동 평균을 추적합니다. 기록이 없는 파일은
+    같은 학생(WATCH_ROOT 바로 아래 디렉토리)의 전체 이벤트 간격을 대신 사용합니다.
+    - 평균 간격이 window_max 이하(자동 저장, 반복 쓰기 등 잦은 저장): 간격의 1.5배로 늘려
+      연속 저장을 하나의 스냅샷으로 합치고, max_wait도 같은 비율로 늘립니다.
+    - 평균 간격이 window_max보다 김(가끔 저장): 어차피 합쳐지지 않으므로 window_min으로 줄여
+      저장마다 빠르게 캡처합니다.
+    오래 쉬었다가 다시 저장해도 빨리 적응하도록 간격 표본은 window_max의 2배로 제한합니다.
+    추적하는 키·학생 수는 max_keys로 제한하며 오래 사용하지 않은 항목부터 버립니다.
+    이벤트 루프에서만 접근하므로 별도의 잠금은 사용하지 않습니다.
+    """
+
+    def __init__(self, watch_root: Path, base_window: float, base_max_wait: float,
+                 window_min: float, window_max: float, max_wait_max: float, max_keys: int = 8192):
+        self.watch_root = Path(watch_root)
+        self.base_window = base_window
+        self.base_max_wait = base_max_wait
+        self.window_min = window_min
+        self.window_max = window_max
+        self.max_wait_max = max(max_wait_max, base_max_wait)
+        self.max_keys = max_keys
+        # 키 -> [마지막 이벤트 시각, 평균 간격(None이면 아직 없음)]
+        self._keys: "OrderedDict[str, list]" = OrderedDict()
+        self._students: "OrderedDict[str, list]" = OrderedDict()
+
+    def observe(self, key: str, now: float) -> Tuple[float, float]:
+        """
+        modified 이벤트를 기록하고 이 키에 적용할 대기 시간을 계산합니다.
+
+        Returns:
+            (debounce 대기 시간, 최대 대기 시간)
+        """
+        key_gap = self._update(self._keys, key, now)
+        student_gap = self._update(self._students, self._student_of(key), now)
+        gap = key_gap if key_gap is not None else student_gap
+
+        if gap is None:
+            window = self.base_window
+        elif gap > self.window_max:
+            window = self.window_min
+        else:
+            window = min(max(gap * _STRETCH, self.window_min), self.window_max)
+
+        max_wait = self.base_max_wait * window / self.base_window if self.base_window > 0 else self.base_max_wait
+        return window, min(max(max_wait, self.base_max_wait), self.max_wait_max)
+
+    def _update(self, entries: "OrderedDict[str, list]", key: str, now: float) -> Optional[float]:
+        """마지막 이벤트 시각과 평균 간격을 갱신하고 평균 간격을 반환"""
+        entry = entries.get(key)
+        if entry is None:
+            entries[key] = [now, None]
+            while len(entries) > self.max_keys:
+                entries.popitem(last=False)
+            return None
+
+        entries.move_to_end(key)
+        sample = min(now - entry[0], 2 * self.window_max)
+        entry[0] = now
+        entry[1] = sample if entry[1] is None else _EWMA_ALPHA * sample + (1 - _EWMA_ALPHA) * entry[1]
+        return entry[1]
+
+    def _student_of(self, key: str) -> str:
+        """WATCH_ROOT 바로 아래 디렉토리(과목-분반-학번), 그 밖의 경로는 상위 디렉토리"""
+        path = Path(key)
+        try:
+            return path.relative_to(self.watch_root).parts[0]
+        except (ValueError, IndexError):
+            return str(path.parent)
+
+
+def create_policy(watch_root: Path):
+    """설정(DEBOUNCE_ADAPTIVE)에 따라 debounce 정책 생성"""
+    if not settings.DEBOUNCE_ADAPTIVE:
+        return FixedWindowPolicy()
+    return AdaptiveWindowPolicy(watch_root,
+                                base_window=settings.DEBOUNCE_WINDOW,
+                                base_max_wait=settings.DEBOUNCE_MAX_WAIT,
+                                window_min=settings.DEBOUNCE_WINDOW_MIN,
+                                window_max=settings.DEBOUNCE_WINDOW_MAX,
+                                max_wait_max=settings.DEBOUNCE_MAX_WAIT_MAX,
+                                max_keys=settings.DEBOUNCE_ADAPTIVE_KEYS)
@@ -1,41 +1,87 @@
 import asyncio
-import time
+import heapq
+import itertools
+from collections import deque
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, List, Optional, Tuple
 from watchdog.events import FileSystemEvent
 from app.utils.logger import get_logger
 from app.config.settings import settings
-from app.utils.metrics import record_debounced_events
+from app.utils.metrics import record_debounced_events, record_debounce_window
+from app.debounce_policy import FixedWindowPolicy
+from app.tracing import mark
 
 logger = get_logger(__name__)
 
+
+class _Bucket:
+    """키별 보류 중인 modified 이벤트 (마지막 이벤트와 누적 개수만 보관)"""
+    __slots__ = ("key", "event", "count", "first_ts", "deadline", "window", "max_wait")
+
+    def __init__(self, key: str, event: FileSystemEvent, now: float, window: float, max_wait: float):
+        self.key = key
+        self.event = event
+        self.count = 1
+        self.first_ts = now
+        self.deadline = now
+        self.window = window  # 정책이 정한 대기 시간 (마지막 이벤트 기준)
+        self.max_wait = max_wait
+
+
 class Debouncer:
-    """파일 시스템 이벤트 debounce 처리"""
-    
-    def __init__(self, processed_queue: asyncio.Queue):
+    """
+    파일 시스템 이벤트 debounce 처리.
+    모든 키의 만료 시각을 하나의 최소 힙으로 관리하고 단일 스케줄러 태스크가
+    만료된 버킷을 플러시합니다. 새 버킷은 inbox를 통해 스케줄러에 전달되며,
+    힙은 스케줄러만 수정합니다. 이후 이벤트가 들어올 때는 버킷의 만료 시각만 갱신하고,
+    힙에서 꺼낸 항목의 만료 시각이 늦춰졌으면 다시 넣습니다(지연 갱신).
+    키별 대기 시간과 최대 대기 시간은 policy(기본: 고정값)가 이벤트마다 정합니다.
+    """
+
+    def __init__(self, processed_queue: asyncio.Queue, policy=None):
         self.processed_queue = processed_queue
-        self.buckets: Dict[str, Dict[str, Any]] = {}
-        self.in_flight: Dict[str, bool] = {}
-        
+        self.policy = policy if policy is not None else FixedWindowPolicy()
+        self.buckets: Dict[str, _Bucket] = {}
+        self._heap: List[Tuple[float, int, _Bucket]] = []
+        self._inbox: "deque[_Bucket]" = deque()
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_deadline: Optional[float] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+
     async def process_event(self, event: FileSystemEvent):
         """raw 파일시스템 이벤트를 debounce 처리"""
         try:
             key = self._generate_key(event)
-            
+
             if event.event_type == "deleted" or event.event_type == "moved":
                 await self._handle_immediate_event(key, event)
                 return
-            
+
             # modified 이벤트만 debounce 처리
             await self._add_to_bucket(key, event)
-            
+
         except Exception as e:
             logger.error("debounce 처리 중 오류",
                         event_type=event.event_type,
                         src_path=event.src_path,
                         error_type=type(e).__name__,
                         exc_info=True)
-    
+
+    async def close(self):
+        """스케줄러 태스크를 중지합니다. 보류 중인 버킷은 플러시하지 않습니다."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+
     def _generate_key(self, event: FileSystemEvent) -> str:
         """이벤트로부터 debounce 키 생성 (경로 기반)"""
         if event.event_type == "moved":
@@ -43,126 +89,126 @@ class Debouncer:
             path = getattr(event, 'dest_path', event.src_path)
         else:
             path = event.src_path
-        
+
         return str(Path(path))
-    
+
     async def _handle_immediate_event(self, key: str, immediate_event: FileSystemEvent):
         """
         즉시 처리 이벤트(deleted, moved)를 처리합니다.
         규칙: 보류 중인 modified 이벤트를 먼저 플러시하고, 그 다음 즉시 처리 이벤트를 전달합니다.
         """
-        if self.in_flight.get(key, False):
-            logger.debug("이미 처리 중인 키 무시", key=key)
-            return
+        # 1. 보류 중인 버킷이 있으면 그 안의 마지막 modified 이벤트를 먼저 플러시합니다.
+        #    힙에 남은 항목은 스케줄러가 꺼낼 때 버려집니다.
+        pending_bucket = self.buckets.pop(key, None)
+        if pending_bucket:
+            await self._emit(pending_bucket)
+            logger.debug("보류 중인 modified 이벤트 플러시 완료", key=key)
+
+        # 2. 수신된 즉시 처리 이벤트를 전달합니다.
+        mark(immediate_event, "flushed")
+        await self.processed_queue.put(immediate_event)
+        logger.debug("즉시 처리 이벤트 전달 완료", key=key)
 
-        try:
-            self.in_flight[key] = True
-
-            # 1. 보류 중인 버킷을 가져와서, 그 안의 modified 이벤트를 먼저 플러시합니다.
-            pending_bucket = self.buckets.pop(key, None)
-            if pending_bucket:
-                if pending_bucket.get('timer_task'):
-                    pending_bucket['timer_task'].cancel()
-                
-                # 마지막 modified 이벤트를 대표로 선택하여 플러시합니다.
-                representative_event = pending_bucket['events'][-1]
-                await self.processed_queue.put(representative_event)
-                logger.debug("보류 중인 modified 이벤트 플러시 완료", key=key)
-
-            # 2. 수신된 즉시 처리 이벤트를 전달합니다.
-            await self.processed_queue.put(immediate_event)
-            logger.debug("즉시 처리 이벤트 전달 완료", key=key)
-
-        finally:
-            self.in_flight[key] = False
-    
     async def _add_to_bucket(self, key: str, event: FileSystemEvent):
-        """버킷에 이벤트를 추가하고 디바운스 타이머를 재설정합니다."""
-        now = time.time()
-        
-        if key in self.buckets:
-            bucket = self.buckets[key]
-            
-            # max_wait 체크: 너무 오래된 버킷은 강제 플러시
-            if now - bucket['first_ts'] >= settings.DEBOUNCE_MAX_WAIT:
-                await self._flush_bucket(key)
-                # 플러시 후 새 버킷으로 시작
-                self.buckets[key] = {
-                    'events': [event],
-                    'first_ts': now,
-                    'last_ts': now,
-                }
-                await self._schedule_timer(key)
-                return
-            else:
-                # 기존 버킷에 이벤트 추가
-                bucket['events'].append(event)
-                bucket['last_ts'] = now
-        else:
-            # 새 버킷 생성
-            self.buckets[key] = {
-                'events': [event],
-                'first_ts': now,
-                'last_ts': now,
-            }
-        
-        # 이벤트가 추가될 때마다 항상 타이머를 재설정 (표준 디바운스 동작)
-        await self._schedule_timer(key)
-    
-    async def _schedule_timer(self, key: str):
-        """타이머를 스케줄링하거나 재설정합니다."""
+        """버킷에 이벤트를 추가하고 만료 시각을 재설정합니다."""
+        self._ensure_scheduler()
+        now = asyncio.get_running_loop().time()
+        window, max_wait = self.policy.observe(key, now)
+
         bucket = self.buckets.get(key)
-        if not bucket:
-            return
-            
-        # 기존 타이머가 있다면 취소
-        if bucket.get('timer_task'):
-            bucket['timer_task'].cancel()
-        
-        # 새 타이머 시작
-        bucket['timer_task'] = asyncio.create_task(
-            self._timer_callback(key, settings.DEBOUNCE_WINDOW)
-        )
-    
-    async def _timer_callback(self, key: str, delay: float):
-        """타이머 콜백"""
-        try:
-            await asyncio.sleep(delay)
-            await self._flush_bucket(key)
-        except asyncio.CancelledError:
-            # 타이머가 취소됨 (새 이벤트가 들어옴)
-            pass
-        except Exception as e:
-            logger.error("타이머 콜백 오류",
-                       key=key,
-                       error_type=type(e).__name__,
-                       exc_info=True)
-    
-    async def _flush_bucket(self, key: str):
-        """버킷 플러시"""
-        if self.in_flight.get(key, False):
-            logger.debug("이미 처리 중인 키 무시", key=key)
-            return
-            
-        bucket = self.buckets.pop(key, None)
-        if not bucket or not bucket['events']:
+        if bucket is not None:
+            # max_wait 체크: 너무 오래된 버킷은 강제 플러시 후 새 버킷으로 시작
+            if now - bucket.first_ts >= max_wait:
+                del self.buckets[key]
+                await self._emit(bucket)
+            else:
+                # 마지막 이벤트만 교체하고 만료 시각을 늦춤 (힙은 꺼낼 때 갱신)
+                bucket.event = event
+                bucket.count += 1
+                bucket.window = window
+                bucket.max_wait = max_wait
+                bucket.deadline = now + window
+                return
+
+        # 새 버킷은 스케줄러가 등록하는 시점부터 타이머를 시작
+        bucket = _Bucket(key, event, now, window, max_wait)
+        self.buckets[key] = bucket
+        self._inbox.append(bucket)
+        self._wakeup.set()
+
+    def _ensure_scheduler(self):
+        """스케줄러 태스크가 없으면 현재 이벤트 루프에서 시작"""
+        if self._scheduler_task is None or self._scheduler_task.done():
+            # 재시작 시 보류 중인 버킷을 모두 다시 등록
+            self._wakeup = asyncio.Event()
+            self._heap.clear()
+            self._inbox.clear()
+            self._inbox.extend(self.buckets.values())
+            self._timer = None
+            self._timer_deadline = None
+            self._scheduler_task = asyncio.create_task(self._run_scheduler())
+
+    def _arm_timer(self, deadline: float):
+        """가장 이른 만료 시각에 스케줄러를 깨우도록 타이머를 설정 (더 이른 시각일 때만 재설정)"""
+        if self._timer is not None and self._timer_deadline <= deadline:
             return
-        
-        debounced_count = len(bucket['events']) - 1
-        if debounced_count > 0:
-            record_debounced_events(debounced_count)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_deadline = deadline
+        self._timer = asyncio.get_running_loop().call_at(deadline, self._wakeup.set)
 
-        try:
-            self.in_flight[key] = True
-            
-            # 마지막 이벤트를 대표로 선택
-            representative_event = bucket['events'][-1]
-            
-            await self.processed_queue.put(representative_event)
-            
-            logger.debug("버킷 플러시 완료",
-                       key=key,
-                       event_count=len(bucket['events']))
-            
-        finally:
-            self.in_flight[key] = False
\ No newline at end of file
+    async def _run_scheduler(self):
+        """만료된 버킷을 플러시하는 단일 스케줄러 루프"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._timer is not None and self._timer_deadline <= loop.time():
+                self._timer = None
+                self._timer_deadline = None
+            try:
+                self._register_new_buckets(loop.time())
+                await self._flush_expired(loop.time())
+            except Exception as e:
+                logger.error("디바운스 스케줄러 오류",
+                           error_type=type(e).__name__,
+                           exc_info=True)
+            if self._heap:
+                self._arm_timer(self._heap[0][0])
+
+    def _register_new_buckets(self, now: float):
+        """inbox의 새 버킷을 힙에 등록"""
+        while self._inbox:
+            bucket = self._inbox.popleft()
+            if self.buckets.get(bucket.key) is not bucket:
+                continue
+            bucket.deadline = max(bucket.deadline, now + bucket.window)
+            heapq.heappush(self._heap, (bucket.deadline, next(self._seq), bucket))
+
+    async def _flush_expired(self, now: float):
+        """만료 시각이 지난 버킷을 모두 플러시"""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, _, bucket = heapq.heappop(heap)
+            if self.buckets.get(bucket.key) is not bucket:
+                # 이미 즉시 플러시되었거나 새 버킷으로 교체됨
+                continue
+            if bucket.deadline > now:
+                # 이벤트가 추가되어 만료가 늦춰짐
+                heapq.heappush(heap, (bucket.deadline, next(self._seq), bucket))
+                continue
+            del self.buckets[bucket.key]
+            await self._emit(bucket)
+
+    async def _emit(self, bucket: _Bucket):
+        """버킷의 마지막 이벤트를 대표로 전달"""
+        if bucket.count > 1:
+            record_debounced_events(bucket.count - 1)
+        record_debounce_window(bucket.window)
+
+        mark(bucket.event, "flushed")
+        await self.processed_queue.put(bucket.event)
+
+        logger.debug("버킷 플러시 완료",
+                   key=bucket.key,
+                   event_count=bucket.count)
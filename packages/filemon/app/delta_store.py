@@ -0,0 +1,233 @@
+import difflib
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.utils.logger import get_logger
+from app.utils.metrics import record_delta_write
+
+logger = get_logger(__name__)
+
+# 차분 파일 포맷: MAGIC 다음에 연산(op)들이 이어짐
+#   b"C" + (>II start, count) : 기준 버전의 [start, start+count) 라인 복사
+#   b"I" + (>I length) + data : 새 데이터 삽입
+DELTA_MAGIC = b"FMD1"
+DELTA_SUFFIX = ".delta"
+_COPY = struct.Struct(">II")
+_INSERT = struct.Struct(">I")
+
+
+def encode_delta(base: bytes, new: bytes) -> bytes:
+    """기준 버전 대비 새 버전의 라인 단위 차분을 인코딩"""
+    base_lines = base.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+
+    out = bytearray(DELTA_MAGIC)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            out += b"C" + _COPY.pack(i1, i2 - i1)
+        elif j2 > j1:  # replace / insert
+            chunk = b"".join(new_lines[j1:j2])
+            out += b"I" + _INSERT.pack(len(chunk)) + chunk
+        # delete: 기준 라인을 복사하지 않으면 되므로 기록할 것이 없음
+    return bytes(out)
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """기준 버전에 차분을 적용하여 새 버전을 복원"""
+    if not delta.startswith(DELTA_MAGIC):
+        raise ValueError("올바르지 않은 차분 파일 형식")
+
+    base_lines = base.splitlines(keepends=True)
+    out = bytearray()
+    pos = len(DELTA_MAGIC)
+    while pos < len(delta):
+        op = delta[pos:pos + 1]
+        pos += 1
+        if op == b"C":
+            start, count = _COPY.unpack_from(delta, pos)
+            pos += _COPY.size
+            out += b"".join(base_lines[start:start + count])
+        elif op == b"I":
+            (length,) = _INSERT.unpack_from(delta, pos)
+            pos += _INSERT.size
+            out += delta[pos:pos + length]
+            pos += length
+        else:
+            raise ValueError(f"알 수 없는 차분 연산: {op!r}")
+    return bytes(out)
+
+
+class DeltaStore:
+    """
+    차분(delta) 기반 스냅샷 저장소.
+    파일별 스냅샷 디렉토리에 키프레임(`<timestamp><suffix>`, 전체 내용)과
+    차분(`<timestamp><suffix>.delta`, 직전 버전 대비)을 저장합니다.
+    키프레임은 keyframe_interval 버전마다, 또는 차분이 전체 파일보다 클 때 기록됩니다.
+    """
+
+    def __init__(self, keyframe_interval: int = 20, cache_size: int = 1024):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.cache_size = cache_size
+        # 스냅샷 디렉토리 -> (직전 버전 내용, 마지막 키프레임 이후 차분 수)
+        self._heads: "OrderedDict[Path, Tuple[bytes, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def write(self, snapshot_dir: Path, timestamp: str, suffix: str, data: bytes) -> str:
+        """
+        새 버전을 저장합니다. (스레드 풀에서 호출되는 동기 함수)
+
+        Returns:
+            str: 저장 종류 ("keyframe" 또는 "delta")
+        """
+        keyframe_path = snapshot_dir / f"{timestamp}{suffix}"
+        delta_path = snapshot_dir / f"{timestamp}{suffix}{DELTA_SUFFIX}"
+        if keyframe_path.exists() or delta_path.exists():
+            # 같은 초의 버전을 교체하는 경우: 캐시된 직전 버전이 교체 대상 자신이므로 그 기준의
+            # 차분은 read()가 적용하는 기준(그 이전 버전)과 맞지 않음 -> 키프레임으로 교체
+            self.write_keyframe(snapshot_dir, timestamp, suffix, data)
+            return "keyframe"
+
+        head = self._get_head(snapshot_dir, suffix)
+        kind = "keyframe"
+        payload = data
+        if head is not None and data:
+            base, deltas_since_keyframe = head
+            if deltas_since_keyframe + 1 < self.keyframe_interval:
+                delta = encode_delta(base, data)
+                if len(delta) < len(data):
+                    kind = "delta"
+                    payload = delta
+
+        if kind == "keyframe":
+            path = keyframe_path
+            chain_length = 0
+        else:
+            path = delta_path
+            chain_length = head[1] + 1
+
+        self._write_file(path, payload)
+
+        self._set_head(snapshot_dir, data, chain_length)
+        record_delta_write(kind, len(payload))
+        return kind
+
+    def write_keyframe(self, snapshot_dir: Path, timestamp: str, suffix: str, data: bytes):
+        """
+        항상 전체 내용을 키프레임으로 저장 (삭제 이벤트의 빈 스냅샷 등).
+        같은 타임스탬프의 차분이 있으면 키프레임이 그 버전을 대신하므로 지웁니다.
+        """
+        self._write_file(snapshot_dir / f"{timestamp}{suffix}", data)
+        try:
+            os.unlink(snapshot_dir / f"{timestamp}{suffix}{DELTA_SUFFIX}")
+        except FileNotFoundError:
+            pass
+        self._set_head(snapshot_dir, data, 0)
+        record_delta_write("keyframe", len(data))
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes):
+        """
+        같은 디렉토리의 고유한 임시 파일에 쓰고 fsync한 뒤 os.replace로 교체합니다.
+        이후 차분이 이 버전을 기준으로 삼으므로, 쓰는 도중 중단되어도 잘린 파일이 남지 않아야 합니다.
+        """
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def list_versions(self, snapshot_dir: Path, suffix: str) -> List[Tuple[str, str]]:
+        """
+        스냅샷 디렉토리의 (timestamp, kind) 목록을 시간순으로 반환.
+        같은 타임스탬프의 키프레임과 차분이 함께 있으면(교체 도중) 키프레임만 포함합니다.
+        """
+        versions = []
+        try:
+            names = os.listdir(snapshot_dir)
+        except FileNotFoundError:
+            return versions
+
+        for name in names:
+            if name.startswith("."):
+                continue  # 기록 중인 임시 파일
+            if name.endswith(suffix + DELTA_SUFFIX):
+                versions.append((name[:-len(suffix + DELTA_SUFFIX)], "delta"))
+            elif name.endswith(suffix):
+                versions.append((name[:len(name) - len(suffix)], "keyframe"))
+        versions.sort()
+        return [v for i, v in enumerate(versions)
+                if not (v[1] == "delta" and i + 1 < len(versions) and versions[i + 1][0] == v[0])]
+
+    def read(self, snapshot_dir: Path, timestamp: str, suffix: str) -> bytes:
+        """
+        지정한 타임스탬프 버전의 내용을 복원합니다.
+        가장 가까운 이전 키프레임에서 시작해 차분을 순서대로 적용하므로
+        최대 keyframe_interval - 1 번의 차분 적용만 필요합니다.
+
+        Raises:
+            FileNotFoundError: 해당 타임스탬프 버전이나 기준 키프레임이 없을 때
+        """
+        versions = self.list_versions(snapshot_dir, suffix)
+        target = next((i for i, (ts, _) in enumerate(versions) if ts == timestamp), None)
+        if target is None:
+            raise FileNotFoundError(snapshot_dir / f"{timestamp}{suffix}")
+
+        start = target
+        while versions[start][1] != "keyframe":
+            start -= 1
+            if start < 0:
+                raise FileNotFoundError(f"기준 키프레임을 찾을 수 없음: {snapshot_dir}")
+
+        data = (snapshot_dir / f"{versions[start][0]}{suffix}").read_bytes()
+        for ts, _ in versions[start + 1:target + 1]:
+            delta = (snapshot_dir / f"{ts}{suffix}{DELTA_SUFFIX}").read_bytes()
+            data = apply_delta(data, delta)
+        return data
+
+    def _get_head(self, snapshot_dir: Path, suffix: str) -> Optional[Tuple[bytes, int]]:
+        """직전 버전 내용과 차분 체인 길이 (캐시에 없으면 디스크에서 복원)"""
+        with self._lock:
+            head = self._heads.get(snapshot_dir)
+            if head is not None:
+                self._heads.move_to_end(snapshot_dir)
+                return head
+
+        versions = self.list_versions(snapshot_dir, suffix)
+        if not versions:
+            return None
+
+        chain_length = 0
+        for _, kind in reversed(versions):
+            if kind == "keyframe":
+                break
+            chain_length += 1
+
+        try:
+            data = self.read(snapshot_dir, versions[-1][0], suffix)
+        except (FileNotFoundError, ValueError):
+            logger.warning("직전 스냅샷 복원 실패, 키프레임으로 저장", snapshot_dir=str(snapshot_dir))
+            return None
+
+        head = (data, chain_length)
+        self._set_head(snapshot_dir, data, chain_length)
+        return head
+
+    def _set_head(self, snapshot_dir: Path, data: bytes, chain_length: int):
+        with self._lock:
+            self._heads[snapshot_dir] = (data, chain_length)
+            self._heads.move_to_end(snapshot_dir)
+            while len(self._heads) > self.cache_size:
+                self._heads.popitem(last=False)
@@ -0,0 +1,38 @@
+from collections import OrderedDict
+from pathlib import Path
+
+
+class DirectoryCache:
+    """
+    이미 존재하는 것으로 확인한 스냅샷 디렉토리를 보관하는 LRU 캐시.
+    스냅샷마다 mkdir(parents=True)를 호출하면 NFS에서는 매번 여러 번의 메타데이터 왕복이
+    발생하므로, 한 번 만든 디렉토리는 캐시에서 확인만 합니다. 디렉토리가 외부에서 삭제된 경우
+    (파일 열기 시 ENOENT) 호출 측에서 discard로 무효화합니다.
+    이벤트 루프에서만 접근하므로 별도의 잠금은 사용하지 않습니다.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Path, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, directory: Path) -> bool:
+        if directory not in self._entries:
+            return False
+        self._entries.move_to_end(directory)
+        return True
+
+    def add(self, directory: Path):
+        """존재를 확인한(생성한) 디렉토리를 기록"""
+        if self.max_entries <= 0:
+            return
+        self._entries[directory] = None
+        self._entries.move_to_end(directory)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, directory: Path):
+        """디렉토리 항목 삭제 (디렉토리가 사라진 경우)"""
+        self._entries.pop(directory, None)
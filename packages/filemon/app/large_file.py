@@ -0,0 +1,62 @@
+import hashlib
+import os
+from typing import NamedTuple
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class Excerpt(NamedTuple):
+    """큰 파일의 앞·뒤 발췌본과 원본 전체 정보"""
+    file_stat: os.stat_result  # 읽은 후 원본 파일 stat
+    size: int                  # 원본 전체 크기
+    digest: bytes              # 원본 전체 blake2b-128 (ContentFingerprint와 같은 해시)
+    data: bytes                # 앞부분 + 생략 표시 + 뒷부분
+
+
+def read_excerpt(src_path: str, excerpt_bytes: int, chunk_size: int = _CHUNK_SIZE) -> Excerpt:
+    """
+    파일을 고정 크기 청크로 한 번 훑으며 전체 해시를 계산하고, 앞·뒤 excerpt_bytes만 남깁니다.
+    (스레드 풀에서 호출되는 동기 함수)
+
+    파일 크기와 무관하게 메모리 사용량은 청크 하나와 발췌본 두 개로 제한됩니다.
+    read_and_verify와 같이 읽기 전후의 fstat(크기, 수정 시간)을 비교하여
+    읽는 중 변경되었으면 RuntimeError를 발생시킵니다.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    head = bytearray()
+    tail = bytearray()
+    size = 0
+
+    fd = os.open(src_path, os.O_RDONLY)
+    try:
+        st_before = os.fstat(fd)
+        while True:
+            chunk = os.pread(fd, chunk_size, size)
+            if not chunk:
+                break
+            h.update(chunk)
+            if len(head) < excerpt_bytes:
+                head += chunk[:excerpt_bytes - len(head)]
+            tail += chunk[-excerpt_bytes:]
+            if len(tail) > excerpt_bytes:
+                del tail[:len(tail) - excerpt_bytes]
+            size += len(chunk)
+        st_after = os.fstat(fd)
+    finally:
+        os.close(fd)
+
+    if (st_before.st_size, st_before.st_mtime) != (st_after.st_size, st_after.st_mtime) \
+            or size != st_after.st_size:
+        raise RuntimeError("파일 읽기 중 내용이 변경되었습니다.")
+
+    digest = h.digest()
+    omitted = size - len(head) - len(tail)
+    if omitted <= 0:
+        # 앞·뒤 발췌본이 겹치면 파일 전체를 그대로 저장
+        rest = size - len(head)
+        data = bytes(head) + bytes(tail[len(tail) - rest:])
+    else:
+        marker = (f"\n... [filemon: {omitted} bytes omitted, "
+                  f"size={size}, blake2b={digest.hex()}] ...\n").encode()
+        data = bytes(head) + marker + bytes(tail)
+    return Excerpt(st_after, size, digest, data)
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from app.utils.logger import get_logger
+from app.utils.metrics import record_workspace_attach, record_workspace_release
+
+logger = get_logger(__name__)
+
+
+class LazyWatches:
+    """
+    lazy 감시 모드의 작업 공간(WATCH_ROOT 바로 아래의 과목-분반-학번 디렉토리) 상태.
+
+    평소에는 작업 공간 디렉토리 자체에만 얕은 watch를 두고, 작업 공간에서 쓰기 활동이 보이면
+    (얕은 watch의 쓰기 이벤트, activate 호출) 그 하위 전체에 watch를 등록합니다.
+    마지막 쓰기 활동 후 idle_ttl이 지나면 release_idle()이 하위 watch를 해제합니다.
+    하위 watch가 없던 동안의 변경은 on_attach 콜백(캐치업 스캔)으로 보완합니다.
+
+    watch 등록·해제는 바인딩된 PrunedInotify의 attach_subtree/detach_subtree로 수행하며,
+    inotify 이벤트 스레드, 이벤트 루프의 스레드 풀 등 어느 스레드에서든 호출할 수 있습니다.
+    """
+
+    def __init__(self, idle_ttl: float, on_attach: Optional[Callable[[str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.on_attach = on_attach
+        self._clock = clock
+        self._lock = threading.Lock()
+        # 하위 watch가 등록된 작업 공간 -> 마지막 쓰기 활동 시각
+        self._last_seen: Dict[bytes, float] = {}
+        self._inotify = None
+
+    def bind(self, inotify):
+        """watch를 관리할 PrunedInotify 연결 (emitter 스레드 시작 시 호출)"""
+        self._inotify = inotify
+
+    @property
+    def attached_count(self) -> int:
+        with self._lock:
+            return len(self._last_seen)
+
+    def is_attached(self, workspace: bytes) -> bool:
+        with self._lock:
+            return workspace in self._last_seen
+
+    def workspace_of(self, path: bytes) -> Optional[bytes]:
+        """경로가 속한 작업 공간 디렉토리 (WATCH_ROOT 자체나 바깥이면 None)"""
+        if self._inotify is None:
+            return None
+        root = self._inotify.path
+        prefix = root.rstrip(b"/") + b"/"
+        if not path.startswith(prefix):
+            return None
+        name = path[len(prefix):].split(b"/", 1)[0]
+        return prefix + name if name else None
+
+    def touch(self, workspace: bytes, trigger: str = "inotify") -> bool:
+        """
+        작업 공간의 쓰기 활동을 기록하고, 하위 watch가 없으면 등록합니다.
+
+        Returns:
+            bool: 이번 호출로 하위 watch를 새로 등록했는지 여부
+        """
+        with self._lock:
+            attached = workspace in self._last_seen
+            self._last_seen[workspace] = self._clock()
+        if attached:
+            return False
+        return self._attach(workspace, trigger)
+
+    def activate(self, path: str) -> bool:
+        """외부 신호(stat 스캐너가 찾은 변경 등)로 경로가 속한 작업 공간을 활성화 (동기 함수)"""
+        workspace = self.workspace_of(os.fsencode(path))
+        if workspace is None:
+            return False
+        return self.touch(workspace, trigger="activate")
+
+    def release_idle(self) -> int:
+        """idle_ttl 동안 쓰기 활동이 없는 작업 공간의 하위 watch 해제 (해제한 작업 공간 수 반환)"""
+        if self._inotify is None:
+            return 0
+        deadline = self._clock() - self.idle_ttl
+        with self._lock:
+            idle: List[bytes] = [ws for ws, seen in self._last_seen.items() if seen < deadline]
+            for workspace in idle:
+                del self._last_seen[workspace]
+            attached = len(self._last_seen)
+
+        for workspace in idle:
+            try:
+                removed = self._inotify.detach_subtree(workspace)
+            except OSError:
+                logger.debug("작업 공간 watch 해제 실패", workspace=os.fsdecode(workspace), exc_info=True)
+                continue
+            logger.debug("유휴 작업 공간 watch 해제", workspace=os.fsdecode(workspace), watches=removed)
+        if idle:
+            record_workspace_release(len(idle), attached)
+            logger.info("유휴 작업 공간 watch 해제 완료", released=len(idle), attached=attached)
+        return len(idle)
+
+    def _attach(self, workspace: bytes, trigger: str) -> bool:
+        started = time.perf_counter()
+        try:
+            added = self._inotify.attach_subtree(workspace)
+        except OSError:
+            # 삭제된 작업 공간 등
+            with self._lock:
+                self._last_seen.pop(workspace, None)
+            logger.debug("작업 공간 watch 등록 실패", workspace=os.fsdecode(workspace), exc_info=True)
+            return False
+        duration = time.perf_counter() - started
+
+        record_workspace_attach(trigger, duration, self.attached_count)
+        logger.info("작업 공간 watch 등록", workspace=os.fsdecode(workspace), trigger=trigger,
+                   watches=added, duration=round(duration, 4))
+        if self.on_attach is not None:
+            self.on_attach(os.fsdecode(workspace))
+        return True
@@ -6,13 +6,23 @@ from watchdog.observers import Observer
 from app.watchdog_handler import WatchdogHandler
 from app.pipeline import FilemonPipeline
 from app.debouncer import Debouncer
+from app.debounce_policy import create_policy
 from app.snapshot import SnapshotManager
+from app.manifest import SnapshotManifest
+from app.spill_queue import SpillQueue, recover_orphaned_spills
 from app.sender import SnapshotSender
+from app.outbox import SnapshotOutbox
+from app.pruned_observer import PrunedObserver
+from app.lazy_watch import LazyWatches
+from app.stat_scanner import StatScanner
+from app.catchup_scan import CatchUpScanner
+from app.retention import RetentionCompactor, RetentionPolicy
 from app.source_path_parser import SourcePathParser
 from app.source_path_filter import PathFilter
+from app.partition import current_partition
 from app.config.settings import settings
 from app.utils.logger import setup_logging, get_logger
-from app.tasks import monitor_watchdog, monitor_queues, run_debouncer, run_main_pipeline
+from app.tasks import monitor_watchdog, monitor_queues, monitor_api_pool, run_blob_gc, run_segment_compaction, run_retention, run_outbox_replayer, run_catchup_scan, run_stat_scanner, run_watch_release, run_debouncer, run_pipeline_router, run_main_pipeline, wait_for_shutdown, ShutdownRequested
 
 logger=None
 
@@ -22,63 +32,158 @@ async def main():
         log_file_path=settings.LOG_FILE_PATH,
         log_level=settings.LOG_LEVEL,
         max_bytes=settings.LOG_MAX_BYTES,
-        backup_count=settings.LOG_BACKUP_COUNT
+        backup_count=settings.LOG_BACKUP_COUNT,
+        sample_rate=settings.LOG_SAMPLE_RATE,
     )
     
     # 로거 초기화 (setup_logging 이후에 호출)
     global logger
     logger = get_logger(__name__)
 
-    # 프로메테우스 메트릭 서버 시작
-    start_http_server(settings.METRICS_PORT)
-    logger.info("프로메테우스 메트릭 서버 시작", port=settings.METRICS_PORT)
+    # 멀티 프로세스 모드에서는 이 워커가 맡은 학생 디렉토리만 처리하고, 메트릭은 슈퍼바이저가 노출
+    partition = current_partition()
+    if partition is None:
+        # 프로메테우스 메트릭 서버 시작
+        start_http_server(settings.METRICS_PORT)
+        logger.info("프로메테우스 메트릭 서버 시작", port=settings.METRICS_PORT)
 
     logger.info("Filemon 애플리케이션 시작",
                log_level=settings.LOG_LEVEL,
-               log_file=settings.LOG_FILE_PATH)
+               log_file=settings.LOG_FILE_PATH,
+               partition=partition)
     loop = asyncio.get_running_loop()
 
     # 의존성 생성
     parser = SourcePathParser()
-    path_filter = PathFilter()
+    path_filter = PathFilter(partition=partition)
     executor = ThreadPoolExecutor(max_workers=settings.THREAD_POOL_WORKERS, thread_name_prefix="filemon")
-    raw_queue = asyncio.Queue()
-    processed_queue = asyncio.Queue()
-    snapshot_manager = SnapshotManager()
-    snapshot_sender = SnapshotSender()
-    pipeline = FilemonPipeline(executor=executor, snapshot_manager=snapshot_manager, snapshot_sender=snapshot_sender, parser=parser, path_filter=path_filter)
-    debouncer = Debouncer(processed_queue=processed_queue)
+    # 메모리 크기를 제한하고 초과분은 디스크로 스필하는 큐
+    raw_queue = SpillQueue("raw", settings.RAW_QUEUE_MAXSIZE, settings.QUEUE_SPILL_DIR)
+    processed_queue = SpillQueue("processed", settings.PROCESSED_QUEUE_MAXSIZE, settings.QUEUE_SPILL_DIR)
+    # 파일 경로 해시로 나눈 파이프라인 워커별 큐 (워커가 1개면 processed_queue를 직접 사용)
+    # 한 샤드가 밀려도 라우터가 멈추지 않도록 샤드별로 디스크 스필
+    shard_queues = [SpillQueue(f"shard-{shard}", settings.PIPELINE_SHARD_QUEUE_SIZE, settings.QUEUE_SPILL_DIR)
+                    for shard in range(settings.PIPELINE_WORKERS)] if settings.PIPELINE_WORKERS > 1 else []
+    # PIPELINE_WORKERS를 줄였으면 사라진 샤드의 스필 이벤트를 processed_queue로 옮겨 다시 분배
+    recover_orphaned_spills(settings.QUEUE_SPILL_DIR, "shard-", {q.name for q in shard_queues}, processed_queue)
+    manifest = None
+    if settings.SNAPSHOT_MANIFEST_ENABLED:
+        manifest = SnapshotManifest(settings.SNAPSHOT_BASE / settings.SNAPSHOT_MANIFEST_DIR,
+                                    checkpoint_every=settings.SNAPSHOT_MANIFEST_CHECKPOINT_EVERY,
+                                    open_manifests=settings.SNAPSHOT_MANIFEST_OPEN)
+    snapshot_manager = SnapshotManager(partition=partition, manifest=manifest, executor=executor)
+    outbox = None
+    if settings.OUTBOX_ENABLED:
+        outbox = SnapshotOutbox(settings.OUTBOX_PATH,
+                                backoff_base=settings.OUTBOX_BACKOFF_BASE,
+                                backoff_max=settings.OUTBOX_BACKOFF_MAX,
+                                max_attempts=settings.OUTBOX_MAX_ATTEMPTS)
+    snapshot_sender = SnapshotSender(outbox=outbox)
+    await snapshot_sender.start()
+    pipeline = FilemonPipeline(executor=executor, snapshot_manager=snapshot_manager, snapshot_sender=snapshot_sender, parser=parser, path_filter=path_filter,
+                               zero_copy=settings.SNAPSHOT_ZERO_COPY and snapshot_manager.supports_zero_copy,
+                               large_file_mode=settings.LARGE_FILE_MODE,
+                               # 전체 복사는 원본을 스냅샷 파일로 그대로 복사하는 저장 방식에서만 (그 밖에는 발췌본)
+                               large_file_full_size=settings.LARGE_FILE_MAX_SIZE if snapshot_manager.supports_zero_copy else 0,
+                               large_file_excerpt_bytes=settings.LARGE_FILE_EXCERPT_BYTES)
+    debouncer = Debouncer(processed_queue=processed_queue, policy=create_policy(settings.WATCH_ROOT))
     handler = WatchdogHandler(raw_queue=raw_queue, loop=loop, path_filter=path_filter)
     logger.debug("의존성 객체 생성 완료",
-               thread_pool_workers=settings.THREAD_POOL_WORKERS)
+               thread_pool_workers=settings.THREAD_POOL_WORKERS,
+               pipeline_workers=settings.PIPELINE_WORKERS)
 
-    observer = Observer()
-    observer.schedule(handler, str(settings.WATCH_ROOT), recursive=True)
-    observer.start()
+    catchup = CatchUpScanner(settings.WATCH_ROOT, path_filter, parser, snapshot_manager, executor,
+                             concurrency=settings.CATCHUP_SCAN_CONCURRENCY,
+                             rate=settings.CATCHUP_SCAN_RATE,
+                             max_file_size=settings.MAX_CAPTURABLE_FILE_SIZE,
+                             notebook_max_file_size=settings.NOTEBOOK_MAX_FILE_SIZE if settings.NOTEBOOK_NORMALIZE else None)
+
+    # inotify는 같은 노드의 쓰기만 감지하므로 NFS 환경에서는 stat 스캐너를 함께(또는 대신) 사용
+    observer = None
+    lazy_watches = None
+    if settings.WATCH_MODE in ("inotify", "hybrid"):
+        if settings.WATCH_LAZY_ENABLED and settings.WATCH_PRUNE_ENABLED and settings.WATCH_MODE == "hybrid":
+            # 하위 watch를 새로 등록한 작업 공간은 watch가 없던 동안의 변경을 캐치업 스캔으로 보완
+            lazy_watches = LazyWatches(settings.WATCH_LAZY_IDLE_TTL,
+                                       on_attach=lambda workspace: asyncio.run_coroutine_threadsafe(
+                                           run_catchup_scan(catchup, raw_queue, [workspace]), loop))
+        elif settings.WATCH_LAZY_ENABLED:
+            # 과제 디렉토리보다 깊은 곳의 쓰기는 stat 스캐너만 감지하므로 스캐너 없이는 변경을 놓침
+            logger.warning("lazy 감시는 WATCH_PRUNE_ENABLED와 WATCH_MODE=hybrid에서만 지원되어 전체 watch를 등록",
+                           watch_mode=settings.WATCH_MODE, prune_enabled=settings.WATCH_PRUNE_ENABLED)
+        observer = PrunedObserver(path_filter.should_descend, lazy=lazy_watches) if settings.WATCH_PRUNE_ENABLED else Observer()
+        observer.schedule(handler, str(settings.WATCH_ROOT), recursive=True)
+        observer.start()
+    scanner = None
+    if settings.WATCH_MODE in ("scan", "hybrid"):
+        scanner = StatScanner(settings.WATCH_ROOT, path_filter,
+                              index_path=settings.SCANNER_INDEX_PATH,
+                              min_interval=settings.SCANNER_MIN_INTERVAL,
+                              max_interval=settings.SCANNER_MAX_INTERVAL,
+                              max_dirs_per_pass=settings.SCANNER_MAX_DIRS_PER_PASS)
     logger.info("Filemon 시작 완료",
+               watch_mode=settings.WATCH_MODE,
                watch_root=str(settings.WATCH_ROOT),
                snapshot_base=str(settings.SNAPSHOT_BASE),
                max_file_size=settings.MAX_CAPTURABLE_FILE_SIZE,
                api_server=settings.API_SERVER)
 
-    # asyncio 스타일의 시그널 처리(Unix)
+    # asyncio 스타일의 시그널 처리(Unix): TaskGroup을 취소하고 정리는 finally에서 한 번만 수행
+    stop_event = asyncio.Event()
     for sig in (signal.SIGINT, signal.SIGTERM):
-        loop.add_signal_handler(sig, lambda s=sig: asyncio.create_task(shutdown(pipeline, observer, executor)))
+        loop.add_signal_handler(sig, stop_event.set)
 
     logger.info("메인 이벤트 루프 시작")
     
     try:
         async with asyncio.TaskGroup() as tg:
+            tg.create_task(wait_for_shutdown(stop_event))
             tg.create_task(run_debouncer(debouncer, raw_queue))
-            tg.create_task(run_main_pipeline(processed_queue, pipeline))
-            tg.create_task(monitor_watchdog(observer))
-            tg.create_task(monitor_queues(raw_queue, processed_queue))
+            if shard_queues:
+                tg.create_task(run_pipeline_router(processed_queue, shard_queues))
+                for shard_queue in shard_queues:
+                    tg.create_task(run_main_pipeline(shard_queue, pipeline))
+            else:
+                tg.create_task(run_main_pipeline(processed_queue, pipeline))
+            if observer is not None:
+                tg.create_task(monitor_watchdog(observer))
+            if settings.CATCHUP_SCAN_ENABLED:
+                # watch 등록 이후에 실행하므로 스캔 중의 변경은 실시간 이벤트로도 감지됨
+                tg.create_task(run_catchup_scan(catchup, raw_queue))
+            if scanner is not None:
+                tg.create_task(run_stat_scanner(scanner, raw_queue, executor, settings.SCANNER_CHECKPOINT_INTERVAL,
+                                                lazy_watches=lazy_watches))
+            if lazy_watches is not None:
+                tg.create_task(run_watch_release(lazy_watches, executor, settings.WATCH_LAZY_RELEASE_INTERVAL))
+            tg.create_task(monitor_queues(raw_queue, processed_queue, shard_queues))
+            tg.create_task(monitor_api_pool(snapshot_sender))
+            if outbox is not None:
+                tg.create_task(run_outbox_replayer(snapshot_sender, settings.OUTBOX_RETRY_INTERVAL))
+            # 블롭 저장소는 워커가 공유하므로 GC는 한 워커에서만 실행
+            if settings.SNAPSHOT_DEDUP_ENABLED and (partition is None or partition.index == 0):
+                tg.create_task(run_blob_gc(snapshot_manager, settings.SNAPSHOT_BLOB_GC_INTERVAL))
+            if settings.SNAPSHOT_RETENTION_ENABLED:
+                if snapshot_manager.supports_retention:
+                    policy = RetentionPolicy(settings.SNAPSHOT_RETENTION_KEEP_ALL,
+                                             settings.SNAPSHOT_RETENTION_RECENT_INTERVAL,
+                                             settings.SNAPSHOT_RETENTION_CLOSED_INTERVAL,
+                                             settings.SNAPSHOT_RETENTION_DEADLINES)
+                    compactor = RetentionCompactor(settings.SNAPSHOT_BASE, policy, snapshot_sender, executor,
+                                                   partition=partition, manifest=manifest,
+                                                   dirs_per_second=settings.SNAPSHOT_RETENTION_DIRS_PER_SECOND)
+                    tg.create_task(run_retention(compactor, settings.SNAPSHOT_RETENTION_INTERVAL))
+                else:
+                    logger.warning("스냅샷 보존 정리는 file 저장 모드에서만 지원", storage_mode=settings.SNAPSHOT_STORAGE_MODE)
+            if settings.SNAPSHOT_STORAGE_MODE == "segment":
+                tg.create_task(run_segment_compaction(snapshot_manager, settings.SNAPSHOT_SEGMENT_COMPACT_INTERVAL))
+    except* ShutdownRequested:
+        pass
     except* Exception as eg:
         logger.critical("TaskGroup에서 하나 이상의 처리되지 않은 예외 발생. 시스템을 종료합니다.", exc_info=True)
     finally:
-        await shutdown(pipeline, observer, executor)
+        await shutdown(pipeline, observer, executor, snapshot_sender, (raw_queue, processed_queue, *shard_queues), scanner)
 
-async def shutdown(pipeline, observer, executor):
+async def shutdown(pipeline, observer, executor, snapshot_sender=None, spill_queues=(), scanner=None):
     logger.info("애플리케이션 종료 시작", component="shutdown")
     try:
         if observer:
@@ -90,6 +195,17 @@ async def shutdown(pipeline, observer, executor):
                    error_type=type(e).__name__,
                    exc_info=True)
     finally:
+        if snapshot_sender:
+            await snapshot_sender.close()
+            if snapshot_sender.outbox is not None:
+                snapshot_sender.outbox.close()
+        if pipeline:
+            pipeline.snapshot_manager.close()
         if executor:
             executor.shutdown(wait=True)
+        for spill_queue in spill_queues:
+            spill_queue.close()
+        if scanner:
+            # 스레드 풀 종료 후 저장하여 진행 중인 스캔과 겹치지 않도록 함
+            scanner.save_index()
         logger.info("애플리케이션 종료 완료", component="shutdown")
\ No newline at end of file
@@ -0,0 +1,261 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+from app.utils.logger import get_logger
+from app.utils.metrics import record_manifest_checkpoint, record_manifest_record
+
+logger = get_logger(__name__)
+
+LOG_SUFFIX = ".jsonl"
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+
+
+def content_digest(data: bytes) -> str:
+    """매니페스트에 기록하는 내용 해시 (ContentFingerprint, BlobStore와 같은 blake2b-128)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """매니페스트에 기록된 스냅샷 하나"""
+    filename: str            # 파일명 (예: src@main.c)
+    timestamp: str           # 스냅샷 타임스탬프 (YYYYMMDD_HHMMSS)
+    size: int                # 스냅샷 크기 (bytes)
+    digest: Optional[str]    # 내용 해시 (blake2b-128 hex, 계산하지 않았으면 None)
+    storage: str             # 저장 위치 (file, blob, delta, segment)
+
+
+class _StudentManifest:
+    """(class_div, hw_name, student_id) 하나의 매니페스트 상태"""
+
+    def __init__(self, base: Path):
+        self.log_path = base.with_name(base.name + LOG_SUFFIX)
+        self.checkpoint_path = base.with_name(base.name + CHECKPOINT_SUFFIX)
+        self.lock = threading.Lock()
+        self.log_file: Optional[TextIO] = None
+        # filename -> 타임스탬프 순 항목 목록, 읽기/쓰기 시 지연 로드
+        self.files: Optional[Dict[str, List[ManifestEntry]]] = None
+        self.log_records = 0  # 마지막 체크포인트 이후 로그 레코드 수
+        # 이 매니페스트를 사용 중인 호출 수 (SnapshotManifest._manifests_lock으로 보호, 사용 중이면 LRU에서 내보내지 않음)
+        self.users = 0
+
+    def close_files(self):
+        if self.log_file is not None:
+            self.log_file.close()
+        self.log_file = None
+
+
+class SnapshotManifest:
+    """
+    학생·과제별 추가 전용(append-only) 스냅샷 매니페스트.
+
+    스냅샷을 만들 때마다 (filename, timestamp, size, digest, storage) 레코드를
+    `<root>/<class_div>/<hw_name>/<student_id>.jsonl`에 한 줄씩 추가하고,
+    레코드가 checkpoint_every개 쌓이면 살아있는 항목 전체를 체크포인트 파일에 원자적으로
+    다시 쓴 뒤 로그를 비웁니다. 처음 접근할 때 체크포인트와 로그를 읽어 메모리 인덱스를
+    구성하므로, 이후 파일별 최신 스냅샷 조회는 O(1), 기간 조회는 이분 탐색으로 처리되어
+    스냅샷 디렉토리를 탐색하지 않아도 됩니다.
+    """
+
+    def __init__(self, root: Path, checkpoint_every: int = 256, open_manifests: int = 1024):
+        self.root = Path(root)
+        self.checkpoint_every = checkpoint_every
+        self.open_manifests = open_manifests
+        self._manifests: "OrderedDict[Tuple[str, str, str], _StudentManifest]" = OrderedDict()
+        self._manifests_lock = threading.Lock()
+
+    # --- 쓰기 ---
+
+    def append(self, class_div: str, hw_name: str, student_id: str, entry: ManifestEntry):
+        """스냅샷 레코드 추가 (동기 함수)"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            self._apply(manifest.files, entry)
+            self._write_record(manifest, self._entry_record(entry))
+        record_manifest_record("append")
+
+    def remove(self, class_div: str, hw_name: str, student_id: str, filename: str, timestamp: str) -> bool:
+        """스냅샷 레코드 삭제 (툼스톤 기록, 공간은 체크포인트 시 회수)"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            if not self._discard(manifest.files, filename, timestamp):
+                return False
+            self._write_record(manifest, {"f": filename, "t": timestamp, "d": 1})
+        record_manifest_record("remove")
+        return True
+
+    def checkpoint(self, class_div: str, hw_name: str, student_id: str):
+        """살아있는 항목을 체크포인트 파일에 다시 쓰고 로그를 비움"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            self._checkpoint(manifest)
+
+    # --- 읽기 ---
+
+    def latest(self, class_div: str, hw_name: str, student_id: str, filename: str) -> Optional[ManifestEntry]:
+        """파일의 마지막 스냅샷 (없으면 None)"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            entries = manifest.files.get(filename)
+            return entries[-1] if entries else None
+
+    def history(self, class_div: str, hw_name: str, student_id: str, filename: str,
+                start: Optional[str] = None, end: Optional[str] = None) -> List[ManifestEntry]:
+        """파일의 스냅샷 목록 (타임스탬프 순, start 이상 end 미만)"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            entries = manifest.files.get(filename, [])
+            lo = 0 if start is None else bisect.bisect_left(entries, start, key=lambda e: e.timestamp)
+            hi = len(entries) if end is None else bisect.bisect_left(entries, end, key=lambda e: e.timestamp)
+            return entries[lo:hi]
+
+    def files(self, class_div: str, hw_name: str, student_id: str) -> List[str]:
+        """스냅샷이 있는 파일명 목록"""
+        with self._use_manifest(class_div, hw_name, student_id) as manifest, manifest.lock:
+            self._load(manifest)
+            return sorted(manifest.files)
+
+    def close(self):
+        """열려 있는 모든 로그 파일 닫기"""
+        with self._manifests_lock:
+            manifests = list(self._manifests.values())
+            self._manifests.clear()
+        for manifest in manifests:
+            with manifest.lock:
+                manifest.close_files()
+
+    # --- 내부 구현 ---
+
+    @contextmanager
+    def _use_manifest(self, class_div: str, hw_name: str, student_id: str) -> Iterator[_StudentManifest]:
+        """
+        매니페스트 상태를 사용하는 동안 LRU에서 내보내지 않도록 표시합니다 (LRU로 메모리에 둘 학생 수 제한).
+        사용 중인 상태를 내보내면 같은 학생에 두 번째 상태가 생겨 메모리 인덱스가 서로 어긋나므로,
+        아무도 사용하지 않는 상태만 내보냅니다.
+        """
+        key = (class_div, hw_name, student_id)
+        evicted = []
+        with self._manifests_lock:
+            manifest = self._manifests.get(key)
+            if manifest is None:
+                manifest = _StudentManifest(self.root / class_div / hw_name / student_id)
+                self._manifests[key] = manifest
+            self._manifests.move_to_end(key)
+            manifest.users += 1
+            excess = len(self._manifests) - self.open_manifests
+            if excess > 0:
+                for old_key in [k for k, old in self._manifests.items() if old.users == 0][:excess]:
+                    evicted.append(self._manifests.pop(old_key))
+
+        # 전역 락을 놓은 뒤 개별 락으로 파일을 닫아 락 순서 역전을 피함
+        for old in evicted:
+            with old.lock:
+                old.close_files()
+        try:
+            yield manifest
+        finally:
+            with self._manifests_lock:
+                manifest.users -= 1
+
+    def _write_record(self, manifest: _StudentManifest, record: dict):
+        if manifest.log_file is None:
+            manifest.log_path.parent.mkdir(parents=True, exist_ok=True)
+            manifest.log_file = open(manifest.log_path, "a", encoding="utf-8")
+        manifest.log_file.write(self._encode_record(record))
+        manifest.log_file.flush()
+        manifest.log_records += 1
+        if self.checkpoint_every > 0 and manifest.log_records >= self.checkpoint_every:
+            self._checkpoint(manifest)
+
+    def _checkpoint(self, manifest: _StudentManifest):
+        """
+        체크포인트를 원자적으로 교체한 뒤 로그를 비웁니다.
+        교체 후 로그를 비우기 전에 중단되어도, 로그 재적용은 멱등이므로 결과가 같습니다.
+        """
+        manifest.log_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = manifest.checkpoint_path.with_name(f".{manifest.checkpoint_path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for filename in sorted(manifest.files):
+                f.writelines(self._encode_record(self._entry_record(e)) for e in manifest.files[filename])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, manifest.checkpoint_path)
+
+        manifest.close_files()
+        manifest.log_file = open(manifest.log_path, "w", encoding="utf-8")
+        manifest.log_records = 0
+        record_manifest_checkpoint()
+        logger.debug("매니페스트 체크포인트 완료", path=str(manifest.checkpoint_path),
+                     files=len(manifest.files))
+
+    def _load(self, manifest: _StudentManifest):
+        """체크포인트와 로그를 순서대로 읽어 메모리 인덱스 구성 (마지막 기록이 우선, 툼스톤은 제거)"""
+        if manifest.files is not None:
+            return
+        files: Dict[str, List[ManifestEntry]] = {}
+        self._replay(manifest.checkpoint_path, files)
+        manifest.log_records = self._replay(manifest.log_path, files)
+        manifest.files = files
+
+    def _replay(self, path: Path, files: Dict[str, List[ManifestEntry]]) -> int:
+        """레코드 파일을 files에 적용하고 읽은 레코드 수 반환"""
+        count = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 비정상 종료로 잘린 마지막 줄은 무시
+                        logger.warning("손상된 매니페스트 레코드 무시", path=str(path))
+                        continue
+                    count += 1
+                    if record.get("d"):
+                        self._discard(files, record["f"], record["t"])
+                        continue
+                    self._apply(files, ManifestEntry(record["f"], record["t"], record["s"],
+                                                     record.get("h"), record["l"]))
+        except FileNotFoundError:
+            pass
+        return count
+
+    @staticmethod
+    def _apply(files: Dict[str, List[ManifestEntry]], entry: ManifestEntry):
+        """타임스탬프 순서를 유지하며 추가 (같은 타임스탬프는 교체, 보통은 끝에 추가)"""
+        entries = files.setdefault(entry.filename, [])
+        if not entries or entries[-1].timestamp < entry.timestamp:
+            entries.append(entry)
+            return
+        i = bisect.bisect_left(entries, entry.timestamp, key=lambda e: e.timestamp)
+        if i < len(entries) and entries[i].timestamp == entry.timestamp:
+            entries[i] = entry
+        else:
+            entries.insert(i, entry)
+
+    @staticmethod
+    def _discard(files: Dict[str, List[ManifestEntry]], filename: str, timestamp: str) -> bool:
+        entries = files.get(filename)
+        if not entries:
+            return False
+        i = bisect.bisect_left(entries, timestamp, key=lambda e: e.timestamp)
+        if i == len(entries) or entries[i].timestamp != timestamp:
+            return False
+        del entries[i]
+        if not entries:
+            del files[filename]
+        return True
+
+    @staticmethod
+    def _entry_record(entry: ManifestEntry) -> dict:
+        return {"f": entry.filename, "t": entry.timestamp, "s": entry.size, "h": entry.digest, "l": entry.storage}
+
+    @staticmethod
+    def _encode_record(record: dict) -> str:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
@@ -0,0 +1,59 @@
+import json
+
+# 실행·화면 상태만 담고 있어 실행할 때마다 바뀌는 셀 메타데이터 키
+_VOLATILE_CELL_METADATA = frozenset({"collapsed", "scrolled", "execution", "ExecuteTime", "jupyter", "trusted"})
+# 위젯 상태처럼 크기가 크고 코드와 무관한 노트북 메타데이터 키
+_VOLATILE_NOTEBOOK_METADATA = frozenset({"widgets"})
+
+
+def normalize_notebook(data: bytes) -> bytes:
+    """
+    Jupyter 노트북(.ipynb)에서 셀 소스와 메타데이터만 남긴 정규화된 JSON을 반환합니다.
+
+    출력(이미지 등 base64 데이터 포함)과 실행 번호, 실행 시각·접힘 같은 화면 상태를 지우고
+    키 정렬·고정 들여쓰기로 다시 직렬화하므로, 코드를 바꾸지 않고 다시 실행·자동 저장한 경우
+    같은 바이트열이 됩니다. 결과는 출력이 비어 있는 유효한 노트북으로 Jupyter에서 열 수 있습니다.
+
+    Raises:
+        ValueError: JSON이 아니거나 노트북 형식(cells 목록)이 아닌 경우
+    """
+    notebook = json.loads(data)
+    if not isinstance(notebook, dict) or not isinstance(notebook.get("cells"), list):
+        raise ValueError("노트북 형식이 아닙니다.")
+
+    cells = []
+    for cell in notebook["cells"]:
+        if not isinstance(cell, dict):
+            raise ValueError("노트북 셀 형식이 아닙니다.")
+        normalized = {
+            "cell_type": cell.get("cell_type", "code"),
+            "metadata": _strip(cell.get("metadata"), _VOLATILE_CELL_METADATA),
+            "source": _join_source(cell.get("source", "")),
+        }
+        if "id" in cell:
+            normalized["id"] = cell["id"]
+        if normalized["cell_type"] == "code":
+            normalized["execution_count"] = None
+            normalized["outputs"] = []
+        cells.append(normalized)
+
+    canonical = {
+        "cells": cells,
+        "metadata": _strip(notebook.get("metadata"), _VOLATILE_NOTEBOOK_METADATA),
+        "nbformat": notebook.get("nbformat", 4),
+        "nbformat_minor": notebook.get("nbformat_minor", 0),
+    }
+    return (json.dumps(canonical, ensure_ascii=False, sort_keys=True, indent=1) + "\n").encode("utf-8")
+
+
+def _strip(metadata, volatile: frozenset) -> dict:
+    if not isinstance(metadata, dict):
+        return {}
+    return {key: value for key, value in metadata.items() if key not in volatile}
+
+
+def _join_source(source) -> str:
+    """nbformat은 소스를 문자열 또는 줄 목록으로 저장하므로 하나의 문자열로 통일"""
+    if isinstance(source, list):
+        return "".join(source)
+    return source
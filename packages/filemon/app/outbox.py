@@ -0,0 +1,131 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_next_attempt ON outbox (next_attempt);
+CREATE TABLE IF NOT EXISTS outbox_dead (
+    id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    failed_at REAL NOT NULL
+);
+"""
+
+
+class OutboxEntry(NamedTuple):
+    """재전송 대기 중인 스냅샷 등록 요청"""
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class SnapshotOutbox:
+    """
+    등록에 실패한 스냅샷을 보관하는 로컬 영구 outbox (SQLite WAL).
+    payload는 bulk 등록 API의 항목 형식(class_div, hw_name, student_id, filename, timestamp, bytes)을
+    그대로 저장하며, 재전송에 실패한 항목은 지수 백오프(지터 포함)로 다음 시도 시각을 늦춥니다.
+    max_attempts번 실패했거나 백엔드가 거부한(4xx) 항목은 재시도하지 않도록 outbox_dead 테이블로 옮깁니다.
+    모든 메서드는 동기 함수이므로 이벤트 루프에서는 스레드 풀을 통해 호출해야 합니다.
+    """
+
+    def __init__(self, path: Path, backoff_base: float = 2, backoff_max: float = 300, max_attempts: int = 0):
+        self.path = Path(path)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts  # 0이면 제한 없음
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, payloads: List[Dict[str, Any]], now: Optional[float] = None):
+        """등록 실패한 항목을 저장 (첫 재시도는 backoff_base 초 후)"""
+        now = time.time() if now is None else now
+        rows = [(json.dumps(p, ensure_ascii=False), now + self.backoff_base, now) for p in payloads]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO outbox (payload, next_attempt, created_at) VALUES (?, ?, ?)", rows)
+
+    def due(self, limit: int, now: Optional[float] = None) -> List[OutboxEntry]:
+        """재시도 시각이 된 항목을 오래된 순서로 최대 limit개 반환"""
+        now = time.time() if now is None else now
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, payload, attempts FROM outbox WHERE next_attempt <= ? "
+                "ORDER BY next_attempt, id LIMIT ?", (now, limit))
+            return [OutboxEntry(row[0], json.loads(row[1]), row[2]) for row in cursor]
+
+    def remove(self, entries: List[OutboxEntry]):
+        """전송에 성공한 항목 삭제"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(e.id,) for e in entries])
+
+    def reschedule(self, entries: List[OutboxEntry], now: Optional[float] = None) -> int:
+        """
+        재전송에 실패한 항목의 다음 시도 시각을 지수 백오프로 늦춤
+
+        Returns:
+            int: max_attempts에 도달하여 dead-letter로 옮긴 항목 수
+        """
+        now = time.time() if now is None else now
+        exhausted = [e for e in entries if self.max_attempts and e.attempts + 1 >= self.max_attempts]
+        exhausted_ids = {e.id for e in exhausted}
+        rows = [(e.attempts + 1, now + self.backoff_delay(e.attempts + 1), e.id)
+                for e in entries if e.id not in exhausted_ids]
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?", rows)
+            self._move_to_dead(exhausted, "max_attempts", now)
+        return len(exhausted)
+
+    def dead_letter(self, entries: List[OutboxEntry], reason: str, now: Optional[float] = None):
+        """재시도해도 성공할 수 없는 항목(백엔드가 거부한 항목 등)을 dead-letter 테이블로 옮김"""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._move_to_dead(entries, reason, now)
+
+    def _move_to_dead(self, entries: List[OutboxEntry], reason: str, now: float):
+        """트랜잭션 안에서 호출 (이번 실패까지 포함한 시도 횟수로 기록)"""
+        rows = [(e.attempts + 1, reason, now, e.id) for e in entries]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO outbox_dead (id, payload, attempts, reason, created_at, failed_at) "
+            "SELECT id, payload, ?, ?, created_at, ? FROM outbox WHERE id = ?", rows)
+        self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(e.id,) for e in entries])
+
+    def backoff_delay(self, attempts: int) -> float:
+        """시도 횟수에 따른 대기 시간 (backoff_base * 2^attempts, 최대 backoff_max, 50~100% 지터)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** min(attempts, 32)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def pending(self) -> int:
+        """대기 중인 항목 수"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead(self) -> int:
+        """dead-letter로 옮긴 항목 수"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox_dead").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,23 @@
+import zlib
+from typing import NamedTuple, Optional
+from app.config.settings import settings
+
+
+class WorkerPartition(NamedTuple):
+    """
+    멀티 프로세스 모드에서 워커가 맡은 학생 디렉토리(과목-분반-학번) 범위.
+    디렉토리명의 crc32 해시로 나누므로 재시작해도 같은 학생은 같은 워커가 맡습니다.
+    """
+    index: int
+    count: int
+
+    def owns(self, student_dir: str) -> bool:
+        """WATCH_ROOT 바로 아래 디렉토리명이 이 워커의 담당인지 확인"""
+        return zlib.crc32(student_dir.encode()) % self.count == self.index
+
+
+def current_partition() -> Optional[WorkerPartition]:
+    """설정(WORKER_INDEX, WORKER_COUNT)의 담당 범위 (단일 프로세스 모드면 None)"""
+    if settings.WORKER_COUNT <= 1:
+        return None
+    return WorkerPartition(settings.WORKER_INDEX, settings.WORKER_COUNT)
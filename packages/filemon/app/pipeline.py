@@ -11,21 +11,36 @@ from app.config.settings import settings
 from app.utils.logger import get_logger
 from app.snapshot import SnapshotManager
 from app.sender import SnapshotSender
-from app.utils.metrics import record_file_size_exceeded
+from app.content_cache import ContentHashCache, ContentFingerprint
+from app.notebook import normalize_notebook
+from app.large_file import read_excerpt
+from app.zero_copy import digest_file
+from app.tracing import mark, finish_trace
+from app.utils.metrics import (record_file_size_exceeded, record_noop_skipped, record_notebook_normalized,
+                               record_large_file_capture)
 
 class FilemonPipeline:
     """파일 모니터링 파이프라인"""
     
-    def __init__(self, executor: ThreadPoolExecutor, snapshot_manager: SnapshotManager, snapshot_sender: SnapshotSender, parser: SourcePathParser, path_filter: PathFilter):
+    def __init__(self, executor: ThreadPoolExecutor, snapshot_manager: SnapshotManager, snapshot_sender: SnapshotSender, parser: SourcePathParser, path_filter: PathFilter, zero_copy: bool = False,
+                 large_file_mode: str = "skip", large_file_full_size: int = 0, large_file_excerpt_bytes: int = 32 * 1024):
         self.executor = executor
         self.snapshot_manager = snapshot_manager
         self.snapshot_sender = snapshot_sender
         self.parser = parser
         self.path_filter = path_filter
+        self.content_cache = ContentHashCache(settings.SNAPSHOT_NOOP_CACHE_SIZE)
+        # 원본 파일을 커널 내부 복사로 스냅샷에 저장 (SnapshotManager.supports_zero_copy인 경우에만)
+        self.zero_copy = zero_copy
+        # 크기 제한을 넘는 파일: skip, excerpt(앞·뒤 발췌본), full(large_file_full_size까지 커널 복사)
+        self.large_file_mode = large_file_mode
+        self.large_file_full_size = large_file_full_size
+        self.large_file_excerpt_bytes = large_file_excerpt_bytes
         self.logger = get_logger("pipeline")
         
     async def process_event(self, raw_event: FileSystemEvent):
         """raw 파일시스템 이벤트를 처리하는 통합 흐름"""
+        mark(raw_event, "started")
         try:
             if raw_event.event_type == "deleted":
                 await self._handle_deleted_event(raw_event)
@@ -48,8 +63,12 @@ class FilemonPipeline:
             parsed_data = self.parser.parse(Path(event.src_path))
             source_info = SourceFileInfo.from_parsed_data(parsed_data, Path(event.src_path))
             
+            # 같은 내용으로 다시 생성되어도 스냅샷을 남기도록 지문 삭제
+            self.content_cache.forget(event.src_path)
             await self.snapshot_manager.create_empty_snapshot_with_info(source_info)
-            await self.snapshot_sender.register_snapshot(source_info, 0)
+            mark(event, "snapshot")
+            if await self.snapshot_sender.register_snapshot(source_info, 0):
+                finish_trace(event)
             self.logger.info("삭제 처리 완료",
                            filename=source_info.filename,
                            class_div=source_info.class_div,
@@ -63,30 +82,69 @@ class FilemonPipeline:
     async def _handle_modified_event(self, event: FileSystemEvent):
         """modified 이벤트 처리"""
         try:
+            # 노트북은 출력을 지운 뒤의 크기로 제한하므로 원본은 더 큰 크기까지 읽음
+            is_notebook = settings.NOTEBOOK_NORMALIZE and event.src_path.endswith(".ipynb")
+            max_size = settings.NOTEBOOK_MAX_FILE_SIZE if is_notebook else settings.MAX_CAPTURABLE_FILE_SIZE
             file_size = os.path.getsize(event.src_path)
-            if file_size > settings.MAX_CAPTURABLE_FILE_SIZE:
+            # 노트북은 정규화에 전체 JSON이 필요하므로 스트리밍 캡처 대상에서 제외
+            oversized = file_size > max_size
+            if oversized and (is_notebook or self.large_file_mode == "skip"):
                 self.logger.warning("파일 크기 초과", src_path=event.src_path, 
-                                  file_size=file_size, max_size=settings.MAX_CAPTURABLE_FILE_SIZE)
+                                  file_size=file_size, max_size=max_size)
                 record_file_size_exceeded()
                 return
             
             parsed_data = self.parser.parse(Path(event.src_path))
             source_info = SourceFileInfo.from_parsed_data(parsed_data, Path(event.src_path))
             
-            # 파일 읽기 및 스냅샷 생성
-            future = self.executor.submit(self.read_and_verify, event.src_path)
-            file_stat, data = await asyncio.wrap_future(future)
-            
-            await self.snapshot_manager.create_snapshot_with_data(source_info, data)
-            api_success = await self.snapshot_sender.register_snapshot(source_info, len(data))
+            if oversized:
+                captured = await self._capture_large(event, source_info, file_size)
+                if captured is None:
+                    return
+                file_size, fingerprint = captured
+            elif self.zero_copy and not is_notebook:
+                captured = await self._capture_zero_copy(event, source_info)
+                if captured is None:
+                    return
+                file_size, fingerprint = captured
+            else:
+                # 파일 읽기 및 스냅샷 생성 (노트북은 같은 스레드 풀 작업에서 정규화까지 처리)
+                read = self.read_notebook if is_notebook else self.read_and_verify
+                future = self.executor.submit(read, event.src_path)
+                file_stat, data = await asyncio.wrap_future(future)
+                mark(event, "read")
+                if is_notebook and len(data) > settings.MAX_CAPTURABLE_FILE_SIZE:
+                    self.logger.warning("파일 크기 초과", src_path=event.src_path,
+                                      file_size=len(data), max_size=settings.MAX_CAPTURABLE_FILE_SIZE,
+                                      normalized=True)
+                    record_file_size_exceeded()
+                    return
+
+                # 마지막으로 캡처한 버전과 내용이 같으면 스냅샷 생성/등록 생략
+                fingerprint = ContentFingerprint.from_data(file_stat, data)
+                if self.content_cache.is_unchanged(event.src_path, fingerprint):
+                    record_noop_skipped()
+                    self.logger.debug("내용 변경 없음, 스냅샷 생략",
+                                    src_path=event.src_path,
+                                    file_size=len(data))
+                    return
+
+                await self.snapshot_manager.create_snapshot_with_data(source_info, data)
+                mark(event, "snapshot")
+                file_size = len(data)
+            api_success = await self.snapshot_sender.register_snapshot(source_info, file_size)
             
             if api_success:
+                # 등록까지 끝난 버전만 기록 (실패 시 같은 내용의 다음 저장에서 다시 시도)
+                if fingerprint is not None:
+                    self.content_cache.remember(event.src_path, fingerprint)
+                finish_trace(event)
                 self.logger.info("수정 처리 완료",
                                 filename=source_info.filename,
                                 class_div=source_info.class_div,
                                 hw_name=source_info.hw_name,
                                 student_id=source_info.student_id,
-                                file_size=len(data))
+                                file_size=file_size)
             else:
                 self.logger.warning("수정 API 등록 실패",
                                   filename=source_info.filename,
@@ -107,6 +165,108 @@ class FilemonPipeline:
             self.logger.error("modified 이벤트 처리 실패", 
                             src_path=event.src_path, exc_info=True)
     
+    async def _capture_zero_copy(self, event: FileSystemEvent, source_info: SourceFileInfo):
+        """
+        커널 내부 복사로 스냅샷을 저장합니다. 이 경로를 이미 캡처한 적이 있으면 원본을 먼저 해시하여
+        (pread로 한 번 읽기) 내용이 같으면 스냅샷 볼륨에 쓰지 않고 건너뛰며, 바뀐 경우에만
+        임시 파일에 복사한 뒤 확정합니다. 처음 보는 경로는 복사하면서 해시합니다.
+
+        Returns:
+            (파일 크기, 지문 또는 None), 내용 변경이 없으면 None
+        """
+        cache_enabled = self.content_cache.max_entries > 0
+        hashed = None
+        if cache_enabled and event.src_path in self.content_cache:
+            future = self.executor.submit(digest_file, event.src_path)
+            hashed = await asyncio.wrap_future(future)
+            fingerprint = ContentFingerprint(hashed.size, hashed.file_stat.st_mtime_ns, hashed.digest)
+            if self.content_cache.is_unchanged(event.src_path, fingerprint):
+                mark(event, "read")
+                record_noop_skipped()
+                self.logger.debug("내용 변경 없음, 스냅샷 생략",
+                                src_path=event.src_path,
+                                file_size=hashed.size)
+                return None
+
+        pending, capture = await self.snapshot_manager.capture_file(
+            source_info, event.src_path, cache_enabled and hashed is None)
+        mark(event, "read")
+
+        if capture.digest is None and hashed is not None \
+                and (capture.size, capture.file_stat.st_mtime_ns) == (hashed.size, hashed.file_stat.st_mtime_ns):
+            # 해시 이후 원본이 바뀌지 않았으면 먼저 계산한 해시를 그대로 사용
+            capture = capture._replace(digest=hashed.digest)
+
+        fingerprint = None
+        if capture.digest is not None and cache_enabled:
+            fingerprint = ContentFingerprint(capture.size, capture.file_stat.st_mtime_ns, capture.digest)
+            if self.content_cache.is_unchanged(event.src_path, fingerprint):
+                # 해시와 복사 사이에 이전 내용으로 되돌아간 경우
+                await self.snapshot_manager.discard_snapshot(pending)
+                record_noop_skipped()
+                self.logger.debug("내용 변경 없음, 스냅샷 생략",
+                                src_path=event.src_path,
+                                file_size=capture.size)
+                return None
+
+        await self.snapshot_manager.commit_snapshot(source_info, pending, capture)
+        mark(event, "snapshot")
+        return capture.size, fingerprint
+
+    async def _capture_large(self, event: FileSystemEvent, source_info: SourceFileInfo, file_size: int):
+        """
+        크기 제한을 넘는 파일을 메모리에 전체를 올리지 않고 캡처합니다.
+        full 모드에서 large_file_full_size 이하이면 커널 복사로 전체를 저장하고, 그 밖에는
+        청크 단위로 전체 해시를 계산하며 앞·뒤 발췌본만 저장합니다. 어느 쪽이든 백엔드에는
+        원본 크기를 등록합니다.
+
+        Returns:
+            (원본 파일 크기, 지문), 내용 변경이 없으면 None
+        """
+        if self.large_file_mode == "full" and file_size <= self.large_file_full_size:
+            captured = await self._capture_zero_copy(event, source_info)
+            if captured is not None:
+                record_large_file_capture("full", captured[0], captured[0])
+                self.logger.info("큰 파일 전체 캡처", src_path=event.src_path, file_size=captured[0])
+            return captured
+
+        future = self.executor.submit(read_excerpt, event.src_path, self.large_file_excerpt_bytes)
+        excerpt = await asyncio.wrap_future(future)
+        mark(event, "read")
+
+        # 지문은 원본 전체 기준이므로 발췌 범위 밖의 변경도 감지
+        fingerprint = ContentFingerprint(excerpt.size, excerpt.file_stat.st_mtime_ns, excerpt.digest)
+        if self.content_cache.is_unchanged(event.src_path, fingerprint):
+            record_noop_skipped()
+            self.logger.debug("내용 변경 없음, 스냅샷 생략",
+                            src_path=event.src_path,
+                            file_size=excerpt.size)
+            return None
+
+        await self.snapshot_manager.create_snapshot_with_data(source_info, excerpt.data)
+        mark(event, "snapshot")
+        record_large_file_capture("excerpt", excerpt.size, len(excerpt.data))
+        self.logger.info("큰 파일 발췌본 캡처", src_path=event.src_path,
+                       file_size=excerpt.size, stored_size=len(excerpt.data))
+        return excerpt.size, fingerprint
+
+    def read_notebook(self, target_file_path: str):
+        """
+        노트북을 read_and_verify로 읽고 셀 소스와 메타데이터만 남기도록 정규화합니다.
+        JSON 노트북 형식이 아니면(작성 중인 파일 등) 원본을 그대로 반환합니다.
+        """
+        file_stat, data = self.read_and_verify(target_file_path)
+        try:
+            normalized = normalize_notebook(data)
+        except ValueError:
+            self.logger.debug("노트북 형식이 아니어서 원본 그대로 캡처", src_path=target_file_path)
+            return file_stat, data
+
+        record_notebook_normalized(len(data), len(normalized))
+        self.logger.debug("노트북 정규화 완료", src_path=target_file_path,
+                        raw_size=len(data), normalized_size=len(normalized))
+        return file_stat, normalized
+
     def read_and_verify(self, target_file_path: str):
         """
         파일을 읽는 동안 변경되지 않았는지 검증하며 안전하게 읽습니다.
@@ -0,0 +1,222 @@
+import os
+from typing import Callable, Optional
+from watchdog.observers.api import BaseObserver, DEFAULT_OBSERVER_TIMEOUT
+from watchdog.observers.inotify import InotifyEmitter
+from watchdog.observers.inotify_buffer import InotifyBuffer
+from watchdog.observers.inotify_c import Inotify, InotifyConstants, inotify_rm_watch
+from watchdog.utils import BaseThread
+from watchdog.utils.delayed_queue import DelayedQueue
+from app.lazy_watch import LazyWatches
+from app.utils.logger import get_logger
+from app.utils.metrics import set_watch_count, record_pruned_dirs
+
+logger = get_logger(__name__)
+
+DescendPredicate = Callable[[str], bool]
+
+# lazy 감시 모드에서 작업 공간 활동으로 보는 이벤트 (열기·읽기는 스캐너도 발생시키므로 제외)
+_WRITE_EVENTS = (InotifyConstants.IN_MODIFY | InotifyConstants.IN_CLOSE_WRITE | InotifyConstants.IN_ATTRIB |
+                 InotifyConstants.IN_CREATE | InotifyConstants.IN_DELETE | InotifyConstants.IN_MOVE)
+
+
+class _WatchTable(dict):
+    """
+    경로 -> watch descriptor 테이블.
+    watchdog은 새 디렉토리 트리를 os.walk로 훑으며 생성 이벤트를 흉내 내는데, 이때 watch를
+    등록하지 않은(가지치기된) 디렉토리 안의 파일도 부모의 descriptor를 조회합니다.
+    KeyError로 emitter 스레드가 죽지 않도록 없는 경로는 -1을 반환합니다 (해당 이벤트는 핸들러 필터에서 걸러짐).
+    """
+
+    def __missing__(self, path: bytes) -> int:
+        return -1
+
+
+class PrunedInotify(Inotify):
+    """
+    감시할 필요가 없는 하위 트리(가상환경, .git, 과제 구조 밖, 너무 깊은 경로)에 watch를 걸지 않는 Inotify.
+    lazy가 주어지면 작업 공간(루트 바로 아래 디렉토리)과 그 바로 아래 과제 디렉토리에만 얕은 watch를
+    걸고, 그보다 깊은 watch는 LazyWatches가 attach_subtree/detach_subtree로 등록·해제합니다.
+    """
+
+    def __init__(self, path: bytes, should_descend: DescendPredicate, *, recursive: bool = False,
+                 event_mask: int | None = None, lazy: Optional[LazyWatches] = None):
+        self._should_descend = should_descend
+        self._lazy = lazy
+        if lazy is not None:
+            lazy.bind(self)
+        super().__init__(path, recursive=recursive, event_mask=event_mask)
+        self._wd_for_path = _WatchTable(self._wd_for_path)
+        set_watch_count(len(self._wd_for_path))
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wd_for_path)
+
+    def read_events(self, *args, **kwargs):
+        events = super().read_events(*args, **kwargs)
+        if events:
+            if self._lazy is not None:
+                # 배치 안의 쓰기 이벤트를 작업 공간별로 모아 활동 기록 (하위 watch가 없으면 등록)
+                workspaces = {self._lazy.workspace_of(e.src_path) for e in events
+                              if e.mask & _WRITE_EVENTS and not e.is_ignored}
+                for workspace in workspaces:
+                    if workspace is not None:
+                        self._lazy.touch(workspace)
+            set_watch_count(len(self._wd_for_path))
+        return events
+
+    def attach_subtree(self, workspace: bytes) -> int:
+        """작업 공간 하위 전체에 watch 등록 (등록한 watch 수 반환, 작업 공간이 아니거나 없으면 OSError)"""
+        if not os.path.isdir(workspace) or not self._should_descend(os.fsdecode(workspace)):
+            raise PermissionError(f"감시 대상 작업 공간이 아님: {os.fsdecode(workspace)}")
+        with self._lock:
+            before = len(self._wd_for_path)
+            Inotify._add_watch(self, workspace, self._event_mask)
+            pruned = self._watch_tree(workspace, self._event_mask)
+            added = len(self._wd_for_path) - before
+        record_pruned_dirs(pruned)
+        set_watch_count(len(self._wd_for_path))
+        return added
+
+    def detach_subtree(self, workspace: bytes) -> int:
+        """
+        작업 공간 하위의 watch 해제 (작업 공간과 과제 디렉토리의 얕은 watch는 유지).
+        경로 테이블은 커널이 보내는 IN_IGNORED 이벤트를 읽을 때 기본 구현이 정리합니다.
+        """
+        prefix = workspace + b"/"
+        with self._lock:
+            wds = [wd for watched, wd in self._wd_for_path.items()
+                   if watched.startswith(prefix) and b"/" in watched[len(prefix):]]
+            for wd in wds:
+                inotify_rm_watch(self._inotify_fd, wd)
+        return len(wds)
+
+    def _add_dir_watch(self, path: bytes, mask: int, *, recursive: bool) -> None:
+        """기본 구현과 같지만, 가지치기 대상 디렉토리는 하위까지 통째로 건너뜀"""
+        if not os.path.isdir(path):
+            raise NotADirectoryError(path)
+        self._add_watch(path, mask)
+        if not recursive:
+            return
+
+        if self._lazy is not None:
+            pruned = self._watch_workspaces(path, mask)
+        else:
+            pruned = self._watch_tree(path, mask)
+        record_pruned_dirs(pruned)
+        logger.info("inotify watch 등록 완료", path=os.fsdecode(path),
+                   watches=len(self._wd_for_path), pruned_dirs=pruned, lazy=self._lazy is not None)
+
+    def _watch_workspaces(self, path: bytes, mask: int) -> int:
+        """
+        lazy 모드: 작업 공간 디렉토리와 그 바로 아래 과제 디렉토리에만 얕은 watch 등록
+        (과제 디렉토리 바로 아래 파일의 쓰기로 작업 공간이 활성화됨, 건너뛴 디렉토리 수 반환)
+        """
+        pruned = 0
+        for workspace in self._watchable_subdirs(path):
+            if workspace is None:
+                pruned += 1
+                continue
+            try:
+                Inotify._add_watch(self, workspace, mask)
+            except OSError:
+                continue
+            for hw_dir in self._watchable_subdirs(workspace):
+                if hw_dir is None:
+                    pruned += 1
+                    continue
+                try:
+                    Inotify._add_watch(self, hw_dir, mask)
+                except OSError:
+                    continue
+        return pruned
+
+    def _watchable_subdirs(self, path: bytes):
+        """바로 아래 디렉토리 경로 (가지치기 대상은 None으로 반환)"""
+        try:
+            with os.scandir(path) as it:
+                entries = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+        return [p if self._should_descend(os.fsdecode(p)) else None for p in entries]
+
+    def _watch_tree(self, path: bytes, mask: int) -> int:
+        """path 아래의 디렉토리에 watch 등록 (가지치기 대상은 하위까지 건너뜀, 건너뛴 디렉토리 수 반환)"""
+        pruned = 0
+        for root, dirnames, _ in os.walk(path):
+            kept = []
+            for dirname in dirnames:
+                full_path = os.path.join(root, dirname)
+                if os.path.islink(full_path):
+                    continue
+                if not self._should_descend(os.fsdecode(full_path)):
+                    pruned += 1
+                    continue
+                try:
+                    Inotify._add_watch(self, full_path, mask)  # 이미 검사했으므로 기본 구현 호출
+                except OSError:
+                    # 등록 도중 삭제된 디렉토리
+                    continue
+                kept.append(dirname)
+            dirnames[:] = kept  # os.walk가 건너뛴 디렉토리 아래로 내려가지 않도록 함
+        return pruned
+
+    def _add_watch(self, path: bytes, mask: int) -> int:
+        # 실행 중 새로 생긴 디렉토리도 같은 조건으로 거름 (watchdog은 OSError이면 해당 디렉토리를 건너뜀)
+        if path != self.path and not self._should_descend(os.fsdecode(path)):
+            record_pruned_dirs(1)
+            raise PermissionError(f"감시 대상이 아닌 디렉토리: {os.fsdecode(path)}")
+        if self._lazy is not None and path != self.path:
+            # lazy 모드에서는 하위 watch가 등록된 작업 공간 안에서만 과제 디렉토리보다 깊은 새 디렉토리를 감시
+            workspace = self._lazy.workspace_of(path)
+            if workspace is not None and b"/" in path[len(workspace) + 1:] \
+                    and not self._lazy.is_attached(workspace):
+                raise PermissionError(f"비활성 작업 공간의 디렉토리: {os.fsdecode(path)}")
+        return super()._add_watch(path, mask)
+
+
+class PrunedInotifyBuffer(InotifyBuffer):
+    """PrunedInotify를 사용하는 InotifyBuffer"""
+
+    def __init__(self, path: bytes, should_descend: DescendPredicate, *, recursive: bool = False,
+                 event_mask: int | None = None, lazy: Optional[LazyWatches] = None):
+        # InotifyBuffer.__init__은 Inotify를 직접 생성하므로 같은 초기화를 PrunedInotify로 수행
+        BaseThread.__init__(self)
+        self._queue = DelayedQueue(self.delay)
+        self._inotify = PrunedInotify(path, should_descend, recursive=recursive, event_mask=event_mask, lazy=lazy)
+        self.start()
+
+
+class PrunedInotifyEmitter(InotifyEmitter):
+    """PrunedInotifyBuffer로 이벤트를 읽는 InotifyEmitter"""
+
+    def __init__(self, event_queue, watch, should_descend: DescendPredicate,
+                 lazy: Optional[LazyWatches] = None, **kwargs):
+        super().__init__(event_queue, watch, **kwargs)
+        self._should_descend = should_descend
+        self._lazy = lazy
+
+    def on_thread_start(self) -> None:
+        path = os.fsencode(self.watch.path)
+        event_mask = self.get_event_mask_from_filter()
+        self._inotify = PrunedInotifyBuffer(path, self._should_descend, recursive=self.watch.is_recursive,
+                                            event_mask=event_mask, lazy=self._lazy)
+
+
+class PrunedObserver(BaseObserver):
+    """
+    watch 등록 단계에서 무시 대상 하위 트리를 건너뛰는 inotify Observer.
+    기본 Observer는 모든 하위 디렉토리(학생별 가상환경, .git 등)에 watch를 걸고 커널도 그 이벤트를
+    모두 전달하므로, 이벤트 단위 필터링 전에 watch 수·시작 시간·불필요한 깨어남을 함께 줄입니다.
+
+    Args:
+        should_descend: 디렉토리 경로를 받아 하위를 감시할지 반환하는 함수 (PathFilter.should_descend)
+        lazy: 주어지면 작업 공간 하위 watch를 활동이 있을 때만 등록 (재귀 watch 하나에만 사용)
+    """
+
+    def __init__(self, should_descend: DescendPredicate, *, lazy: Optional[LazyWatches] = None,
+                 timeout: float = DEFAULT_OBSERVER_TIMEOUT):
+        def emitter_class(event_queue, watch, **kwargs):
+            return PrunedInotifyEmitter(event_queue, watch, should_descend, lazy, **kwargs)
+
+        super().__init__(emitter_class, timeout=timeout)
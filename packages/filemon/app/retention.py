@@ -0,0 +1,217 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.manifest import SnapshotManifest
+from app.partition import WorkerPartition
+from app.sender import SnapshotSender
+from app.utils.logger import get_logger
+from app.utils.metrics import record_retention_thinned
+
+logger = get_logger(__name__)
+
+_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+_TIMESTAMP_LENGTH = 15
+# 백엔드에 한 번에 보고할 최대 스냅샷 수
+_REPORT_CHUNK = 500
+
+
+class SnapshotFile(NamedTuple):
+    """스냅샷 파일 하나 (`<timestamp><suffix>`)"""
+    timestamp: str
+    path: Path
+    size: int
+
+
+class RetentionPolicy:
+    """
+    스냅샷 보존 정책.
+
+    - keep_all 이내에 만든 스냅샷은 모두 보존
+    - 그보다 오래된 스냅샷은 recent_interval(예: 5분) 구간마다 마지막 하나만 보존
+    - 마감 시각(deadlines)이 지난 과제는 closed_interval(예: 1시간) 구간마다 하나만 보존하되,
+      마감 전 마지막 스냅샷(제출본)은 보존
+    파일별 최신 스냅샷과 삭제 표시(빈 스냅샷)는 항상 보존합니다. 구간마다 가장 늦은 스냅샷을
+    남기므로 같은 정책을 다시 적용해도 추가로 삭제되는 스냅샷이 없습니다.
+    """
+
+    def __init__(self, keep_all: float, recent_interval: float, closed_interval: float,
+                 deadlines: Optional[Dict[str, datetime]] = None):
+        self.keep_all = keep_all
+        self.recent_interval = recent_interval
+        self.closed_interval = closed_interval
+        self.deadlines = deadlines or {}  # "과목-분반/과제" -> 마감 시각
+
+    def select_thinned(self, class_div: str, hw_name: str, snapshots: List[SnapshotFile],
+                       now: datetime) -> List[SnapshotFile]:
+        """파일 하나의 스냅샷 목록에서 삭제할 스냅샷을 반환"""
+        deadline = self.deadlines.get(f"{class_div}/{hw_name}")
+        closed = deadline is not None and now >= deadline
+        interval = self.closed_interval if closed else self.recent_interval
+        if interval <= 0 or len(snapshots) < 2:
+            return []
+
+        ordered = sorted(snapshots, key=lambda s: s.timestamp)
+        protected = {ordered[-1].timestamp}
+        if closed:
+            submitted = [s for s in ordered if _parse(s.timestamp) <= deadline]
+            if submitted:
+                protected.add(submitted[-1].timestamp)
+
+        thinned = []
+        seen_buckets = set()
+        # 최신부터 보면서 구간별로 처음 만난(가장 늦은) 스냅샷만 남김
+        for snapshot in reversed(ordered):
+            taken_at = _parse(snapshot.timestamp)
+            bucket = int(taken_at.timestamp() // interval)
+            first_in_bucket = bucket not in seen_buckets
+            seen_buckets.add(bucket)
+            if first_in_bucket or snapshot.timestamp in protected or snapshot.size == 0:
+                continue
+            if (now - taken_at).total_seconds() < self.keep_all:
+                continue
+            thinned.append(snapshot)
+        return thinned
+
+
+def _parse(timestamp: str) -> datetime:
+    return datetime.strptime(timestamp, _TIMESTAMP_FORMAT)
+
+
+class RetentionCompactor:
+    """
+    SNAPSHOT_BASE(file 저장 모드)의 스냅샷을 보존 정책에 따라 솎아내는 백그라운드 작업.
+
+    학생 디렉토리(과목-분반/과제/학번) 단위로 스레드 풀에서 탐색하고, 디렉토리 사이에
+    쉬어 초당 dirs_per_second개까지만 처리하여 디스크 I/O를 제한합니다.
+    삭제할 스냅샷을 먼저 백엔드에 보고하고, 백엔드가 DB 행을 지웠다고 확인한 스냅샷만
+    파일을 지우므로 보고가 실패하면 다음 주기에 다시 시도합니다 (DB에 없는 파일이 남을
+    수는 있어도 파일이 없는 DB 행은 생기지 않음).
+    """
+
+    def __init__(self, snapshot_base: Path, policy: RetentionPolicy, snapshot_sender: SnapshotSender,
+                 executor: ThreadPoolExecutor, partition: Optional[WorkerPartition] = None,
+                 manifest: Optional[SnapshotManifest] = None, dirs_per_second: float = 20):
+        self.snapshot_base = Path(snapshot_base)
+        self.policy = policy
+        self.snapshot_sender = snapshot_sender
+        self.executor = executor
+        self.partition = partition
+        # 삭제한 스냅샷을 매니페스트에도 반영
+        self.manifest = manifest
+        self.dirs_per_second = dirs_per_second
+
+    async def run_cycle(self, now: Optional[datetime] = None) -> int:
+        """
+        전체 스냅샷 트리를 한 번 순회하며 솎아냅니다.
+
+        Returns:
+            int: 삭제한 스냅샷 수
+        """
+        loop = asyncio.get_running_loop()
+        now = now or datetime.now()
+        student_dirs = await loop.run_in_executor(self.executor, self._list_student_dirs)
+        logger.info("스냅샷 보존 정리 시작", student_dirs=len(student_dirs))
+
+        interval = 1.0 / self.dirs_per_second if self.dirs_per_second > 0 else 0.0
+        thinned_total = 0
+        for class_div, hw_name, student_dir in student_dirs:
+            try:
+                thinned_total += await self._compact_student(class_div, hw_name, student_dir, now)
+            except Exception:
+                logger.error("스냅샷 보존 정리 실패", path=str(student_dir), exc_info=True)
+            if interval:
+                await asyncio.sleep(interval)
+
+        logger.info("스냅샷 보존 정리 완료", student_dirs=len(student_dirs), thinned=thinned_total)
+        return thinned_total
+
+    async def _compact_student(self, class_div: str, hw_name: str, student_dir: Path, now: datetime) -> int:
+        loop = asyncio.get_running_loop()
+        plan = await loop.run_in_executor(self.executor, self._plan, class_div, hw_name, student_dir, now)
+        if not plan:
+            return 0
+
+        items = [{"class_div": class_div, "hw_name": hw_name, "student_id": student_dir.name,
+                  "filename": filename, "timestamp": snapshot.timestamp}
+                 for filename, snapshot in plan]
+        # 백엔드가 DB 행을 지웠다고 확인한 스냅샷만 파일 삭제 (타임스탬프가 어긋난 행을 남기지 않음)
+        confirmed = []
+        for start in range(0, len(items), _REPORT_CHUNK):
+            deleted = await self.snapshot_sender.report_thinned_snapshots(items[start:start + _REPORT_CHUNK])
+            if deleted is None:
+                logger.warning("솎아낸 스냅샷 보고 실패, 다음 주기에 재시도", path=str(student_dir))
+                break
+            chunk = plan[start:start + _REPORT_CHUNK]
+            confirmed.extend(entry for entry, ok in zip(chunk, deleted) if ok)
+            if not all(deleted):
+                logger.warning("DB 행을 찾지 못한 스냅샷은 파일을 남김", path=str(student_dir),
+                               kept=len(chunk) - sum(map(bool, deleted)))
+        plan = confirmed
+        if not plan:
+            return 0
+
+        freed = await loop.run_in_executor(self.executor, self._delete, [snapshot for _, snapshot in plan])
+        if self.manifest is not None:
+            await loop.run_in_executor(self.executor, self._remove_from_manifest, class_div, hw_name,
+                                       student_dir.name, plan)
+        record_retention_thinned(len(plan), freed)
+        logger.debug("스냅샷 솎아내기 완료", path=str(student_dir), thinned=len(plan), freed_bytes=freed)
+        return len(plan)
+
+    def _list_student_dirs(self) -> List[Tuple[str, str, Path]]:
+        """(과목-분반, 과제, 학번 디렉토리) 목록 (.blobs 등 숨김 디렉토리와 다른 워커의 학생 제외)"""
+        result = []
+        for class_dir in self._subdirs(self.snapshot_base):
+            for hw_dir in self._subdirs(class_dir):
+                for student_dir in self._subdirs(hw_dir):
+                    if self.partition is None or self.partition.owns(f"{class_dir.name}-{student_dir.name}"):
+                        result.append((class_dir.name, hw_dir.name, student_dir))
+        return result
+
+    @staticmethod
+    def _subdirs(path: Path) -> List[Path]:
+        try:
+            with os.scandir(path) as it:
+                return sorted(Path(entry.path) for entry in it
+                              if entry.is_dir(follow_symlinks=False) and not entry.name.startswith("."))
+        except OSError:
+            return []
+
+    def _plan(self, class_div: str, hw_name: str, student_dir: Path, now: datetime) -> List[Tuple[str, SnapshotFile]]:
+        """학생 디렉토리의 파일별 스냅샷을 읽고 삭제할 (파일명, 스냅샷) 목록을 반환 (스레드 풀에서 실행)"""
+        plan = []
+        for file_dir in self._subdirs(student_dir):
+            snapshots = []
+            with os.scandir(file_dir) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    timestamp = entry.name[:_TIMESTAMP_LENGTH]
+                    try:
+                        _parse(timestamp)
+                    except ValueError:
+                        continue
+                    snapshots.append(SnapshotFile(timestamp, Path(entry.path), entry.stat().st_size))
+            for snapshot in self.policy.select_thinned(class_div, hw_name, snapshots, now):
+                plan.append((file_dir.name, snapshot))
+        return plan
+
+    def _remove_from_manifest(self, class_div: str, hw_name: str, student_id: str,
+                              plan: List[Tuple[str, SnapshotFile]]):
+        for filename, snapshot in plan:
+            self.manifest.remove(class_div, hw_name, student_id, filename, snapshot.timestamp)
+
+    @staticmethod
+    def _delete(snapshots: List[SnapshotFile]) -> int:
+        """스냅샷 파일 삭제 후 회수한 용량 반환 (블롭 하드 링크는 블롭 GC가 정리)"""
+        freed = 0
+        for snapshot in snapshots:
+            try:
+                snapshot.path.unlink()
+                freed += snapshot.size
+            except FileNotFoundError:
+                pass
+        return freed
@@ -0,0 +1,32 @@
+import argparse
+from pathlib import Path
+from app.config.settings import settings
+from app.segment_store import SegmentStore
+
+
+def main(argv=None):
+    """
+    세그먼트 저장소의 스냅샷을 기존 디렉토리 구조로 내보내는 도구.
+
+    사용 예:
+        python -m app.segment_export --output /watcher/snapshots-export
+    """
+    parser = argparse.ArgumentParser(description="세그먼트 스냅샷을 기존 디렉토리 구조로 내보내기")
+    parser.add_argument("--source", type=Path,
+                        default=settings.SNAPSHOT_BASE / settings.SNAPSHOT_SEGMENT_DIR,
+                        help="세그먼트 저장소 경로 (기본값: SNAPSHOT_BASE/SNAPSHOT_SEGMENT_DIR)")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="내보낼 디렉토리 (class_div/hw_name/student_id/<filename>/<timestamp><suffix>)")
+    args = parser.parse_args(argv)
+
+    store = SegmentStore(args.source)
+    try:
+        exported = store.export(args.output)
+    finally:
+        store.close()
+    print(f"{exported}개의 스냅샷을 {args.output}에 내보냈습니다.")
+    return exported
+
+
+if __name__ == "__main__":
+    main()
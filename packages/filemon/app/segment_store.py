@@ -0,0 +1,392 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from app.utils.logger import get_logger
+from app.utils.metrics import record_segment_append, record_segment_compaction
+
+logger = get_logger(__name__)
+
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".dat"
+INDEX_NAME = "index.jsonl"
+
+
+@dataclass(frozen=True)
+class SegmentEntry:
+    """세그먼트에 기록된 스냅샷 하나의 위치 정보"""
+    filename: str    # 파일명 (예: src@main.c)
+    timestamp: str   # 스냅샷 타임스탬프 (YYYYMMDD_HHMMSS)
+    segment: int     # 세그먼트 번호
+    offset: int      # 세그먼트 내 시작 위치
+    length: int      # 데이터 길이 (bytes)
+
+
+class _StudentLog:
+    """(class_div, hw_name, student_id) 하나의 세그먼트 로그 상태"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.active_segment: Optional[int] = None
+        self.active_size = 0
+        self.segment_file: Optional[BinaryIO] = None
+        self.index_file: Optional[TextIO] = None
+        # (filename, timestamp) -> SegmentEntry, 읽기/압축 시 지연 로드
+        self.entries: Optional[Dict[Tuple[str, str], SegmentEntry]] = None
+        self.dead_bytes = 0
+        # 이 로그를 사용 중인 호출 수 (SegmentStore._logs_lock으로 보호, 사용 중인 로그는 LRU에서 내보내지 않음)
+        self.users = 0
+
+    def close_files(self):
+        for f in (self.segment_file, self.index_file):
+            if f is not None:
+                f.close()
+        self.segment_file = None
+        self.index_file = None
+
+
+class SegmentStore:
+    """
+    로그 구조(log-structured) 스냅샷 저장소.
+    스냅샷마다 개별 파일을 만드는 대신 학생·과제별 세그먼트 파일(`seg-000001.dat`)에
+    이어 쓰고, (filename, timestamp, segment, offset, length)를 `index.jsonl`에 기록합니다.
+    세그먼트가 max_segment_bytes를 넘으면 새 세그먼트로 넘어가며,
+    덮어쓰기·삭제로 생긴 죽은 데이터는 compact()로 회수합니다.
+    """
+
+    def __init__(self, root: Path, max_segment_bytes: int = 16 * 1024 * 1024, open_logs: int = 256):
+        self.root = Path(root)
+        self.max_segment_bytes = max_segment_bytes
+        self.open_logs = open_logs
+        self._logs: "OrderedDict[Tuple[str, str, str], _StudentLog]" = OrderedDict()
+        self._logs_lock = threading.Lock()
+
+    # --- 쓰기 ---
+
+    def append(self, class_div: str, hw_name: str, student_id: str,
+               filename: str, timestamp: str, data: bytes) -> SegmentEntry:
+        """스냅샷 데이터를 활성 세그먼트에 추가하고 인덱스에 기록 (동기 함수)"""
+        with self._use_log(class_div, hw_name, student_id) as log, log.lock:
+            self._ensure_active_segment(log, len(data))
+            offset = log.active_size
+            log.segment_file.write(data)
+            log.segment_file.flush()
+            log.active_size += len(data)
+
+            # 데이터를 먼저 기록한 뒤 인덱스를 기록하므로, 인덱스에 있는 항목은 항상 읽을 수 있음
+            entry = SegmentEntry(filename, timestamp, log.active_segment, offset, len(data))
+            self._write_index_record(log, {"f": filename, "t": timestamp, "g": entry.segment,
+                                           "o": offset, "l": len(data)})
+            if log.entries is not None:
+                self._apply_entry(log, entry)
+
+        record_segment_append(len(data))
+        return entry
+
+    def delete(self, class_div: str, hw_name: str, student_id: str, filename: str, timestamp: str) -> bool:
+        """스냅샷 항목 삭제 (툼스톤 기록, 실제 공간은 압축 시 회수)"""
+        with self._use_log(class_div, hw_name, student_id) as log, log.lock:
+            self._load_entries(log)
+            entry = log.entries.pop((filename, timestamp), None)
+            if entry is None:
+                return False
+            log.dead_bytes += entry.length
+            if log.index_file is None:
+                log.directory.mkdir(parents=True, exist_ok=True)
+                log.index_file = open(log.directory / INDEX_NAME, "a", encoding="utf-8")
+            self._write_index_record(log, {"f": filename, "t": timestamp, "d": 1})
+            return True
+
+    # --- 읽기 ---
+
+    def read(self, class_div: str, hw_name: str, student_id: str, filename: str, timestamp: str) -> bytes:
+        """
+        스냅샷 데이터 반환
+
+        Raises:
+            FileNotFoundError: 해당 스냅샷이 없을 때
+        """
+        with self._use_log(class_div, hw_name, student_id) as log, log.lock:
+            self._load_entries(log)
+            entry = log.entries.get((filename, timestamp))
+            if entry is None:
+                raise FileNotFoundError(f"{class_div}/{hw_name}/{student_id}/{filename}@{timestamp}")
+            if log.segment_file is not None:
+                log.segment_file.flush()
+            return self._read_entry(log.directory, entry)
+
+    def list_entries(self, class_div: str, hw_name: str, student_id: str,
+                     filename: Optional[str] = None) -> List[SegmentEntry]:
+        """학생·과제의 스냅샷 항목 목록 (파일명, 타임스탬프 순)"""
+        with self._use_log(class_div, hw_name, student_id) as log, log.lock:
+            self._load_entries(log)
+            entries = [e for e in log.entries.values() if filename is None or e.filename == filename]
+        return sorted(entries, key=lambda e: (e.filename, e.timestamp))
+
+    # --- 압축 ---
+
+    def compact(self, class_div: str, hw_name: str, student_id: str) -> bool:
+        """
+        살아있는 항목만 새 세그먼트로 다시 써서 죽은 데이터와 작은 세그먼트를 정리합니다.
+
+        Returns:
+            bool: 압축을 수행했는지 여부
+        """
+        with self._use_log(class_div, hw_name, student_id) as log, log.lock:
+            self._load_entries(log)
+            old_segments = self._list_segments(log.directory)
+            live_bytes = sum(e.length for e in log.entries.values())
+            needed_segments = max(1, -(-live_bytes // self.max_segment_bytes))
+            if log.dead_bytes == 0 and len(old_segments) <= needed_segments:
+                return False
+
+            log.close_files()
+            next_segment = (old_segments[-1] if old_segments else 0) + 1
+            new_entries: Dict[Tuple[str, str], SegmentEntry] = {}
+            index_lines = []
+            out = None
+            out_segment = next_segment - 1
+            out_size = self.max_segment_bytes
+            try:
+                for key in sorted(log.entries, key=lambda k: (k[0], k[1])):
+                    entry = log.entries[key]
+                    data = self._read_entry(log.directory, entry)
+                    if out is None or (out_size > 0 and out_size + len(data) > self.max_segment_bytes):
+                        if out is not None:
+                            out.close()
+                        out_segment += 1
+                        out = open(self._segment_path(log.directory, out_segment), "wb")
+                        out_size = 0
+                    out.write(data)
+                    new_entry = SegmentEntry(entry.filename, entry.timestamp, out_segment, out_size, len(data))
+                    out_size += len(data)
+                    new_entries[key] = new_entry
+                    index_lines.append(self._encode_record({"f": new_entry.filename, "t": new_entry.timestamp,
+                                                            "g": new_entry.segment, "o": new_entry.offset,
+                                                            "l": new_entry.length}))
+                if out is not None:
+                    out.flush()
+                    os.fsync(out.fileno())
+            finally:
+                if out is not None:
+                    out.close()
+
+            # 새 인덱스를 원자적으로 교체한 뒤 이전 세그먼트 삭제
+            tmp_index = log.directory / f".{INDEX_NAME}.tmp"
+            with open(tmp_index, "w", encoding="utf-8") as f:
+                f.writelines(index_lines)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_index, log.directory / INDEX_NAME)
+            for segment in old_segments:
+                try:
+                    os.unlink(self._segment_path(log.directory, segment))
+                except FileNotFoundError:
+                    pass
+
+            reclaimed = log.dead_bytes
+            log.entries = new_entries
+            log.dead_bytes = 0
+            log.active_segment = None
+            log.active_size = 0
+
+        record_segment_compaction(reclaimed)
+        logger.info("세그먼트 압축 완료",
+                   directory=str(log.directory),
+                   old_segments=len(old_segments),
+                   new_segments=out_segment - next_segment + 1 if new_entries else 0,
+                   reclaimed_bytes=reclaimed)
+        return True
+
+    def compact_all(self, owns: Optional[Callable[[str, str], bool]] = None) -> int:
+        """
+        모든 학생·과제 로그를 압축 대상인지 확인하고 압축 (압축한 로그 수 반환).
+        owns(class_div, student_id)가 주어지면 True인 학생의 로그만 압축합니다
+        (멀티 프로세스 모드에서 다른 워커가 쓰고 있는 로그를 건드리지 않도록).
+        """
+        compacted = 0
+        for class_div, hw_name, student_id in self.iter_logs():
+            if owns is not None and not owns(class_div, student_id):
+                continue
+            try:
+                if self.compact(class_div, hw_name, student_id):
+                    compacted += 1
+            except Exception:
+                logger.error("세그먼트 압축 실패",
+                           class_div=class_div, hw_name=hw_name, student_id=student_id,
+                           exc_info=True)
+        return compacted
+
+    def iter_logs(self):
+        """저장소의 (class_div, hw_name, student_id) 목록"""
+        if not self.root.exists():
+            return
+        for class_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for hw_dir in sorted(p for p in class_dir.iterdir() if p.is_dir()):
+                for student_dir in sorted(p for p in hw_dir.iterdir() if p.is_dir()):
+                    yield class_dir.name, hw_dir.name, student_dir.name
+
+    # --- 호환성 내보내기 ---
+
+    def export(self, output_dir: Path) -> int:
+        """
+        세그먼트의 스냅샷을 기존 디렉토리 구조
+        (`class_div/hw_name/student_id/<filename>/<timestamp><suffix>`)로 풀어 씁니다.
+
+        Returns:
+            int: 내보낸 스냅샷 수
+        """
+        output_dir = Path(output_dir)
+        exported = 0
+        for class_div, hw_name, student_id in list(self.iter_logs()):
+            for entry in self.list_entries(class_div, hw_name, student_id):
+                data = self.read(class_div, hw_name, student_id, entry.filename, entry.timestamp)
+                target_dir = output_dir / class_div / hw_name / student_id / entry.filename
+                target_dir.mkdir(parents=True, exist_ok=True)
+                suffix = Path(entry.filename).suffix
+                with open(target_dir / f"{entry.timestamp}{suffix}", "wb") as f:
+                    f.write(data)
+                exported += 1
+        return exported
+
+    def close(self):
+        """열려 있는 모든 세그먼트/인덱스 파일 닫기"""
+        with self._logs_lock:
+            logs = list(self._logs.values())
+            self._logs.clear()
+        for log in logs:
+            with log.lock:
+                log.close_files()
+
+    # --- 내부 구현 ---
+
+    @contextmanager
+    def _use_log(self, class_div: str, hw_name: str, student_id: str) -> Iterator[_StudentLog]:
+        """
+        로그 상태를 사용하는 동안 LRU에서 내보내지 않도록 표시합니다 (LRU로 열린 로그 수 제한).
+        사용 중인 로그를 내보내면 같은 키에 두 번째 _StudentLog가 생겨 서로 다른 락과 오프셋으로
+        같은 세그먼트에 쓰게 되므로, 내보내기는 아무도 사용하지 않는 로그만 대상으로 합니다.
+        """
+        key = (class_div, hw_name, student_id)
+        evicted = []
+        with self._logs_lock:
+            log = self._logs.get(key)
+            if log is None:
+                log = _StudentLog(self.root / class_div / hw_name / student_id)
+                self._logs[key] = log
+            self._logs.move_to_end(key)
+            log.users += 1
+            excess = len(self._logs) - self.open_logs
+            if excess > 0:
+                for old_key in [k for k, old in self._logs.items() if old.users == 0][:excess]:
+                    evicted.append(self._logs.pop(old_key))
+
+        # 전역 락을 놓은 뒤 개별 로그 락으로 파일을 닫아 락 순서 역전을 피함
+        for old in evicted:
+            with old.lock:
+                old.close_files()
+        try:
+            yield log
+        finally:
+            with self._logs_lock:
+                log.users -= 1
+
+    def _ensure_active_segment(self, log: _StudentLog, incoming: int):
+        """활성 세그먼트를 열고, 가득 찼다면 새 세그먼트로 롤오버"""
+        if log.active_segment is None:
+            log.directory.mkdir(parents=True, exist_ok=True)
+            segments = self._list_segments(log.directory)
+            log.active_segment = segments[-1] if segments else 1
+            try:
+                log.active_size = self._segment_path(log.directory, log.active_segment).stat().st_size
+            except FileNotFoundError:
+                log.active_size = 0
+
+        if log.active_size > 0 and log.active_size + incoming > self.max_segment_bytes:
+            if log.segment_file is not None:
+                log.segment_file.close()
+                log.segment_file = None
+            log.active_segment += 1
+            log.active_size = 0
+
+        if log.segment_file is None:
+            log.segment_file = open(self._segment_path(log.directory, log.active_segment), "ab")
+        if log.index_file is None:
+            log.index_file = open(log.directory / INDEX_NAME, "a", encoding="utf-8")
+
+    def _write_index_record(self, log: _StudentLog, record: dict):
+        log.index_file.write(self._encode_record(record))
+        log.index_file.flush()
+
+    @staticmethod
+    def _encode_record(record: dict) -> str:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _load_entries(self, log: _StudentLog):
+        """인덱스 파일을 읽어 메모리 인덱스 구성 (마지막 기록이 우선, 툼스톤은 제거)"""
+        if log.entries is not None:
+            return
+        if log.index_file is not None:
+            log.index_file.flush()
+
+        entries: Dict[Tuple[str, str], SegmentEntry] = {}
+        log.entries = entries
+        log.dead_bytes = 0
+        index_path = log.directory / INDEX_NAME
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 비정상 종료로 잘린 마지막 줄은 무시
+                        logger.warning("손상된 인덱스 레코드 무시", index_path=str(index_path))
+                        continue
+                    key = (record["f"], record["t"])
+                    if record.get("d"):
+                        old = entries.pop(key, None)
+                        if old is not None:
+                            log.dead_bytes += old.length
+                        continue
+                    self._apply_entry(log, SegmentEntry(record["f"], record["t"], record["g"],
+                                                        record["o"], record["l"]))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _apply_entry(log: _StudentLog, entry: SegmentEntry):
+        old = log.entries.get((entry.filename, entry.timestamp))
+        if old is not None:
+            log.dead_bytes += old.length
+        log.entries[(entry.filename, entry.timestamp)] = entry
+
+    def _read_entry(self, directory: Path, entry: SegmentEntry) -> bytes:
+        with open(self._segment_path(directory, entry.segment), "rb") as f:
+            f.seek(entry.offset)
+            data = f.read(entry.length)
+        if len(data) != entry.length:
+            raise ValueError(f"세그먼트 데이터가 잘림: {directory} seg={entry.segment} offset={entry.offset}")
+        return data
+
+    @staticmethod
+    def _segment_path(directory: Path, segment: int) -> Path:
+        return directory / f"{SEGMENT_PREFIX}{segment:06d}{SEGMENT_SUFFIX}"
+
+    @staticmethod
+    def _list_segments(directory: Path) -> List[int]:
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        segments = []
+        for name in names:
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                number = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+                if number.isdigit():
+                    segments.append(int(number))
+        return sorted(segments)
@@ -1,64 +1,174 @@
+import asyncio
 import aiohttp
-from typing import Optional
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from app.utils.logger import get_logger
 from app.config.settings import settings
 from app.models.source_file_info import SourceFileInfo
-from app.utils.metrics import record_api_request
+from app.outbox import OutboxEntry, SnapshotOutbox
+from app.utils.metrics import record_api_request, record_api_pool_acquire, set_api_pool_connections, record_api_batch, record_outbox_events, set_outbox_pending
 
 logger = get_logger(__name__)
 
+# 백엔드·프록시가 일시적으로 처리하지 못한 경우의 상태 코드 (항목 문제가 아니므로 배치를 나누지 않고 재시도)
+_UNAVAILABLE_STATUSES = {408, 429, 502, 503, 504}
+
 
 class SnapshotSender:
     """스냅샷 등록 API 클라이언트"""
-    
-    def __init__(self):
+
+    def __init__(self, outbox: Optional[SnapshotOutbox] = None):
         self.base_url = settings.API_SERVER.rstrip('/')
         self.timeout = aiohttp.ClientTimeout(total=settings.API_TIMEOUT_TOTAL)
-        logger.info("API 클라이언트 초기화 완료", base_url=self.base_url)
-    
+        self.session: Optional[aiohttp.ClientSession] = None
+
+        # 배치 모드: 등록 요청을 모아 크기 또는 대기 시간 기준으로 bulk API에 전송
+        self.batching = settings.API_BATCH_ENABLED
+        self._batch: List[Tuple[SourceFileInfo, int]] = []
+        self._batch_ready = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # 등록 실패 시 재전송을 위해 저장하는 로컬 outbox (없으면 실패한 등록은 유실)
+        self.outbox = outbox
+        logger.info("API 클라이언트 초기화 완료", base_url=self.base_url, batching=self.batching,
+                   outbox=str(outbox.path) if outbox else None)
+
+    async def start(self):
+        """keep-alive 커넥션 풀을 사용하는 장기 세션 생성 (애플리케이션 시작 시 1회)"""
+        if self.batching and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run_batch_flusher())
+
+        if self.session is not None and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.API_POOL_SIZE,
+            limit_per_host=settings.API_POOL_PER_HOST,
+            keepalive_timeout=settings.API_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            trace_configs=[self._create_trace_config()],
+        )
+        logger.info("API 커넥션 풀 생성 완료",
+                   pool_size=settings.API_POOL_SIZE,
+                   pool_per_host=settings.API_POOL_PER_HOST)
+
+    async def close(self):
+        """배치 플러셔를 정리하고 남은 배치를 전송한 뒤 세션과 커넥션 풀 종료"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        while self._batch and self.session is not None and not self.session.closed:
+            await self._flush_batch()
+
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("API 커넥션 풀 종료 완료")
+        self.session = None
+
+    def update_pool_metrics(self):
+        """현재 커넥션 풀 상태(사용 중/유휴 커넥션 수)를 메트릭에 반영"""
+        connector = self.session.connector if self.session is not None else None
+        if connector is None or connector.closed:
+            set_api_pool_connections(0, 0)
+            return
+
+        # aiohttp는 풀 상태를 공개 API로 노출하지 않으므로 내부 속성을 방어적으로 읽음
+        acquired = len(getattr(connector, "_acquired", ()))
+        idle = sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+        set_api_pool_connections(acquired, idle)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """장기 세션 반환 (start()가 호출되지 않았다면 지연 생성)"""
+        if self.session is None or self.session.closed:
+            await self.start()
+        return self.session
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """커넥션 획득 대기 시간과 재사용 여부를 측정하는 TraceConfig 생성"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx: SimpleNamespace, params):
+            ctx.request_start = asyncio.get_running_loop().time()
+
+        async def on_connection_reuseconn(session, ctx: SimpleNamespace, params):
+            record_api_pool_acquire("reused", asyncio.get_running_loop().time() - ctx.request_start)
+
+        async def on_connection_create_end(session, ctx: SimpleNamespace, params):
+            record_api_pool_acquire("created", asyncio.get_running_loop().time() - ctx.request_start)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
     async def register_snapshot(self, source_file_info: SourceFileInfo, file_size: int) -> bool:
         """
         스냅샷 등록 API 호출
-        
+
+        배치 모드에서는 등록 요청을 배치에 적재만 하고 즉시 반환하며,
+        실제 전송은 백그라운드 플러셔가 bulk API로 수행합니다.
+
         Args:
             source_file_info: 소스 파일 정보
             file_size: 파일 크기 (bytes)
-            
+
         Returns:
-            bool: 등록 성공 여부
+            bool: 등록 성공 여부 (배치 모드에서는 배치 적재 여부)
         """
+        if self.batching:
+            await self.start()
+            self._enqueue_batch(source_file_info, file_size)
+            return True
+
+        success = await self._post_snapshot(source_file_info, file_size)
+        if not success:
+            await self._save_to_outbox([self._bulk_item(source_file_info, file_size)])
+        return success
+
+    async def _post_snapshot(self, source_file_info: SourceFileInfo, file_size: int) -> bool:
+        """단건 스냅샷 등록 API 호출"""
         # API 엔드포인트 구성
         endpoint = f"/api/{source_file_info.class_div}/{source_file_info.hw_name}/{source_file_info.student_id}/{source_file_info.filename}/{source_file_info.timestamp}"
         full_url = f"{self.base_url}{endpoint}"
-        
-        
+
+
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(
-                    full_url,
-                    json={"bytes": file_size}
-                ) as response:
-                    if response.status == 200:
-                        logger.info("API 요청 성공", 
-                                   filename=source_file_info.filename,
-                                   class_div=source_file_info.class_div,
-                                   hw_name=source_file_info.hw_name,
-                                   student_id=source_file_info.student_id)
-                        record_api_request("success")
-                        return True
-                    
-                    response_text = await response.text()
-                    logger.error("API 요청 실패",
+            session = await self._get_session()
+            async with session.post(
+                full_url,
+                json={"bytes": file_size}
+            ) as response:
+                if response.status == 200:
+                    logger.info("API 요청 성공",
                                filename=source_file_info.filename,
                                class_div=source_file_info.class_div,
                                hw_name=source_file_info.hw_name,
-                               student_id=source_file_info.student_id,
-                               status_code=response.status,
-                               response_text=response_text)
-                    record_api_request("failure")
-                    return False
-                    
+                               student_id=source_file_info.student_id)
+                    record_api_request("success")
+                    return True
+
+                response_text = await response.text()
+                logger.error("API 요청 실패",
+                           filename=source_file_info.filename,
+                           class_div=source_file_info.class_div,
+                           hw_name=source_file_info.hw_name,
+                           student_id=source_file_info.student_id,
+                           status_code=response.status,
+                           response_text=response_text)
+                record_api_request("failure")
+                return False
+
         except aiohttp.ClientError as e:
             logger.error("API 오류 발생",
                        filename=source_file_info.filename,
@@ -78,4 +188,224 @@ class SnapshotSender:
                        error_type=type(e).__name__,
                        exc_info=True)
             record_api_request("failure")
-            return False
\ No newline at end of file
+            return False
+
+    def _enqueue_batch(self, source_file_info: SourceFileInfo, file_size: int):
+        """배치에 등록 요청 추가"""
+        self._batch.append((source_file_info, file_size))
+        self._batch_ready.set()
+        if len(self._batch) >= settings.API_BATCH_MAX_SIZE:
+            self._batch_full.set()
+
+    async def _run_batch_flusher(self):
+        """배치가 가득 차거나 최대 대기 시간이 지나면 플러시하는 백그라운드 태스크"""
+        logger.info("배치 플러셔 시작",
+                   max_size=settings.API_BATCH_MAX_SIZE,
+                   max_linger=settings.API_BATCH_MAX_LINGER)
+        while True:
+            await self._batch_ready.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=settings.API_BATCH_MAX_LINGER)
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self._flush_batch()
+            except Exception as e:
+                logger.error("배치 플러시 중 예상치 못한 오류",
+                           error_type=type(e).__name__,
+                           exc_info=True)
+
+    async def _flush_batch(self) -> bool:
+        """배치에서 최대 API_BATCH_MAX_SIZE개를 꺼내 전송"""
+        batch = self._batch[:settings.API_BATCH_MAX_SIZE]
+        self._batch = self._batch[settings.API_BATCH_MAX_SIZE:]
+        if len(self._batch) < settings.API_BATCH_MAX_SIZE:
+            self._batch_full.clear()
+        if not self._batch:
+            self._batch_ready.clear()
+
+        if not batch:
+            return True
+        success = await self.register_snapshots_bulk(batch)
+        if not success:
+            await self._save_to_outbox([self._bulk_item(info, size) for info, size in batch])
+        return success
+
+    async def register_snapshots_bulk(self, items: List[Tuple[SourceFileInfo, int]]) -> bool:
+        """
+        스냅샷 일괄 등록 API 호출 (백엔드에서 하나의 트랜잭션으로 저장)
+
+        Args:
+            items: (소스 파일 정보, 파일 크기) 목록
+
+        Returns:
+            bool: 등록 성공 여부
+        """
+        return await self._post_bulk([self._bulk_item(info, size) for info, size in items])
+
+    @staticmethod
+    def _bulk_item(source_file_info: SourceFileInfo, file_size: int) -> Dict[str, Any]:
+        """bulk 등록 API의 항목 형식 (outbox에도 이 형식으로 저장)"""
+        return {
+            "class_div": source_file_info.class_div,
+            "hw_name": source_file_info.hw_name,
+            "student_id": source_file_info.student_id,
+            "filename": source_file_info.filename,
+            "timestamp": source_file_info.timestamp,
+            "bytes": file_size,
+        }
+
+    async def _post_bulk(self, payload: List[Dict[str, Any]]) -> bool:
+        """bulk 등록 API 호출"""
+        return await self._send_bulk(payload) == "success"
+
+    async def _send_bulk(self, payload: List[Dict[str, Any]]) -> str:
+        """
+        bulk 등록 API 호출 후 결과 분류
+
+        Returns:
+            str: "success", "rejected"(4xx, 재시도해도 실패), "error"(그 밖의 오류 응답, 항목 문제일 수 있음),
+                 "unavailable"(연결 실패·시간 초과·일시적 과부하)
+        """
+        full_url = f"{self.base_url}/api/snapshots/bulk"
+        record_api_batch(len(payload))
+
+        try:
+            session = await self._get_session()
+            async with session.post(full_url, json=payload) as response:
+                if response.status == 200:
+                    logger.info("일괄 API 요청 성공", count=len(payload))
+                    record_api_request("success")
+                    return "success"
+
+                response_text = await response.text()
+                logger.error("일괄 API 요청 실패",
+                           count=len(payload),
+                           status_code=response.status,
+                           response_text=response_text)
+                record_api_request("failure")
+                if response.status in _UNAVAILABLE_STATUSES:
+                    return "unavailable"
+                return "rejected" if 400 <= response.status < 500 else "error"
+
+        except aiohttp.ClientError as e:
+            logger.error("일괄 API 오류 발생",
+                       count=len(payload),
+                       error_type="aiohttp.ClientError",
+                       exc_info=True)
+            record_api_request("failure")
+            return "unavailable"
+        except Exception as e:
+            logger.error("예상치 못한 일괄 API 오류",
+                       count=len(payload),
+                       error_type=type(e).__name__,
+                       exc_info=True)
+            record_api_request("failure")
+            return "unavailable"
+
+    async def report_thinned_snapshots(self, items: List[Dict[str, Any]]) -> Optional[List[bool]]:
+        """
+        보존 정책으로 삭제할 스냅샷을 백엔드에 알려 DB 행을 함께 삭제하도록 합니다.
+
+        Args:
+            items: class_div, hw_name, student_id, filename, timestamp 항목 목록
+
+        Returns:
+            Optional[List[bool]]: 항목별 DB 행 삭제 여부, 보고 실패 시 None
+                (호출 측은 행이 삭제된 항목의 스냅샷 파일만 지워야 함)
+        """
+        full_url = f"{self.base_url}/api/snapshots/thinned"
+        try:
+            session = await self._get_session()
+            async with session.post(full_url, json=items) as response:
+                if response.status == 200:
+                    record_api_request("success")
+                    body = await response.json()
+                    deleted = body.get("deleted")
+                    if isinstance(deleted, list) and len(deleted) == len(items):
+                        return [bool(d) for d in deleted]
+                    # 항목별 결과가 없는 백엔드: 모두 지운 경우에만 파일 삭제를 허용
+                    return [body.get("count") == len(items)] * len(items)
+
+                response_text = await response.text()
+                logger.error("솎아낸 스냅샷 보고 실패",
+                           count=len(items),
+                           status_code=response.status,
+                           response_text=response_text)
+                record_api_request("failure")
+                return None
+
+        except Exception as e:
+            logger.error("솎아낸 스냅샷 보고 중 오류",
+                       count=len(items),
+                       error_type=type(e).__name__,
+                       exc_info=True)
+            record_api_request("failure")
+            return None
+
+    # --- Outbox ---
+
+    async def _save_to_outbox(self, payloads: List[Dict[str, Any]]):
+        """등록에 실패한 항목을 outbox에 저장 (스레드 풀에서 실행)"""
+        if self.outbox is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.outbox.add, payloads)
+            record_outbox_events("stored", len(payloads))
+            logger.info("등록 실패 항목 outbox 저장", count=len(payloads))
+        except Exception as e:
+            logger.error("outbox 저장 실패, 등록 요청 유실",
+                       count=len(payloads),
+                       error_type=type(e).__name__,
+                       exc_info=True)
+
+    async def replay_outbox(self) -> int:
+        """
+        재시도 시각이 된 outbox 항목을 최대 API_BATCH_MAX_SIZE개 bulk API로 재전송합니다.
+        성공한 항목은 삭제하고, 실패한 항목은 지수 백오프로 다음 시도를 늦춥니다.
+
+        Returns:
+            int: 이번에 전송을 시도한 항목 수
+        """
+        if self.outbox is None:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self.outbox.due, settings.API_BATCH_MAX_SIZE)
+        if entries:
+            await self._replay_entries(entries)
+
+        set_outbox_pending(await loop.run_in_executor(None, self.outbox.pending))
+        return len(entries)
+
+    async def _replay_entries(self, entries: List[OutboxEntry]):
+        """
+        outbox 항목을 bulk API로 전송합니다. bulk API는 전체가 한 트랜잭션이므로 백엔드가 오류로 응답하면
+        배치를 반으로 나눠 다시 보내 문제 항목을 분리합니다. 백엔드가 거부한(4xx) 항목은 재시도하지 않고
+        dead-letter로 옮기며, 연결 실패 등 일시적인 실패는 나누지 않고 백오프로 재시도합니다.
+        """
+        loop = asyncio.get_running_loop()
+        result = await self._send_bulk([entry.payload for entry in entries])
+        if result == "success":
+            await loop.run_in_executor(None, self.outbox.remove, entries)
+            record_outbox_events("delivered", len(entries))
+            logger.info("outbox 재전송 성공", count=len(entries))
+        elif result in ("rejected", "error") and len(entries) > 1:
+            middle = len(entries) // 2
+            await self._replay_entries(entries[:middle])
+            await self._replay_entries(entries[middle:])
+        elif result == "rejected":
+            await loop.run_in_executor(None, self.outbox.dead_letter, entries, "rejected")
+            record_outbox_events("dead", len(entries))
+            logger.error("백엔드가 거부한 등록 항목을 dead-letter로 이동", payload=entries[0].payload)
+        else:
+            dead = await loop.run_in_executor(None, self.outbox.reschedule, entries)
+            record_outbox_events("retried", len(entries) - dead)
+            if dead:
+                record_outbox_events("dead", dead)
+                logger.error("최대 재시도 횟수 초과 항목을 dead-letter로 이동", count=dead)
+            logger.warning("outbox 재전송 실패, 재시도 예약",
+                         count=len(entries) - dead,
+                         attempts=max(entry.attempts for entry in entries) + 1)
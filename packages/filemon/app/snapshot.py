@@ -1,31 +1,107 @@
+import asyncio
+import os
+import uuid
 import aiofiles
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple, Optional, Tuple, TypeVar
 from app.models.source_file_info import SourceFileInfo
 from app.config.settings import settings
+from app.blob_store import BlobStore
+from app.delta_store import DeltaStore
+from app.dir_cache import DirectoryCache
+from app.manifest import ManifestEntry, SnapshotManifest, content_digest
+from app.partition import WorkerPartition
+from app.segment_store import SegmentStore
+from app.zero_copy import CaptureResult, copy_verified
 from app.utils.logger import get_logger
+from app.utils.metrics import record_snapshot_dir_cache
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+
+class PendingSnapshot(NamedTuple):
+    """capture_file로 임시 파일에 복사해 둔, 아직 확정하지 않은 스냅샷"""
+    temp_path: Path      # 스냅샷 디렉토리 안의 임시 파일
+    snapshot_path: Path  # 확정 시 옮길 최종 경로 (<timestamp><suffix>)
+    timestamp: str
+
 
 class SnapshotManager:
     """스냅샷 관리자"""
     
-    def __init__(self):
-        pass
+    def __init__(self, partition: Optional[WorkerPartition] = None, manifest: Optional[SnapshotManifest] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        # 스냅샷 파일 I/O를 실행할 스레드 풀 (None이면 이벤트 루프 기본 실행기)
+        self.executor = executor
+        # 멀티 프로세스 모드에서 이 워커가 맡은 학생 범위 (세그먼트 압축 대상 제한)
+        self.partition = partition
+        # 스냅샷마다 학생별 매니페스트에 레코드 추가 (최신 스냅샷 조회 시 디렉토리 탐색 생략)
+        self.manifest = manifest
+
+        # segment 모드에서는 학생·과제별 세그먼트 파일에 이어 쓰기
+        self.segment_store = None
+        if settings.SNAPSHOT_STORAGE_MODE == "segment":
+            self.segment_store = SegmentStore(settings.SNAPSHOT_BASE / settings.SNAPSHOT_SEGMENT_DIR,
+                                              max_segment_bytes=settings.SNAPSHOT_SEGMENT_MAX_BYTES,
+                                              open_logs=settings.SNAPSHOT_SEGMENT_OPEN_LOGS)
+
+        # delta 모드에서는 직전 버전 대비 차분 + 주기적 키프레임으로 저장
+        self.delta_store = None
+        if settings.SNAPSHOT_STORAGE_MODE == "delta":
+            self.delta_store = DeltaStore(keyframe_interval=settings.SNAPSHOT_DELTA_KEYFRAME_INTERVAL,
+                                          cache_size=settings.SNAPSHOT_DELTA_CACHE_SIZE)
+
+        # 중복 제거 모드에서는 스냅샷을 내용 주소 기반 블롭의 하드 링크로 저장
+        self.blob_store = None
+        if self.delta_store is None and settings.SNAPSHOT_DEDUP_ENABLED:
+            self.blob_store = BlobStore(settings.SNAPSHOT_BASE / settings.SNAPSHOT_BLOB_DIR,
+                                        gc_grace_seconds=settings.SNAPSHOT_BLOB_GC_GRACE)
+
+        # 이미 만든 스냅샷 디렉토리 (mkdir 메타데이터 왕복 생략용)
+        self.dir_cache = DirectoryCache(settings.SNAPSHOT_DIR_CACHE_SIZE)
+
+        # 매니페스트에 기록할 저장 위치
+        if self.segment_store is not None:
+            self.storage = "segment"
+        elif self.delta_store is not None:
+            self.storage = "delta"
+        elif self.blob_store is not None:
+            self.storage = "blob"
+        else:
+            self.storage = "file"
 
     async def create_snapshot_with_data(self, path_info: SourceFileInfo, data: bytes):
         """읽은 데이터로 스냅샷 파일 생성"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = path_info.timestamp
         snapshot_path = self._get_snapshot_path(path_info, timestamp)
         
-        # 디렉토리 생성
-        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # aiofiles로 비동기 파일 쓰기
         try:
-            async with aiofiles.open(snapshot_path, "wb") as f:
-                await f.write(data)
+            loop = asyncio.get_running_loop()
+            if self.segment_store is not None:
+                # 세그먼트에 이어 쓰기 (스레드 풀에서 실행, 스냅샷별 디렉토리를 만들지 않음)
+                await loop.run_in_executor(self.executor, self._append_to_segment, path_info, timestamp, data)
+            elif self.delta_store is not None:
+                # 차분 또는 키프레임 저장 (스레드 풀에서 실행)
+                await self._write_in_directory(snapshot_path.parent, lambda: loop.run_in_executor(
+                    self.executor, self.delta_store.write, snapshot_path.parent,
+                    timestamp, path_info.target_file_path.suffix, data))
+            elif self.blob_store is not None:
+                # 블롭 저장 + 하드 링크 생성 (스레드 풀에서 실행)
+                await self._write_in_directory(snapshot_path.parent, lambda: loop.run_in_executor(
+                    self.executor, self.blob_store.link_snapshot, data, snapshot_path))
+            else:
+                # aiofiles로 비동기 파일 쓰기
+                async def write():
+                    async with aiofiles.open(snapshot_path, "wb") as f:
+                        await f.write(data)
+                await self._write_in_directory(snapshot_path.parent, write)
+            if self.manifest is not None:
+                await loop.run_in_executor(self.executor, lambda: self._record_manifest(
+                    path_info, timestamp, len(data), content_digest(data)))
             logger.info("스냅샷 파일 생성 완료", 
                        filename=path_info.filename,
                        file_size=len(data))
@@ -35,16 +111,84 @@ class SnapshotManager:
                         exc_info=True)
             raise
 
+    @property
+    def supports_zero_copy(self) -> bool:
+        """원본 파일을 스냅샷 파일로 그대로 복사하는 저장 방식인지 (file 모드, 중복 제거 비활성화)"""
+        return self.segment_store is None and self.delta_store is None and self.blob_store is None
+
+    @property
+    def supports_retention(self) -> bool:
+        """스냅샷을 개별 파일로 저장하여 보존 정책으로 솎아낼 수 있는지 (차분·세그먼트 모드 제외)"""
+        return self.segment_store is None and self.delta_store is None
+
+    async def capture_file(self, path_info: SourceFileInfo, src_path: str,
+                           with_digest: bool = False) -> Tuple[PendingSnapshot, CaptureResult]:
+        """
+        원본 파일을 커널 내부 복사로 스냅샷 디렉토리의 임시 파일에 저장 (file 모드 전용).
+        읽기와 쓰기를 한 번의 스레드 풀 호출에서 처리하며, 내용을 파이썬 bytes로 올리지 않습니다.
+        같은 초에 캡처한 스냅샷이 이미 등록되어 있을 수 있으므로 최종 경로에는 쓰지 않고,
+        commit_snapshot 또는 discard_snapshot으로 확정·폐기합니다.
+
+        Returns:
+            (확정 전 스냅샷, 캡처 정보)
+        """
+        timestamp = path_info.timestamp
+        snapshot_path = self._get_snapshot_path(path_info, timestamp)
+        temp_path = snapshot_path.with_name(f".{snapshot_path.name}.{uuid.uuid4().hex}.tmp")
+        loop = asyncio.get_running_loop()
+        # 매니페스트를 쓰는 경우 복사하면서 해시도 계산
+        with_digest = with_digest or self.manifest is not None
+        result = await self._write_in_directory(snapshot_path.parent, lambda: loop.run_in_executor(
+            self.executor, copy_verified, src_path, str(temp_path), with_digest))
+        return PendingSnapshot(temp_path, snapshot_path, timestamp), result
+
+    async def commit_snapshot(self, path_info: SourceFileInfo, pending: PendingSnapshot, capture: CaptureResult):
+        """capture_file로 복사한 임시 파일을 최종 스냅샷 경로로 원자적으로 이동"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, os.replace, pending.temp_path, pending.snapshot_path)
+        except OSError:
+            await loop.run_in_executor(self.executor, pending.temp_path.unlink, True)
+            raise
+        if self.manifest is not None:
+            await loop.run_in_executor(self.executor, self._record_manifest, path_info, pending.timestamp,
+                                       capture.size, capture.digest.hex())
+        logger.info("스냅샷 파일 생성 완료",
+                   filename=path_info.filename,
+                   file_size=capture.size)
+
+    async def discard_snapshot(self, pending: PendingSnapshot):
+        """capture_file로 복사한 임시 파일 삭제 (내용 변경이 없는 경우, 최종 경로는 건드리지 않음)"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, pending.temp_path.unlink, True)
+
     async def create_empty_snapshot_with_info(self, path_info: SourceFileInfo):
         """빈 스냅샷 생성 (삭제 이벤트용) - 파싱된 정보 사용"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = path_info.timestamp
             snapshot_path = self._get_snapshot_path(path_info, timestamp)
-            snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            loop = asyncio.get_running_loop()
             
-            # 빈 파일 생성
-            async with aiofiles.open(snapshot_path, "wb") as f:
-                pass  # 빈 파일
+            if self.segment_store is not None:
+                await loop.run_in_executor(self.executor, self._append_to_segment, path_info, timestamp, b"")
+            elif self.delta_store is not None:
+                # 빈 키프레임으로 저장하여 이후 차분의 기준이 되도록 함
+                await self._write_in_directory(snapshot_path.parent, lambda: loop.run_in_executor(
+                    self.executor, self.delta_store.write_keyframe, snapshot_path.parent,
+                    timestamp, path_info.target_file_path.suffix, b""))
+            elif self.blob_store is not None:
+                # 같은 초의 스냅샷이 공유 블롭의 하드 링크일 수 있으므로 제자리에서 비우지 않고 빈 블롭으로 링크
+                await self._write_in_directory(snapshot_path.parent, lambda: loop.run_in_executor(
+                    self.executor, self.blob_store.link_snapshot, b"", snapshot_path))
+            else:
+                # 빈 파일 생성
+                async def write():
+                    async with aiofiles.open(snapshot_path, "wb") as f:
+                        pass  # 빈 파일
+                await self._write_in_directory(snapshot_path.parent, write)
+            if self.manifest is not None:
+                await loop.run_in_executor(self.executor, self._record_manifest, path_info, timestamp,
+                                           0, content_digest(b""))
             
             logger.info("빈 스냅샷 생성 완료", filename=path_info.filename)
             
@@ -54,6 +198,137 @@ class SnapshotManager:
                         exc_info=True)
             raise
 
+    async def read_snapshot(self, path_info: SourceFileInfo, timestamp: str) -> bytes:
+        """지정한 타임스탬프의 스냅샷 내용 반환 (delta 모드에서는 키프레임과 차분으로 복원)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.load_snapshot, path_info, timestamp)
+
+    def load_snapshot(self, path_info: SourceFileInfo, timestamp: str) -> bytes:
+        """read_snapshot의 동기 버전 (스레드 풀에서 호출)"""
+        snapshot_path = self._get_snapshot_path(path_info, timestamp)
+        if self.segment_store is not None:
+            return self.segment_store.read(path_info.class_div, path_info.hw_name, path_info.student_id,
+                                           self._get_nested_path(path_info), timestamp)
+        if self.delta_store is not None:
+            return self.delta_store.read(snapshot_path.parent, timestamp, path_info.target_file_path.suffix)
+        return snapshot_path.read_bytes()
+
+    def latest_manifest_entry(self, path_info: SourceFileInfo) -> Optional[ManifestEntry]:
+        """매니페스트에 기록된 마지막 스냅샷 (매니페스트를 쓰지 않거나 기록이 없으면 None). 동기 함수"""
+        if self.manifest is None:
+            return None
+        return self.manifest.latest(path_info.class_div, path_info.hw_name, path_info.student_id,
+                                    self._get_nested_path(path_info))
+
+    def latest_snapshot_timestamp(self, path_info: SourceFileInfo) -> Optional[str]:
+        """
+        마지막으로 캡처한 스냅샷의 타임스탬프 (없으면 None). 스레드 풀에서 호출되는 동기 함수.
+        매니페스트에 기록이 있으면 디렉토리를 탐색하지 않습니다.
+        """
+        entry = self.latest_manifest_entry(path_info)
+        if entry is not None:
+            return entry.timestamp
+
+        suffix = path_info.target_file_path.suffix
+        if self.segment_store is not None:
+            entries = self.segment_store.list_entries(path_info.class_div, path_info.hw_name,
+                                                      path_info.student_id, self._get_nested_path(path_info))
+            return entries[-1].timestamp if entries else None
+
+        snapshot_dir = self._get_snapshot_path(path_info, "").parent
+        if self.delta_store is not None:
+            versions = self.delta_store.list_versions(snapshot_dir, suffix)
+            return versions[-1][0] if versions else None
+
+        try:
+            names = os.listdir(snapshot_dir)
+        except FileNotFoundError:
+            return None
+        timestamps = [name[:len(name) - len(suffix)] for name in names if name.endswith(suffix)]
+        return max(timestamps) if timestamps else None
+
+    async def compact_segments(self) -> int:
+        """segment 모드에서 압축이 필요한 세그먼트 로그를 정리"""
+        if self.segment_store is None:
+            return 0
+        owns = None
+        if self.partition is not None:
+            owns = lambda class_div, student_id: self.partition.owns(f"{class_div}-{student_id}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.segment_store.compact_all, owns)
+
+    def close(self):
+        """열려 있는 저장소 파일 정리"""
+        if self.segment_store is not None:
+            self.segment_store.close()
+        if self.manifest is not None:
+            self.manifest.close()
+
+    async def collect_garbage(self) -> int:
+        """중복 제거 모드에서 더 이상 참조되지 않는 블롭 정리"""
+        if self.blob_store is None:
+            return 0
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.blob_store.collect_garbage)
+
+    async def _ensure_directory(self, directory: Path) -> bool:
+        """
+        스냅샷 디렉토리를 준비합니다. 캐시에 없는 경우에만 스레드 풀에서 mkdir을 실행합니다.
+
+        Returns:
+            bool: 캐시 적중으로 mkdir을 생략했으면 True
+        """
+        if directory in self.dir_cache:
+            record_snapshot_dir_cache("hit")
+            return True
+        record_snapshot_dir_cache("miss")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, partial(directory.mkdir, parents=True, exist_ok=True))
+        self.dir_cache.add(directory)
+        return False
+
+    async def _write_in_directory(self, directory: Path, write: Callable[[], Awaitable[T]]) -> T:
+        """
+        디렉토리를 준비한 뒤 write()를 실행합니다.
+        캐시를 믿고 mkdir을 생략했는데 디렉토리가 사라져 ENOENT가 발생하면,
+        캐시 항목을 무효화하고 디렉토리를 다시 만든 뒤 한 번 재시도합니다.
+        """
+        cached = await self._ensure_directory(directory)
+        try:
+            return await write()
+        except FileNotFoundError:
+            if not cached:
+                raise
+            self.dir_cache.discard(directory)
+            record_snapshot_dir_cache("stale")
+            logger.info("캐시된 스냅샷 디렉토리가 사라져 다시 생성", directory=str(directory))
+            await self._ensure_directory(directory)
+            return await write()
+
+    def _record_manifest(self, path_info: SourceFileInfo, timestamp: str, size: int, digest: str):
+        """
+        매니페스트에 스냅샷 레코드 추가 (스레드 풀에서 실행).
+        스냅샷은 이미 저장되었으므로 실패해도 예외를 전파하지 않습니다
+        (누락된 레코드는 조회 시 디렉토리 탐색 또는 재캡처로 보완됨).
+        """
+        entry = ManifestEntry(self._get_nested_path(path_info), timestamp, size, digest, self.storage)
+        try:
+            self.manifest.append(path_info.class_div, path_info.hw_name, path_info.student_id, entry)
+        except OSError:
+            logger.warning("매니페스트 기록 실패", filename=path_info.filename, exc_info=True)
+
+    def _remove_manifest(self, path_info: SourceFileInfo, timestamp: str):
+        try:
+            self.manifest.remove(path_info.class_div, path_info.hw_name, path_info.student_id,
+                                 self._get_nested_path(path_info), timestamp)
+        except OSError:
+            logger.warning("매니페스트 기록 실패", filename=path_info.filename, exc_info=True)
+
+    def _append_to_segment(self, path_info: SourceFileInfo, timestamp: str, data: bytes):
+        """기존 디렉토리 구조와 같은 파일명(중첩 경로를 @로 결합)으로 세그먼트에 기록"""
+        self.segment_store.append(path_info.class_div, path_info.hw_name, path_info.student_id,
+                                  self._get_nested_path(path_info), timestamp, data)
+
     def _get_snapshot_path(self, path_info: SourceFileInfo, timestamp: str) -> Path:
         """스냅샷 파일 경로 생성"""
         snapshot_dir = (settings.SNAPSHOT_BASE / 
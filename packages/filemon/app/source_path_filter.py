@@ -1,7 +1,9 @@
 import os
 import re
 from pathlib import Path
+from typing import Optional
 from app.config.settings import settings
+from app.partition import WorkerPartition
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,9 +26,14 @@ class PathFilter:
     # 허용할 파일 확장자
     ALLOWED_EXTENSIONS = {".c", ".h", ".py", ".cpp", ".hpp", ".ipynb"}
 
-    def __init__(self):
+    # WATCH_ROOT 기준 최대 디렉토리 깊이 (class/hw/d1/d2/d3)
+    MAX_DIR_DEPTH = 5
+
+    def __init__(self, partition: Optional[WorkerPartition] = None):
         self.watch_root = settings.WATCH_ROOT
-        logger.info("PathFilter 초기화 완료", watch_root=str(self.watch_root))
+        # 멀티 프로세스 모드에서 이 워커가 맡은 학생 디렉토리 범위 (None이면 전체)
+        self.partition = partition
+        logger.info("PathFilter 초기화 완료", watch_root=str(self.watch_root), partition=partition)
 
     def is_directory(self, file_path: str) -> bool:
         """디렉토리인지 확인"""
@@ -41,6 +48,40 @@ class PathFilter:
         # 2. 경로 구조가 유효한지 확인
         return self._is_valid_source_path(file_path)
 
+    def should_descend(self, dir_path: str) -> bool:
+        """
+        디렉토리 하위를 탐색(감시)할 필요가 있는지 확인.
+        무시 패턴에 해당하거나, 과목-분반-학번/과제 구조가 아니거나, 너무 깊은 디렉토리는
+        하위에 처리 대상 파일이 있을 수 없으므로 통째로 건너뜁니다.
+        """
+        try:
+            parts = Path(dir_path).relative_to(self.watch_root).parts
+        except ValueError:
+            return False
+
+        if len(parts) > self.MAX_DIR_DEPTH:
+            return False
+
+        # 무시 패턴은 디렉토리 하위 경로 기준으로 검사 (예: /.../env/ 아래 모든 파일)
+        if self._is_ignored(os.path.join(dir_path, "_")):
+            return False
+
+        if len(parts) >= 1 and (len(parts[0].split('-')) != 3 or not self._owns(parts[0])):
+            return False
+
+        if len(parts) >= 2 and not self._is_hw_dir(parts[1]):
+            return False
+
+        return True
+
+    def _owns(self, student_dir: str) -> bool:
+        """이 워커가 맡은 학생 디렉토리인지 확인"""
+        return self.partition is None or self.partition.owns(student_dir)
+
+    def _is_hw_dir(self, name: str) -> bool:
+        """과제 폴더명 검사 (예: hw1, hw10)"""
+        return name.startswith("hw") and name[2:].isdigit() and 0 <= int(name[2:]) <= 10
+
     def _is_ignored(self, path_str: str) -> bool:
         """무시 패턴에 해당하는지 확인"""
         for pattern in self.IGNORE_PATTERNS:
@@ -64,12 +105,11 @@ class PathFilter:
 
             # 1. 과목-분반-학번 폴더 검사 (예: os-1-202012345)
             class_student_parts = parts[0].split('-')
-            if len(class_student_parts) != 3:
+            if len(class_student_parts) != 3 or not self._owns(parts[0]):
                 return False
 
             # 2. 과제 폴더 검사 (예: hw1, hw10)
-            hw_part = parts[1]
-            if not (hw_part.startswith("hw") and hw_part[2:].isdigit() and 0 <= int(hw_part[2:]) <= 10):
+            if not self._is_hw_dir(parts[1]):
                 return False
 
             # 3. 파일 확장자 검사
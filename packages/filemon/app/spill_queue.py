@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Collection, Optional
+from watchdog.events import FileSystemEvent, FileModifiedEvent, FileDeletedEvent, FileMovedEvent
+from app.tracing import EventTrace, get_trace
+from app.utils.logger import get_logger
+from app.utils.metrics import record_spilled_events, record_replayed_events, set_spill_backlog
+
+logger = get_logger(__name__)
+
+_EVENT_CLASSES = {
+    "modified": FileModifiedEvent,
+    "deleted": FileDeletedEvent,
+}
+
+
+def encode_event(event: FileSystemEvent) -> bytes:
+    """파일 이벤트를 스필 파일의 한 줄(JSON)로 직렬화"""
+    record = {"t": event.event_type, "s": event.src_path}
+    if event.event_type == "moved":
+        record["d"] = event.dest_path
+    trace = get_trace(event)
+    if trace is not None:
+        record["tr"] = trace.to_dict()
+    return json.dumps(record, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_event(line: bytes) -> FileSystemEvent:
+    """스필 파일의 한 줄을 파일 이벤트로 복원"""
+    record = json.loads(line)
+    if record["t"] == "moved":
+        event = FileMovedEvent(record["s"], record["d"])
+    else:
+        event = _EVENT_CLASSES[record["t"]](record["s"])
+    if "tr" in record:
+        event.trace = EventTrace.from_dict(record["tr"])
+    return event
+
+
+class SpillQueue:
+    """
+    디스크 스필(spill-over)을 지원하는 유한 크기 이벤트 큐.
+    메모리 큐가 maxsize에 도달하면 이후 이벤트는 스필 파일에 순서대로 기록되고,
+    메모리 큐가 절반 이하로 줄어들 때마다 스필 파일에서 FIFO 순서로 다시 채웁니다.
+    스필 중에는 새 이벤트도 모두 스필 파일에 기록하므로 전체 순서가 유지되며,
+    이벤트를 버리지 않습니다. 재시작 시 남아 있는 스필 파일은 다시 재생됩니다.
+    asyncio.Queue 중 파이프라인에서 사용하는 메서드(put_nowait, put, get, qsize)만 제공하며,
+    이벤트 루프 스레드에서만 호출해야 합니다 (watchdog 스레드는 call_soon_threadsafe 사용).
+    """
+
+    def __init__(self, name: str, maxsize: int, spill_dir: Path):
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.low_watermark = self.maxsize // 2
+        self.spill_path = Path(spill_dir) / f"{name}.spill"
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._writer = None
+        self._reader = None
+        self._spilled = 0
+
+        self._recover()
+
+    def qsize(self) -> int:
+        """메모리 큐와 스필 파일에 대기 중인 전체 이벤트 수"""
+        return self._queue.qsize() + self._spilled
+
+    @property
+    def spilled(self) -> int:
+        """스필 파일에 대기 중인 이벤트 수"""
+        return self._spilled
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put_nowait(self, event: FileSystemEvent):
+        """이벤트 추가. 메모리 큐가 가득 찼거나 스필 중이면 스필 파일에 기록합니다."""
+        if self._spilled == 0 and self._queue.qsize() < self.maxsize:
+            self._queue.put_nowait(event)
+            return
+        self._spill(event)
+
+    async def put(self, event: FileSystemEvent):
+        """put_nowait와 동일 (가득 차도 대기하지 않고 스필)"""
+        self.put_nowait(event)
+
+    async def get(self) -> FileSystemEvent:
+        """가장 오래된 이벤트를 꺼냅니다."""
+        event = await self._queue.get()
+        if self._spilled and self._queue.qsize() <= self.low_watermark:
+            self._replay()
+        return event
+
+    def peek_nowait(self) -> Optional[FileSystemEvent]:
+        """가장 오래된 이벤트를 꺼내지 않고 반환 (비어 있으면 None, 모니터링 용도)"""
+        items = self._queue._queue  # 스필 중에도 메모리 큐의 맨 앞이 가장 오래된 이벤트
+        return items[0] if items else None
+
+    def get_nowait(self) -> FileSystemEvent:
+        event = self._queue.get_nowait()
+        if self._spilled and self._queue.qsize() <= self.low_watermark:
+            self._replay()
+        return event
+
+    def close(self):
+        """스필 파일 핸들을 닫습니다. 재생되지 않은 이벤트는 다음 시작 시 재생됩니다."""
+        if self._spilled and self._reader is not None:
+            self._drop_replayed_prefix()
+        self._close_handles()
+
+    def _close_handles(self):
+        for handle in (self._writer, self._reader):
+            if handle is not None:
+                handle.close()
+        self._writer = None
+        self._reader = None
+
+    def _spill(self, event: FileSystemEvent):
+        if self._writer is None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = open(self.spill_path, "ab")
+            if self._spilled == 0:
+                logger.warning("큐가 가득 차 이벤트를 디스크로 스필 시작",
+                               queue=self.name, maxsize=self.maxsize, spill_path=str(self.spill_path))
+        self._writer.write(encode_event(event))
+        # 프로세스가 비정상 종료되어도 버퍼에 남은 이벤트를 잃지 않도록 바로 커널에 넘김 (재시작 시 _recover로 재생)
+        self._writer.flush()
+        self._spilled += 1
+        record_spilled_events(self.name, 1)
+        set_spill_backlog(self.name, self._spilled)
+
+    def _replay(self):
+        """스필 파일에서 메모리 큐의 빈 자리만큼 이벤트를 FIFO 순서로 다시 채움"""
+        if self._writer is not None:
+            self._writer.flush()
+        if self._reader is None:
+            self._reader = open(self.spill_path, "rb")
+
+        replayed = 0
+        while self._spilled and self._queue.qsize() < self.maxsize:
+            line = self._reader.readline()
+            if not line:
+                # 기록된 줄 수보다 파일이 짧음 (비정상 종료로 잘린 파일)
+                self._spilled = 0
+                break
+            self._spilled -= 1
+            try:
+                self._queue.put_nowait(decode_event(line))
+                replayed += 1
+            except (ValueError, KeyError):
+                logger.warning("손상된 스필 레코드 무시", queue=self.name)
+
+        record_replayed_events(self.name, replayed)
+        set_spill_backlog(self.name, self._spilled)
+        if self._spilled == 0:
+            self._reset()
+            logger.info("스필된 이벤트 재생 완료", queue=self.name)
+
+    def _drop_replayed_prefix(self):
+        """이미 재생한 앞부분을 제거하여 재시작 시 중복 재생되지 않도록 함"""
+        if self._writer is not None:
+            self._writer.flush()
+        tmp_path = self.spill_path.with_suffix(".spill.tmp")
+        with open(tmp_path, "wb") as out:
+            while chunk := self._reader.read(1024 * 1024):
+                out.write(chunk)
+        os.replace(tmp_path, self.spill_path)
+
+    def _reset(self):
+        """스필 파일을 모두 재생했으면 파일을 비우고 핸들을 닫음"""
+        self._close_handles()
+        try:
+            os.truncate(self.spill_path, 0)
+        except FileNotFoundError:
+            pass
+
+    def _recover(self):
+        """이전 실행에서 남은 스필 파일이 있으면 재생 대상으로 등록"""
+        pending = 0
+        valid_end = 0
+        try:
+            with open(self.spill_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    pending += 1
+                    valid_end += len(line)
+        except FileNotFoundError:
+            return
+
+        # 비정상 종료로 잘린 마지막 줄은 이후 기록과 섞이지 않도록 제거
+        os.truncate(self.spill_path, valid_end)
+        if pending:
+            logger.info("이전 실행의 스필된 이벤트 복구", queue=self.name, pending=pending)
+            self._spilled = pending
+            self._replay()
+        else:
+            self._reset()
+
+
+def recover_orphaned_spills(spill_dir: Path, prefix: str, active: Collection[str], target: "SpillQueue") -> int:
+    """
+    이름이 prefix로 시작하지만 더 이상 사용하지 않는 큐(예: PIPELINE_WORKERS를 줄여 사라진 샤드)의
+    스필 파일을 순서대로 target 큐로 옮기고 삭제합니다. 옮긴 이벤트 수를 반환합니다.
+    """
+    moved = 0
+    for path in sorted(Path(spill_dir).glob(f"{prefix}*.spill")):
+        name = path.name[:-len(".spill")]
+        if name in active:
+            continue
+        orphan = SpillQueue(name, 1, spill_dir)
+        count = 0
+        while not orphan.empty():
+            target.put_nowait(orphan.get_nowait())
+            count += 1
+        orphan.close()
+        path.unlink(missing_ok=True)
+        if count:
+            logger.warning("사용하지 않는 큐의 스필 이벤트를 옮김", queue=name, target=target.name, events=count)
+        moved += count
+    return moved
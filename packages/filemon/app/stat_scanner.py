@@ -0,0 +1,258 @@
+import heapq
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from watchdog.events import FileSystemEvent, FileModifiedEvent, FileDeletedEvent
+from app.source_path_filter import PathFilter
+from app.utils.logger import get_logger
+from app.utils.metrics import record_scanned_dirs, set_scanner_tracked_dirs
+
+logger = get_logger(__name__)
+
+
+class _DirState:
+    """스캔 대상 디렉토리의 마지막 상태와 스캔 주기"""
+    __slots__ = ("path", "mtime_ns", "files", "subdirs", "interval", "next_scan", "listed")
+
+    def __init__(self, path: str, interval: float, next_scan: float):
+        self.path = path
+        self.mtime_ns = 0
+        self.files: Dict[str, Optional[Tuple[int, int]]] = {}  # 파일명 -> (mtime_ns, size), 새 파일은 None
+        self.subdirs: Set[str] = set()
+        self.interval = interval
+        self.next_scan = next_scan
+        self.listed = False  # 디렉토리 목록을 한 번이라도 읽었는지 여부
+
+
+class StatScanner:
+    """
+    inotify가 감지하지 못하는 변경(다른 노드에서 NFS로 쓴 파일)을 찾는 증분 stat 스캐너.
+
+    디렉토리마다 (파일명 -> mtime_ns, size) 인덱스를 유지하고, 디렉토리 mtime이 바뀐
+    경우에만 목록을 다시 읽습니다(항목 추가/삭제/이름 변경). 파일 내용 변경은 디렉토리
+    mtime에 반영되지 않으므로 알려진 파일은 매 스캔마다 stat으로 비교합니다.
+    스캔 주기는 디렉토리별로 변경이 발견되면 min_interval로 줄이고, 변경이 없으면
+    max_interval까지 두 배씩 늘려 최근 활동이 있는 디렉토리만 자주 확인합니다.
+    무시 패턴·과제 구조·깊이 조건에 맞지 않는 하위 디렉토리는 탐색하지 않습니다.
+
+    변경은 WatchdogHandler와 같은 FileModifiedEvent / FileDeletedEvent로 반환됩니다.
+    scan_due()와 save_index()는 블로킹 함수이므로 스레드 풀에서 한 번에 하나씩 호출해야 합니다.
+    """
+
+    def __init__(self, root: Path, path_filter: PathFilter, index_path: Optional[Path] = None,
+                 min_interval: float = 2, max_interval: float = 60, max_dirs_per_pass: int = 500):
+        self.root = str(root)
+        self.path_filter = path_filter
+        self.index_path = Path(index_path) if index_path else None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_dirs_per_pass = max_dirs_per_pass
+        self._dirs: Dict[str, _DirState] = {}
+        self._heap: List[Tuple[float, str]] = []
+        # 인덱스가 없는 첫 실행에서는 기존 파일을 기준선으로만 기록 (이벤트 폭주 방지)
+        self._emit_existing = False
+
+    # --- 인덱스 ---
+
+    def load_index(self) -> bool:
+        """
+        저장된 인덱스를 불러옵니다. 인덱스가 있으면 중단 중에 변경된 파일도 첫 스캔에서 감지합니다.
+
+        Returns:
+            bool: 인덱스를 불러왔는지 여부
+        """
+        now = time.monotonic()
+        loaded = False
+        if self.index_path is not None:
+            try:
+                with open(self.index_path, "r", encoding="utf-8", errors="surrogateescape") as f:
+                    data = json.load(f)
+                for path, record in data["dirs"].items():
+                    state = self._add_dir(path, now)
+                    state.mtime_ns = record["m"]
+                    state.files = {name: tuple(value) if value else None for name, value in record["f"].items()}
+                    state.subdirs = set(record["d"])
+                    state.listed = True
+                # 목록만 기록되고 아직 스캔되지 않았던 하위 디렉토리도 추적
+                for state in list(self._dirs.values()):
+                    for subdir in state.subdirs:
+                        self._add_dir(subdir, now)
+                loaded = True
+                logger.info("스캐너 인덱스 로드 완료", index_path=str(self.index_path), dirs=len(self._dirs))
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError, TypeError):
+                logger.warning("스캐너 인덱스 손상, 기준선부터 다시 생성", index_path=str(self.index_path), exc_info=True)
+                self._dirs.clear()
+                self._heap.clear()
+
+        self._emit_existing = loaded
+        if self.root not in self._dirs:
+            self._add_dir(self.root, now)
+        return loaded
+
+    def save_index(self):
+        """인덱스를 원자적으로 저장 (임시 파일 + os.replace)"""
+        if self.index_path is None:
+            return
+        data = {"dirs": {
+            path: {"m": state.mtime_ns, "f": state.files, "d": sorted(state.subdirs)}
+            for path, state in self._dirs.items() if state.listed
+        }}
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8", errors="surrogateescape") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    # --- 스캔 ---
+
+    def build_baseline(self):
+        """인덱스가 없을 때 전체 트리를 한 번 스캔하여 기준선만 기록 (이벤트 없음)"""
+        started = time.monotonic()
+        discarded: List[FileSystemEvent] = []
+        stack = [self.root]
+        while stack:
+            state = self._dirs.get(stack.pop())
+            if state is None or state.listed:
+                continue
+            self._scan_dir(state, discarded)
+            stack.extend(state.subdirs)
+
+        self._emit_existing = True
+        clock = time.monotonic()
+        for state in self._dirs.values():
+            self._schedule(state, clock + state.interval)
+        logger.info("스캐너 기준선 생성 완료", dirs=len(self._dirs),
+                   elapsed=round(clock - started, 3))
+
+    def scan_due(self, now: Optional[float] = None) -> Tuple[List[FileSystemEvent], float]:
+        """
+        스캔 시각이 된 디렉토리를 최대 max_dirs_per_pass개 스캔합니다.
+
+        Returns:
+            (감지된 이벤트 목록, 다음 스캔까지 남은 시간(초))
+        """
+        clock = time.monotonic()
+        now = clock if now is None else now
+        events: List[FileSystemEvent] = []
+
+        # 이번 패스에서 다시 예약된 디렉토리를 중복 스캔하지 않도록 대상을 먼저 꺼냄
+        due: List[_DirState] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.max_dirs_per_pass:
+            due_at, path = heapq.heappop(self._heap)
+            state = self._dirs.get(path)
+            if state is None or state.next_scan != due_at:
+                continue  # 삭제되었거나 다시 예약된 디렉토리
+            due.append(state)
+
+        for state in due:
+            if state.path not in self._dirs:
+                continue  # 이번 패스에서 상위 디렉토리와 함께 삭제됨
+            changed = self._scan_dir(state, events)
+            if state.path in self._dirs:
+                state.interval = self.min_interval if changed else min(state.interval * 2, self.max_interval)
+                self._schedule(state, clock + state.interval)
+
+        record_scanned_dirs(len(due))
+        set_scanner_tracked_dirs(len(self._dirs))
+        delay = max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else self.max_interval
+        return events, delay
+
+    def _scan_dir(self, state: _DirState, events: List[FileSystemEvent]) -> bool:
+        """디렉토리 하나를 스캔하고 변경이 있었는지 반환"""
+        try:
+            dir_mtime_ns = os.stat(state.path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            self._remove_dir(state.path, events)
+            return True
+        except OSError:
+            logger.debug("디렉토리 stat 실패", path=state.path, exc_info=True)
+            return False
+
+        changed = False
+        if not state.listed or dir_mtime_ns != state.mtime_ns:
+            # 목록 변경(또는 새로 생긴 디렉토리)은 활동으로 간주 (기준선 생성 중 제외)
+            self._relist(state, events)
+            changed = self._emit_existing
+            state.mtime_ns = dir_mtime_ns
+            state.listed = True
+
+        # 파일 내용 변경은 디렉토리 mtime에 반영되지 않으므로 알려진 파일을 다시 stat
+        for name, previous in list(state.files.items()):
+            path = os.path.join(state.path, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                del state.files[name]
+                events.append(FileDeletedEvent(path))
+                changed = True
+                continue
+            except OSError:
+                continue
+            current = (st.st_mtime_ns, st.st_size)
+            if current != previous:
+                state.files[name] = current
+                if previous is not None or self._emit_existing:
+                    events.append(FileModifiedEvent(path))
+                changed = True
+        return changed
+
+    def _relist(self, state: _DirState, events: List[FileSystemEvent]):
+        """디렉토리 목록을 다시 읽어 추가/삭제된 파일과 하위 디렉토리를 반영"""
+        files: Set[str] = set()
+        subdirs: Set[str] = set()
+        try:
+            with os.scandir(state.path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if self.path_filter.should_descend(entry.path):
+                            subdirs.add(entry.path)
+                    elif self.path_filter.should_process(entry.path):
+                        files.add(entry.name)
+        except OSError:
+            logger.debug("디렉토리 목록 읽기 실패", path=state.path, exc_info=True)
+            return
+
+        for name in list(state.files):
+            if name not in files:
+                del state.files[name]
+                events.append(FileDeletedEvent(os.path.join(state.path, name)))
+        for name in files - state.files.keys():
+            # 새 파일: 이어지는 stat 비교에서 modified 이벤트 발생 (기준선 생성 중에는 제외)
+            state.files[name] = None
+
+        now = time.monotonic()
+        for path in state.subdirs - subdirs:
+            self._remove_dir(path, events)
+        for path in subdirs - state.subdirs:
+            self._add_dir(path, now)
+        state.subdirs = subdirs
+
+    def _add_dir(self, path: str, now: float) -> _DirState:
+        state = self._dirs.get(path)
+        if state is None:
+            state = _DirState(path, self.min_interval, now)
+            self._dirs[path] = state
+            heapq.heappush(self._heap, (now, path))
+        return state
+
+    def _remove_dir(self, path: str, events: List[FileSystemEvent]):
+        """삭제된 디렉토리와 하위 디렉토리의 파일을 모두 deleted로 보고하고 인덱스에서 제거"""
+        state = self._dirs.pop(path, None)
+        if state is None:
+            return
+        for name in state.files:
+            events.append(FileDeletedEvent(os.path.join(path, name)))
+        for subdir in state.subdirs:
+            self._remove_dir(subdir, events)
+
+    def _schedule(self, state: _DirState, at: float):
+        state.next_scan = at
+        heapq.heappush(self._heap, (at, state.path))
@@ -0,0 +1,201 @@
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from app.config.settings import settings
+from app.utils.logger import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+# 이 시간 이상 실행된 워커가 종료되면 재시작 대기 시간을 초기화 (초)
+_STABLE_RUN_SECONDS = 60.0
+# 첫 재시작 대기 시간 (초)
+_RESTART_BACKOFF_BASE = 1.0
+
+
+def _worker_path(path: Path, index: int) -> Path:
+    """워커별로 겹치지 않도록 파일명에 워커 번호를 붙인 경로 (예: outbox.db -> outbox-1.db)"""
+    return path.with_name(f"{path.stem}-{index}{path.suffix}")
+
+
+def run_worker(index: int, count: int):
+    """
+    워커 프로세스 진입점.
+    spawn으로 시작되어 설정을 새로 읽은 뒤, 담당 범위와 워커별 경로를 지정하고 main()을 실행합니다.
+    """
+    settings.WORKER_INDEX = index
+    settings.WORKER_COUNT = count
+    # 스필 파일, 스캔 인덱스, outbox, 로그 파일은 프로세스마다 따로 사용
+    settings.QUEUE_SPILL_DIR = settings.QUEUE_SPILL_DIR / f"worker-{index}"
+    settings.SCANNER_INDEX_PATH = _worker_path(settings.SCANNER_INDEX_PATH, index)
+    settings.OUTBOX_PATH = _worker_path(settings.OUTBOX_PATH, index)
+    settings.LOG_FILE_PATH = os.path.join(settings.LOG_FILE_PATH, f"worker-{index}")
+
+    # 슈퍼바이저 프로세스가 prometheus_client를 멀티 프로세스 설정 전에 로드하지 않도록 여기서 import
+    from app.main import main
+    asyncio.run(main())
+
+
+class Supervisor:
+    """
+    WATCH_ROOT를 학생 디렉토리 해시로 나눠 워커 프로세스 N개에 맡기는 슈퍼바이저.
+
+    워커는 spawn으로 시작하며 각자 담당 학생 디렉토리만 감시·처리합니다(WorkerPartition).
+    워커의 메트릭은 PROMETHEUS_MULTIPROC_DIR의 파일로 기록되고, 슈퍼바이저가 하나의
+    /metrics 엔드포인트로 합쳐서 노출합니다. 비정상 종료된 워커는 지수 백오프 후 다시 시작하며,
+    SIGTERM/SIGINT를 받으면 워커에 SIGTERM을 전달하고 종료를 기다립니다.
+    """
+
+    def __init__(self, workers: int, metrics_dir: Path, metrics_port: int,
+                 target: Callable[[int, int], None] = run_worker,
+                 restart_backoff_max: float = 30, shutdown_timeout: float = 30):
+        self.workers = workers
+        self.metrics_dir = Path(metrics_dir)
+        self.metrics_port = metrics_port
+        self.target = target
+        self.restart_backoff_max = restart_backoff_max
+        self.shutdown_timeout = shutdown_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._started_at: Dict[int, float] = {}
+        self._backoff: Dict[int, float] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> int:
+        """워커를 시작하고 종료 신호를 받을 때까지 감시합니다. 종료 코드를 반환합니다."""
+        self._prepare_metrics_dir()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._request_stop)
+
+        if self.metrics_port:
+            self._start_metrics_server()
+        logger.info("슈퍼바이저 시작", workers=self.workers, metrics_dir=str(self.metrics_dir))
+
+        for index in range(self.workers):
+            self._start(index)
+        try:
+            while not self._stopping:
+                self._supervise_once(timeout=1.0)
+        finally:
+            self._stop_all()
+        logger.info("슈퍼바이저 종료 완료")
+        return 0
+
+    def _prepare_metrics_dir(self):
+        """이전 실행의 메트릭 파일을 지우고, 워커가 상속할 환경 변수를 설정"""
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(self.metrics_dir)
+
+    def _start_metrics_server(self):
+        """모든 워커의 메트릭 파일을 합쳐서 노출하는 HTTP 서버 시작"""
+        from prometheus_client import CollectorRegistry, start_http_server, multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=str(self.metrics_dir))
+        start_http_server(self.metrics_port, registry=registry)
+        logger.info("프로메테우스 메트릭 서버 시작", port=self.metrics_port, mode="multiprocess")
+
+    def _start(self, index: int):
+        process = self._context.Process(target=self.target, args=(index, self.workers),
+                                        name=f"filemon-worker-{index}", daemon=False)
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = time.monotonic()
+        self._restart_at.pop(index, None)
+        logger.info("워커 시작", worker=index, pid=process.pid)
+
+    def _supervise_once(self, timeout: float):
+        """종료된 워커를 정리하고, 재시작 시각이 된 워커를 다시 시작"""
+        sentinels = {process.sentinel: index for index, process in self._processes.items()}
+        timeout = self._next_timeout(timeout)
+        if sentinels:
+            ready = wait(list(sentinels), timeout=timeout)
+        else:
+            time.sleep(timeout)
+            ready = []
+
+        now = time.monotonic()
+        for sentinel in ready:
+            index = sentinels[sentinel]
+            process = self._processes.pop(index)
+            process.join()
+            self._on_exit(index, process, now)
+
+        if self._stopping:
+            return
+        for index, restart_at in list(self._restart_at.items()):
+            if restart_at <= now:
+                self._start(index)
+
+    def _next_timeout(self, timeout: float) -> float:
+        """다음 재시작 예정 시각까지 남은 시간 (없으면 timeout)"""
+        if not self._restart_at:
+            return timeout
+        return max(0.0, min(timeout, min(self._restart_at.values()) - time.monotonic()))
+
+    def _on_exit(self, index: int, process: multiprocessing.Process, now: float):
+        """종료된 워커의 메트릭을 정리하고 재시작을 예약"""
+        self._mark_dead(process.pid)
+        if self._stopping:
+            logger.info("워커 종료", worker=index, pid=process.pid, exitcode=process.exitcode)
+            return
+
+        from app.utils.metrics import record_worker_restart
+        record_worker_restart(index)
+        if now - self._started_at.get(index, now) >= _STABLE_RUN_SECONDS:
+            self._backoff[index] = _RESTART_BACKOFF_BASE
+        backoff = self._backoff.get(index, _RESTART_BACKOFF_BASE)
+        self._backoff[index] = min(backoff * 2, self.restart_backoff_max)
+        self._restart_at[index] = now + backoff
+        logger.error("워커가 비정상 종료되어 재시작 예약",
+                    worker=index, pid=process.pid, exitcode=process.exitcode, backoff=backoff)
+
+    def _mark_dead(self, pid: Optional[int]):
+        """종료된 워커의 live Gauge 파일 삭제 (합산 값에서 제외)"""
+        from prometheus_client import multiprocess
+        try:
+            multiprocess.mark_process_dead(pid, path=str(self.metrics_dir))
+        except Exception:
+            logger.debug("워커 메트릭 정리 실패", pid=pid, exc_info=True)
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def _stop_all(self):
+        """모든 워커에 SIGTERM을 보내고 shutdown_timeout까지 기다린 뒤, 남은 워커는 강제 종료"""
+        self._stopping = True
+        self._restart_at.clear()
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        for index, process in list(self._processes.items()):
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("워커가 제시간에 종료되지 않아 강제 종료", worker=index, pid=process.pid)
+                process.kill()
+                process.join()
+            self._mark_dead(process.pid)
+        self._processes.clear()
+
+
+def run_supervisor() -> int:
+    """설정(FILEMON_WORKERS 등)으로 슈퍼바이저를 실행합니다."""
+    setup_logging(
+        log_file_path=settings.LOG_FILE_PATH,
+        log_level=settings.LOG_LEVEL,
+        max_bytes=settings.LOG_MAX_BYTES,
+        backup_count=settings.LOG_BACKUP_COUNT,
+        sample_rate=settings.LOG_SAMPLE_RATE,
+    )
+    supervisor = Supervisor(settings.FILEMON_WORKERS, settings.PROMETHEUS_MULTIPROC_DIR, settings.METRICS_PORT,
+                            restart_backoff_max=settings.WORKER_RESTART_BACKOFF_MAX,
+                            shutdown_timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+    return supervisor.run()
@@ -1,14 +1,35 @@
 import asyncio
+import zlib
+from typing import List, Optional, Sequence
 from watchdog.observers import Observer
 from app.debouncer import Debouncer
 from app.pipeline import FilemonPipeline
+from app.sender import SnapshotSender
+from app.snapshot import SnapshotManager
+from app.config.settings import settings
+from app.stat_scanner import StatScanner
+from app.catchup_scan import CatchUpScanner
+from app.lazy_watch import LazyWatches
+from app.retention import RetentionCompactor
+from app.spill_queue import SpillQueue
+from app.tracing import start_trace, update_oldest_age
 from app.utils.logger import get_logger
-from app.utils.metrics import watchdog_up, set_queue_size, processing_duration_seconds
+from app.utils.metrics import record_raw_event, watchdog_up, set_queue_size, set_shard_queue_size, processing_duration_seconds
 
 logger = get_logger(__name__)
 
 # --- Monitoring Tasks ---
 
+class ShutdownRequested(Exception):
+    """종료 시그널을 받아 TaskGroup의 나머지 작업을 취소하기 위한 예외"""
+
+
+async def wait_for_shutdown(stop_event: asyncio.Event):
+    """종료 시그널(stop_event)을 기다렸다가 예외를 발생시켜 TaskGroup의 모든 작업을 취소합니다."""
+    await stop_event.wait()
+    logger.info("종료 시그널 수신, 실행 중인 작업 취소", component="shutdown")
+    raise ShutdownRequested()
+
 async def monitor_watchdog(observer: Observer):
     """Watchdog Observer 스레드를 주기적으로 모니터링합니다."""
     logger.info("Watchdog 모니터링 시작", component="watchdog_monitor")
@@ -18,16 +39,122 @@ async def monitor_watchdog(observer: Observer):
         watchdog_up.set(1)
         await asyncio.sleep(10)
 
-async def monitor_queues(raw_queue: asyncio.Queue, processed_queue: asyncio.Queue):
+async def monitor_queues(raw_queue: asyncio.Queue, processed_queue: asyncio.Queue, shard_queues: Sequence[asyncio.Queue] = ()):
     """주요 큐들의 현재 사이즈를 주기적으로 측정합니다."""
     logger.info("큐 모니터링 시작", component="queue_monitor")
     while True:
         set_queue_size("raw", raw_queue.qsize())
         set_queue_size("processed", processed_queue.qsize())
+        update_oldest_age("raw", raw_queue)
+        update_oldest_age("processed", processed_queue)
+        for shard, shard_queue in enumerate(shard_queues):
+            set_shard_queue_size(shard, shard_queue.qsize())
+            update_oldest_age(f"shard-{shard}", shard_queue)
         await asyncio.sleep(10)
 
+async def monitor_api_pool(snapshot_sender: SnapshotSender):
+    """API 클라이언트 커넥션 풀 상태를 주기적으로 측정합니다."""
+    logger.info("API 커넥션 풀 모니터링 시작", component="api_pool_monitor")
+    while True:
+        snapshot_sender.update_pool_metrics()
+        await asyncio.sleep(10)
+
+# --- Maintenance Tasks ---
+
+async def run_blob_gc(snapshot_manager: SnapshotManager, interval: float):
+    """미참조 블롭 GC를 주기적으로 실행합니다. GC 실패는 로깅 후 다음 주기에 재시도합니다."""
+    logger.info("블롭 GC 태스크 시작", component="blob_gc", interval=interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await snapshot_manager.collect_garbage()
+        except Exception:
+            logger.error("블롭 GC 중 오류 발생", component="blob_gc", exc_info=True)
+
+async def run_segment_compaction(snapshot_manager: SnapshotManager, interval: float):
+    """세그먼트 압축을 주기적으로 실행합니다. 압축 실패는 로깅 후 다음 주기에 재시도합니다."""
+    logger.info("세그먼트 압축 태스크 시작", component="segment_compaction", interval=interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await snapshot_manager.compact_segments()
+        except Exception:
+            logger.error("세그먼트 압축 중 오류 발생", component="segment_compaction", exc_info=True)
+
+async def run_retention(compactor: RetentionCompactor, interval: float):
+    """스냅샷 보존 정리를 주기적으로 실행합니다. 실패는 로깅 후 다음 주기에 재시도합니다."""
+    logger.info("스냅샷 보존 정리 태스크 시작", component="retention", interval=interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await compactor.run_cycle()
+        except Exception:
+            logger.error("스냅샷 보존 정리 중 오류 발생", component="retention", exc_info=True)
+
+async def run_outbox_replayer(snapshot_sender: SnapshotSender, interval: float):
+    """등록 실패 outbox를 재전송합니다. 한 번에 가득 찬 배치를 보냈으면 쉬지 않고 이어서 전송합니다."""
+    logger.info("outbox 재전송 태스크 시작", component="outbox_replayer", interval=interval)
+    while True:
+        try:
+            sent = await snapshot_sender.replay_outbox()
+        except Exception:
+            logger.error("outbox 재전송 중 오류 발생", component="outbox_replayer", exc_info=True)
+            sent = 0
+        if sent < settings.API_BATCH_MAX_SIZE:
+            await asyncio.sleep(interval)
+
 # --- Core Worker Tasks ---
 
+async def run_catchup_scan(scanner: CatchUpScanner, raw_queue, student_dirs: Optional[List[str]] = None):
+    """
+    시작 시(또는 lazy 감시에서 작업 공간 watch를 등록할 때) 한 번 실행되는 캐치업 스캔.
+    실패해도 실시간 감시는 계속합니다.
+    """
+    try:
+        await scanner.run(raw_queue, student_dirs)
+    except Exception:
+        logger.error("캐치업 스캔 중 오류 발생", component="catchup_scan", exc_info=True)
+
+async def run_stat_scanner(scanner: StatScanner, raw_queue, executor, checkpoint_interval: float,
+                           lazy_watches: Optional[LazyWatches] = None):
+    """
+    stat 스캐너 실행 태스크. 스캔은 스레드 풀에서 수행하고 감지된 이벤트를 raw 큐에 넣습니다.
+    인덱스가 없으면 먼저 기준선을 만들고, 인덱스는 주기적으로 저장합니다 (종료 시 저장은 shutdown에서 수행).
+    lazy_watches가 주어지면 변경이 감지된 작업 공간에 inotify watch를 등록합니다 (hybrid 모드).
+    """
+    loop = asyncio.get_running_loop()
+    logger.info("stat 스캐너 시작", component="stat_scanner", root=scanner.root)
+    if not await loop.run_in_executor(executor, scanner.load_index):
+        await loop.run_in_executor(executor, scanner.build_baseline)
+
+    last_checkpoint = loop.time()
+    while True:
+        with processing_duration_seconds.labels(component='stat_scanner').time():
+            events, delay = await loop.run_in_executor(executor, scanner.scan_due)
+        for event in events:
+            record_raw_event(event.event_type)
+            raw_queue.put_nowait(start_trace(event))
+        if lazy_watches is not None and events:
+            paths = {event.src_path for event in events}
+            await loop.run_in_executor(executor, lambda: [lazy_watches.activate(path) for path in paths])
+
+        if loop.time() - last_checkpoint >= checkpoint_interval:
+            await loop.run_in_executor(executor, scanner.save_index)
+            last_checkpoint = loop.time()
+        await asyncio.sleep(delay)
+
+async def run_watch_release(lazy_watches: LazyWatches, executor, interval: float):
+    """lazy 감시 모드에서 유휴 작업 공간의 하위 watch를 주기적으로 해제합니다."""
+    loop = asyncio.get_running_loop()
+    logger.info("유휴 작업 공간 watch 해제 태스크 시작", component="lazy_watch",
+               idle_ttl=lazy_watches.idle_ttl, interval=interval)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await loop.run_in_executor(executor, lazy_watches.release_idle)
+        except Exception:
+            logger.error("유휴 작업 공간 watch 해제 중 오류 발생", component="lazy_watch", exc_info=True)
+
 async def run_debouncer(debouncer: Debouncer, raw_queue: asyncio.Queue):
     """debouncer 실행 태스크. 처리 중 오류 발생 시 예외를 전파합니다."""
     logger.info("Debouncer 시작", component="debouncer")
@@ -36,6 +163,21 @@ async def run_debouncer(debouncer: Debouncer, raw_queue: asyncio.Queue):
         with processing_duration_seconds.labels(component='debouncer').time():
             await debouncer.process_event(raw_event)
 
+def shard_for(src_path: str, shard_count: int) -> int:
+    """파일 경로로 샤드 번호를 결정합니다. 같은 파일은 항상 같은 샤드에서 순서대로 처리됩니다."""
+    return zlib.crc32(src_path.encode("utf-8", "surrogateescape")) % shard_count
+
+async def run_pipeline_router(processed_queue: asyncio.Queue, shard_queues: Sequence[SpillQueue]):
+    """
+    debounce된 이벤트를 파일 경로 해시에 따라 샤드 큐로 분배합니다.
+    샤드 큐는 가득 차면 디스크로 스필하므로 한 샤드가 밀려도 라우터가 대기하지 않아 다른 샤드가 멈추지 않습니다.
+    """
+    logger.info("파이프라인 라우터 시작", component="pipeline_router", shards=len(shard_queues))
+    while True:
+        event = await processed_queue.get()
+        shard = shard_for(event.src_path, len(shard_queues))
+        shard_queues[shard].put_nowait(event)
+
 async def run_main_pipeline(processed_queue: asyncio.Queue, pipeline: FilemonPipeline):
     """메인 파이프라인 실행 태스크. 개별 이벤트의 오류는 로깅 후 계속 진행하며, 루프 자체의 오류는 예외를 전파합니다."""
     logger.info("메인 파이프라인 시작", component="pipeline")
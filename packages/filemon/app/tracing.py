@@ -0,0 +1,81 @@
+import time
+from typing import Dict, Optional
+from watchdog.events import FileSystemEvent
+from app.utils.metrics import record_stage_duration, record_edit_to_registered, set_queue_oldest_age
+
+# (단계 이름, 시작 시점, 종료 시점)
+STAGES = (
+    ("debounce", "received", "flushed"),   # 감지 -> 디바운스 플러시
+    ("queue", "flushed", "started"),       # 플러시 -> 파이프라인 처리 시작 (processed/샤드 큐 대기)
+    ("read", "started", "read"),           # 처리 시작 -> 파일 읽기 완료
+    ("snapshot", "read", "snapshot"),      # 파일 읽기 -> 스냅샷 저장 완료
+    ("register", "snapshot", "registered"),  # 스냅샷 저장 -> API 등록 응답
+)
+
+
+class EventTrace:
+    """이벤트 하나가 각 단계를 통과한 시각 (Unix 시간, 스필 파일을 거쳐도 유지되도록 벽시계 사용)"""
+    __slots__ = ("received", "flushed", "started", "read", "snapshot", "registered")
+
+    def __init__(self, received: float):
+        self.received = received
+        self.flushed: Optional[float] = None
+        self.started: Optional[float] = None
+        self.read: Optional[float] = None
+        self.snapshot: Optional[float] = None
+        self.registered: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> "EventTrace":
+        trace = cls(data["received"])
+        for name, value in data.items():
+            setattr(trace, name, value)
+        return trace
+
+
+def start_trace(event: FileSystemEvent, received: Optional[float] = None) -> FileSystemEvent:
+    """이벤트 감지 시각을 기록합니다. (watchdog 핸들러, stat 스캐너, 캐치업 스캔)"""
+    event.trace = EventTrace(time.time() if received is None else received)
+    return event
+
+
+def get_trace(event: FileSystemEvent) -> Optional[EventTrace]:
+    trace = getattr(event, "trace", None)
+    return trace if isinstance(trace, EventTrace) else None
+
+
+def mark(event: FileSystemEvent, stage: str):
+    """단계 통과 시각을 기록합니다. 추적 정보가 없는 이벤트는 무시합니다."""
+    trace = get_trace(event)
+    if trace is not None:
+        setattr(trace, stage, time.time())
+
+
+def finish_trace(event: FileSystemEvent):
+    """API 등록까지 끝난 이벤트의 단계별 소요 시간과 전체 지연을 기록합니다."""
+    trace = get_trace(event)
+    if trace is None:
+        return
+    trace.registered = time.time()
+    for stage, begin, end in STAGES:
+        begin_ts, end_ts = getattr(trace, begin), getattr(trace, end)
+        if begin_ts is not None and end_ts is not None:
+            record_stage_duration(stage, max(0.0, end_ts - begin_ts))
+    record_edit_to_registered(max(0.0, trace.registered - trace.received))
+
+
+def update_oldest_age(name: str, queue, now: Optional[float] = None):
+    """큐 맨 앞(가장 오래된) 이벤트가 감지된 뒤 지난 시간을 기록합니다."""
+    now = time.time() if now is None else now
+    head = queue.peek_nowait() if hasattr(queue, "peek_nowait") else _peek_asyncio_queue(queue)
+    trace = get_trace(head) if head is not None else None
+    set_queue_oldest_age(name, now - trace.received if trace is not None else 0.0)
+
+
+def _peek_asyncio_queue(queue) -> Optional[FileSystemEvent]:
+    # asyncio.Queue는 peek을 제공하지 않으므로 내부 deque의 맨 앞을 읽음 (모니터링 용도)
+    items = getattr(queue, "_queue", None)
+    return items[0] if items else None
@@ -4,17 +4,50 @@ from prometheus_client import Counter, Gauge, Histogram
 # =============================================================================
 # Filemon 메트릭
 # =============================================================================
+# 멀티 프로세스 모드(FILEMON_WORKERS > 1)에서는 워커별 값을 슈퍼바이저가 합쳐서 노출합니다.
+# Gauge는 살아 있는 워커 값만 합산(livesum)하며, 상태·시각 값은 최소/최대를 사용합니다.
 
 # 1. Watchdog 상태 메트릭
 watchdog_up = Gauge(
     'watchdog_up',
-    'Watchdog Observer 스레드 상태 (1=활성, 0=중지)'
+    'Watchdog Observer 스레드 상태 (1=활성, 0=중지)',
+    multiprocess_mode='livemin'
+)
+
+watchdog_watches = Gauge(
+    'watchdog_watches',
+    '현재 등록된 inotify watch 수',
+    multiprocess_mode='livesum'
+)
+
+watchdog_pruned_dirs_total = Counter(
+    'watchdog_pruned_dirs_total',
+    '무시 패턴·과제 구조·깊이 조건으로 watch 등록을 건너뛴 디렉토리 수'
+)
+
+watchdog_attached_workspaces = Gauge(
+    'watchdog_attached_workspaces',
+    'lazy 감시 모드에서 하위 전체에 watch가 등록된 작업 공간 수',
+    multiprocess_mode='livesum'
+)
+
+watchdog_attach_duration_seconds = Histogram(
+    'watchdog_attach_duration_seconds',
+    'lazy 감시 모드에서 작업 공간 하위에 watch를 등록하는 데 걸린 시간 (초)',
+    ['trigger'],  # inotify, activate
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+watchdog_released_workspaces_total = Counter(
+    'watchdog_released_workspaces_total',
+    'lazy 감시 모드에서 유휴 시간이 지나 하위 watch를 해제한 작업 공간 수'
 )
 
 # 2. 이벤트 처리 메트릭
 watchdog_last_event_time_seconds = Gauge(
     'watchdog_last_event_time_seconds',
-    '마지막으로 감지된 파일 시스템 이벤트의 Unix 타임스탬프'
+    '마지막으로 감지된 파일 시스템 이벤트의 Unix 타임스탬프',
+    multiprocess_mode='livemax'
 )
 
 raw_events_total = Counter(
@@ -27,14 +60,70 @@ raw_events_total = Counter(
 queue_size = Gauge(
     'queue_size',
     '현재 큐 크기 (대기 중인 이벤트 수)',
+    ['queue'],
+    multiprocess_mode='livesum'
+)
+
+queue_spilled_events_total = Counter(
+    'queue_spilled_events_total',
+    '큐가 가득 차 디스크로 스필된 이벤트 수',
+    ['queue']
+)
+
+queue_replayed_events_total = Counter(
+    'queue_replayed_events_total',
+    '디스크 스필 파일에서 큐로 다시 재생된 이벤트 수',
     ['queue']
 )
 
+queue_spill_backlog = Gauge(
+    'queue_spill_backlog',
+    '디스크 스필 파일에서 재생을 기다리는 이벤트 수',
+    ['queue'],
+    multiprocess_mode='livesum'
+)
+
+pipeline_shard_queue_size = Gauge(
+    'pipeline_shard_queue_size',
+    '파이프라인 워커(샤드)별 대기 중인 이벤트 수',
+    ['shard'],
+    multiprocess_mode='livesum'
+)
+
 debounced_events_total = Counter(
     'debounced_events_total',
     '디바운싱으로 인해 삭제된 총 이벤트 수'
 )
 
+debounce_window_seconds = Histogram(
+    'debounce_window_seconds',
+    '플러시된 버킷에 적용된 debounce 대기 시간 (초)',
+    buckets=(0.1, 0.2, 0.3, 0.45, 0.6, 0.9, 1.2, 1.6, 2.0, 3.0, 5.0)
+)
+
+scanner_scanned_dirs_total = Counter(
+    'scanner_scanned_dirs_total',
+    'stat 스캐너가 스캔한 디렉토리 수'
+)
+
+scanner_tracked_dirs = Gauge(
+    'scanner_tracked_dirs',
+    'stat 스캐너가 추적 중인 디렉토리 수',
+    multiprocess_mode='livesum'
+)
+
+catchup_files_total = Counter(
+    'catchup_files_total',
+    '시작 시 캐치업 스캔에서 확인한 파일 수',
+    ['result']
+)
+
+catchup_pending_dirs = Gauge(
+    'catchup_pending_dirs',
+    '캐치업 스캔이 남은 과제 디렉토리 수',
+    multiprocess_mode='livesum'
+)
+
 # 4. API 요청 메트릭
 api_requests_total = Counter(
     'api_requests_total',
@@ -59,8 +148,188 @@ processing_duration_seconds = Histogram(
     ['component']
 )
 
+# 감지 시각부터 단계별로 걸린 시간 (병목 단계 파악용)
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+pipeline_stage_duration_seconds = Histogram(
+    'pipeline_stage_duration_seconds',
+    '이벤트가 파이프라인 단계(debounce, queue, read, snapshot, register)에서 보낸 시간 (초)',
+    ['stage'],
+    buckets=_LATENCY_BUCKETS
+)
+
+edit_to_registered_seconds = Histogram(
+    'edit_to_registered_seconds',
+    '파일 변경 감지부터 스냅샷 등록 완료까지 걸린 시간 (초)',
+    buckets=_LATENCY_BUCKETS
+)
+
+queue_oldest_event_age_seconds = Gauge(
+    'queue_oldest_event_age_seconds',
+    '큐에서 가장 오래 대기 중인 이벤트가 감지된 뒤 지난 시간 (초)',
+    ['queue'],
+    multiprocess_mode='livemax'
+)
+
+snapshot_noop_skipped_total = Counter(
+    'snapshot_noop_skipped_total',
+    '내용이 마지막 스냅샷과 같아 건너뛴 수정 이벤트 수'
+)
+
+notebook_bytes_total = Counter(
+    'notebook_bytes_total',
+    '정규화 전(raw)·후(normalized) 노트북 용량 (bytes)',
+    ['kind']
+)
+
+large_file_captures_total = Counter(
+    'large_file_captures_total',
+    '크기 제한을 넘어 스트리밍으로 캡처한 파일 수 (mode: excerpt, full)',
+    ['mode']
+)
+
+large_file_bytes_total = Counter(
+    'large_file_bytes_total',
+    '스트리밍 캡처한 큰 파일의 원본(source)·저장(stored) 용량 (bytes)',
+    ['kind']
+)
+
+snapshot_dir_cache_total = Counter(
+    'snapshot_dir_cache_total',
+    '스냅샷 디렉토리 캐시 조회 결과별 횟수 (hit: 캐시 적중, miss: 디렉토리 생성, stale: 삭제된 디렉토리 재생성)',
+    ['result']
+)
+
+# 6. HTTP 커넥션 풀 메트릭
+api_pool_connections = Gauge(
+    'api_pool_connections',
+    'API 클라이언트 커넥션 풀의 커넥션 수',
+    ['state'],
+    multiprocess_mode='livesum'
+)
+
+api_pool_acquire_wait_seconds = Histogram(
+    'api_pool_acquire_wait_seconds',
+    '요청 시작부터 커넥션을 획득하기까지 걸린 시간 (초)',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+api_pool_acquisitions_total = Counter(
+    'api_pool_acquisitions_total',
+    '커넥션 획득 방식별 총 횟수 (reused: 풀 재사용, created: 신규 연결)',
+    ['result']
+)
+
+api_batch_size = Histogram(
+    'api_batch_size',
+    'bulk API로 한 번에 전송된 스냅샷 등록 수',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
+outbox_events_total = Counter(
+    'outbox_events_total',
+    '등록 실패 outbox 처리 결과별 항목 수 (stored: 저장, delivered: 재전송 성공, retried: 재시도 예약, dead: 재시도 중단)',
+    ['result']
+)
+
+outbox_pending = Gauge(
+    'outbox_pending',
+    'outbox에서 재전송을 기다리는 스냅샷 등록 수',
+    multiprocess_mode='livesum'
+)
+
+# 7. 스냅샷 저장소 메트릭
+snapshot_dedup_total = Counter(
+    'snapshot_dedup_total',
+    '블롭 저장소 중복 제거 결과별 스냅샷 수 (hit: 기존 블롭 재사용, miss: 새 블롭 저장)',
+    ['result']
+)
+
+blob_gc_removed_total = Counter(
+    'blob_gc_removed_total',
+    'GC로 삭제된 미참조 블롭 수'
+)
+
+blob_gc_freed_bytes_total = Counter(
+    'blob_gc_freed_bytes_total',
+    'GC로 회수된 블롭 용량 (bytes)'
+)
+
+snapshot_delta_writes_total = Counter(
+    'snapshot_delta_writes_total',
+    '차분 저장 모드에서 기록된 스냅샷 수',
+    ['kind']
+)
+
+snapshot_delta_written_bytes_total = Counter(
+    'snapshot_delta_written_bytes_total',
+    '차분 저장 모드에서 실제로 디스크에 기록된 용량 (bytes)',
+    ['kind']
+)
+
+snapshot_segment_appended_bytes_total = Counter(
+    'snapshot_segment_appended_bytes_total',
+    '세그먼트 저장 모드에서 세그먼트에 추가된 스냅샷 용량 (bytes)'
+)
+
+snapshot_segment_compactions_total = Counter(
+    'snapshot_segment_compactions_total',
+    '수행된 세그먼트 압축 수'
+)
+
+snapshot_segment_reclaimed_bytes_total = Counter(
+    'snapshot_segment_reclaimed_bytes_total',
+    '세그먼트 압축으로 회수된 용량 (bytes)'
+)
+
+snapshot_manifest_records_total = Counter(
+    'snapshot_manifest_records_total',
+    '학생별 스냅샷 매니페스트에 기록된 레코드 수',
+    ['op']  # append, remove
+)
+
+snapshot_manifest_checkpoints_total = Counter(
+    'snapshot_manifest_checkpoints_total',
+    '수행된 스냅샷 매니페스트 체크포인트 수'
+)
+
+retention_thinned_total = Counter(
+    'retention_thinned_total',
+    '보존 정책에 따라 삭제된 스냅샷 수'
+)
+
+retention_freed_bytes_total = Counter(
+    'retention_freed_bytes_total',
+    '보존 정책에 따른 스냅샷 삭제로 회수된 용량 (bytes, 블롭 하드 링크 포함)'
+)
+
+# 8. 멀티 프로세스 메트릭
+worker_restarts_total = Counter(
+    'worker_restarts_total',
+    '비정상 종료되어 슈퍼바이저가 다시 시작한 워커 프로세스 수',
+    ['worker']
+)
+
 # --- Helper Functions ---
 
+def set_watch_count(count: int):
+    """Sets the number of registered inotify watches."""
+    watchdog_watches.set(count)
+
+def record_pruned_dirs(count: int):
+    """Records directories skipped at watch registration time."""
+    watchdog_pruned_dirs_total.inc(count)
+
+def record_workspace_attach(trigger: str, duration: float, attached: int):
+    """Records deep watches attached to a workspace and the current attached workspace count."""
+    watchdog_attach_duration_seconds.labels(trigger=trigger).observe(duration)
+    watchdog_attached_workspaces.set(attached)
+
+def record_workspace_release(count: int, attached: int):
+    """Records workspaces whose deep watches were released after the idle TTL."""
+    watchdog_released_workspaces_total.inc(count)
+    watchdog_attached_workspaces.set(attached)
+
 def record_raw_event(event_type: str):
     """
     A raw filesystem event was detected.
@@ -73,10 +342,46 @@ def set_queue_size(queue_name: str, size: int):
     """Sets the current size for a given queue."""
     queue_size.labels(queue=queue_name).set(size)
 
+def record_spilled_events(queue_name: str, count: int):
+    """Records events spilled to disk because a queue was full."""
+    queue_spilled_events_total.labels(queue=queue_name).inc(count)
+
+def record_replayed_events(queue_name: str, count: int):
+    """Records spilled events replayed back into a queue."""
+    queue_replayed_events_total.labels(queue=queue_name).inc(count)
+
+def set_spill_backlog(queue_name: str, size: int):
+    """Sets the number of spilled events waiting to be replayed."""
+    queue_spill_backlog.labels(queue=queue_name).set(size)
+
+def set_shard_queue_size(shard: int, size: int):
+    """Sets the current size of a pipeline shard queue."""
+    pipeline_shard_queue_size.labels(shard=str(shard)).set(size)
+
+def record_scanned_dirs(count: int):
+    """Records directories scanned in one stat scanner pass."""
+    scanner_scanned_dirs_total.inc(count)
+
+def set_scanner_tracked_dirs(count: int):
+    """Sets the number of directories tracked by the stat scanner."""
+    scanner_tracked_dirs.set(count)
+
+def record_catchup_files(result: str):
+    """Records one file checked by the startup catch-up scan."""
+    catchup_files_total.labels(result=result).inc()
+
+def set_catchup_pending_dirs(count: int):
+    """Sets the number of assignment directories left in the catch-up scan."""
+    catchup_pending_dirs.set(count)
+
 def record_debounced_events(count: int):
     """Records that a number of events were debounced (discarded)."""
     debounced_events_total.inc(count)
 
+def record_debounce_window(seconds: float):
+    """Records the debounce window applied to a flushed bucket."""
+    debounce_window_seconds.observe(seconds)
+
 def record_api_request(status: str):
     """Records an API request with its status."""
     api_requests_total.labels(status=status).inc()
@@ -88,3 +393,97 @@ def record_file_size_exceeded():
 def record_parse_error():
     """Records a file path parsing error."""
     parse_errors_total.inc()
+
+def record_stage_duration(stage: str, seconds: float):
+    """Records time an event spent in one pipeline stage."""
+    pipeline_stage_duration_seconds.labels(stage=stage).observe(seconds)
+
+def record_edit_to_registered(seconds: float):
+    """Records the lag from change detection to snapshot registration."""
+    edit_to_registered_seconds.observe(seconds)
+
+def set_queue_oldest_age(queue_name: str, seconds: float):
+    """Sets the age of the oldest event waiting in a queue."""
+    queue_oldest_event_age_seconds.labels(queue=queue_name).set(seconds)
+
+def record_noop_skipped():
+    """Records a modified event skipped because the content did not change."""
+    snapshot_noop_skipped_total.inc()
+
+def record_notebook_normalized(raw_size: int, normalized_size: int):
+    """Records notebook sizes before and after normalization."""
+    notebook_bytes_total.labels(kind="raw").inc(raw_size)
+    notebook_bytes_total.labels(kind="normalized").inc(normalized_size)
+
+def record_large_file_capture(mode: str, source_size: int, stored_size: int):
+    """Records a file above the size cap captured by streaming ('excerpt' or 'full')."""
+    large_file_captures_total.labels(mode=mode).inc()
+    large_file_bytes_total.labels(kind="source").inc(source_size)
+    large_file_bytes_total.labels(kind="stored").inc(stored_size)
+
+def record_snapshot_dir_cache(result: str):
+    """Records a snapshot directory cache lookup (hit, miss, stale)."""
+    snapshot_dir_cache_total.labels(result=result).inc()
+
+
+def set_api_pool_connections(acquired: int, idle: int):
+    """Sets the number of acquired and idle pooled connections."""
+    api_pool_connections.labels(state="acquired").set(acquired)
+    api_pool_connections.labels(state="idle").set(idle)
+
+def record_api_pool_acquire(result: str, wait_seconds: float):
+    """Records how a pooled connection was obtained and how long it took."""
+    api_pool_acquisitions_total.labels(result=result).inc()
+    api_pool_acquire_wait_seconds.observe(wait_seconds)
+
+def record_api_batch(size: int):
+    """Records the number of registrations sent in one bulk request."""
+    api_batch_size.observe(size)
+
+def record_outbox_events(result: str, count: int):
+    """Records outbox entries stored, delivered, rescheduled or dead-lettered."""
+    outbox_events_total.labels(result=result).inc(count)
+
+def set_outbox_pending(count: int):
+    """Sets the number of registrations waiting in the outbox."""
+    outbox_pending.set(count)
+
+def record_dedup_result(result: str):
+    """Records whether a snapshot reused an existing blob."""
+    snapshot_dedup_total.labels(result=result).inc()
+
+def record_blob_gc(removed: int, freed_bytes: int):
+    """Records the outcome of a blob garbage collection pass."""
+    blob_gc_removed_total.inc(removed)
+    blob_gc_freed_bytes_total.inc(freed_bytes)
+
+def record_delta_write(kind: str, written_bytes: int):
+    """Records a keyframe or delta written by the delta snapshot store."""
+    snapshot_delta_writes_total.labels(kind=kind).inc()
+    snapshot_delta_written_bytes_total.labels(kind=kind).inc(written_bytes)
+
+def record_segment_append(size: int):
+    """Records a snapshot appended to a segment file."""
+    snapshot_segment_appended_bytes_total.inc(size)
+
+def record_segment_compaction(reclaimed_bytes: int):
+    """Records one segment compaction and the space it reclaimed."""
+    snapshot_segment_compactions_total.inc()
+    snapshot_segment_reclaimed_bytes_total.inc(reclaimed_bytes)
+
+def record_manifest_record(op: str):
+    """Records one manifest record ('append' or 'remove')."""
+    snapshot_manifest_records_total.labels(op=op).inc()
+
+def record_manifest_checkpoint():
+    """Records one manifest checkpoint."""
+    snapshot_manifest_checkpoints_total.inc()
+
+def record_retention_thinned(count: int, freed_bytes: int):
+    """Records snapshots removed by the retention compactor."""
+    retention_thinned_total.inc(count)
+    retention_freed_bytes_total.inc(freed_bytes)
+
+def record_worker_restart(worker_index: int):
+    """Records that the supervisor restarted a worker process."""
+    worker_restarts_total.labels(worker=str(worker_index)).inc()
@@ -4,6 +4,7 @@ from app.utils.logger import get_logger
 from watchdog.events import FileSystemEventHandler, FileDeletedEvent, FileModifiedEvent
 from app.source_path_filter import PathFilter
 from app.utils.metrics import record_raw_event
+from app.tracing import start_trace
 
 logger = get_logger(__name__)
 
@@ -30,6 +31,7 @@ class WatchdogHandler(FileSystemEventHandler):
             logger.debug("수정 이벤트 큐에 추가", src_path=event.src_path)
             record_raw_event(event.event_type)
             
+            start_trace(event)
             self.loop.call_soon_threadsafe(
                 self.raw_queue.put_nowait, event
             )
@@ -46,6 +48,7 @@ class WatchdogHandler(FileSystemEventHandler):
             
             record_raw_event(event.event_type)
 
+            start_trace(event)
             self.loop.call_soon_threadsafe(
                 self.raw_queue.put_nowait, event
             )
@@ -65,6 +68,7 @@ class WatchdogHandler(FileSystemEventHandler):
                 
                 delete_event = FileDeletedEvent(src_path)
                 record_raw_event(delete_event.event_type)
+                start_trace(delete_event)
                 self.loop.call_soon_threadsafe(
                     self.raw_queue.put_nowait, delete_event
                 )
@@ -77,6 +81,7 @@ class WatchdogHandler(FileSystemEventHandler):
                 
                 modify_event = FileModifiedEvent(dest_path)
                 record_raw_event(modify_event.event_type)
+                start_trace(modify_event)
                 self.loop.call_soon_threadsafe(
                     self.raw_queue.put_nowait, modify_event
                 )
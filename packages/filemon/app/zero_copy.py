@@ -0,0 +1,121 @@
+import errno
+import hashlib
+import os
+from typing import NamedTuple, Optional
+
+_CHUNK_SIZE = 64 * 1024
+# 커널 복사를 지원하지 않는 파일 시스템·커널에서 발생하는 오류 (다음 방식으로 대체)
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+
+class CaptureResult(NamedTuple):
+    """커널 복사로 캡처한 스냅샷 정보"""
+    file_stat: os.stat_result  # 복사 후 원본 파일 stat
+    size: int
+    digest: Optional[bytes]  # ContentFingerprint와 같은 blake2b-128 (요청한 경우에만)
+
+
+def copy_verified(src_path: str, dst_path: str, with_digest: bool = False) -> CaptureResult:
+    """
+    원본 파일을 사용자 공간 버퍼 없이 스냅샷 파일로 복사합니다. (스레드 풀에서 호출되는 동기 함수)
+    os.copy_file_range를 우선 사용하고, 지원하지 않으면 os.sendfile, 마지막으로 read/write로 복사합니다.
+    read_and_verify와 같이 복사 전후의 fstat(크기, 수정 시간)을 비교하여 복사 중 변경되었으면
+    RuntimeError를 발생시킵니다. 복사·해시 중 오류(ENOSPC, EIO 등)가 나도 스냅샷 파일을 지웁니다.
+    """
+    src_fd = os.open(src_path, os.O_RDONLY)
+    try:
+        st_before = os.fstat(src_fd)
+        dst_fd = os.open(dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                copied = _kernel_copy(src_fd, dst_fd, st_before.st_size)
+            finally:
+                os.close(dst_fd)
+
+            digest = _stream_digest(src_fd, copied) if with_digest else None
+            st_after = os.fstat(src_fd)
+            if (st_before.st_size, st_before.st_mtime) != (st_after.st_size, st_after.st_mtime) \
+                    or copied != st_after.st_size:
+                raise RuntimeError("파일 읽기 중 내용이 변경되었습니다.")
+        except BaseException:
+            _unlink_quietly(dst_path)
+            raise
+    finally:
+        os.close(src_fd)
+
+    return CaptureResult(st_after, copied, digest)
+
+
+def digest_file(src_path: str) -> CaptureResult:
+    """
+    원본 파일을 복사하지 않고 청크 단위 pread로 한 번 읽어 해시만 계산합니다. (스레드 풀에서 호출되는 동기 함수)
+    copy_verified와 같이 읽기 전후의 fstat을 비교하여 읽는 중 변경되었으면 RuntimeError를 발생시킵니다.
+    """
+    fd = os.open(src_path, os.O_RDONLY)
+    try:
+        st_before = os.fstat(fd)
+        digest = _stream_digest(fd, st_before.st_size)
+        st_after = os.fstat(fd)
+    finally:
+        os.close(fd)
+
+    if (st_before.st_size, st_before.st_mtime) != (st_after.st_size, st_after.st_mtime):
+        raise RuntimeError("파일 읽기 중 내용이 변경되었습니다.")
+    return CaptureResult(st_after, st_after.st_size, digest)
+
+
+def _unlink_quietly(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, count: int) -> int:
+    """count 바이트까지 복사하고 실제 복사한 바이트 수를 반환 (파일이 줄어들면 더 적을 수 있음)"""
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < count:
+                n = os.copy_file_range(src_fd, dst_fd, count - copied, copied, copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    if hasattr(os, "sendfile"):
+        try:
+            os.lseek(dst_fd, copied, os.SEEK_SET)  # sendfile은 대상 fd의 현재 위치에 기록
+            while copied < count:
+                n = os.sendfile(dst_fd, src_fd, copied, count - copied)
+                if n == 0:
+                    return copied
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    while copied < count:
+        chunk = os.pread(src_fd, min(_CHUNK_SIZE, count - copied), copied)
+        if not chunk:
+            break
+        os.pwrite(dst_fd, chunk, copied)
+        copied += len(chunk)
+    return copied
+
+
+def _stream_digest(fd: int, size: int) -> bytes:
+    """파일 전체를 메모리에 올리지 않고 청크 단위로 해시"""
+    h = hashlib.blake2b(digest_size=16)
+    offset = 0
+    while offset < size:
+        chunk = os.pread(fd, min(_CHUNK_SIZE, size - offset), offset)
+        if not chunk:
+            break
+        h.update(chunk)
+        offset += len(chunk)
+    return h.digest()
@@ -0,0 +1,68 @@
+"""
+Debouncer 마이크로벤치마크.
+
+처리량(events/s)과 보류 중인 키당 메모리 사용량을 측정합니다.
+
+    uv run python -m benchmarks.bench_debouncer --keys 10000 --events-per-key 20
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from watchdog.events import FileModifiedEvent
+
+from app.config.settings import settings
+from app.debouncer import Debouncer
+
+
+async def measure_throughput(keys: int, events_per_key: int) -> float:
+    """키를 번갈아 가며 modified 이벤트를 넣을 때의 처리량 (events/s)"""
+    debouncer = Debouncer(asyncio.Queue())
+    events = [FileModifiedEvent(f"/bench/student-{i % 500}/hw1/file_{i}.c") for i in range(keys)]
+
+    start = time.perf_counter()
+    for _ in range(events_per_key):
+        for event in events:
+            await debouncer.process_event(event)
+    elapsed = time.perf_counter() - start
+
+    await debouncer.close()
+    return keys * events_per_key / elapsed
+
+
+async def measure_memory(keys: int) -> float:
+    """보류 중인 키당 추가 메모리 (bytes, 이벤트 객체 자체는 제외)"""
+    debouncer = Debouncer(asyncio.Queue())
+    events = [FileModifiedEvent(f"/bench/student-{i % 500}/hw1/file_{i}.c") for i in range(keys)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for event in events:
+        await debouncer.process_event(event)
+    await asyncio.sleep(0)  # 스케줄러가 새 버킷을 힙에 등록하도록 양보
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    await debouncer.close()
+    return (after - before) / keys
+
+
+async def main(args):
+    # 측정 중 플러시가 일어나지 않도록 윈도우를 충분히 길게 설정
+    settings.DEBOUNCE_WINDOW = 3600
+    settings.DEBOUNCE_MAX_WAIT = 3600
+
+    throughput = await measure_throughput(args.keys, args.events_per_key)
+    per_key = await measure_memory(args.keys)
+
+    print(f"keys={args.keys} events_per_key={args.events_per_key}")
+    print(f"throughput: {throughput:,.0f} events/s")
+    print(f"memory per pending key: {per_key:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Debouncer microbenchmark")
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--events-per-key", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
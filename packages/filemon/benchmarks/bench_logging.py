@@ -0,0 +1,76 @@
+"""
+로깅 마이크로벤치마크.
+
+이벤트 하나당 파이프라인이 남기는 INFO 로그 3줄을 기준으로 호출 스레드가 부담하는 시간을 측정합니다.
+sync는 렌더링과 파일 쓰기를 호출 스레드에서 하는 기존 방식, queue는 QueueListener로 넘기는 방식,
+sampled는 queue에 메시지별 샘플링(LOG_SAMPLE_RATE)을 더한 방식입니다.
+
+    uv run python -m benchmarks.bench_logging --events 20000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from app.utils import logger as app_logging
+from app.utils.logger import setup_logging, get_logger, shutdown_logging
+
+MODES = ("sync", "queue", "sampled")
+
+
+def configure(mode: str, log_dir: str, sample_rate: int):
+    setup_logging(log_dir, "INFO", max_bytes=0, backup_count=0,
+                  sample_rate=sample_rate if mode == "sampled" else 0)
+    if mode == "sync":
+        # 큐 핸들러 대신 리스너의 핸들러를 로거에 직접 연결 (기존 동기 방식)
+        listener = app_logging._listener
+        app_logging._listener = None
+        listener.stop()
+        app_logger = logging.getLogger(app_logging.APP_LOGGER_NAME)
+        for handler in list(app_logger.handlers):
+            app_logger.removeHandler(handler)
+        for handler in listener.handlers:
+            app_logger.addHandler(handler)
+
+
+def run(mode: str, events: int, sample_rate: int):
+    """호출 스레드 기준 이벤트당 시간(us)과 로그를 모두 기록하기까지의 시간(s)"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        configure(mode, log_dir, sample_rate)
+        logger = get_logger(f"bench.{mode}")
+
+        start = time.perf_counter()
+        for i in range(events):
+            path = f"/watch/os-1-2024{i % 500:05d}/hw1/main_{i % 20}.c"
+            logger.info("이벤트 처리 시작", event_type="modified", path=path)
+            logger.info("스냅샷 생성 완료", path=path, size=1024)
+            logger.info("스냅샷 등록 완료", path=path)
+        caller = time.perf_counter() - start
+        shutdown_logging()
+        drained = time.perf_counter() - start
+    return caller / events * 1e6, drained
+
+
+def main(args):
+    stdout = sys.stdout
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull  # 콘솔 핸들러 출력 버림
+        try:
+            for mode in MODES:
+                results[mode] = run(mode, args.events, args.sample_rate)
+        finally:
+            sys.stdout = stdout
+
+    print(f"events={args.events} lines_per_event=3 sample_rate={args.sample_rate}")
+    for mode, (per_event, drained) in results.items():
+        print(f"{mode:8s} caller: {per_event:8.1f} us/event  drained: {drained:6.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logging microbenchmark")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=int, default=10)
+    main(parser.parse_args())
@@ -0,0 +1,322 @@
+"""
+Filemon 종단 간(end-to-end) 벤치마크.
+
+tmpfs(/dev/shm) 위에 `과목-분반-학번/hwN/...` 구조의 작업 공간을 만들고, 별도 프로세스에서
+여러 학생의 편집 패턴을 재생합니다. 실제 inotify Observer, Debouncer, FilemonPipeline,
+SnapshotSender를 main.py와 같은 방식으로 연결하고 로컬 스텁 백엔드로 등록 요청을 받아
+저장부터 등록까지의 지연을 측정합니다.
+
+편집 패턴:
+    typing    짧은 간격으로 같은 파일을 반복 저장 (타이핑 중 자동 저장)
+    autosave  1초마다 여러 파일을 저장
+    atomic    임시 파일에 쓴 뒤 rename으로 교체 (vim, JetBrains 방식)
+    unzip     새 과제 디렉토리에 파일 여러 개를 한 번에 생성
+    mix       학생마다 위 패턴을 번갈아 사용
+
+    uv run python -m benchmarks.bench_pipeline --students 50 --pattern mix --duration 10
+
+CPU와 RSS는 filemon(스텁 백엔드 포함) 프로세스 기준이며, 부하 생성 프로세스는 제외됩니다.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from aiohttp import web
+from prometheus_client import REGISTRY
+
+PATTERNS = ("typing", "autosave", "atomic", "unzip")
+
+
+# --- 부하 생성 (자식 프로세스) ---
+
+def snapshot_key(watch_root: Path, path: Path) -> str:
+    """스텁 백엔드가 기록하는 등록 키와 같은 형식 (class_div/hw/student_id/filename)"""
+    parts = path.relative_to(watch_root).parts
+    course, div, student_id = parts[0].split("-")
+    return f"{course}-{div}/{parts[1]}/{student_id}/{'@'.join(parts[2:])}"
+
+
+class Student:
+    """학생 한 명의 편집 패턴 재생기"""
+
+    def __init__(self, watch_root: Path, index: int, pattern: str, deadline: float, saves: list):
+        self.watch_root = watch_root
+        self.workspace = watch_root / f"os-{index % 3 + 1}-2024{index:05d}"
+        self.pattern = pattern
+        self.deadline = deadline
+        self.saves = saves
+        self.rng = random.Random(index)
+
+    def run(self):
+        getattr(self, f"_{self.pattern}")()
+
+    def _save(self, path: Path, content: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        self.saves.append((snapshot_key(self.watch_root, path), time.time()))
+
+    def _typing(self):
+        path = self.workspace / "hw1" / "main.c"
+        body = "int main() {\n"
+        while time.time() < self.deadline:
+            # 0.05~0.2초 간격으로 20타 정도 입력 후 잠시 멈춤
+            for _ in range(20):
+                body += self.rng.choice("abcdefghij;\n ")
+                self._save(path, body)
+                time.sleep(self.rng.uniform(0.05, 0.2))
+            time.sleep(self.rng.uniform(0.5, 2))
+
+    def _autosave(self):
+        paths = [self.workspace / "hw2" / "src" / f"module_{i}.py" for i in range(5)]
+        revision = 0
+        while time.time() < self.deadline:
+            revision += 1
+            for path in paths:
+                self._save(path, f"# revision {revision}\nprint({revision})\n")
+            time.sleep(1)
+
+    def _atomic(self):
+        path = self.workspace / "hw3" / "Main.java"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        revision = 0
+        while time.time() < self.deadline:
+            revision += 1
+            tmp_path = path.with_name(f".{path.name}.swp")
+            tmp_path.write_text(f"class Main {{ int v = {revision}; }}\n")
+            os.replace(tmp_path, path)
+            self.saves.append((snapshot_key(self.watch_root, path), time.time()))
+            time.sleep(self.rng.uniform(0.3, 1.5))
+
+    def _unzip(self):
+        archive = 0
+        while time.time() < self.deadline:
+            hw_dir = self.workspace / f"hw{4 + archive % 6}" / f"starter{archive}"
+            for i in range(30):
+                self._save(hw_dir / f"file_{i}.cpp", f"// starter {archive} file {i}\n")
+            archive += 1
+            time.sleep(self.rng.uniform(2, 4))
+
+
+def generate_workload(watch_root: str, students: int, pattern: str, duration: float, output: str):
+    """자식 프로세스 진입점. 학생별 스레드에서 편집을 재생하고 저장 시각을 output에 기록"""
+    root = Path(watch_root)
+    deadline = time.time() + duration
+    saves: list = []
+    threads = []
+    for index in range(students):
+        student_pattern = PATTERNS[index % len(PATTERNS)] if pattern == "mix" else pattern
+        student = Student(root, index, student_pattern, deadline, saves)
+        thread = threading.Thread(target=student.run)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    with open(output, "w") as f:
+        json.dump(saves, f)
+
+
+# --- 스텁 백엔드 ---
+
+class StubBackend:
+    """등록 요청을 받아 키별 수신 시각만 기록하는 로컬 API 서버"""
+
+    def __init__(self):
+        self.registrations = defaultdict(list)
+        self.count = 0
+
+    def _record(self, key: str):
+        self.registrations[key].append(time.time())
+        self.count += 1
+
+    async def register(self, request: web.Request) -> web.Response:
+        info = request.match_info
+        self._record(f"{info['class_div']}/{info['hw_name']}/{info['student_id']}/{info['filename']}")
+        return web.json_response({"ok": True})
+
+    async def register_bulk(self, request: web.Request) -> web.Response:
+        for item in await request.json():
+            self._record(f"{item['class_div']}/{item['hw_name']}/{item['student_id']}/{item['filename']}")
+        return web.json_response({"ok": True})
+
+    async def start(self) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_post("/api/snapshots/bulk", self.register_bulk)
+        app.router.add_post("/api/{class_div}/{hw_name}/{student_id}/{filename}/{timestamp}", self.register)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        return runner
+
+
+# --- 측정 ---
+
+def save_to_registration_latencies(saves, registrations) -> list:
+    """각 등록에 대해, 직전 등록 이후 마지막 저장부터 등록까지의 시간"""
+    saves_by_key = defaultdict(list)
+    for key, ts in saves:
+        saves_by_key[key].append(ts)
+
+    latencies = []
+    for key, registered in registrations.items():
+        key_saves = sorted(saves_by_key.get(key, ()))
+        previous = 0.0
+        for ts in sorted(registered):
+            lo = bisect.bisect_right(key_saves, previous)
+            hi = bisect.bisect_right(key_saves, ts)
+            if hi > lo:
+                latencies.append(ts - key_saves[hi - 1])
+            previous = ts
+    return sorted(latencies)
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def raw_event_count() -> float:
+    return sum(REGISTRY.get_sample_value("raw_events_total", {"type": t}) or 0 for t in ("modified", "deleted"))
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def main(args):
+    base = Path(tempfile.mkdtemp(prefix="filemon-bench-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None))
+    watch_root = base / "codes"
+    watch_root.mkdir()
+
+    backend = StubBackend()
+    runner = await backend.start()
+
+    # 앱 모듈이 생성 시점에 settings를 읽으므로 먼저 설정
+    from app.config.settings import settings
+    settings.WATCH_ROOT = watch_root
+    settings.SNAPSHOT_BASE = base / "snapshots"
+    settings.QUEUE_SPILL_DIR = base / "spill"
+    settings.API_SERVER = f"http://127.0.0.1:{backend.port}"
+    settings.PIPELINE_WORKERS = args.workers
+    settings.OUTBOX_ENABLED = False
+
+    from app.utils.logger import setup_logging
+    setup_logging(log_file_path=str(base / "logs"), log_level=args.log_level,
+                  max_bytes=settings.LOG_MAX_BYTES, backup_count=settings.LOG_BACKUP_COUNT)
+
+    from app.debouncer import Debouncer
+    from app.debounce_policy import create_policy
+    from app.pipeline import FilemonPipeline
+    from app.pruned_observer import PrunedObserver
+    from app.sender import SnapshotSender
+    from app.snapshot import SnapshotManager
+    from app.source_path_filter import PathFilter
+    from app.source_path_parser import SourcePathParser
+    from app.spill_queue import SpillQueue
+    from app.tasks import run_debouncer, run_pipeline_router, run_main_pipeline
+    from app.watchdog_handler import WatchdogHandler
+
+    loop = asyncio.get_running_loop()
+    path_filter = PathFilter()
+    executor = ThreadPoolExecutor(max_workers=settings.THREAD_POOL_WORKERS, thread_name_prefix="filemon")
+    raw_queue = SpillQueue("raw", settings.RAW_QUEUE_MAXSIZE, settings.QUEUE_SPILL_DIR)
+    processed_queue = SpillQueue("processed", settings.PROCESSED_QUEUE_MAXSIZE, settings.QUEUE_SPILL_DIR)
+    shard_queues = [asyncio.Queue(maxsize=settings.PIPELINE_SHARD_QUEUE_SIZE)
+                    for _ in range(settings.PIPELINE_WORKERS)] if settings.PIPELINE_WORKERS > 1 else []
+    snapshot_manager = SnapshotManager()
+    sender = SnapshotSender()
+    await sender.start()
+    pipeline = FilemonPipeline(executor=executor, snapshot_manager=snapshot_manager, snapshot_sender=sender,
+                               parser=SourcePathParser(), path_filter=path_filter,
+                               zero_copy=settings.SNAPSHOT_ZERO_COPY and snapshot_manager.supports_zero_copy)
+    debouncer = Debouncer(processed_queue=processed_queue, policy=create_policy(watch_root))
+
+    observer = PrunedObserver(path_filter.should_descend)
+    observer.schedule(WatchdogHandler(raw_queue=raw_queue, loop=loop, path_filter=path_filter),
+                      str(watch_root), recursive=True)
+    observer.start()
+
+    tasks = [asyncio.create_task(run_debouncer(debouncer, raw_queue))]
+    if shard_queues:
+        tasks.append(asyncio.create_task(run_pipeline_router(processed_queue, shard_queues)))
+        tasks += [asyncio.create_task(run_main_pipeline(q, pipeline)) for q in shard_queues]
+    else:
+        tasks.append(asyncio.create_task(run_main_pipeline(processed_queue, pipeline)))
+
+    saves_path = base / "saves.json"
+    generator = multiprocessing.get_context("spawn").Process(
+        target=generate_workload,
+        args=(str(watch_root), args.students, args.pattern, args.duration, str(saves_path)))
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.monotonic()
+    generator.start()
+    while generator.is_alive():
+        await asyncio.sleep(0.2)
+
+    # 디바운스 대기와 큐가 모두 비고 등록이 더 이상 늘지 않을 때까지 대기
+    idle_since, last_count = time.monotonic(), backend.count
+    while time.monotonic() - idle_since < settings.DEBOUNCE_MAX_WAIT + 1:
+        await asyncio.sleep(0.2)
+        busy = raw_queue.qsize() or processed_queue.qsize() or any(q.qsize() for q in shard_queues)
+        if busy or backend.count != last_count:
+            idle_since, last_count = time.monotonic(), backend.count
+    elapsed = time.monotonic() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    rss_mb = current_rss_mb()
+
+    observer.stop()
+    observer.join()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await debouncer.close()
+    await sender.close()
+    snapshot_manager.close()
+    executor.shutdown(wait=True)
+    raw_queue.close()
+    processed_queue.close()
+    await runner.cleanup()
+
+    with open(saves_path) as f:
+        saves = json.load(f)
+    latencies = save_to_registration_latencies(saves, backend.registrations)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    print(f"students={args.students} pattern={args.pattern} duration={args.duration}s workers={args.workers}")
+    print(f"saves:          {len(saves):,} ({len(saves) / elapsed:,.0f}/s)")
+    print(f"raw events:     {raw_event_count():,.0f} ({raw_event_count() / elapsed:,.0f}/s)")
+    print(f"registrations:  {backend.count:,} ({backend.count / elapsed:,.0f}/s)")
+    print(f"save->register: p50={percentile(latencies, 0.5) * 1000:,.0f}ms "
+          f"p99={percentile(latencies, 0.99) * 1000:,.0f}ms")
+    print(f"cpu:            {cpu:,.2f}s ({cpu / elapsed * 100:,.0f}% of one core)")
+    print(f"rss:            {rss_mb:,.1f}MB (peak {usage_after.ru_maxrss / 1024:,.1f}MB)")
+
+    if not args.keep:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filemon end-to-end benchmark")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--pattern", choices=PATTERNS + ("mix",), default="mix")
+    parser.add_argument("--duration", type=float, default=10, help="부하 생성 시간 (초)")
+    parser.add_argument("--workers", type=int, default=4, help="PIPELINE_WORKERS")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--keep", action="store_true", help="작업 디렉토리를 삭제하지 않음")
+    asyncio.run(main(parser.parse_args()))
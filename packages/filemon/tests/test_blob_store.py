@@ -0,0 +1,115 @@
+import errno
+import os
+import pytest
+from unittest.mock import patch
+
+from app.blob_store import BlobStore
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    """tmp_path 하위의 BlobStore 인스턴스 (GC 유예 시간 없음)"""
+    return BlobStore(tmp_path / ".blobs", gc_grace_seconds=0)
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    """스냅샷 디렉토리"""
+    path = tmp_path / "os-1" / "hw1" / "202012345" / "test.c"
+    path.mkdir(parents=True)
+    return path
+
+
+class TestBlobStore:
+    """BlobStore 테스트"""
+
+    def test_link_snapshot_first_write_stores_blob(self, blob_store, snapshot_dir):
+        """처음 저장하는 내용은 블롭을 만들고 스냅샷을 하드 링크로 생성"""
+        snapshot_path = snapshot_dir / "20240830_123456.c"
+
+        reused = blob_store.link_snapshot(b"int main() {}", snapshot_path)
+
+        assert reused is False
+        blob = blob_store.blob_path(BlobStore.digest(b"int main() {}"))
+        assert snapshot_path.read_bytes() == b"int main() {}"
+        assert os.path.samefile(blob, snapshot_path)
+        assert blob.stat().st_nlink == 2
+
+    def test_link_snapshot_duplicate_reuses_blob(self, blob_store, snapshot_dir):
+        """동일한 내용은 기존 블롭을 재사용"""
+        first = snapshot_dir / "20240830_123456.c"
+        second = snapshot_dir / "20240830_123457.c"
+
+        blob_store.link_snapshot(b"same", first)
+        reused = blob_store.link_snapshot(b"same", second)
+
+        assert reused is True
+        assert os.path.samefile(first, second)
+        assert blob_store.blob_path(BlobStore.digest(b"same")).stat().st_nlink == 3
+
+    def test_link_snapshot_different_content(self, blob_store, snapshot_dir):
+        """다른 내용은 서로 다른 블롭으로 저장"""
+        first = snapshot_dir / "20240830_123456.c"
+        second = snapshot_dir / "20240830_123457.c"
+
+        blob_store.link_snapshot(b"v1", first)
+        blob_store.link_snapshot(b"v2", second)
+
+        assert not os.path.samefile(first, second)
+        assert second.read_bytes() == b"v2"
+
+    def test_link_snapshot_fallback_when_link_unsupported(self, blob_store, snapshot_dir):
+        """하드 링크를 지원하지 않으면 일반 파일로 저장"""
+        snapshot_path = snapshot_dir / "20240830_123456.c"
+
+        with patch('app.blob_store.os.link', side_effect=PermissionError(1, "Operation not permitted")):
+            reused = blob_store.link_snapshot(b"data", snapshot_path)
+
+        assert reused is False
+        assert snapshot_path.read_bytes() == b"data"
+        assert snapshot_path.stat().st_nlink == 1
+
+    def test_fallback_does_not_truncate_shared_blob(self, blob_store, snapshot_dir, tmp_path):
+        """일반 파일로 대체 저장할 때 같은 경로의 기존 하드 링크(공유 블롭)를 덮어쓰지 않음"""
+        other = tmp_path / "other.c"
+        snapshot_path = snapshot_dir / "20240830_123456.c"
+        blob_store.link_snapshot(b"shared", other)
+        blob_store.link_snapshot(b"shared", snapshot_path)
+
+        with patch('app.blob_store.os.link', side_effect=OSError(errno.EMLINK, "Too many links")):
+            blob_store.link_snapshot(b"new", snapshot_path)
+
+        assert snapshot_path.read_bytes() == b"new"
+        assert other.read_bytes() == b"shared"
+        assert blob_store.blob_path(BlobStore.digest(b"shared")).read_bytes() == b"shared"
+
+    def test_collect_garbage_removes_unreferenced_blobs(self, blob_store, snapshot_dir):
+        """참조가 사라진 블롭만 GC로 삭제"""
+        kept = snapshot_dir / "20240830_123456.c"
+        dropped = snapshot_dir / "20240830_123457.c"
+        blob_store.link_snapshot(b"kept", kept)
+        blob_store.link_snapshot(b"dropped", dropped)
+        dropped.unlink()
+
+        removed = blob_store.collect_garbage()
+
+        assert removed == 1
+        assert blob_store.blob_path(BlobStore.digest(b"kept")).exists()
+        assert not blob_store.blob_path(BlobStore.digest(b"dropped")).exists()
+        assert kept.read_bytes() == b"kept"
+
+    def test_collect_garbage_respects_grace_period(self, tmp_path, snapshot_dir):
+        """유예 시간 이내에 생성된 블롭은 참조가 없어도 삭제하지 않음"""
+        store = BlobStore(tmp_path / ".blobs", gc_grace_seconds=3600)
+        snapshot_path = snapshot_dir / "20240830_123456.c"
+        store.link_snapshot(b"fresh", snapshot_path)
+        snapshot_path.unlink()
+
+        assert store.collect_garbage() == 0
+        assert store.blob_path(BlobStore.digest(b"fresh")).exists()
+
+    def test_collect_garbage_without_root(self, tmp_path):
+        """블롭 디렉토리가 없으면 아무것도 하지 않음"""
+        store = BlobStore(tmp_path / "missing")
+
+        assert store.collect_garbage() == 0
@@ -0,0 +1,152 @@
+import json
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.catchup_scan import CatchUpScanner
+from app.manifest import ManifestEntry, SnapshotManifest, content_digest
+from app.notebook import normalize_notebook
+from app.config.settings import settings
+from app.snapshot import SnapshotManager
+from app.source_path_filter import PathFilter
+from app.source_path_parser import SourcePathParser
+
+
+@pytest.fixture
+def roots(tmp_path, mocker):
+    """tmp_path 아래의 감시 루트와 스냅샷 루트 (file 저장 모드)"""
+    watch_root = tmp_path / "codes"
+    snapshot_base = tmp_path / "snapshots"
+    mocker.patch.object(settings, "WATCH_ROOT", watch_root)
+    mocker.patch.object(settings, "SNAPSHOT_BASE", snapshot_base)
+    mocker.patch.object(settings, "SNAPSHOT_STORAGE_MODE", "file")
+    mocker.patch.object(settings, "SNAPSHOT_DEDUP_ENABLED", False)
+    return watch_root, snapshot_base
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def write_source(watch_root, relative, content, mtime):
+    path = watch_root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def write_snapshot(snapshot_base, relative_dir, timestamp, suffix, content):
+    snapshot_dir = snapshot_base / relative_dir
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    (snapshot_dir / f"{timestamp}{suffix}").write_text(content)
+
+
+class FakeQueue:
+    def __init__(self):
+        self.events = []
+
+    def put_nowait(self, event):
+        self.events.append(event)
+
+
+@pytest.mark.asyncio
+async def test_enqueues_only_changed_files(roots, executor):
+    watch_root, snapshot_base = roots
+    captured = 1_700_000_000  # 2023-11-14 (로컬 시간 기준 스냅샷 타임스탬프와 비교)
+    timestamp = datetime.fromtimestamp(captured).strftime("%Y%m%d_%H%M%S")
+
+    # 스냅샷 이후 수정되지 않음
+    write_source(watch_root, "os-1-202012345/hw1/same.c", "same", captured - 10)
+    write_snapshot(snapshot_base, "os-1/hw1/202012345/same.c", timestamp, ".c", "same")
+    # 스냅샷 이후 수정되었지만 내용은 같음 (touch)
+    write_source(watch_root, "os-1-202012345/hw1/touched.c", "touched", captured + 60)
+    write_snapshot(snapshot_base, "os-1/hw1/202012345/touched.c", timestamp, ".c", "touched")
+    # 스냅샷 이후 내용이 바뀜
+    write_source(watch_root, "os-1-202012345/hw1/src/edited.c", "new body", captured + 60)
+    write_snapshot(snapshot_base, "os-1/hw1/202012345/src@edited.c", timestamp, ".c", "old body")
+    # 스냅샷이 없는 새 파일
+    write_source(watch_root, "os-1-202012345/hw2/new.py", "print(1)", captured + 60)
+    # 무시 대상
+    write_source(watch_root, "os-1-202012345/hw2/.venv/lib.py", "x = 1", captured + 60)
+
+    scanner = CatchUpScanner(watch_root, PathFilter(), SourcePathParser(), SnapshotManager(), executor,
+                             concurrency=2, rate=0)
+    queue = FakeQueue()
+    enqueued = await scanner.run(queue)
+
+    paths = sorted(os.path.relpath(e.src_path, watch_root) for e in queue.events)
+    assert paths == ["os-1-202012345/hw1/src/edited.c", "os-1-202012345/hw2/new.py"]
+    assert enqueued == 2
+    assert all(e.event_type == "modified" for e in queue.events)
+
+
+@pytest.mark.asyncio
+async def test_skips_files_larger_than_capture_limit(roots, executor):
+    watch_root, _ = roots
+    write_source(watch_root, "os-1-202012345/hw1/big.c", "x" * 100, 1_700_000_000)
+
+    scanner = CatchUpScanner(watch_root, PathFilter(), SourcePathParser(), SnapshotManager(), executor,
+                             rate=0, max_file_size=10)
+    queue = FakeQueue()
+
+    assert await scanner.run(queue) == 0
+    assert queue.events == []
+
+
+@pytest.mark.asyncio
+async def test_notebook_compares_normalized_content(roots, executor):
+    watch_root, snapshot_base = roots
+    captured = 1_700_000_000
+    timestamp = datetime.fromtimestamp(captured).strftime("%Y%m%d_%H%M%S")
+    notebook = {"cells": [{"cell_type": "code", "execution_count": 2, "metadata": {}, "source": "plot()",
+                           "outputs": [{"output_type": "display_data", "data": {"image/png": "A" * 1000}}]}],
+                "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+    path = write_source(watch_root, "os-1-202012345/hw1/plot.ipynb", json.dumps(notebook), captured + 60)
+    write_snapshot(snapshot_base, "os-1/hw1/202012345/plot.ipynb", timestamp, ".ipynb",
+                   normalize_notebook(path.read_bytes()).decode())
+
+    scanner = CatchUpScanner(watch_root, PathFilter(), SourcePathParser(), SnapshotManager(), executor,
+                             rate=0, max_file_size=100, notebook_max_file_size=1024 * 1024)
+
+    assert await scanner.run(FakeQueue()) == 0
+
+
+@pytest.mark.asyncio
+async def test_manifest_compares_digest_without_reading_snapshots(roots, executor, mocker):
+    watch_root, snapshot_base = roots
+    captured = 1_700_000_000
+    timestamp = datetime.fromtimestamp(captured).strftime("%Y%m%d_%H%M%S")
+    manifest = SnapshotManifest(snapshot_base / ".manifests")
+    for name, snapshot_content in (("touched.c", "touched"), ("edited.c", "old body")):
+        manifest.append("os-1", "hw1", "202012345",
+                        ManifestEntry(name, timestamp, len(snapshot_content),
+                                      content_digest(snapshot_content.encode()), "file"))
+    write_source(watch_root, "os-1-202012345/hw1/touched.c", "touched", captured + 60)
+    write_source(watch_root, "os-1-202012345/hw1/edited.c", "new body", captured + 60)
+
+    manager = SnapshotManager(manifest=manifest)
+    load_snapshot = mocker.spy(manager, "load_snapshot")
+    scanner = CatchUpScanner(watch_root, PathFilter(), SourcePathParser(), manager, executor, rate=0)
+    queue = FakeQueue()
+
+    assert await scanner.run(queue) == 1
+    assert [os.path.basename(e.src_path) for e in queue.events] == ["edited.c"]
+    load_snapshot.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_scans_only_given_student_dirs(roots, executor):
+    watch_root, _ = roots
+    write_source(watch_root, "os-1-202012345/hw1/a.c", "a", 1_700_000_000)
+    write_source(watch_root, "os-1-202099999/hw1/b.c", "b", 1_700_000_000)
+
+    scanner = CatchUpScanner(watch_root, PathFilter(), SourcePathParser(), SnapshotManager(), executor, rate=0)
+    queue = FakeQueue()
+
+    assert await scanner.run(queue, [str(watch_root / "os-1-202099999")]) == 1
+    assert [os.path.basename(e.src_path) for e in queue.events] == ["b.c"]
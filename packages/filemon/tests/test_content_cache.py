@@ -0,0 +1,45 @@
+from unittest.mock import Mock
+
+from app.content_cache import ContentHashCache, ContentFingerprint
+
+
+def fingerprint(data: bytes, mtime_ns: int = 1) -> ContentFingerprint:
+    """테스트용 지문 생성"""
+    return ContentFingerprint.from_data(Mock(st_mtime_ns=mtime_ns), data)
+
+
+class TestContentHashCache:
+    """ContentHashCache 테스트"""
+
+    def test_unknown_path_is_changed(self):
+        """기록이 없는 경로는 변경된 것으로 취급"""
+        cache = ContentHashCache()
+
+        assert cache.is_unchanged("/a.c", fingerprint(b"x")) is False
+
+    def test_same_content_different_mtime(self):
+        """mtime만 바뀌고 내용이 같으면 변경 없음"""
+        cache = ContentHashCache()
+        cache.remember("/a.c", fingerprint(b"x", mtime_ns=1))
+
+        assert cache.is_unchanged("/a.c", fingerprint(b"x", mtime_ns=2)) is True
+        assert cache.is_unchanged("/a.c", fingerprint(b"y", mtime_ns=2)) is False
+
+    def test_evicts_least_recently_used(self):
+        """최대 개수를 넘으면 가장 오래 사용하지 않은 경로부터 제거"""
+        cache = ContentHashCache(max_entries=2)
+        cache.remember("/a.c", fingerprint(b"a"))
+        cache.remember("/b.c", fingerprint(b"b"))
+        cache.is_unchanged("/a.c", fingerprint(b"a"))
+        cache.remember("/c.c", fingerprint(b"c"))
+
+        assert len(cache) == 2
+        assert cache.is_unchanged("/a.c", fingerprint(b"a")) is True
+        assert cache.is_unchanged("/b.c", fingerprint(b"b")) is False
+
+    def test_disabled_when_size_is_zero(self):
+        """max_entries가 0이면 아무것도 기록하지 않음"""
+        cache = ContentHashCache(max_entries=0)
+        cache.remember("/a.c", fingerprint(b"a"))
+
+        assert cache.is_unchanged("/a.c", fingerprint(b"a")) is False
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from app.debounce_policy import AdaptiveWindowPolicy
+
+WATCH_ROOT = Path("/watch")
+FILE = "/watch/os-1-202012345/hw1/main.c"
+
+
+def make_policy():
+    return AdaptiveWindowPolicy(WATCH_ROOT, base_window=0.6, base_max_wait=3.0,
+                                window_min=0.3, window_max=2.0, max_wait_max=10.0, max_keys=2)
+
+
+def replay(policy, key, gap, count, start=0.0):
+    result = None
+    for i in range(count):
+        result = policy.observe(key, start + i * gap)
+    return result
+
+
+def test_first_event_uses_base_window():
+    assert make_policy().observe(FILE, 0.0) == (0.6, 3.0)
+
+
+def test_frequent_saves_stretch_window_and_max_wait():
+    window, max_wait = replay(make_policy(), FILE, gap=1.0, count=10)
+
+    assert window == 1.5
+    assert max_wait == 7.5
+
+
+def test_bursts_stay_at_minimum_and_quiet_files_shrink():
+    policy = make_policy()
+
+    assert replay(policy, FILE, gap=0.05, count=10) == (0.3, 3.0)
+    assert replay(policy, FILE, gap=30.0, count=10, start=100.0) == (0.3, 3.0)
+
+
+def test_new_file_inherits_student_tempo():
+    policy = make_policy()
+    for i in range(10):
+        policy.observe(f"/watch/os-1-202012345/hw1/gen_{i}.c", i * 1.0)
+
+    assert policy.observe("/watch/os-1-202012345/hw1/new.c", 10.0)[0] == 1.5
+    assert policy.observe("/watch/os-1-202099999/hw1/new.c", 10.0)[0] == 0.6
+
+
+def test_tracked_keys_are_bounded():
+    policy = make_policy()
+    for i in range(5):
+        policy.observe(f"/watch/os-1-2020{i:05d}/hw1/main.c", float(i))
+
+    assert len(policy._keys) == 2
+    assert len(policy._students) == 2
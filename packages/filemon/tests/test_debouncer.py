@@ -168,3 +168,62 @@ async def test_independent_paths(mock_settings, debouncer, processed_queue):
     assert processed_queue.qsize() == 1
     result2 = await processed_queue.get()
     assert result2 == event_b
+
+
+@pytest.mark.asyncio
+async def test_bucket_keeps_only_latest_event(mock_settings, debouncer, processed_queue, mocker):
+    """버킷은 모든 이벤트가 아니라 마지막 이벤트와 개수만 보관"""
+    record = mocker.patch('app.debouncer.record_debounced_events')
+    events = [create_mock_event("modified", "/test/file.txt") for _ in range(5)]
+
+    for event in events:
+        await debouncer.process_event(event)
+
+    bucket = debouncer.buckets["/test/file.txt"]
+    assert bucket.event is events[-1]
+    assert bucket.count == 5
+
+    await asyncio.sleep(TEST_DEBOUNCE_WINDOW + 0.05)
+
+    assert processed_queue.qsize() == 1
+    assert await processed_queue.get() is events[-1]
+    record.assert_called_once_with(4)
+
+
+@pytest.mark.asyncio
+async def test_single_scheduler_for_many_keys(mock_settings, debouncer, processed_queue):
+    """여러 키를 하나의 스케줄러 태스크로 처리하고 키마다 힙 항목은 하나"""
+    tasks_before = len(asyncio.all_tasks())
+
+    for i in range(100):
+        for _ in range(3):
+            await debouncer.process_event(create_mock_event("modified", f"/test/file_{i}.txt"))
+    await asyncio.sleep(0)
+
+    assert len(asyncio.all_tasks()) == tasks_before + 1
+    assert len(debouncer._heap) == 100
+
+    await asyncio.sleep(TEST_DEBOUNCE_WINDOW + 0.05)
+
+    assert processed_queue.qsize() == 100
+    assert debouncer.buckets == {}
+    await debouncer.close()
+
+
+@pytest.mark.asyncio
+async def test_policy_sets_window_per_key(processed_queue):
+    """정책이 정한 키별 대기 시간으로 플러시"""
+    class Policy:
+        def observe(self, key, now):
+            return (0.05, 1.0) if key.endswith("fast.c") else (10.0, 20.0)
+
+    debouncer = Debouncer(processed_queue, policy=Policy())
+    await debouncer.process_event(create_mock_event("modified", "/test/fast.c"))
+    await debouncer.process_event(create_mock_event("modified", "/test/slow.c"))
+
+    await asyncio.sleep(0.1)
+
+    assert processed_queue.qsize() == 1
+    assert (await processed_queue.get()).src_path == "/test/fast.c"
+    assert set(debouncer.buckets) == {"/test/slow.c"}
+    await debouncer.close()
@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+from app.delta_store import DeltaStore, encode_delta, apply_delta, DELTA_SUFFIX
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    """파일별 스냅샷 디렉토리"""
+    path = tmp_path / "os-1" / "hw1" / "202012345" / "main.c"
+    path.mkdir(parents=True)
+    return path
+
+
+def make_source(lines: int, changed_line: int = -1) -> bytes:
+    """테스트용 C 소스 생성 (changed_line 위치의 한 줄만 다름)"""
+    body = []
+    for i in range(lines):
+        text = f"    printf(\"line {i}\\n\");\n"
+        if i == changed_line:
+            text = f"    printf(\"changed {i}\\n\");\n"
+        body.append(text)
+    return ("#include <stdio.h>\nint main() {\n" + "".join(body) + "}\n").encode()
+
+
+class TestDeltaCodec:
+    """차분 인코딩/디코딩 테스트"""
+
+    @pytest.mark.parametrize("base,new", [
+        (b"", b"hello\n"),
+        (b"a\nb\nc\n", b"a\nb\nc\n"),
+        (b"a\nb\nc\n", b"a\nX\nc\n"),
+        (b"a\nb\nc\n", b"c\n"),
+        (b"a\nb", b"a\nb\nnew line without newline"),
+        (b"\x00\x01binary\xff", b"\x00\x01binary\xfe\n"),
+    ])
+    def test_roundtrip(self, base, new):
+        """차분을 적용하면 새 버전이 정확히 복원됨"""
+        assert apply_delta(base, encode_delta(base, new)) == new
+
+    def test_small_edit_produces_small_delta(self):
+        """한 줄 수정의 차분은 전체 파일보다 훨씬 작음"""
+        base = make_source(500)
+        new = make_source(500, changed_line=250)
+
+        delta = encode_delta(base, new)
+
+        assert len(delta) < len(new) // 20
+
+    def test_apply_invalid_delta(self):
+        """잘못된 형식의 차분은 ValueError"""
+        with pytest.raises(ValueError):
+            apply_delta(b"base", b"not a delta")
+
+
+class TestDeltaStore:
+    """DeltaStore 테스트"""
+
+    def test_first_version_is_keyframe(self, snapshot_dir):
+        """첫 버전은 키프레임으로 저장"""
+        store = DeltaStore(keyframe_interval=5)
+
+        kind = store.write(snapshot_dir, "20240830_120000", ".c", make_source(100))
+
+        assert kind == "keyframe"
+        assert (snapshot_dir / "20240830_120000.c").read_bytes() == make_source(100)
+
+    def test_small_edits_are_stored_as_deltas(self, snapshot_dir):
+        """이후의 작은 수정은 차분으로 저장되고 모든 버전을 복원할 수 있음"""
+        store = DeltaStore(keyframe_interval=10)
+        versions = [make_source(200, changed_line=i) for i in range(4)]
+        kinds = [store.write(snapshot_dir, f"20240830_12000{i}", ".c", data)
+                 for i, data in enumerate(versions)]
+
+        assert kinds == ["keyframe", "delta", "delta", "delta"]
+        assert (snapshot_dir / f"20240830_120003.c{DELTA_SUFFIX}").exists()
+        for i, data in enumerate(versions):
+            assert store.read(snapshot_dir, f"20240830_12000{i}", ".c") == data
+
+    def test_keyframe_every_interval(self, snapshot_dir):
+        """keyframe_interval 버전마다 키프레임을 기록"""
+        store = DeltaStore(keyframe_interval=3)
+
+        kinds = [store.write(snapshot_dir, f"20240830_12000{i}", ".c", make_source(200, changed_line=i))
+                 for i in range(7)]
+
+        assert kinds == ["keyframe", "delta", "delta", "keyframe", "delta", "delta", "keyframe"]
+
+    def test_keyframe_when_delta_is_larger(self, snapshot_dir):
+        """차분이 전체 내용보다 크면 키프레임으로 저장"""
+        store = DeltaStore(keyframe_interval=10)
+        store.write(snapshot_dir, "20240830_120000", ".c", make_source(100))
+
+        kind = store.write(snapshot_dir, "20240830_120001", ".c", b"x")
+
+        assert kind == "keyframe"
+
+    def test_recovers_chain_state_from_disk(self, snapshot_dir):
+        """캐시가 없는 새 인스턴스도 디스크에서 직전 버전과 체인 길이를 복원"""
+        first = DeltaStore(keyframe_interval=3)
+        first.write(snapshot_dir, "20240830_120000", ".c", make_source(200, changed_line=0))
+        first.write(snapshot_dir, "20240830_120001", ".c", make_source(200, changed_line=1))
+
+        second = DeltaStore(keyframe_interval=3)
+        kinds = [second.write(snapshot_dir, f"20240830_12000{i}", ".c", make_source(200, changed_line=i))
+                 for i in (2, 3)]
+
+        assert kinds == ["delta", "keyframe"]
+        assert second.read(snapshot_dir, "20240830_120002", ".c") == make_source(200, changed_line=2)
+
+    def test_write_keyframe_resets_chain(self, snapshot_dir):
+        """빈 키프레임(삭제) 이후 버전은 다시 키프레임부터 시작"""
+        store = DeltaStore(keyframe_interval=10)
+        store.write(snapshot_dir, "20240830_120000", ".c", make_source(100))
+        store.write_keyframe(snapshot_dir, "20240830_120001", ".c", b"")
+
+        kind = store.write(snapshot_dir, "20240830_120002", ".c", make_source(100))
+
+        assert kind == "keyframe"
+        assert store.read(snapshot_dir, "20240830_120001", ".c") == b""
+
+    def test_same_second_write_replaces_version_with_keyframe(self, snapshot_dir):
+        """같은 초에 다시 저장하면 기존 차분을 키프레임으로 교체하고 이후 체인도 올바르게 복원"""
+        store = DeltaStore(keyframe_interval=10)
+        store.write(snapshot_dir, "20240830_120000", ".c", make_source(200, changed_line=0))
+        store.write(snapshot_dir, "20240830_120001", ".c", make_source(200, changed_line=1))
+
+        kind = store.write(snapshot_dir, "20240830_120001", ".c", make_source(200, changed_line=2))
+        store.write(snapshot_dir, "20240830_120002", ".c", make_source(200, changed_line=3))
+
+        assert kind == "keyframe"
+        assert not (snapshot_dir / f"20240830_120001.c{DELTA_SUFFIX}").exists()
+        assert store.read(snapshot_dir, "20240830_120000", ".c") == make_source(200, changed_line=0)
+        assert store.read(snapshot_dir, "20240830_120001", ".c") == make_source(200, changed_line=2)
+        assert store.read(snapshot_dir, "20240830_120002", ".c") == make_source(200, changed_line=3)
+
+    def test_interrupted_keyframe_write_keeps_previous_version(self, snapshot_dir, monkeypatch):
+        """키프레임을 쓰는 도중 중단되어도 기존 파일이 잘리지 않고 임시 파일도 남지 않음"""
+        store = DeltaStore(keyframe_interval=10)
+        store.write(snapshot_dir, "20240830_120000", ".c", make_source(100))
+
+        def crash(fd):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "fsync", crash)
+        with pytest.raises(OSError):
+            store.write_keyframe(snapshot_dir, "20240830_120000", ".c", b"")
+
+        assert os.listdir(snapshot_dir) == ["20240830_120000.c"]
+        assert DeltaStore().read(snapshot_dir, "20240830_120000", ".c") == make_source(100)
+
+    def test_read_missing_version(self, snapshot_dir):
+        """없는 타임스탬프는 FileNotFoundError"""
+        store = DeltaStore()
+
+        with pytest.raises(FileNotFoundError):
+            store.read(snapshot_dir, "20240830_120000", ".c")
+
+    def test_list_versions(self, snapshot_dir):
+        """버전 목록이 시간순으로 종류와 함께 반환됨"""
+        store = DeltaStore(keyframe_interval=10)
+        store.write(snapshot_dir, "20240830_120001", ".c", make_source(100, changed_line=1))
+        store.write(snapshot_dir, "20240830_120002", ".c", make_source(100, changed_line=2))
+
+        assert store.list_versions(snapshot_dir, ".c") == [
+            ("20240830_120001", "keyframe"),
+            ("20240830_120002", "delta"),
+        ]
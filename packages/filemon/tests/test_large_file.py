@@ -0,0 +1,29 @@
+import hashlib
+import os
+import pytest
+
+from app.large_file import read_excerpt
+
+
+def test_excerpt_keeps_head_tail_and_full_digest(tmp_path):
+    content = b"H" * 100 + os.urandom(10_000) + b"T" * 100
+    path = tmp_path / "big.log"
+    path.write_bytes(content)
+
+    excerpt = read_excerpt(str(path), excerpt_bytes=100, chunk_size=4096)
+
+    assert excerpt.size == len(content)
+    assert excerpt.digest == hashlib.blake2b(content, digest_size=16).digest()
+    assert excerpt.data.startswith(b"H" * 100)
+    assert excerpt.data.endswith(b"T" * 100)
+    assert b"10000 bytes omitted" in excerpt.data
+    assert excerpt.digest.hex().encode() in excerpt.data
+
+
+@pytest.mark.parametrize("size", [0, 50, 150, 200])
+def test_small_file_is_kept_whole(tmp_path, size):
+    content = os.urandom(size)
+    path = tmp_path / "small.bin"
+    path.write_bytes(content)
+
+    assert read_excerpt(str(path), excerpt_bytes=100, chunk_size=64).data == content
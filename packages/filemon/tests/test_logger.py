@@ -0,0 +1,42 @@
+import pytest
+import structlog
+
+from app.utils.logger import RateSampler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def log(sampler, method="info", event="이벤트 처리 완료"):
+    return sampler(None, method, {"event": event})
+
+
+def test_drops_info_over_rate_and_reports_count():
+    clock = FakeClock()
+    sampler = RateSampler(2, clock=clock)
+
+    assert log(sampler) and log(sampler)
+    for _ in range(3):
+        with pytest.raises(structlog.DropEvent):
+            log(sampler)
+    assert log(sampler, event="다른 메시지")
+
+    clock.now = 1.0
+    assert log(sampler)["sampled_out"] == 3
+    assert "sampled_out" not in log(sampler)
+
+
+def test_warnings_and_disabled_sampler_pass_through():
+    sampler = RateSampler(1, clock=FakeClock())
+    log(sampler)
+
+    for _ in range(5):
+        assert log(sampler, method="warning")
+    disabled = RateSampler(0)
+    for _ in range(5):
+        assert log(disabled)
@@ -0,0 +1,82 @@
+import pytest
+
+from app.manifest import CHECKPOINT_SUFFIX, LOG_SUFFIX, ManifestEntry, SnapshotManifest, content_digest
+
+
+STUDENT = ("os-1", "hw1", "202012345")
+
+
+def entry(filename, timestamp, data=b"x"):
+    return ManifestEntry(filename, timestamp, len(data), content_digest(data), "file")
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """작은 체크포인트 간격을 사용하는 SnapshotManifest"""
+    manifest = SnapshotManifest(tmp_path / ".manifests", checkpoint_every=4)
+    yield manifest
+    manifest.close()
+
+
+class TestSnapshotManifest:
+    """SnapshotManifest 테스트"""
+
+    def test_latest_and_history(self, manifest):
+        """파일별 최신 스냅샷과 기간 조회"""
+        for second in range(3):
+            manifest.append(*STUDENT, entry("main.c", f"20240830_12000{second}", b""))
+        manifest.append(*STUDENT, entry("util.c", "20240830_120001"))
+
+        assert manifest.latest(*STUDENT, "main.c").timestamp == "20240830_120002"
+        assert manifest.latest(*STUDENT, "missing.c") is None
+        assert [e.timestamp for e in manifest.history(*STUDENT, "main.c", start="20240830_120001")] == [
+            "20240830_120001", "20240830_120002"]
+        assert [e.timestamp for e in manifest.history(*STUDENT, "main.c", end="20240830_120001")] == [
+            "20240830_120000"]
+        assert manifest.files(*STUDENT) == ["main.c", "util.c"]
+
+    def test_out_of_order_and_duplicate_timestamps(self, manifest):
+        """늦게 기록된 과거 스냅샷은 순서대로 끼워 넣고, 같은 타임스탬프는 교체"""
+        manifest.append(*STUDENT, entry("main.c", "20240830_120005"))
+        manifest.append(*STUDENT, entry("main.c", "20240830_120001"))
+        manifest.append(*STUDENT, entry("main.c", "20240830_120005", b"new"))
+
+        history = manifest.history(*STUDENT, "main.c")
+        assert [e.timestamp for e in history] == ["20240830_120001", "20240830_120005"]
+        assert history[-1].size == 3
+
+    def test_remove_updates_latest(self, manifest):
+        """삭제 후 최신 스냅샷은 이전 스냅샷"""
+        manifest.append(*STUDENT, entry("main.c", "20240830_120000"))
+        manifest.append(*STUDENT, entry("main.c", "20240830_120001"))
+
+        assert manifest.remove(*STUDENT, "main.c", "20240830_120001")
+        assert not manifest.remove(*STUDENT, "main.c", "20240830_120001")
+        assert manifest.latest(*STUDENT, "main.c").timestamp == "20240830_120000"
+
+    def test_checkpoint_truncates_log_and_reloads(self, manifest, tmp_path):
+        """체크포인트 후 로그가 비워지고, 다시 열어도 같은 인덱스를 복원"""
+        for second in range(5):
+            manifest.append(*STUDENT, entry("main.c", f"20240830_12000{second}"))
+        manifest.remove(*STUDENT, "main.c", "20240830_120000")
+        manifest.close()
+
+        base = tmp_path / ".manifests" / "os-1" / "hw1"
+        assert len((base / f"202012345{CHECKPOINT_SUFFIX}").read_text().splitlines()) == 4
+        assert len((base / f"202012345{LOG_SUFFIX}").read_text().splitlines()) == 2
+
+        reopened = SnapshotManifest(tmp_path / ".manifests")
+        history = reopened.history(*STUDENT, "main.c")
+        assert [e.timestamp for e in history] == [f"20240830_12000{s}" for s in range(1, 5)]
+        assert history[0].digest == content_digest(b"x")
+
+    def test_truncated_last_line_is_ignored(self, manifest, tmp_path):
+        """비정상 종료로 잘린 마지막 레코드는 무시"""
+        manifest.append(*STUDENT, entry("main.c", "20240830_120000"))
+        manifest.close()
+        log_path = tmp_path / ".manifests" / "os-1" / "hw1" / f"202012345{LOG_SUFFIX}"
+        with open(log_path, "a") as f:
+            f.write('{"f":"main.c","t":"2024')
+
+        reopened = SnapshotManifest(tmp_path / ".manifests")
+        assert reopened.latest(*STUDENT, "main.c").timestamp == "20240830_120000"
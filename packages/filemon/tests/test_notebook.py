@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from app.notebook import normalize_notebook
+
+
+def make_notebook(source, execution_count=1, image="iVBORw0KGgo" * 10000):
+    return json.dumps({
+        "cells": [
+            {"cell_type": "markdown", "id": "a1", "metadata": {}, "source": ["# 과제 1\n"]},
+            {
+                "cell_type": "code", "id": "b2", "execution_count": execution_count,
+                "metadata": {"tags": ["solution"], "scrolled": True, "execution": {"iopub.execute_input": "2024-09-01T00:00:00Z"}},
+                "outputs": [{"output_type": "display_data", "data": {"image/png": image}, "metadata": {}}],
+                "source": source,
+            },
+        ],
+        "metadata": {"kernelspec": {"name": "python3"}, "widgets": {"state": {}}},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }).encode()
+
+
+def test_strips_outputs_and_volatile_metadata():
+    normalized = json.loads(normalize_notebook(make_notebook(["import numpy as np\n", "np.zeros(3)"])))
+
+    code = normalized["cells"][1]
+    assert code["source"] == "import numpy as np\nnp.zeros(3)"
+    assert code["outputs"] == [] and code["execution_count"] is None
+    assert code["metadata"] == {"tags": ["solution"]}
+    assert normalized["cells"][0]["source"] == "# 과제 1\n"
+    assert normalized["metadata"] == {"kernelspec": {"name": "python3"}}
+    assert normalized["nbformat_minor"] == 5
+
+
+def test_rerun_without_code_change_is_identical_and_small():
+    first = make_notebook("plot()", execution_count=1, image="AAAA" * 50000)
+    rerun = make_notebook(["plot()"], execution_count=7, image="BBBB" * 60000)
+
+    assert normalize_notebook(first) == normalize_notebook(rerun)
+    assert len(normalize_notebook(first)) * 100 < len(first)
+    assert normalize_notebook(first) != normalize_notebook(make_notebook("plot(x)"))
+
+
+@pytest.mark.parametrize("data", [b"{\"cells\": [", b"[]", b"{\"metadata\": {}}", b"\xff\xfe"])
+def test_rejects_non_notebooks(data):
+    with pytest.raises(ValueError):
+        normalize_notebook(data)
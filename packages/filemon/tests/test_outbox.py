@@ -0,0 +1,96 @@
+import pytest
+
+from app.outbox import SnapshotOutbox
+
+
+def payload(idx: int) -> dict:
+    return {
+        "class_div": "os-1",
+        "hw_name": "hw1",
+        "student_id": "202012345",
+        "filename": f"file{idx}.c",
+        "timestamp": "20240320_153000",
+        "bytes": idx,
+    }
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = SnapshotOutbox(tmp_path / "outbox.db", backoff_base=2, backoff_max=60)
+    yield outbox
+    outbox.close()
+
+
+class TestSnapshotOutbox:
+    """SnapshotOutbox 테스트"""
+
+    def test_add_and_due(self, outbox):
+        """저장한 항목은 backoff_base 이후 오래된 순서로 반환"""
+        outbox.add([payload(0), payload(1)], now=100)
+
+        assert outbox.due(10, now=101) == []
+        entries = outbox.due(10, now=102)
+        assert [e.payload for e in entries] == [payload(0), payload(1)]
+        assert [e.attempts for e in entries] == [0, 0]
+
+    def test_due_respects_limit(self, outbox):
+        """한 번에 limit개까지만 반환"""
+        outbox.add([payload(i) for i in range(5)], now=0)
+
+        assert len(outbox.due(2, now=10)) == 2
+
+    def test_remove(self, outbox):
+        """전송 성공한 항목 삭제"""
+        outbox.add([payload(0), payload(1)], now=0)
+        entries = outbox.due(1, now=10)
+
+        outbox.remove(entries)
+
+        assert outbox.pending() == 1
+        assert [e.payload for e in outbox.due(10, now=10)] == [payload(1)]
+
+    def test_reschedule_backs_off_exponentially(self, outbox, mocker):
+        """재시도마다 대기 시간이 두 배로 늘고 상한을 넘지 않음"""
+        mocker.patch('app.outbox.random.uniform', return_value=1.0)
+
+        assert [outbox.backoff_delay(n) for n in (1, 2, 3, 10)] == [4, 8, 16, 60]
+
+        outbox.add([payload(0)], now=0)
+        [entry] = outbox.due(10, now=2)
+        outbox.reschedule([entry], now=2)
+
+        assert outbox.due(10, now=5) == []
+        [retried] = outbox.due(10, now=6)
+        assert retried.attempts == 1
+
+    def test_reschedule_dead_letters_after_max_attempts(self, tmp_path):
+        """max_attempts번 실패한 항목은 재시도 대신 dead-letter로 이동"""
+        outbox = SnapshotOutbox(tmp_path / "outbox.db", backoff_base=0, max_attempts=2)
+        outbox.add([payload(0)], now=0)
+
+        assert outbox.reschedule(outbox.due(10, now=1), now=1) == 0
+        assert outbox.reschedule(outbox.due(10, now=2), now=2) == 1
+
+        assert outbox.pending() == 0
+        assert outbox.dead() == 1
+        outbox.close()
+
+    def test_dead_letter(self, outbox):
+        """거부된 항목은 즉시 dead-letter로 이동"""
+        outbox.add([payload(0), payload(1)], now=0)
+        first, second = outbox.due(10, now=10)
+
+        outbox.dead_letter([first], "rejected")
+
+        assert outbox.dead() == 1
+        assert [e.payload for e in outbox.due(10, now=10)] == [payload(1)]
+
+    def test_entries_survive_reopen(self, tmp_path):
+        """재시작 후에도 저장된 항목이 유지됨"""
+        first = SnapshotOutbox(tmp_path / "outbox.db")
+        first.add([payload(0)], now=0)
+        first.close()
+
+        second = SnapshotOutbox(tmp_path / "outbox.db")
+        assert [e.payload for e in second.due(10, now=10)] == [payload(0)]
+        second.close()
@@ -62,3 +62,26 @@ def test_should_process_processes_files(path_filter, mocker):
     """
     test_path = "/watcher/codes/class-1-202012345/hw1/test.c"
     assert path_filter.should_process(test_path) is True
+
+
+# 디렉토리 탐색 여부 테스트 케이스 (설명, 경로, 예상결과)
+descend_test_cases = [
+    ("WATCH_ROOT", "/watcher/codes", True),
+    ("학생 디렉토리", "/watcher/codes/class-1-202012345", True),
+    ("과제 디렉토리", "/watcher/codes/class-1-202012345/hw1", True),
+    ("최대 깊이 디렉토리", "/watcher/codes/class-1-202012345/hw1/a/b/c", True),
+    ("깊이 초과 디렉토리", "/watcher/codes/class-1-202012345/hw1/a/b/c/d", False),
+    ("가상환경", "/watcher/codes/class-1-202012345/hw1/.venv", False),
+    ("env 디렉토리", "/watcher/codes/class-1-202012345/hw1/env", False),
+    ("site-packages", "/watcher/codes/class-1-202012345/hw1/x/site-packages", False),
+    ("lib 디렉토리", "/watcher/codes/class-1-202012345/hw1/lib", False),
+    (".git 디렉토리", "/watcher/codes/class-1-202012345/.git", False),
+    ("과제 형식이 아닌 디렉토리", "/watcher/codes/class-1-202012345/project", False),
+    ("학생 형식이 아닌 디렉토리", "/watcher/codes/shared", False),
+    ("WATCH_ROOT 외부", "/another/path", False),
+]
+
+@pytest.mark.parametrize("description, path, expected", descend_test_cases, ids=[c[0] for c in descend_test_cases])
+def test_should_descend(path_filter, description, path, expected):
+    """하위에 처리 대상 파일이 있을 수 있는 디렉토리만 탐색하는지 테스트"""
+    assert path_filter.should_descend(path) == expected
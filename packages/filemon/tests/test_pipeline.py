@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import json
 import os
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
@@ -12,6 +13,7 @@ from app.source_path_filter import PathFilter
 from app.models.source_file_info import SourceFileInfo
 from app.snapshot import SnapshotManager
 from app.sender import SnapshotSender
+from app.zero_copy import CaptureResult
 
 
 @pytest.fixture
@@ -348,6 +350,116 @@ class TestFilemonPipeline:
             mock_file.close.assert_called_once()
 
 
+class TestFilemonPipelineNoop:
+    """변경 없는 수정 이벤트 필터 테스트"""
+
+    async def _modify(self, pipeline, event, data, mtime_ns=1):
+        """read_and_verify 결과를 data로 고정하여 수정 이벤트 처리"""
+        file_stat = Mock(st_size=len(data), st_mtime=mtime_ns / 1e9, st_mtime_ns=mtime_ns)
+
+        async def mock_future_result():
+            return (file_stat, data)
+
+        with patch('app.pipeline.os.path.getsize', return_value=len(data)), \
+             patch('app.pipeline.SourceFileInfo.from_parsed_data', return_value=Mock(filename='test.c')), \
+             patch('app.pipeline.asyncio.wrap_future', side_effect=lambda _: mock_future_result()):
+            await pipeline.process_event(event)
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_skipped(self, pipeline, mock_fs_event, mock_snapshot_manager, mock_snapshot_sender):
+        """내용이 같은 수정 이벤트는 mtime이 바뀌어도 스냅샷을 만들지 않음"""
+        await self._modify(pipeline, mock_fs_event, b'int main;', mtime_ns=1)
+        await self._modify(pipeline, mock_fs_event, b'int main;', mtime_ns=2)
+
+        mock_snapshot_manager.create_snapshot_with_data.assert_called_once()
+        mock_snapshot_sender.register_snapshot.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_changed_content_is_captured(self, pipeline, mock_fs_event, mock_snapshot_manager):
+        """내용이 바뀌면 스냅샷 생성"""
+        await self._modify(pipeline, mock_fs_event, b'int main;')
+        await self._modify(pipeline, mock_fs_event, b'int main();')
+
+        assert mock_snapshot_manager.create_snapshot_with_data.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_registration_is_not_remembered(self, pipeline, mock_fs_event, mock_snapshot_manager, mock_snapshot_sender):
+        """API 등록에 실패한 버전은 같은 내용이 다시 저장되면 재시도"""
+        mock_snapshot_sender.register_snapshot.return_value = False
+
+        await self._modify(pipeline, mock_fs_event, b'int main;')
+        await self._modify(pipeline, mock_fs_event, b'int main;')
+
+        assert mock_snapshot_manager.create_snapshot_with_data.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_deleted_event_resets_fingerprint(self, pipeline, mock_fs_event, mock_deleted_event, mock_snapshot_manager):
+        """삭제 후 같은 내용으로 다시 생성되면 스냅샷 생성"""
+        await self._modify(pipeline, mock_fs_event, b'int main;')
+        await pipeline.process_event(mock_deleted_event)
+        await self._modify(pipeline, mock_fs_event, b'int main;')
+
+        assert mock_snapshot_manager.create_snapshot_with_data.call_count == 2
+
+
+class TestFilemonPipelineZeroCopy:
+    """커널 내부 복사 캡처 경로 테스트"""
+
+    @pytest.fixture
+    def zero_copy_pipeline(self, mock_executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter):
+        mock_snapshot_manager.capture_file = AsyncMock()
+        mock_snapshot_manager.discard_snapshot = AsyncMock()
+        mock_snapshot_manager.commit_snapshot = AsyncMock()
+        return FilemonPipeline(mock_executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter,
+                               zero_copy=True)
+
+    async def _modify(self, pipeline, event, digest, size=9, mtime_ns=1):
+        file_stat = Mock(st_size=size, st_mtime_ns=mtime_ns)
+        captured_digest = digest if pipeline.snapshot_manager.capture_file.call_count == 0 else None
+        pipeline.snapshot_manager.capture_file.return_value = (Path('/snap/20240830_123456.c'),
+                                                              CaptureResult(file_stat, size, captured_digest))
+
+        async def hashed():
+            return CaptureResult(file_stat, size, digest)
+
+        with patch('app.pipeline.os.path.getsize', return_value=size), \
+             patch('app.pipeline.SourceFileInfo.from_parsed_data', return_value=Mock(filename='test.c')), \
+             patch('app.pipeline.asyncio.wrap_future', side_effect=lambda _: hashed()):
+            await pipeline.process_event(event)
+
+    @pytest.mark.asyncio
+    async def test_captures_without_reading_into_memory(self, zero_copy_pipeline, mock_fs_event, mock_snapshot_manager, mock_snapshot_sender):
+        """read_and_verify와 create_snapshot_with_data 대신 capture_file 사용"""
+        await self._modify(zero_copy_pipeline, mock_fs_event, b'digest-1', size=9)
+
+        mock_snapshot_manager.capture_file.assert_awaited_once()
+        mock_snapshot_manager.create_snapshot_with_data.assert_not_called()
+        zero_copy_pipeline.executor.submit.assert_not_called()
+        assert mock_snapshot_sender.register_snapshot.call_args.args[1] == 9
+
+    @pytest.mark.asyncio
+    async def test_identical_content_skips_copy(self, zero_copy_pipeline, mock_fs_event, mock_snapshot_manager, mock_snapshot_sender):
+        """이미 캡처한 경로는 원본을 먼저 해시하여 내용이 같으면 복사 자체를 하지 않음"""
+        await self._modify(zero_copy_pipeline, mock_fs_event, b'digest-1', mtime_ns=1)
+        await self._modify(zero_copy_pipeline, mock_fs_event, b'digest-1', mtime_ns=2)
+
+        zero_copy_pipeline.executor.submit.assert_called_once()
+        mock_snapshot_manager.capture_file.assert_awaited_once()
+        mock_snapshot_manager.discard_snapshot.assert_not_called()
+        mock_snapshot_manager.commit_snapshot.assert_awaited_once()
+        mock_snapshot_sender.register_snapshot.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_changed_content_reuses_source_digest(self, zero_copy_pipeline, mock_fs_event, mock_snapshot_manager, mock_snapshot_sender):
+        """내용이 바뀌면 복사 중 다시 해시하지 않고 먼저 계산한 해시로 확정"""
+        await self._modify(zero_copy_pipeline, mock_fs_event, b'digest-1', mtime_ns=1)
+        await self._modify(zero_copy_pipeline, mock_fs_event, b'digest-2', mtime_ns=2)
+
+        assert mock_snapshot_manager.capture_file.await_args_list[1].args[2] is False
+        assert mock_snapshot_manager.commit_snapshot.await_args.args[2].digest == b'digest-2'
+        assert mock_snapshot_sender.register_snapshot.call_count == 2
+
+
 class TestFilemonPipelineInit:
     """FilemonPipeline 초기화 테스트"""
 
@@ -362,4 +474,114 @@ class TestFilemonPipelineInit:
         assert pipeline.snapshot_sender == mock_snapshot_sender
         assert pipeline.parser == mock_parser
         assert pipeline.path_filter == mock_path_filter
-        assert pipeline.snapshot_sender is not None
\ No newline at end of file
+        assert pipeline.snapshot_sender is not None
+
+class TestFilemonPipelineNotebook:
+    """노트북 정규화 캡처 테스트"""
+
+    @pytest.fixture
+    def notebook_pipeline(self, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter):
+        executor = ThreadPoolExecutor(max_workers=1)
+        yield FilemonPipeline(executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter,
+                              zero_copy=True)
+        executor.shutdown()
+
+    def _write(self, path, source, image):
+        path.write_text(json.dumps({
+            "cells": [{"cell_type": "code", "execution_count": 3, "metadata": {}, "source": source,
+                       "outputs": [{"output_type": "display_data", "data": {"image/png": image}}]}],
+            "metadata": {}, "nbformat": 4, "nbformat_minor": 5,
+        }))
+
+    async def _modify(self, pipeline, path):
+        event = Mock(spec=FileSystemEvent, event_type="modified", src_path=str(path))
+        with patch('app.pipeline.SourceFileInfo.from_parsed_data', return_value=Mock(filename='plot.ipynb')):
+            await pipeline.process_event(event)
+
+    @pytest.mark.asyncio
+    async def test_large_notebook_is_captured_normalized(self, notebook_pipeline, tmp_path, mock_snapshot_manager, mock_snapshot_sender):
+        """출력 때문에 크기 제한을 넘는 노트북도 정규화 후 크기로 저장·등록"""
+        notebook = tmp_path / "plot.ipynb"
+        self._write(notebook, "plot()", "A" * 200_000)
+
+        await self._modify(notebook_pipeline, notebook)
+
+        data = mock_snapshot_manager.create_snapshot_with_data.call_args.args[1]
+        assert json.loads(data)["cells"][0]["outputs"] == []
+        assert mock_snapshot_sender.register_snapshot.call_args.args[1] == len(data)
+
+    @pytest.mark.asyncio
+    async def test_rerun_with_same_code_is_skipped(self, notebook_pipeline, tmp_path, mock_snapshot_manager, mock_snapshot_sender):
+        """출력만 바뀐 자동 저장은 스냅샷 생략"""
+        notebook = tmp_path / "plot.ipynb"
+        self._write(notebook, "plot()", "A" * 1000)
+        await self._modify(notebook_pipeline, notebook)
+        self._write(notebook, "plot()", "B" * 2000)
+        await self._modify(notebook_pipeline, notebook)
+
+        mock_snapshot_manager.create_snapshot_with_data.assert_called_once()
+        mock_snapshot_sender.register_snapshot.assert_called_once()
+
+
+class TestFilemonPipelineLargeFile:
+    """크기 제한을 넘는 파일의 스트리밍 캡처 테스트"""
+
+    @pytest.fixture
+    def executor(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        yield executor
+        executor.shutdown(wait=True)
+
+    def _pipeline(self, executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter, **kwargs):
+        mock_snapshot_manager.capture_file = AsyncMock()
+        mock_snapshot_manager.discard_snapshot = AsyncMock()
+        mock_snapshot_manager.commit_snapshot = AsyncMock()
+        return FilemonPipeline(executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter,
+                               large_file_excerpt_bytes=100, **kwargs)
+
+    async def _modify(self, pipeline, path):
+        event = Mock(spec=FileSystemEvent, event_type="modified", src_path=str(path))
+        with patch('app.pipeline.settings') as mock_settings, \
+             patch('app.pipeline.SourceFileInfo.from_parsed_data', return_value=Mock(filename='big.log')):
+            mock_settings.MAX_CAPTURABLE_FILE_SIZE = 1000
+            await pipeline.process_event(event)
+
+    @pytest.mark.asyncio
+    async def test_excerpt_registers_source_size(self, tmp_path, executor, mock_snapshot_manager, mock_snapshot_sender,
+                                                 mock_parser, mock_path_filter):
+        """발췌본만 저장하고 백엔드에는 원본 크기를 등록, 같은 내용은 다시 캡처하지 않음"""
+        path = tmp_path / "big.log"
+        path.write_bytes(b"x" * 5000)
+        pipeline = self._pipeline(executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter,
+                                  large_file_mode="excerpt")
+
+        await self._modify(pipeline, path)
+        os.utime(path, ns=(1, 1))
+        await self._modify(pipeline, path)
+
+        mock_snapshot_manager.create_snapshot_with_data.assert_awaited_once()
+        stored = mock_snapshot_manager.create_snapshot_with_data.await_args.args[1]
+        assert len(stored) < 1000
+        mock_snapshot_sender.register_snapshot.assert_called_once()
+        assert mock_snapshot_sender.register_snapshot.call_args.args[1] == 5000
+
+    @pytest.mark.asyncio
+    async def test_full_mode_copies_up_to_hard_limit(self, tmp_path, executor, mock_snapshot_manager, mock_snapshot_sender,
+                                                     mock_parser, mock_path_filter):
+        """full 모드는 상한 이하면 커널 복사, 초과하면 발췌본"""
+        pipeline = self._pipeline(executor, mock_snapshot_manager, mock_snapshot_sender, mock_parser, mock_path_filter,
+                                  large_file_mode="full", large_file_full_size=4000)
+        mock_snapshot_manager.capture_file.return_value = (Path('/snap/20240830_123456.log'),
+                                                           CaptureResult(Mock(st_mtime_ns=1), 3000, b'digest'))
+        small = tmp_path / "small.log"
+        small.write_bytes(b"y" * 3000)
+        big = tmp_path / "big.log"
+        big.write_bytes(b"z" * 5000)
+
+        await self._modify(pipeline, small)
+        await self._modify(pipeline, big)
+
+        mock_snapshot_manager.capture_file.assert_awaited_once()
+        mock_snapshot_manager.create_snapshot_with_data.assert_awaited_once()
+        sizes = [c.args[1] for c in mock_snapshot_sender.register_snapshot.call_args_list]
+        assert sizes == [3000, 5000]
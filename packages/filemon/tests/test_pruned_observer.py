@@ -0,0 +1,146 @@
+import inspect
+import os
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from app.source_path_filter import PathFilter
+from app.lazy_watch import LazyWatches
+from app.pruned_observer import PrunedInotify, PrunedObserver
+from watchdog.observers.inotify import InotifyEmitter
+from watchdog.observers.inotify_buffer import InotifyBuffer
+from watchdog.observers.inotify_c import Inotify
+
+
+@pytest.fixture
+def watch_root(tmp_path, mocker):
+    """가상환경, .git, 과제 구조 밖 디렉토리가 섞인 감시 트리"""
+    root = tmp_path / "codes"
+    hw_dir = root / "os-1-202012345" / "hw1"
+    (hw_dir / "src").mkdir(parents=True)
+    (hw_dir / ".venv" / "lib" / "site-packages").mkdir(parents=True)
+    (hw_dir / ".git" / "objects").mkdir(parents=True)
+    (root / "shared" / "data").mkdir(parents=True)
+    (root / "os-1-202012345" / "notes").mkdir()
+    mock_settings = MagicMock()
+    mock_settings.WATCH_ROOT = root
+    mocker.patch('app.source_path_filter.settings', mock_settings)
+    return root
+
+
+def watched_paths(inotify):
+    return sorted(os.path.relpath(os.fsdecode(p), inotify.path.decode()) for p in inotify._wd_for_path)
+
+
+def test_watchdog_internals_used_by_pruned_inotify_exist(watch_root):
+    """PrunedInotify가 재정의·사용하는 watchdog 내부 구현이 바뀌면 업그레이드 시 바로 실패"""
+    assert list(inspect.signature(Inotify._add_dir_watch).parameters) == ["self", "path", "mask", "recursive"]
+    assert list(inspect.signature(Inotify._add_watch).parameters) == ["self", "path", "mask"]
+    assert "_add_dir_watch" in inspect.getsource(Inotify.__init__)
+    assert "self._inotify = Inotify(" in inspect.getsource(InotifyBuffer.__init__)
+    assert callable(InotifyEmitter.get_event_mask_from_filter)
+
+    inotify = PrunedInotify(os.fsencode(watch_root), PathFilter().should_descend, recursive=True)
+    try:
+        for name in ("_wd_for_path", "_path_for_wd", "_lock", "_inotify_fd", "_event_mask"):
+            assert hasattr(inotify, name), name
+        assert isinstance(inotify._wd_for_path, dict)
+    finally:
+        inotify.close()
+
+
+def test_ignored_subtrees_are_not_watched(watch_root):
+    inotify = PrunedInotify(os.fsencode(watch_root), PathFilter().should_descend, recursive=True)
+    try:
+        assert watched_paths(inotify) == [
+            ".",
+            "os-1-202012345",
+            "os-1-202012345/hw1",
+            "os-1-202012345/hw1/src",
+        ]
+    finally:
+        inotify.close()
+
+
+def test_new_ignored_directory_is_not_watched(watch_root):
+    inotify = PrunedInotify(os.fsencode(watch_root), PathFilter().should_descend, recursive=True)
+    try:
+        hw_dir = watch_root / "os-1-202012345" / "hw1"
+        (hw_dir / "env").mkdir()
+        (hw_dir / "pkg").mkdir()
+        inotify.read_events()
+
+        paths = watched_paths(inotify)
+        assert "os-1-202012345/hw1/pkg" in paths
+        assert "os-1-202012345/hw1/env" not in paths
+    finally:
+        inotify.close()
+
+
+def test_observer_delivers_events_outside_pruned_subtrees(watch_root):
+    handler = MagicMock()
+    observer = PrunedObserver(PathFilter().should_descend)
+    observer.schedule(handler, str(watch_root), recursive=True)
+    observer.start()
+    try:
+        time.sleep(0.1)
+        (watch_root / "os-1-202012345" / "hw1" / "src" / "main.c").write_text("int main() {}")
+
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline and not handler.dispatch.called:
+            time.sleep(0.05)
+        paths = [call.args[0].src_path for call in handler.dispatch.call_args_list]
+        assert any(path.endswith("main.c") for path in paths)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lazy_mode_watches_workspaces_only_until_activity(watch_root):
+    attached = []
+    lazy = LazyWatches(idle_ttl=60, on_attach=attached.append)
+    inotify = PrunedInotify(os.fsencode(watch_root), PathFilter().should_descend, recursive=True, lazy=lazy)
+    try:
+        shallow = [".", "os-1-202012345", "os-1-202012345/hw1"]
+        assert watched_paths(inotify) == shallow
+
+        # 얕은 watch가 없는 깊은 디렉토리의 쓰기는 보이지 않음 (hybrid 모드의 스캐너가 activate)
+        (watch_root / "os-1-202012345" / "hw1" / "src" / "main.c").write_text("int main() {}")
+        inotify.read_events()
+        assert watched_paths(inotify) == shallow
+
+        # 과제 디렉토리 바로 아래 파일의 쓰기로 하위 watch 등록
+        (watch_root / "os-1-202012345" / "hw1" / "a.c").write_text("int a;")
+        inotify.read_events()
+        assert watched_paths(inotify) == shallow + ["os-1-202012345/hw1/src"]
+        assert attached == [str(watch_root / "os-1-202012345")]
+    finally:
+        inotify.close()
+
+
+def test_lazy_mode_releases_idle_workspaces(watch_root):
+    clock = FakeClock()
+    lazy = LazyWatches(idle_ttl=60, clock=clock)
+    inotify = PrunedInotify(os.fsencode(watch_root), PathFilter().should_descend, recursive=True, lazy=lazy)
+    try:
+        assert lazy.activate(str(watch_root / "os-1-202012345" / "hw1" / "src" / "main.c"))
+        assert not lazy.activate(str(watch_root / "shared" / "data" / "x.txt"))
+        assert len(watched_paths(inotify)) == 4
+
+        clock.now = 30
+        assert lazy.release_idle() == 0
+        clock.now = 61
+        assert lazy.release_idle() == 1
+        inotify.read_events()  # IN_IGNORED 처리로 경로 테이블 정리
+        assert watched_paths(inotify) == [".", "os-1-202012345", "os-1-202012345/hw1"]
+        assert lazy.attached_count == 0
+    finally:
+        inotify.close()
@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+from app.partition import WorkerPartition
+from app.retention import RetentionCompactor, RetentionPolicy, SnapshotFile
+
+NOW = datetime(2025, 5, 1, 12, 0, 0)
+
+
+def make_policy(deadlines=None):
+    return RetentionPolicy(keep_all=24 * 3600, recent_interval=300, closed_interval=3600, deadlines=deadlines)
+
+
+def snapshot(taken_at, size=10):
+    timestamp = taken_at.strftime("%Y%m%d_%H%M%S")
+    return SnapshotFile(timestamp, Path(f"/snap/{timestamp}.c"), size)
+
+
+def every_minute(start, count, size=10):
+    return [snapshot(start + timedelta(minutes=i), size) for i in range(count)]
+
+
+def kept(policy, snapshots, now=NOW):
+    thinned = {s.timestamp for s in policy.select_thinned("os-1", "hw1", snapshots, now)}
+    return [s for s in snapshots if s.timestamp not in thinned]
+
+
+def test_recent_snapshots_are_all_kept():
+    snapshots = every_minute(NOW - timedelta(hours=2), 60)
+
+    assert kept(make_policy(), snapshots) == snapshots
+
+
+def test_old_snapshots_keep_latest_per_interval():
+    snapshots = every_minute(datetime(2025, 4, 29, 10, 0), 15)
+
+    remaining = kept(make_policy(), snapshots)
+
+    assert [s.timestamp for s in remaining] == ["20250429_100400", "20250429_100900", "20250429_101400"]
+    # 다시 적용해도 더 지워지지 않음
+    assert kept(make_policy(), remaining) == remaining
+
+
+def test_empty_snapshot_is_never_thinned():
+    snapshots = every_minute(datetime(2025, 4, 29, 10, 0), 5)
+    snapshots[1] = snapshot(datetime(2025, 4, 29, 10, 1), size=0)
+
+    remaining = kept(make_policy(), snapshots)
+
+    assert [s.timestamp for s in remaining] == ["20250429_100100", "20250429_100400"]
+
+
+def test_closed_assignment_keeps_hourly_and_last_submission():
+    deadline = datetime(2025, 4, 29, 10, 32)
+    snapshots = every_minute(datetime(2025, 4, 29, 10, 0), 60)
+
+    remaining = kept(make_policy({"os-1/hw1": deadline}), snapshots)
+
+    assert [s.timestamp for s in remaining] == ["20250429_103200", "20250429_105900"]
+
+
+def test_compactor_reports_then_deletes(tmp_path):
+    file_dir = tmp_path / "os-1" / "hw1" / "202012345" / "src@main.c"
+    file_dir.mkdir(parents=True)
+    for s in every_minute(datetime(2025, 4, 29, 10, 0), 10):
+        (file_dir / f"{s.timestamp}.c").write_bytes(b"x" * 10)
+    (tmp_path / ".blobs").mkdir()
+    sender = AsyncMock()
+    sender.report_thinned_snapshots.side_effect = lambda items: [True] * len(items)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        compactor = RetentionCompactor(tmp_path, make_policy(), sender, executor, dirs_per_second=0)
+        thinned = asyncio.run(compactor.run_cycle(NOW))
+
+    assert thinned == 8
+    assert sorted(p.name for p in file_dir.iterdir()) == ["20250429_100400.c", "20250429_100900.c"]
+    items = sender.report_thinned_snapshots.await_args.args[0]
+    assert len(items) == 8
+    assert items[0]["student_id"] == "202012345"
+    assert items[0]["filename"] == "src@main.c"
+
+
+def test_compactor_keeps_files_when_report_fails(tmp_path):
+    file_dir = tmp_path / "os-1" / "hw1" / "202012345" / "main.c"
+    file_dir.mkdir(parents=True)
+    for s in every_minute(datetime(2025, 4, 29, 10, 0), 10):
+        (file_dir / f"{s.timestamp}.c").write_bytes(b"x")
+    sender = AsyncMock()
+    sender.report_thinned_snapshots.return_value = None
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        compactor = RetentionCompactor(tmp_path, make_policy(), sender, executor, dirs_per_second=0)
+        thinned = asyncio.run(compactor.run_cycle(NOW))
+
+    assert thinned == 0
+    assert len(list(file_dir.iterdir())) == 10
+
+
+def test_compactor_keeps_files_whose_rows_were_not_deleted(tmp_path):
+    file_dir = tmp_path / "os-1" / "hw1" / "202012345" / "main.c"
+    file_dir.mkdir(parents=True)
+    for s in every_minute(datetime(2025, 4, 29, 10, 0), 10):
+        (file_dir / f"{s.timestamp}.c").write_bytes(b"x")
+    sender = AsyncMock()
+    # 백엔드가 첫 항목의 행을 찾지 못함 (예: 파일 이름과 다른 타임스탬프로 등록된 행)
+    sender.report_thinned_snapshots.side_effect = lambda items: [False] + [True] * (len(items) - 1)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        compactor = RetentionCompactor(tmp_path, make_policy(), sender, executor, dirs_per_second=0)
+        thinned = asyncio.run(compactor.run_cycle(NOW))
+
+    items = sender.report_thinned_snapshots.await_args.args[0]
+    assert thinned == 7
+    assert (file_dir / f"{items[0]['timestamp']}.c").exists()
+    assert len(list(file_dir.iterdir())) == 3
+
+
+def test_compactor_skips_other_workers_students(tmp_path):
+    students = [f"2020{i:05d}" for i in range(8)]
+    for student_id in students:
+        file_dir = tmp_path / "os-1" / "hw1" / student_id / "main.c"
+        file_dir.mkdir(parents=True)
+        for s in every_minute(datetime(2025, 4, 29, 10, 0), 10):
+            (file_dir / f"{s.timestamp}.c").write_bytes(b"x")
+    partition = WorkerPartition(0, 2)
+    sender = AsyncMock()
+    sender.report_thinned_snapshots.side_effect = lambda items: [True] * len(items)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        compactor = RetentionCompactor(tmp_path, make_policy(), sender, executor,
+                                       partition=partition, dirs_per_second=0)
+        asyncio.run(compactor.run_cycle(NOW))
+
+    for student_id in students:
+        remaining = len(list((tmp_path / "os-1" / "hw1" / student_id / "main.c").iterdir()))
+        assert remaining == (2 if partition.owns(f"os-1-{student_id}") else 10)
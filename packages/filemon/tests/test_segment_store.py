@@ -0,0 +1,142 @@
+import pytest
+
+from app.segment_store import SegmentStore, INDEX_NAME
+from app.segment_export import main as export_main
+
+
+STUDENT = ("os-1", "hw1", "202012345")
+
+
+@pytest.fixture
+def store(tmp_path):
+    """작은 롤오버 크기를 사용하는 SegmentStore"""
+    store = SegmentStore(tmp_path / ".segments", max_segment_bytes=64)
+    yield store
+    store.close()
+
+
+class TestSegmentStore:
+    """SegmentStore 테스트"""
+
+    def test_append_and_read(self, store):
+        """추가한 스냅샷을 그대로 읽을 수 있음"""
+        store.append(*STUDENT, "main.c", "20240830_120000", b"v1")
+        store.append(*STUDENT, "main.c", "20240830_120001", b"version 2")
+
+        assert store.read(*STUDENT, "main.c", "20240830_120000") == b"v1"
+        assert store.read(*STUDENT, "main.c", "20240830_120001") == b"version 2"
+
+    def test_snapshots_share_one_segment_file(self, store, tmp_path):
+        """여러 스냅샷이 하나의 세그먼트 파일과 인덱스로 저장됨"""
+        for i in range(5):
+            store.append(*STUDENT, f"file{i}.c", "20240830_120000", b"x" * 10)
+
+        student_dir = tmp_path / ".segments" / "os-1" / "hw1" / "202012345"
+        assert sorted(p.name for p in student_dir.iterdir()) == [INDEX_NAME, "seg-000001.dat"]
+
+    def test_rollover_to_new_segment(self, store):
+        """세그먼트 크기 한도를 넘으면 새 세그먼트로 롤오버"""
+        first = store.append(*STUDENT, "main.c", "20240830_120000", b"a" * 40)
+        second = store.append(*STUDENT, "main.c", "20240830_120001", b"b" * 40)
+
+        assert (first.segment, first.offset) == (1, 0)
+        assert (second.segment, second.offset) == (2, 0)
+        assert store.read(*STUDENT, "main.c", "20240830_120001") == b"b" * 40
+
+    def test_read_missing_snapshot(self, store):
+        """없는 스냅샷은 FileNotFoundError"""
+        with pytest.raises(FileNotFoundError):
+            store.read(*STUDENT, "main.c", "20240830_120000")
+
+    def test_index_survives_reopen(self, tmp_path):
+        """새 인스턴스가 디스크의 인덱스로 스냅샷을 찾고 활성 세그먼트에 이어 씀"""
+        first = SegmentStore(tmp_path / ".segments", max_segment_bytes=1024)
+        first.append(*STUDENT, "main.c", "20240830_120000", b"one")
+        first.close()
+
+        second = SegmentStore(tmp_path / ".segments", max_segment_bytes=1024)
+        entry = second.append(*STUDENT, "main.c", "20240830_120001", b"two")
+
+        assert (entry.segment, entry.offset) == (1, 3)
+        assert [e.timestamp for e in second.list_entries(*STUDENT, "main.c")] == [
+            "20240830_120000", "20240830_120001"]
+        assert second.read(*STUDENT, "main.c", "20240830_120000") == b"one"
+        second.close()
+
+    def test_torn_index_line_is_ignored(self, store, tmp_path):
+        """비정상 종료로 잘린 인덱스 줄은 무시"""
+        store.append(*STUDENT, "main.c", "20240830_120000", b"ok")
+        store.close()
+        index = tmp_path / ".segments" / "os-1" / "hw1" / "202012345" / INDEX_NAME
+        with open(index, "a") as f:
+            f.write('{"f":"main.c","t":"2024')
+
+        reopened = SegmentStore(tmp_path / ".segments")
+        assert [e.timestamp for e in reopened.list_entries(*STUDENT)] == ["20240830_120000"]
+        reopened.close()
+
+    def test_delete_and_compact(self, store, tmp_path):
+        """삭제·덮어쓰기로 생긴 죽은 데이터를 압축으로 회수"""
+        store.append(*STUDENT, "main.c", "20240830_120000", b"a" * 30)
+        store.append(*STUDENT, "main.c", "20240830_120001", b"b" * 30)
+        store.append(*STUDENT, "main.c", "20240830_120002", b"c" * 30)
+        store.append(*STUDENT, "main.c", "20240830_120002", b"C" * 30)  # 같은 타임스탬프 덮어쓰기
+        assert store.delete(*STUDENT, "main.c", "20240830_120000") is True
+
+        assert store.compact(*STUDENT) is True
+
+        entries = store.list_entries(*STUDENT)
+        assert [e.timestamp for e in entries] == ["20240830_120001", "20240830_120002"]
+        assert store.read(*STUDENT, "main.c", "20240830_120002") == b"C" * 30
+        student_dir = tmp_path / ".segments" / "os-1" / "hw1" / "202012345"
+        segments = sorted(p.name for p in student_dir.glob("seg-*.dat"))
+        assert sum((student_dir / name).stat().st_size for name in segments) == 60
+
+        # 압축이 더 필요 없으면 아무것도 하지 않음
+        assert store.compact(*STUDENT) is False
+
+    def test_append_after_compaction(self, store):
+        """압축 후에도 이어 쓰기와 읽기가 정상 동작"""
+        store.append(*STUDENT, "main.c", "20240830_120000", b"a" * 10)
+        store.delete(*STUDENT, "main.c", "20240830_120000")
+        store.compact(*STUDENT)
+
+        store.append(*STUDENT, "main.c", "20240830_120001", b"new")
+
+        assert store.read(*STUDENT, "main.c", "20240830_120001") == b"new"
+
+    def test_open_logs_are_bounded(self, tmp_path):
+        """열린 로그 수가 open_logs를 넘지 않고, 닫힌 로그도 다시 쓸 수 있음"""
+        store = SegmentStore(tmp_path / ".segments", open_logs=2)
+        for student in ("1", "2", "3"):
+            store.append("os-1", "hw1", student, "main.c", "20240830_120000", student.encode())
+
+        assert len(store._logs) == 2
+        store.append("os-1", "hw1", "1", "main.c", "20240830_120001", b"again")
+        assert store.read("os-1", "hw1", "1", "main.c", "20240830_120000") == b"1"
+        store.close()
+
+    def test_log_in_use_is_not_evicted(self, tmp_path):
+        """다른 스레드가 사용 중인 로그는 LRU에서 내보내지 않아 같은 키에 로그 상태가 하나만 존재"""
+        store = SegmentStore(tmp_path / ".segments", open_logs=1)
+        with store._use_log("os-1", "hw1", "1") as in_use:
+            for student in ("2", "3"):
+                store.append("os-1", "hw1", student, "main.c", "20240830_120000", student.encode())
+            with store._use_log("os-1", "hw1", "1") as same:
+                assert same is in_use
+
+        store.append("os-1", "hw1", "4", "main.c", "20240830_120000", b"4")
+        assert list(store._logs) == [("os-1", "hw1", "4")]
+        store.close()
+
+    def test_export_to_directory_layout(self, store, tmp_path):
+        """기존 디렉토리 구조로 내보내기"""
+        store.append(*STUDENT, "src@main.c", "20240830_120000", b"int main;")
+        store.append("os-1", "hw2", "202099999", "a.py", "20240830_120001", b"print()")
+        store.close()
+
+        exported = export_main(["--source", str(tmp_path / ".segments"), "--output", str(tmp_path / "out")])
+
+        assert exported == 2
+        assert (tmp_path / "out/os-1/hw1/202012345/src@main.c/20240830_120000.c").read_bytes() == b"int main;"
+        assert (tmp_path / "out/os-1/hw2/202099999/a.py/20240830_120001.py").read_bytes() == b"print()"
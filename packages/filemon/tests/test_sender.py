@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import aiohttp
 from unittest.mock import AsyncMock, patch, MagicMock
@@ -5,6 +6,7 @@ from pathlib import Path
 
 from app.sender import SnapshotSender
 from app.models.source_file_info import SourceFileInfo
+from app.outbox import SnapshotOutbox
 
 
 class TestSnapshotSender:
@@ -28,104 +30,138 @@ class TestSnapshotSender:
         )
 
     def _create_mock_session(self, status_code=200, response_text='{"message": "success"}'):
-        """Mock aiohttp session 생성 헬퍼 함수"""
-        from unittest.mock import MagicMock
-        
+        """Mock aiohttp session 생성 헬퍼 함수 (장기 세션을 대체)"""
         # 일반 Mock을 사용하여 context manager 구현
         mock_response = MagicMock()
         mock_response.status = status_code
         mock_response.text = AsyncMock(return_value=response_text)
-        
-        # POST 요청의 context manager 
+
+        # POST 요청의 context manager
         mock_post_context = MagicMock()
         mock_post_context.__aenter__ = AsyncMock(return_value=mock_response)
         mock_post_context.__aexit__ = AsyncMock(return_value=None)
-        
+
         # Session mock
         mock_session = MagicMock()
+        mock_session.closed = False
         mock_session.post = MagicMock(return_value=mock_post_context)
-        
-        # ClientSession context manager
-        mock_session_context = MagicMock()
-        mock_session_context.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session_context.__aexit__ = AsyncMock(return_value=None)
-        
-        return mock_session_context, mock_session
+
+        return mock_session
 
     def test_init(self, sender):
         """SnapshotSender 초기화 테스트"""
         assert sender.base_url == "http://localhost:8080"
         assert sender.timeout.total == 20
+        assert sender.session is None
 
     @patch('app.sender.settings')
     def test_init_with_custom_settings(self, mock_settings):
         """커스텀 설정으로 초기화 테스트"""
         mock_settings.API_SERVER = "http://test-server:9000/"
         mock_settings.API_TIMEOUT_TOTAL = 30
-        
+
         sender = SnapshotSender()
-        
+
         assert sender.base_url == "http://test-server:9000"
         assert sender.timeout.total == 30
 
+    @pytest.mark.asyncio
+    async def test_start_creates_pooled_session(self, sender):
+        """start()가 커넥션 풀 설정이 적용된 장기 세션을 생성하는지 테스트"""
+        with patch('app.sender.settings') as mock_settings:
+            mock_settings.API_POOL_SIZE = 10
+            mock_settings.API_POOL_PER_HOST = 4
+            mock_settings.API_KEEPALIVE_TIMEOUT = 15
+            await sender.start()
+
+        try:
+            session = sender.session
+            assert session is not None
+            assert session.connector.limit == 10
+            assert session.connector.limit_per_host == 4
+
+            # 두 번째 start()는 기존 세션을 그대로 유지
+            await sender.start()
+            assert sender.session is session
+        finally:
+            await sender.close()
+
+        assert sender.session is None
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_session_reused_across_requests(self, sender, sample_source_file_info):
+        """여러 요청이 하나의 세션을 재사용하는지 테스트"""
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        with patch('aiohttp.ClientSession') as mock_client_session:
+            assert await sender.register_snapshot(sample_source_file_info, 1)
+            assert await sender.register_snapshot(sample_source_file_info, 2)
+
+            mock_client_session.assert_not_called()
+        assert mock_session.post.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_register_snapshot_lazily_starts_session(self, sender, sample_source_file_info):
+        """start() 없이 호출하면 세션을 지연 생성하는지 테스트"""
+        mock_session = self._create_mock_session()
+
+        async def fake_start():
+            sender.session = mock_session
+
+        with patch.object(sender, 'start', side_effect=fake_start) as mock_start:
+            result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is True
+        mock_start.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_register_snapshot_success(self, sender, sample_source_file_info):
         """API 요청 성공 테스트"""
-        mock_session_context, mock_session = self._create_mock_session()
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session_context):
-            result = await sender.register_snapshot(sample_source_file_info, 1024)
-            
-            assert result is True
-            mock_session.post.assert_called_once()
-            
-            # 호출된 URL과 데이터 검증 (student_id가 정수로 변환되어야 함)
-            call_args = mock_session.post.call_args
-            assert "/api/os-1/hw1/202012345/main@src@test.c/" in call_args[0][0]
-            assert call_args[1]["json"] == {"bytes": 1024}
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is True
+        mock_session.post.assert_called_once()
+
+        # 호출된 URL과 데이터 검증 (student_id가 정수로 변환되어야 함)
+        call_args = mock_session.post.call_args
+        assert "/api/os-1/hw1/202012345/main@src@test.c/" in call_args[0][0]
+        assert call_args[1]["json"] == {"bytes": 1024}
 
     @pytest.mark.asyncio
     async def test_register_snapshot_api_error(self, sender, sample_source_file_info):
         """API 요청 실패 테스트 (4xx/5xx 응답)"""
-        mock_response = AsyncMock()
-        mock_response.status = 404
-        mock_response.text = AsyncMock(return_value='{"error": "Not Found"}')
-        
-        mock_session = AsyncMock()
-        mock_session.post.return_value.__aenter__.return_value = mock_response
-        
-        with patch('aiohttp.ClientSession') as mock_client_session:
-            mock_client_session.return_value.__aenter__.return_value = mock_session
-            
-            result = await sender.register_snapshot(sample_source_file_info, 1024)
-            
-            assert result is False
+        sender.session = self._create_mock_session(status_code=404, response_text='{"error": "Not Found"}')
+
+        result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is False
 
     @pytest.mark.asyncio
     async def test_register_snapshot_client_error(self, sender, sample_source_file_info):
         """aiohttp.ClientError 발생 테스트"""
-        mock_session = AsyncMock()
+        mock_session = self._create_mock_session()
         mock_session.post.side_effect = aiohttp.ClientError("Connection error")
-        
-        with patch('aiohttp.ClientSession') as mock_client_session:
-            mock_client_session.return_value.__aenter__.return_value = mock_session
-            
-            result = await sender.register_snapshot(sample_source_file_info, 1024)
-            
-            assert result is False
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is False
 
     @pytest.mark.asyncio
     async def test_register_snapshot_unexpected_error(self, sender, sample_source_file_info):
         """예상치 못한 예외 발생 테스트"""
-        mock_session = AsyncMock()
+        mock_session = self._create_mock_session()
         mock_session.post.side_effect = Exception("Unexpected error")
-        
-        with patch('aiohttp.ClientSession') as mock_client_session:
-            mock_client_session.return_value.__aenter__.return_value = mock_session
-            
-            result = await sender.register_snapshot(sample_source_file_info, 1024)
-            
-            assert result is False
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is False
 
     @pytest.mark.asyncio
     async def test_register_snapshot_with_various_student_ids(self, sender):
@@ -136,23 +172,22 @@ class TestSnapshotSender:
             "12.34",      # 소수점 포함
             "123abc",     # 혼합
         ]
-        
+
         for student_id in test_cases:
             source_file_info = SourceFileInfo(
                 class_div="os-1",
-                hw_name="hw1", 
+                hw_name="hw1",
                 student_id=student_id,
                 filename="test.c",
                 target_file_path=Path("/test/path/test.c"),
                 timestamp="20240320_153000"
             )
-            
-            mock_session_context, mock_session = self._create_mock_session()
-            
-            with patch('aiohttp.ClientSession', return_value=mock_session_context):
-                result = await sender.register_snapshot(source_file_info, 1024)
-                # 클라이언트는 모든 student_id 형식을 허용하고, 백엔드가 검증함
-                assert result is True
+
+            sender.session = self._create_mock_session()
+
+            result = await sender.register_snapshot(source_file_info, 1024)
+            # 클라이언트는 모든 student_id 형식을 허용하고, 백엔드가 검증함
+            assert result is True
 
     @pytest.mark.asyncio
     async def test_register_snapshot_url_encoding(self, sender):
@@ -165,35 +200,35 @@ class TestSnapshotSender:
             target_file_path=Path("/test/path/file.c"),
             timestamp="20240320_153000"
         )
-        
-        mock_session_context, mock_session = self._create_mock_session()
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session_context):
-            result = await sender.register_snapshot(special_source_file_info, 512)
-            
-            assert result is True
-            
-            # URL에 파일명이 올바르게 포함되는지 확인
-            call_args = mock_session.post.call_args
-            assert "file@with@special.c" in call_args[0][0]
+
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(special_source_file_info, 512)
+
+        assert result is True
+
+        # URL에 파일명이 올바르게 포함되는지 확인
+        call_args = mock_session.post.call_args
+        assert "file@with@special.c" in call_args[0][0]
 
     @pytest.mark.asyncio
     async def test_register_snapshot_zero_file_size(self, sender, sample_source_file_info):
         """파일 크기가 0인 경우 테스트 (삭제 이벤트)"""
-        mock_session_context, mock_session = self._create_mock_session()
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session_context):
-            result = await sender.register_snapshot(sample_source_file_info, 0)
-            
-            assert result is True
-            
-            # 0 바이트가 올바르게 전송되는지 확인
-            call_args = mock_session.post.call_args
-            assert call_args[1]["json"] == {"bytes": 0}
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(sample_source_file_info, 0)
+
+        assert result is True
+
+        # 0 바이트가 올바르게 전송되는지 확인
+        call_args = mock_session.post.call_args
+        assert call_args[1]["json"] == {"bytes": 0}
 
     @pytest.mark.parametrize("student_id,expected_url_part", [
         ("202012345", "202012345"),
-        ("123456789", "123456789"), 
+        ("123456789", "123456789"),
         ("000012345", "000012345"),  # 문자열 그대로 유지
         ("0", "0"),
     ])
@@ -208,28 +243,300 @@ class TestSnapshotSender:
             target_file_path=Path("/test/path/test.c"),
             timestamp="20240320_153000"
         )
-        
-        mock_session_context, mock_session = self._create_mock_session()
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session_context):
-            result = await sender.register_snapshot(source_file_info, 1024)
-            
-            assert result is True
-            
-            # URL에 원본 student_id가 그대로 포함되는지 확인
-            call_args = mock_session.post.call_args
-            assert f"/api/os-1/hw1/{expected_url_part}/test.c/" in call_args[0][0]
+
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(source_file_info, 1024)
+
+        assert result is True
+
+        # URL에 원본 student_id가 그대로 포함되는지 확인
+        call_args = mock_session.post.call_args
+        assert f"/api/os-1/hw1/{expected_url_part}/test.c/" in call_args[0][0]
 
     @pytest.mark.asyncio
     async def test_timestamp_from_source_info(self, sender, sample_source_file_info):
         """SourceFileInfo의 타임스탬프 사용 테스트"""
-        mock_session_context, mock_session = self._create_mock_session()
-        
-        with patch('aiohttp.ClientSession', return_value=mock_session_context):
-            result = await sender.register_snapshot(sample_source_file_info, 1024)
-            
-            assert result is True
-            
-            # SourceFileInfo의 타임스탬프가 URL에 포함되는지 확인
-            call_args = mock_session.post.call_args
-            assert "20240320_153000" in call_args[0][0]
\ No newline at end of file
+        mock_session = self._create_mock_session()
+        sender.session = mock_session
+
+        result = await sender.register_snapshot(sample_source_file_info, 1024)
+
+        assert result is True
+
+        # SourceFileInfo의 타임스탬프가 URL에 포함되는지 확인
+        call_args = mock_session.post.call_args
+        assert "20240320_153000" in call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_update_pool_metrics_without_session(self, sender):
+        """세션이 없을 때 풀 메트릭이 0으로 설정되는지 테스트"""
+        with patch('app.sender.set_api_pool_connections') as mock_set:
+            sender.update_pool_metrics()
+
+        mock_set.assert_called_once_with(0, 0)
+
+
+class TestSnapshotSenderBatching:
+    """SnapshotSender 배치 모드 테스트"""
+
+    @pytest.fixture
+    def batch_settings(self, mocker):
+        """배치 모드 설정을 테스트용 값으로 대체"""
+        mocker.patch('app.sender.settings.API_BATCH_ENABLED', True)
+        mocker.patch('app.sender.settings.API_BATCH_MAX_SIZE', 3)
+        mocker.patch('app.sender.settings.API_BATCH_MAX_LINGER', 0.05)
+
+    @pytest.fixture
+    def sender(self, batch_settings):
+        """세션이 mock으로 대체된 배치 모드 SnapshotSender"""
+        sender = SnapshotSender()
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_post_context = MagicMock()
+        mock_post_context.__aenter__ = AsyncMock(return_value=mock_response)
+        mock_post_context.__aexit__ = AsyncMock(return_value=None)
+        sender.session = MagicMock()
+        sender.session.closed = False
+        sender.session.close = AsyncMock()
+        sender.session.post = MagicMock(return_value=mock_post_context)
+        return sender
+
+    def _make_info(self, idx):
+        return SourceFileInfo(
+            class_div="os-1",
+            hw_name="hw1",
+            student_id="202012345",
+            filename=f"file{idx}.c",
+            target_file_path=Path(f"/test/path/file{idx}.c"),
+            timestamp="20240320_153000"
+        )
+
+    @pytest.mark.asyncio
+    async def test_flush_when_batch_full(self, sender):
+        """배치가 가득 차면 대기 시간 없이 bulk API로 전송되는지 테스트"""
+        for idx in range(3):
+            assert await sender.register_snapshot(self._make_info(idx), idx) is True
+
+        await asyncio.sleep(0.01)
+
+        sender.session.post.assert_called_once()
+        call_args = sender.session.post.call_args
+        assert call_args[0][0] == "http://localhost:8080/api/snapshots/bulk"
+        payload = call_args[1]["json"]
+        assert [item["filename"] for item in payload] == ["file0.c", "file1.c", "file2.c"]
+        assert payload[1] == {
+            "class_div": "os-1",
+            "hw_name": "hw1",
+            "student_id": "202012345",
+            "filename": "file1.c",
+            "timestamp": "20240320_153000",
+            "bytes": 1,
+        }
+        await sender.close()
+
+    @pytest.mark.asyncio
+    async def test_flush_after_max_linger(self, sender):
+        """배치가 덜 찼더라도 최대 대기 시간이 지나면 전송되는지 테스트"""
+        await sender.register_snapshot(self._make_info(0), 10)
+
+        sender.session.post.assert_not_called()
+        await asyncio.sleep(0.1)
+
+        sender.session.post.assert_called_once()
+        assert len(sender.session.post.call_args[1]["json"]) == 1
+        await sender.close()
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_batch(self, sender):
+        """close() 시 남은 배치가 전송되는지 테스트"""
+        session = sender.session
+        await sender.register_snapshot(self._make_info(0), 10)
+        await sender.register_snapshot(self._make_info(1), 20)
+
+        await sender.close()
+
+        session.post.assert_called_once()
+        assert len(session.post.call_args[1]["json"]) == 2
+        session.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_register_snapshots_bulk_failure(self, sender):
+        """bulk API가 실패 응답을 주면 False를 반환하는지 테스트"""
+        response = sender.session.post.return_value.__aenter__.return_value
+        response.status = 500
+        response.text = AsyncMock(return_value="error")
+
+        result = await sender.register_snapshots_bulk([(self._make_info(0), 1)])
+
+        assert result is False
+
+    @pytest.mark.asyncio
+    async def test_report_thinned_returns_per_item_results(self, sender):
+        """솎아낸 스냅샷 보고 시 백엔드가 실제로 지운 항목만 True"""
+        response = sender.session.post.return_value.__aenter__.return_value
+        response.json = AsyncMock(return_value={"count": 1, "deleted": [True, False]})
+
+        result = await sender.report_thinned_snapshots([{"timestamp": "20240320_153000"},
+                                                        {"timestamp": "20240320_153001"}])
+
+        assert result == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_report_thinned_partial_count_without_items(self, sender):
+        """항목별 결과 없이 일부만 지웠다는 응답이면 어떤 파일도 지우지 않도록 모두 False"""
+        response = sender.session.post.return_value.__aenter__.return_value
+        response.json = AsyncMock(return_value={"count": 1})
+
+        result = await sender.report_thinned_snapshots([{"timestamp": "20240320_153000"},
+                                                        {"timestamp": "20240320_153001"}])
+
+        assert result == [False, False]
+
+    @pytest.mark.asyncio
+    async def test_report_thinned_failure(self, sender):
+        """보고가 실패하면 None"""
+        response = sender.session.post.return_value.__aenter__.return_value
+        response.status = 500
+        response.text = AsyncMock(return_value="error")
+
+        assert await sender.report_thinned_snapshots([{"timestamp": "20240320_153000"}]) is None
+
+
+class TestSnapshotSenderOutbox:
+    """SnapshotSender outbox 재전송 테스트"""
+
+    @pytest.fixture
+    def outbox(self, tmp_path):
+        outbox = SnapshotOutbox(tmp_path / "outbox.db", backoff_base=0)
+        yield outbox
+        outbox.close()
+
+    @pytest.fixture
+    def sender(self, outbox):
+        """세션이 mock으로 대체되고 outbox가 연결된 SnapshotSender"""
+        sender = SnapshotSender(outbox=outbox)
+        mock_response = MagicMock()
+        mock_response.status = 500
+        mock_response.text = AsyncMock(return_value="error")
+        mock_post_context = MagicMock()
+        mock_post_context.__aenter__ = AsyncMock(return_value=mock_response)
+        mock_post_context.__aexit__ = AsyncMock(return_value=None)
+        sender.session = MagicMock()
+        sender.session.closed = False
+        sender.session.post = MagicMock(return_value=mock_post_context)
+        return sender
+
+    @pytest.fixture
+    def sample_source_file_info(self):
+        return SourceFileInfo(
+            class_div="os-1",
+            hw_name="hw1",
+            student_id="202012345",
+            filename="main.c",
+            target_file_path=Path("/test/path/main.c"),
+            timestamp="20240320_153000"
+        )
+
+    def _set_status(self, sender, status):
+        sender.session.post.return_value.__aenter__.return_value.status = status
+
+    @pytest.mark.asyncio
+    async def test_failed_registration_is_stored(self, sender, outbox, sample_source_file_info):
+        """등록에 실패하면 bulk 항목 형식으로 outbox에 저장"""
+        result = await sender.register_snapshot(sample_source_file_info, 42)
+
+        assert result is False
+        [entry] = outbox.due(10)
+        assert entry.payload == {
+            "class_div": "os-1",
+            "hw_name": "hw1",
+            "student_id": "202012345",
+            "filename": "main.c",
+            "timestamp": "20240320_153000",
+            "bytes": 42,
+        }
+
+    @pytest.mark.asyncio
+    async def test_successful_registration_is_not_stored(self, sender, outbox, sample_source_file_info):
+        """등록에 성공하면 outbox에 저장하지 않음"""
+        self._set_status(sender, 200)
+
+        assert await sender.register_snapshot(sample_source_file_info, 42) is True
+        assert outbox.pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_delivers_via_bulk_api(self, sender, outbox, sample_source_file_info):
+        """재전송에 성공한 항목은 bulk API로 전송되고 outbox에서 삭제"""
+        await sender.register_snapshot(sample_source_file_info, 42)
+        self._set_status(sender, 200)
+
+        sent = await sender.replay_outbox()
+
+        assert sent == 1
+        assert outbox.pending() == 0
+        call_args = sender.session.post.call_args
+        assert call_args[0][0] == "http://localhost:8080/api/snapshots/bulk"
+        assert call_args[1]["json"][0]["bytes"] == 42
+
+    @pytest.mark.asyncio
+    async def test_replay_failure_reschedules(self, sender, outbox, sample_source_file_info):
+        """재전송에 실패한 항목은 남아 있고 시도 횟수가 증가"""
+        outbox.backoff_base = 60
+        outbox.add([SnapshotSender._bulk_item(sample_source_file_info, 42)], now=0)
+
+        assert await sender.replay_outbox() == 1
+
+        assert outbox.pending() == 1
+        assert outbox.due(10) == []
+
+    def _respond_by_payload(self, sender, status_for):
+        """요청 payload에 따라 응답 상태 코드를 정하는 mock 세션"""
+        def post(url, json):
+            response = MagicMock()
+            response.status = status_for(json)
+            response.text = AsyncMock(return_value="")
+            context = MagicMock()
+            context.__aenter__ = AsyncMock(return_value=response)
+            context.__aexit__ = AsyncMock(return_value=None)
+            return context
+        sender.session.post = MagicMock(side_effect=post)
+
+    @pytest.mark.asyncio
+    async def test_replay_isolates_rejected_item(self, sender, outbox, sample_source_file_info):
+        """bulk 요청이 거부되면 배치를 나눠 정상 항목은 등록하고 거부된 항목만 dead-letter로 이동"""
+        items = [SnapshotSender._bulk_item(sample_source_file_info, size) for size in range(5)]
+        outbox.add(items, now=0)
+        delivered = []
+
+        def status_for(payload):
+            if any(p["bytes"] == 3 for p in payload):
+                return 422
+            delivered.extend(p["bytes"] for p in payload)
+            return 200
+        self._respond_by_payload(sender, status_for)
+
+        assert await sender.replay_outbox() == 5
+
+        assert sorted(delivered) == [0, 1, 2, 4]
+        assert outbox.pending() == 0
+        assert outbox.dead() == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_does_not_split_when_unavailable(self, sender, outbox, sample_source_file_info):
+        """백엔드가 일시적으로 응답하지 못하면 배치를 나누지 않고 그대로 재시도 예약"""
+        outbox.backoff_base = 60
+        outbox.add([SnapshotSender._bulk_item(sample_source_file_info, size) for size in range(5)], now=0)
+        self._set_status(sender, 503)
+
+        assert await sender.replay_outbox() == 5
+
+        assert sender.session.post.call_count == 1
+        assert outbox.pending() == 5
+        assert outbox.dead() == 0
+
+    @pytest.mark.asyncio
+    async def test_replay_without_outbox(self, sample_source_file_info):
+        """outbox가 없으면 재전송할 것이 없음"""
+        assert await SnapshotSender().replay_outbox() == 0
@@ -1,8 +1,10 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
 
+from app.manifest import SnapshotManifest, content_digest
 from app.snapshot import SnapshotManager
 from app.models.source_file_info import SourceFileInfo
 
@@ -44,16 +46,14 @@ class TestSnapshotManager:
 
     @patch('pathlib.Path.mkdir')
     @patch('app.snapshot.aiofiles.open')
-    @patch('app.snapshot.datetime')
     @patch('app.snapshot.settings')
     @pytest.mark.asyncio
-    async def test_create_snapshot_with_data_success(self, mock_settings, mock_datetime, 
+    async def test_create_snapshot_with_data_success(self, mock_settings,
                                                     mock_aiofiles_open, mock_mkdir,
                                                     snapshot_manager, mock_source_info):
         """데이터로 스냅샷 생성 성공"""
         # Given
         mock_settings.SNAPSHOT_BASE = Path('/snapshots')
-        mock_datetime.now.return_value.strftime.return_value = '20240830_123456'
         
         mock_file = AsyncMock()
         mock_aiofiles_open.return_value.__aenter__.return_value = mock_file
@@ -71,16 +71,14 @@ class TestSnapshotManager:
 
     @patch('pathlib.Path.mkdir')
     @patch('app.snapshot.aiofiles.open')
-    @patch('app.snapshot.datetime')
     @patch('app.snapshot.settings')
     @pytest.mark.asyncio
-    async def test_create_snapshot_with_nested_path(self, mock_settings, mock_datetime,
+    async def test_create_snapshot_with_nested_path(self, mock_settings,
                                                    mock_aiofiles_open, mock_mkdir,
                                                    snapshot_manager, mock_nested_source_info):
         """중첩 경로에서 스냅샷 생성"""
         # Given
         mock_settings.SNAPSHOT_BASE = Path('/snapshots')
-        mock_datetime.now.return_value.strftime.return_value = '20240830_123456'
         
         mock_file = AsyncMock()
         mock_aiofiles_open.return_value.__aenter__.return_value = mock_file
@@ -98,16 +96,14 @@ class TestSnapshotManager:
 
     @patch('pathlib.Path.mkdir')
     @patch('app.snapshot.aiofiles.open')
-    @patch('app.snapshot.datetime')
     @patch('app.snapshot.settings')
     @pytest.mark.asyncio
-    async def test_create_empty_snapshot_with_info_success(self, mock_settings, 
-                                                          mock_datetime, mock_aiofiles_open, mock_mkdir,
+    async def test_create_empty_snapshot_with_info_success(self, mock_settings,
+                                                          mock_aiofiles_open, mock_mkdir,
                                                           snapshot_manager, mock_source_info):
         """빈 스냅샷 생성 성공""" 
         # Given
         mock_settings.SNAPSHOT_BASE = Path('/snapshots')
-        mock_datetime.now.return_value.strftime.return_value = '20240830_123456'
         
         mock_file = AsyncMock()
         mock_aiofiles_open.return_value.__aenter__.return_value = mock_file
@@ -205,3 +201,255 @@ class TestSnapshotManager:
         # When & Then
         with pytest.raises(ValueError, match="과제 디렉토리를 찾을 수 없음"):
             snapshot_manager._get_nested_path(mock_info)
+
+
+class TestSnapshotManagerDedup:
+    """중복 제거 모드 SnapshotManager 테스트"""
+
+    @pytest.fixture
+    def dedup_manager(self, tmp_path, mocker):
+        """실제 파일시스템을 사용하는 중복 제거 모드 SnapshotManager"""
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', True)
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path)
+        return SnapshotManager()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_snapshots_share_blob(self, dedup_manager, mock_source_info, mocker):
+        """동일한 내용의 스냅샷이 하나의 블롭을 공유하는지 확인"""
+        await dedup_manager.create_snapshot_with_data(mock_source_info, b'same content')
+        mock_source_info.timestamp = '20240830_123500'
+        await dedup_manager.create_snapshot_with_data(mock_source_info, b'same content')
+
+        first = dedup_manager._get_snapshot_path(mock_source_info, '20240830_123456')
+        second = dedup_manager._get_snapshot_path(mock_source_info, '20240830_123500')
+        assert first.read_bytes() == b'same content'
+        assert first.stat().st_ino == second.stat().st_ino
+
+    @pytest.mark.asyncio
+    async def test_empty_snapshot_keeps_shared_blob(self, dedup_manager, mock_source_info, mock_nested_source_info, mocker):
+        """같은 초의 삭제 스냅샷이 다른 학생과 공유하는 블롭을 비우지 않음"""
+        await dedup_manager.create_snapshot_with_data(mock_nested_source_info, b'starter')
+        await dedup_manager.create_snapshot_with_data(mock_source_info, b'starter')
+
+        await dedup_manager.create_empty_snapshot_with_info(mock_source_info)
+
+        assert dedup_manager._get_snapshot_path(mock_source_info, '20240830_123456').read_bytes() == b''
+        assert dedup_manager._get_snapshot_path(mock_nested_source_info, '20240830_123456').read_bytes() == b'starter'
+
+    @pytest.mark.asyncio
+    async def test_collect_garbage_disabled_without_dedup(self, snapshot_manager):
+        """중복 제거 모드가 아니면 GC는 아무것도 하지 않음"""
+        assert snapshot_manager.blob_store is None
+        assert await snapshot_manager.collect_garbage() == 0
+
+
+class TestSnapshotManagerDelta:
+    """delta 저장 모드 SnapshotManager 테스트"""
+
+    @pytest.fixture
+    def delta_manager(self, tmp_path, mocker):
+        """실제 파일시스템을 사용하는 delta 모드 SnapshotManager"""
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', 'delta')
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path)
+        return SnapshotManager()
+
+    @pytest.mark.asyncio
+    async def test_snapshots_readable_after_delta_write(self, delta_manager, mock_source_info, mocker):
+        """차분으로 저장된 스냅샷도 read_snapshot으로 원본 내용이 복원되는지 확인"""
+        timestamps = ['20240830_120000', '20240830_120001', '20240830_120002']
+        base = b''.join(f'int line{i};\n'.encode() for i in range(100))
+        versions = [base, base + b'int added;\n', base.replace(b'line50', b'edit50')]
+
+        for timestamp, data in zip(timestamps, versions):
+            mock_source_info.timestamp = timestamp
+            await delta_manager.create_snapshot_with_data(mock_source_info, data)
+
+        snapshot_dir = delta_manager._get_snapshot_path(mock_source_info, timestamps[0]).parent
+        assert sorted(p.name for p in snapshot_dir.iterdir()) == [
+            '20240830_120000.c', '20240830_120001.c.delta', '20240830_120002.c.delta']
+        for timestamp, data in zip(timestamps, versions):
+            assert await delta_manager.read_snapshot(mock_source_info, timestamp) == data
+
+    @pytest.mark.asyncio
+    async def test_empty_snapshot_is_keyframe(self, delta_manager, mock_source_info, mocker):
+        """삭제 이벤트의 빈 스냅샷은 빈 키프레임으로 저장되는지 확인"""
+        mock_source_info.timestamp = '20240830_120000'
+
+        await delta_manager.create_empty_snapshot_with_info(mock_source_info)
+
+        assert await delta_manager.read_snapshot(mock_source_info, '20240830_120000') == b''
+
+
+class TestSnapshotManagerSegment:
+    """segment 저장 모드 SnapshotManager 테스트"""
+
+    @pytest.fixture
+    def segment_manager(self, tmp_path, mocker):
+        """실제 파일시스템을 사용하는 segment 모드 SnapshotManager"""
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', 'segment')
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path)
+        manager = SnapshotManager()
+        yield manager
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshots_appended_to_segment(self, segment_manager, mock_nested_source_info, tmp_path, mocker):
+        """스냅샷이 개별 파일 없이 세그먼트에 기록되고 읽을 수 있는지 확인"""
+        mock_nested_source_info.timestamp = '20240830_120000'
+        await segment_manager.create_snapshot_with_data(mock_nested_source_info, b'class Main {}')
+        mock_nested_source_info.timestamp = '20240830_120001'
+        await segment_manager.create_empty_snapshot_with_info(mock_nested_source_info)
+
+        assert not (tmp_path / 'java-2').exists()
+        entries = segment_manager.segment_store.list_entries('java-2', 'hw2', '202098765')
+        assert [(e.filename, e.timestamp) for e in entries] == [
+            ('src@main@Main.java', '20240830_120000'), ('src@main@Main.java', '20240830_120001')]
+        assert await segment_manager.read_snapshot(mock_nested_source_info, '20240830_120000') == b'class Main {}'
+        assert await segment_manager.read_snapshot(mock_nested_source_info, '20240830_120001') == b''
+
+
+class TestSnapshotManagerZeroCopy:
+    """capture_file (커널 내부 복사) 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_capture_file_writes_snapshot(self, tmp_path, mocker):
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path / "snapshots")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', "file")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', False)
+        source = tmp_path / "codes" / "os-1-202012345" / "hw1" / "test.c"
+        source.parent.mkdir(parents=True)
+        source.write_bytes(b"int main() {}")
+        info = SourceFileInfo('os-1', 'hw1', '202012345', 'test.c', source, '20240830_123456')
+        manager = SnapshotManager()
+
+        pending, result = await manager.capture_file(info, str(source), with_digest=True)
+
+        assert manager.supports_zero_copy
+        assert pending.snapshot_path.parent == tmp_path / "snapshots" / "os-1" / "hw1" / "202012345" / "test.c"
+        assert not pending.snapshot_path.exists()
+        assert result.size == 13
+        await manager.commit_snapshot(info, pending, result)
+        assert pending.snapshot_path.read_bytes() == b"int main() {}"
+        assert list(pending.snapshot_path.parent.iterdir()) == [pending.snapshot_path]
+
+    @pytest.mark.asyncio
+    async def test_discard_in_same_second_keeps_committed_snapshot(self, tmp_path, mocker):
+        """같은 초의 두 번째 캡처를 폐기해도 이미 등록된 스냅샷은 남음"""
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path / "snapshots")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', "file")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', False)
+        source = tmp_path / "codes" / "os-1-202012345" / "hw1" / "test.c"
+        source.parent.mkdir(parents=True)
+        source.write_bytes(b"int main() {}")
+        info = SourceFileInfo('os-1', 'hw1', '202012345', 'test.c', source, '20240830_123456')
+        manager = SnapshotManager()
+
+        first, result = await manager.capture_file(info, str(source), with_digest=True)
+        await manager.commit_snapshot(info, first, result)
+        second, _ = await manager.capture_file(info, str(source), with_digest=True)
+        await manager.discard_snapshot(second)
+
+        assert second.snapshot_path == first.snapshot_path
+        assert first.snapshot_path.read_bytes() == b"int main() {}"
+        assert list(first.snapshot_path.parent.iterdir()) == [first.snapshot_path]
+
+
+class TestSnapshotManagerDirectoryCache:
+    """스냅샷 디렉토리 캐시 테스트"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, mocker):
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path / "snapshots")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', "file")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', False)
+        return SnapshotManager()
+
+    @pytest.mark.asyncio
+    async def test_known_directory_skips_mkdir(self, manager, mock_source_info, mocker):
+        await manager.create_snapshot_with_data(mock_source_info, b"int main() {}")
+
+        mkdir = mocker.patch('pathlib.Path.mkdir')
+        mock_source_info.timestamp = '20240830_123457'
+        await manager.create_snapshot_with_data(mock_source_info, b"int main() {}")
+
+        mkdir.assert_not_called()
+        snapshot_dir = manager._get_snapshot_path(mock_source_info, '20240830_123456').parent
+        assert sorted(p.name for p in snapshot_dir.iterdir()) == ['20240830_123456.c', '20240830_123457.c']
+
+    @pytest.mark.asyncio
+    async def test_removed_directory_is_recreated(self, manager, mock_source_info):
+        await manager.create_snapshot_with_data(mock_source_info, b"v1")
+        snapshot_dir = manager._get_snapshot_path(mock_source_info, '20240830_123456').parent
+        for path in snapshot_dir.iterdir():
+            path.unlink()
+        snapshot_dir.rmdir()
+
+        await manager.create_empty_snapshot_with_info(mock_source_info)
+
+        assert len(list(snapshot_dir.iterdir())) == 1
+        assert snapshot_dir in manager.dir_cache
+
+
+class TestSnapshotManagerManifest:
+    """스냅샷 매니페스트 기록 테스트"""
+
+    @pytest.fixture
+    def manager(self, tmp_path, mocker):
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path / "snapshots")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', "file")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', False)
+        manager = SnapshotManager(manifest=SnapshotManifest(tmp_path / "snapshots" / ".manifests"))
+        yield manager
+        manager.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshots_recorded_in_manifest(self, manager, mock_nested_source_info, mocker):
+        mock_nested_source_info.timestamp = '20240830_120000'
+        await manager.create_snapshot_with_data(mock_nested_source_info, b"class Main {}")
+        mock_nested_source_info.timestamp = '20240830_120001'
+        await manager.create_empty_snapshot_with_info(mock_nested_source_info)
+
+        history = manager.manifest.history('java-2', 'hw2', '202098765', 'src@main@Main.java')
+        assert [(e.timestamp, e.size, e.storage) for e in history] == [
+            ('20240830_120000', 13, 'file'), ('20240830_120001', 0, 'file')]
+        assert history[0].digest == content_digest(b"class Main {}")
+        assert manager.latest_snapshot_timestamp(mock_nested_source_info) == '20240830_120001'
+
+    @pytest.mark.asyncio
+    async def test_capture_recorded_in_manifest_on_commit(self, manager, tmp_path):
+        source = tmp_path / "codes" / "os-1-202012345" / "hw1" / "test.c"
+        source.parent.mkdir(parents=True)
+        source.write_bytes(b"int main() {}")
+        info = SourceFileInfo('os-1', 'hw1', '202012345', 'test.c', source, '20240830_123456')
+
+        pending, result = await manager.capture_file(info, str(source))
+        assert manager.latest_manifest_entry(info) is None
+
+        await manager.commit_snapshot(info, pending, result)
+        entry = manager.latest_manifest_entry(info)
+        assert entry.timestamp == pending.timestamp
+        assert entry.digest == result.digest.hex() == content_digest(b"int main() {}")
+
+    @pytest.mark.asyncio
+    async def test_file_io_runs_on_given_executor(self, tmp_path, mocker):
+        mocker.patch('app.snapshot.settings.SNAPSHOT_BASE', tmp_path / "snapshots")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_STORAGE_MODE', "file")
+        mocker.patch('app.snapshot.settings.SNAPSHOT_DEDUP_ENABLED', False)
+        source = tmp_path / "codes" / "os-1-202012345" / "hw1" / "test.c"
+        source.parent.mkdir(parents=True)
+        source.write_bytes(b"int main() {}")
+        info = SourceFileInfo('os-1', 'hw1', '202012345', 'test.c', source, '20240830_123456')
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="filemon") as executor:
+            submit = mocker.spy(executor, 'submit')
+            manager = SnapshotManager(manifest=SnapshotManifest(tmp_path / "snapshots" / ".manifests"),
+                                      executor=executor)
+            try:
+                pending, result = await manager.capture_file(info, str(source))
+                await manager.commit_snapshot(info, pending, result)
+                assert manager.latest_manifest_entry(info).timestamp == pending.timestamp
+            finally:
+                manager.close()
+
+        # 디렉토리 생성, 복사, 교체, 매니페스트 기록 모두 주입한 스레드 풀에서 실행
+        assert submit.call_count == 4
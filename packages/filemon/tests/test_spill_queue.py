@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from watchdog.events import FileModifiedEvent, FileDeletedEvent, FileMovedEvent
+
+from app.spill_queue import SpillQueue, recover_orphaned_spills, encode_event, decode_event
+
+
+def modified(i: int) -> FileModifiedEvent:
+    return FileModifiedEvent(f"/codes/os-1-202012345/hw1/file_{i}.c")
+
+
+async def drain(queue: SpillQueue) -> list:
+    """큐의 모든 이벤트를 순서대로 꺼냄"""
+    return [await queue.get() for _ in range(queue.qsize())]
+
+
+class TestEventCodec:
+    """스필 레코드 직렬화 테스트"""
+
+    @pytest.mark.parametrize("event", [
+        FileModifiedEvent("/codes/a.c"),
+        FileDeletedEvent("/codes/a.c"),
+        FileMovedEvent("/codes/a.c", "/codes/b.c"),
+        FileModifiedEvent("/codes/\udcff.c"),
+    ])
+    def test_roundtrip(self, event):
+        """직렬화 후 복원한 이벤트가 원래 이벤트와 같음"""
+        assert decode_event(encode_event(event)) == event
+
+
+class TestSpillQueue:
+    """SpillQueue 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_under_limit_stays_in_memory(self, tmp_path):
+        """maxsize 이하에서는 스필 파일을 만들지 않음"""
+        queue = SpillQueue("raw", 10, tmp_path)
+        for i in range(10):
+            queue.put_nowait(modified(i))
+
+        assert queue.spilled == 0
+        assert not (tmp_path / "raw.spill").exists()
+        assert [e.src_path for e in await drain(queue)] == [modified(i).src_path for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_overflow_spills_and_replays_in_order(self, tmp_path):
+        """maxsize를 넘는 이벤트는 스필되고 FIFO 순서로 모두 재생됨"""
+        queue = SpillQueue("raw", 4, tmp_path)
+        for i in range(20):
+            queue.put_nowait(modified(i))
+
+        assert queue.qsize() == 20
+        assert queue.spilled == 16
+        assert queue._queue.qsize() == 4
+
+        events = await drain(queue)
+
+        assert events == [modified(i) for i in range(20)]
+        assert queue.spilled == 0
+        assert (tmp_path / "raw.spill").stat().st_size == 0
+
+    @pytest.mark.asyncio
+    async def test_new_events_follow_spilled_events(self, tmp_path):
+        """스필 중에 들어온 이벤트는 스필된 이벤트 뒤에 전달됨"""
+        queue = SpillQueue("raw", 2, tmp_path)
+        for i in range(5):
+            queue.put_nowait(modified(i))
+
+        first = await queue.get()
+        await queue.put(modified(5))
+
+        assert first == modified(0)
+        assert await drain(queue) == [modified(i) for i in range(1, 6)]
+
+    @pytest.mark.asyncio
+    async def test_get_waits_for_event(self, tmp_path):
+        """빈 큐의 get은 이벤트가 들어올 때까지 대기"""
+        queue = SpillQueue("raw", 2, tmp_path)
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+
+        queue.put_nowait(modified(1))
+
+        assert await asyncio.wait_for(getter, 1) == modified(1)
+
+    @pytest.mark.asyncio
+    async def test_unreplayed_events_recovered_after_restart(self, tmp_path):
+        """재생되지 않은 스필 이벤트는 재시작 후 중복 없이 재생됨"""
+        queue = SpillQueue("processed", 2, tmp_path)
+        for i in range(10):
+            queue.put_nowait(modified(i))
+        consumed = [await queue.get() for _ in range(3)]
+        queue.close()
+
+        restarted = SpillQueue("processed", 2, tmp_path)
+
+        # 메모리 큐에 있던 이벤트(종료 시 유실)를 제외한 나머지가 순서대로 복구됨
+        recovered = await drain(restarted)
+        assert consumed == [modified(i) for i in range(3)]
+        assert recovered == [modified(i) for i in range(5, 10)]
+
+    @pytest.mark.asyncio
+    async def test_spilled_events_survive_crash_without_close(self, tmp_path):
+        """close() 없이 프로세스가 종료되어도 스필한 이벤트는 재시작 후 복구됨"""
+        queue = SpillQueue("raw", 1, tmp_path)
+        for i in range(4):
+            queue.put_nowait(modified(i))
+
+        restarted = SpillQueue("raw", 1, tmp_path)
+
+        assert await drain(restarted) == [modified(i) for i in range(1, 4)]
+        queue._close_handles()
+
+    @pytest.mark.asyncio
+    async def test_torn_spill_record_is_discarded(self, tmp_path):
+        """비정상 종료로 잘린 마지막 레코드는 버리고 이후 기록과 섞이지 않음"""
+        (tmp_path / "raw.spill").write_bytes(encode_event(modified(1)) + b'{"t":"modi')
+
+        queue = SpillQueue("raw", 1, tmp_path)
+        queue.put_nowait(modified(2))
+
+        assert await drain(queue) == [modified(1), modified(2)]
+
+    @pytest.mark.asyncio
+    async def test_orphaned_shard_spills_move_to_target(self, tmp_path):
+        """샤드 수를 줄여 사라진 샤드의 스필 이벤트는 대상 큐로 순서대로 옮겨지고 파일은 삭제됨"""
+        for shard in range(3):
+            queue = SpillQueue(f"shard-{shard}", 1, tmp_path)
+            for i in range(3):
+                queue.put_nowait(modified(shard * 10 + i))
+            queue.close()
+        active = SpillQueue("shard-0", 1, tmp_path)
+        processed = SpillQueue("processed", 2, tmp_path)
+
+        moved = recover_orphaned_spills(tmp_path, "shard-", {active.name}, processed)
+
+        assert moved == 4
+        assert await drain(processed) == [modified(11), modified(12), modified(21), modified(22)]
+        assert sorted(p.name for p in tmp_path.glob("shard-*")) == ["shard-0.spill"]
+        assert await drain(active) == [modified(1), modified(2)]
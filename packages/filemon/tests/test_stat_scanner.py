@@ -0,0 +1,102 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+
+from app.source_path_filter import PathFilter
+from app.stat_scanner import StatScanner
+
+
+@pytest.fixture
+def watch_root(tmp_path, mocker):
+    """tmp_path를 WATCH_ROOT로 사용하는 과제 디렉토리 구조"""
+    root = tmp_path / "codes"
+    (root / "os-1-202012345" / "hw1").mkdir(parents=True)
+    (root / "os-1-202012345" / "hw1" / "main.c").write_text("int main() {}")
+    mock_settings = MagicMock()
+    mock_settings.WATCH_ROOT = root
+    mocker.patch('app.source_path_filter.settings', mock_settings)
+    return root
+
+
+@pytest.fixture
+def scanner(watch_root, tmp_path):
+    scanner = StatScanner(watch_root, PathFilter(), index_path=tmp_path / "index.json",
+                          min_interval=1, max_interval=8)
+    scanner.load_index()
+    scanner.build_baseline()
+    return scanner
+
+
+def scan_all(scanner):
+    """모든 디렉토리를 즉시 스캔"""
+    events, _ = scanner.scan_due(now=float("inf"))
+    return sorted((e.event_type, os.path.basename(e.src_path)) for e in events)
+
+
+def touch(path, content):
+    """같은 초 안의 변경도 감지되도록 mtime을 명시적으로 변경"""
+    path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_baseline_emits_no_events(scanner):
+    assert scan_all(scanner) == []
+
+
+def test_detects_modified_file(scanner, watch_root):
+    touch(watch_root / "os-1-202012345" / "hw1" / "main.c", "int main() { return 0; }")
+
+    assert scan_all(scanner) == [("modified", "main.c")]
+    assert scan_all(scanner) == []
+
+
+def test_detects_created_and_deleted_files(scanner, watch_root):
+    hw_dir = watch_root / "os-1-202012345" / "hw1"
+    (hw_dir / "main.c").unlink()
+    (hw_dir / "util.c").write_text("void f() {}")
+    (hw_dir / "notes.txt").write_text("무시되는 확장자")
+
+    assert scan_all(scanner) == [("deleted", "main.c"), ("modified", "util.c")]
+
+
+def test_detects_files_in_new_directory(scanner, watch_root):
+    src_dir = watch_root / "os-1-202012345" / "hw2" / "src"
+    src_dir.mkdir(parents=True)
+    (src_dir / "a.py").write_text("print(1)")
+
+    # 새 디렉토리는 발견된 다음 스캔에서 목록을 읽음
+    events = scan_all(scanner) + scan_all(scanner) + scan_all(scanner)
+    assert events == [("modified", "a.py")]
+
+
+def test_ignored_directories_are_not_tracked(scanner, watch_root):
+    venv_dir = watch_root / "os-1-202012345" / "hw1" / ".venv"
+    venv_dir.mkdir()
+    (venv_dir / "site.py").write_text("x = 1")
+    scan_all(scanner)
+    scan_all(scanner)
+
+    assert str(venv_dir) not in scanner._dirs
+
+
+def test_index_detects_changes_while_stopped(scanner, watch_root, tmp_path):
+    scanner.save_index()
+    touch(watch_root / "os-1-202012345" / "hw1" / "main.c", "changed while stopped")
+
+    restarted = StatScanner(watch_root, PathFilter(), index_path=tmp_path / "index.json")
+    assert restarted.load_index() is True
+    assert scan_all(restarted) == [("modified", "main.c")]
+
+
+def test_idle_directories_back_off(scanner, watch_root):
+    hw_dir = str(watch_root / "os-1-202012345" / "hw1")
+    scan_all(scanner)
+    first = scanner._dirs[hw_dir].interval
+    scan_all(scanner)
+
+    assert scanner._dirs[hw_dir].interval == min(first * 2, scanner.max_interval)
+
+    touch(watch_root / "os-1-202012345" / "hw1" / "main.c", "changed")
+    scan_all(scanner)
+    assert scanner._dirs[hw_dir].interval == scanner.min_interval
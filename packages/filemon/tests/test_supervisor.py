@@ -0,0 +1,55 @@
+import sys
+import time
+
+from app.partition import WorkerPartition
+from app.source_path_filter import PathFilter
+from app.supervisor import Supervisor
+
+
+def crash(index, count):
+    sys.exit(3)
+
+
+def test_partitions_cover_each_student_exactly_once():
+    students = [f"os-{i % 3 + 1}-2024{i:05d}" for i in range(300)]
+    partitions = [WorkerPartition(index, 4) for index in range(4)]
+
+    owners = [[p.index for p in partitions if p.owns(student)] for student in students]
+
+    assert all(len(owner) == 1 for owner in owners)
+    assert {owner[0] for owner in owners} == {0, 1, 2, 3}
+
+
+def test_path_filter_skips_other_workers_students(mocker):
+    mocker.patch('app.source_path_filter.settings.WATCH_ROOT', "/watch")
+    partition = WorkerPartition(0, 2)
+    mine = next(f"os-1-2024{i:05d}" for i in range(100) if partition.owns(f"os-1-2024{i:05d}"))
+    other = next(f"os-1-2024{i:05d}" for i in range(100) if not partition.owns(f"os-1-2024{i:05d}"))
+    path_filter = PathFilter(partition=partition)
+
+    assert path_filter.should_descend(f"/watch/{mine}")
+    assert path_filter.should_process(f"/watch/{mine}/hw1/main.c")
+    assert not path_filter.should_descend(f"/watch/{other}")
+    assert not path_filter.should_process(f"/watch/{other}/hw1/main.c")
+    assert PathFilter().should_process(f"/watch/{other}/hw1/main.c")
+
+
+def test_crashed_worker_is_restarted(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)  # 테스트 후 환경 변수 복원
+    supervisor = Supervisor(1, tmp_path / "prometheus", metrics_port=0, target=crash)
+    supervisor._prepare_metrics_dir()
+    supervisor._start(0)
+    first_pid = supervisor._processes[0].pid
+
+    deadline = time.monotonic() + 30
+    while 0 not in supervisor._restart_at and time.monotonic() < deadline:
+        supervisor._supervise_once(timeout=0.5)
+    assert supervisor._restart_at[0] > time.monotonic() - 1
+
+    supervisor._restart_at[0] = 0
+    supervisor._supervise_once(timeout=0)
+    try:
+        assert supervisor._processes[0].pid != first_pid
+        assert supervisor._backoff[0] == 2.0
+    finally:
+        supervisor._stop_all()
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from watchdog.events import FileModifiedEvent
+
+from app.spill_queue import SpillQueue
+from app.tasks import shard_for, run_pipeline_router, run_main_pipeline, wait_for_shutdown, ShutdownRequested
+
+
+class TestPipelineSharding:
+    """파이프라인 샤딩 테스트"""
+
+    def test_shard_for_is_stable(self):
+        """같은 경로는 항상 같은 샤드로 분배"""
+        path = "/watcher/codes/os-1-202012345/hw1/main.c"
+
+        assert shard_for(path, 4) == shard_for(path, 4)
+        assert 0 <= shard_for(path, 4) < 4
+
+    def test_shard_for_spreads_paths(self):
+        """여러 파일은 여러 샤드에 고르게 분배"""
+        shards = {shard_for(f"/watcher/codes/os-1-2020{i:05d}/hw1/main.c", 4) for i in range(100)}
+
+        assert shards == {0, 1, 2, 3}
+
+    @pytest.mark.asyncio
+    async def test_router_keeps_per_file_order(self):
+        """같은 파일의 이벤트는 같은 샤드 큐에 도착 순서대로 전달"""
+        processed_queue = asyncio.Queue()
+        shard_queues = [asyncio.Queue() for _ in range(4)]
+        events = [FileModifiedEvent(f"/codes/file_{i % 3}.c") for i in range(9)]
+        for event in events:
+            processed_queue.put_nowait(event)
+
+        router = asyncio.create_task(run_pipeline_router(processed_queue, shard_queues))
+        await asyncio.sleep(0.01)
+        router.cancel()
+
+        for i in range(3):
+            path = f"/codes/file_{i}.c"
+            shard_queue = shard_queues[shard_for(path, 4)]
+            routed = [e for e in shard_queue._queue if e.src_path == path]
+            assert routed == [e for e in events if e.src_path == path]
+
+    @pytest.mark.asyncio
+    async def test_full_shard_does_not_block_router(self, tmp_path):
+        """한 샤드 큐가 가득 차도 라우터는 대기하지 않고 스필하여 다른 샤드로 계속 분배"""
+        processed_queue = asyncio.Queue()
+        shard_queues = [SpillQueue(f"shard-{i}", 1, tmp_path) for i in range(2)]
+        busy = next(f"/codes/busy_{i}.c" for i in range(100) if shard_for(f"/codes/busy_{i}.c", 2) == 0)
+        idle = next(f"/codes/idle_{i}.c" for i in range(100) if shard_for(f"/codes/idle_{i}.c", 2) == 1)
+        for _ in range(5):
+            processed_queue.put_nowait(FileModifiedEvent(busy))
+        processed_queue.put_nowait(FileModifiedEvent(idle))
+
+        router = asyncio.create_task(run_pipeline_router(processed_queue, shard_queues))
+        await asyncio.sleep(0.01)
+        router.cancel()
+
+        assert processed_queue.empty()
+        assert shard_queues[0].qsize() == 5 and shard_queues[0].spilled == 4
+        assert (await shard_queues[1].get()).src_path == idle
+        assert [(await shard_queues[0].get()).src_path for _ in range(5)] == [busy] * 5
+        for shard_queue in shard_queues:
+            shard_queue.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_file_does_not_block_other_shards(self):
+        """한 샤드의 느린 처리가 다른 샤드의 처리를 막지 않음"""
+        shard_queues = [asyncio.Queue() for _ in range(2)]
+        done = []
+        release = asyncio.Event()
+
+        class Pipeline:
+            async def process_event(self, event):
+                if event.src_path == "slow":
+                    await release.wait()
+                done.append(event.src_path)
+
+        workers = [asyncio.create_task(run_main_pipeline(q, Pipeline())) for q in shard_queues]
+        shard_queues[0].put_nowait(FileModifiedEvent("slow"))
+        shard_queues[1].put_nowait(FileModifiedEvent("fast"))
+        await asyncio.sleep(0.01)
+
+        assert done == ["fast"]
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert done == ["fast", "slow"]
+        for worker in workers:
+            worker.cancel()
+
+
+class TestShutdown:
+    """종료 시그널 처리 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_stop_event_cancels_task_group(self):
+        """stop_event가 설정되면 실행 중인 작업이 오류 없이 취소되고 TaskGroup이 끝남"""
+        stop_event = asyncio.Event()
+        cancelled = []
+
+        async def forever():
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(wait_for_shutdown(stop_event))
+                tg.create_task(forever())
+
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.01)
+        stop_event.set()
+
+        with pytest.raises(ExceptionGroup) as exc_info:
+            await asyncio.wait_for(task, 1)
+        assert exc_info.group_contains(ShutdownRequested)
+        assert cancelled == [True]
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+from watchdog.events import FileModifiedEvent
+
+from app.spill_queue import SpillQueue, encode_event, decode_event
+from app.tracing import start_trace, get_trace, mark, finish_trace, update_oldest_age
+
+
+def stage_count(stage):
+    return REGISTRY.get_sample_value("pipeline_stage_duration_seconds_count", {"stage": stage}) or 0
+
+
+def end_to_end_count():
+    return REGISTRY.get_sample_value("edit_to_registered_seconds_count") or 0
+
+
+def test_finish_trace_records_each_stage():
+    event = start_trace(FileModifiedEvent("/watch/os-1-202012345/hw1/main.c"), received=100.0)
+    for stage in ("flushed", "started", "read", "snapshot"):
+        mark(event, stage)
+    before = {stage: stage_count(stage) for stage in ("debounce", "queue", "read", "snapshot", "register")}
+    before_e2e = end_to_end_count()
+
+    finish_trace(event)
+
+    for stage, count in before.items():
+        assert stage_count(stage) == count + 1
+    assert end_to_end_count() == before_e2e + 1
+    assert get_trace(event).registered is not None
+
+
+def test_untraced_event_is_ignored():
+    event = FileModifiedEvent("/watch/os-1-202012345/hw1/main.c")
+    before_e2e = end_to_end_count()
+
+    mark(event, "flushed")
+    finish_trace(event)
+
+    assert get_trace(event) is None
+    assert end_to_end_count() == before_e2e
+
+
+def test_trace_survives_spill_encoding():
+    event = start_trace(FileModifiedEvent("/watch/os-1-202012345/hw1/main.c"), received=123.5)
+    mark(event, "flushed")
+
+    restored = decode_event(encode_event(event))
+
+    assert get_trace(restored).received == 123.5
+    assert get_trace(restored).flushed == get_trace(event).flushed
+
+
+@pytest.mark.asyncio
+async def test_oldest_age_for_asyncio_and_spill_queues(tmp_path):
+    queue = asyncio.Queue()
+    spill_queue = SpillQueue("raw", 10, tmp_path)
+    for q in (queue, spill_queue):
+        q.put_nowait(start_trace(FileModifiedEvent("/a.c"), received=90.0))
+        q.put_nowait(start_trace(FileModifiedEvent("/b.c"), received=95.0))
+
+    update_oldest_age("test-asyncio", queue, now=100.0)
+    update_oldest_age("test-spill", spill_queue, now=100.0)
+    update_oldest_age("test-empty", asyncio.Queue(), now=100.0)
+
+    sample = lambda name: REGISTRY.get_sample_value("queue_oldest_event_age_seconds", {"queue": name})
+    assert sample("test-asyncio") == 10.0
+    assert sample("test-spill") == 10.0
+    assert sample("test-empty") == 0.0
+    spill_queue.close()
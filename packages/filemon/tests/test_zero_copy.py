@@ -0,0 +1,92 @@
+import errno
+import os
+import pytest
+
+from app import zero_copy
+from app.content_cache import ContentFingerprint
+from app.zero_copy import copy_verified, digest_file
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "main.c"
+    path.write_bytes(b"int main() { return 0; }\n" * 5000)
+    return path
+
+
+def unsupported(*args, **kwargs):
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+
+def test_copies_content_and_digest(source, tmp_path):
+    dst = tmp_path / "snapshot.c"
+
+    result = copy_verified(str(source), str(dst), with_digest=True)
+
+    data = source.read_bytes()
+    assert dst.read_bytes() == data
+    assert result.size == len(data)
+    assert result.digest == ContentFingerprint.from_data(result.file_stat, data).digest
+
+
+def test_digest_is_optional(source, tmp_path):
+    result = copy_verified(str(source), str(tmp_path / "snapshot.c"))
+
+    assert result.digest is None
+
+
+def test_falls_back_to_sendfile(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "copy_file_range", unsupported)
+    dst = tmp_path / "snapshot.c"
+
+    copy_verified(str(source), str(dst))
+
+    assert dst.read_bytes() == source.read_bytes()
+
+
+def test_falls_back_to_read_write(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "copy_file_range", unsupported)
+    monkeypatch.setattr(os, "sendfile", unsupported)
+    dst = tmp_path / "snapshot.c"
+
+    copy_verified(str(source), str(dst))
+
+    assert dst.read_bytes() == source.read_bytes()
+
+
+def test_change_during_copy_removes_snapshot(source, tmp_path, monkeypatch):
+    original_copy = zero_copy._kernel_copy
+
+    def copy_then_append(src_fd, dst_fd, count):
+        copied = original_copy(src_fd, dst_fd, count)
+        with open(source, "ab") as f:
+            f.write(b"// edited while copying\n")
+        return copied
+
+    monkeypatch.setattr(zero_copy, "_kernel_copy", copy_then_append)
+    dst = tmp_path / "snapshot.c"
+
+    with pytest.raises(RuntimeError):
+        copy_verified(str(source), str(dst))
+    assert not dst.exists()
+
+
+def test_copy_error_removes_snapshot(source, tmp_path, monkeypatch):
+    def io_error(*args, **kwargs):
+        raise OSError(errno.EIO, os.strerror(errno.EIO))
+
+    monkeypatch.setattr(os, "copy_file_range", io_error, raising=False)
+    dst = tmp_path / ".snapshot.c.tmp"
+
+    with pytest.raises(OSError):
+        copy_verified(str(source), str(dst))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["main.c"]
+
+
+def test_digest_file_matches_copy_digest_without_writing(source, tmp_path):
+    copied = copy_verified(str(source), str(tmp_path / "snapshot.c"), with_digest=True)
+
+    hashed = digest_file(str(source))
+
+    assert (hashed.size, hashed.digest) == (copied.size, copied.digest)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["main.c", "snapshot.c"]
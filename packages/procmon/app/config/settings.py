@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     LOG_FILE_PATH: str = "/opt/procmon/logs/procmon.log"
     LOG_MAX_BYTES: int = 10 * 1024 * 1024  # 10MB
     LOG_BACKUP_COUNT: int = 0 # 무제한
+    LOG_SAMPLE_RATE: int = 10  # 같은 INFO 메시지를 초당 최대 N개만 기록 (0이면 샘플링 안 함)
 
 
 # 설정 객체 인스턴스화
@@ -23,6 +23,7 @@ async def main():
         log_level=settings.LOG_LEVEL,
         max_bytes=settings.LOG_MAX_BYTES,
         backup_count=settings.LOG_BACKUP_COUNT,
+        sample_rate=settings.LOG_SAMPLE_RATE,
     )
     logger = get_logger("main")
 
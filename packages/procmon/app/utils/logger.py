@@ -1,27 +1,94 @@
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import structlog
 import structlog.contextvars as ctx
 
+try:
+    import orjson  # 선택 의존성: 설치되어 있으면 JSON 렌더링에 사용
+except ImportError:
+    orjson = None
+
 
 # 우리 앱 전용 최상위 로거 네임스페이스
 APP_LOGGER_NAME = "procmon"
 
 
+# 렌더링과 파일 I/O를 처리하는 백그라운드 리스너 (setup_logging에서 생성)
+_listener = None
+
+
+class RateSampler:
+    """
+    같은 메시지(event)의 INFO 이하 로그를 1초 구간마다 max_per_second개까지만 통과시키는 structlog 프로세서.
+    WARNING 이상은 항상 기록하며, 버려진 로그 수는 다음 구간의 첫 로그에 sampled_out으로 남깁니다.
+    """
+
+    _SAMPLED_METHODS = frozenset({"debug", "info"})
+
+    def __init__(self, max_per_second: int, clock=time.monotonic):
+        self.max_per_second = max_per_second
+        self._clock = clock
+        self._windows = {}  # event -> [구간 시작 시각, 통과 수, 버린 수]
+        self._lock = threading.Lock()
+
+    def __call__(self, logger, method_name, event_dict):
+        if self.max_per_second <= 0 or method_name not in self._SAMPLED_METHODS:
+            return event_dict
+
+        key = event_dict.get("event")
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 1.0:
+                dropped = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if dropped:
+                    event_dict["sampled_out"] = dropped
+                return event_dict
+            if window[1] < self.max_per_second:
+                window[1] += 1
+                return event_dict
+            window[2] += 1
+        raise structlog.DropEvent
+
+
+def _dumps(obj, default=str, **kwargs) -> str:
+    """JSON 직렬화 (orjson이 있으면 사용, 없으면 공백 없는 표준 json)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=default).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """레코드를 포맷하지 않고 그대로 큐에 넣어 렌더링까지 리스너 스레드에서 처리하도록 함"""
+
+    def prepare(self, record):
+        return record
+
+
 def setup_logging(
     log_file_path: str,
     log_level: str,
     max_bytes: int,
     backup_count: int,
+    sample_rate: int = 0,
 ):
     """
     structlog와 contextvars를 활용한 간결하고 Pythonic한 로깅 설정.
     - 콘솔: 가독성 좋은 컬러 출력
     - 파일: 구조화된 JSON 출력 (RotatingFileHandler 사용)
     - contextvars: 요청/작업 컨텍스트 자동 병합
+    - 렌더링과 파일 쓰기는 QueueListener 스레드에서 처리하여 이벤트 루프를 막지 않음
+    - sample_rate > 0이면 같은 INFO 메시지를 초당 sample_rate개까지만 기록
     """
+    global _listener
     # 1. 로그 파일 디렉토리 생성 및 동적 경로 설정
     log_dir = os.path.dirname(log_file_path)
     os.makedirs(log_dir, exist_ok=True)
@@ -41,17 +108,23 @@ def setup_logging(
     app_logger.setLevel(log_level)
     app_logger.propagate = False  # 루트 로거로 전파 방지
 
+    # 다시 설정하는 경우 이전 리스너를 멈추고 핸들러를 교체
+    if _listener is not None:
+        _listener.stop()
+    for handler in list(app_logger.handlers):
+        app_logger.removeHandler(handler)
+        handler.close()
+
     # 2.1. 콘솔 핸들러 설정 (가독성 좋은 컬러 출력)
     console_formatter = structlog.stdlib.ProcessorFormatter(
         processor=structlog.dev.ConsoleRenderer(colors=True),
     )
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(console_formatter)
-    app_logger.addHandler(console_handler)
 
     # 2.2. 파일 핸들러 설정 (구조화된 JSON 출력, 용량 기반 로테이션)
     file_formatter = structlog.stdlib.ProcessorFormatter(
-        processor=structlog.processors.JSONRenderer(ensure_ascii=False),
+        processor=structlog.processors.JSONRenderer(serializer=_dumps),
     )
 
     file_handler = RotatingFileHandler(
@@ -61,15 +134,22 @@ def setup_logging(
         encoding="utf-8",
     )
     file_handler.setFormatter(file_formatter)
-    app_logger.addHandler(file_handler)
+
+    # 2.3. 호출 스레드는 레코드를 큐에 넣기만 하고, 렌더링과 I/O는 리스너 스레드가 처리
+    log_queue = queue.SimpleQueue()
+    app_logger.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
 
     # 3. structlog 설정
     structlog.configure(
         processors=[
+            # 기록되지 않을 로그는 다른 처리 전에 먼저 걸러냄
+            structlog.stdlib.filter_by_level,
+            RateSampler(sample_rate),
             ctx.merge_contextvars,
             structlog.stdlib.add_log_level,
             structlog.stdlib.add_logger_name,
-            structlog.stdlib.filter_by_level,
             structlog.processors.TimeStamper(fmt="iso", utc=True),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
@@ -81,6 +161,17 @@ def setup_logging(
     )
 
 
+def shutdown_logging():
+    """큐에 남은 로그를 모두 기록하고 리스너 스레드를 종료합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str):
     """애플리케이션 네임스페이스에 맞는 structlog 로거를 가져옵니다."""
     full_name = f"{APP_LOGGER_NAME}.{name}"